@@ -0,0 +1,38 @@
+"""Retail sevkiyat planlama çekirdeği - arayüzden bağımsız hesaplama fonksiyonları"""
+from .tanimlar import VARSAYILAN_ARALIKLAR, DURUMLAR, VERI_TANIMLARI, DOSYA_UZANTILARI, dosya_eslestir
+from .cekirdek import (
+    segment_etiketleri,
+    segmentle,
+    segmentleri_sirala,
+    veri_parmak_izi,
+    parametre_anahtari,
+    veri_ozeti,
+    segmentasyon_uygula,
+    varsayilan_siralama,
+    varsayilan_matrisler,
+    varsayilan_cover_matrisi,
+    yeni_urunleri_tespit_et,
+    matris_degerleri,
+    ihtiyac_hesapla,
+    depo_tahsis_et,
+    sevkiyat_hazirla,
+    yasak_ekle,
+    depo_sevkiyati,
+    talepleri_tahsis_et,
+    sevkiyat_hesapla,
+    alim_siparis_hesapla,
+    master_data_olustur,
+)
+from .motor import MOTORLAR, kullanilabilir_motorlar, birlestir, grupla
+from .paralel import depo_bazinda_hesapla
+from .akis import HesaplamaAkisi
+from .senaryo import senaryolari_hesapla, carpanlarla_senaryolar
+from .parcali import parcali_sevkiyat_hesapla
+from .okuma import csv_oku, veri_oku, kolonlari_kontrol_et, dosyalari_oku, parcali_oku
+from .kodlama import KOD_KOLONLARI, kod_sozlugu_olustur, kodla, kodlari_esitle
+from .isler import ArkaPlanIsi, IsIptalEdildi
+from .olcum import Olcum, olcum_gunlugu, olcum_gunlugune_yaz
+from .kup import SevkiyatKupu, kup_olustur
+from .harita import il_haritasi, il_koordinatlari
+from .tablo import tablo_suz, tablo_sayfasi, sayfa_sayisi, disa_aktar
+from .ornek_veri import OLCEKLER, ornek_veri_olustur, ornek_veri_yaz
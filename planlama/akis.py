@@ -0,0 +1,236 @@
+"""Sevkiyat hesaplamasının aşama grafiği (DAG) ve aşama bazında önbellek.
+
+Her aşamanın anahtarı, aşamanın kendi girdilerinin (veri, matris, parametre) özeti ile
+bağlı olduğu önceki aşamaların anahtarlarından oluşur. Anahtarı değişmeyen aşama tekrar
+çalışmaz, önceki çıktısı kullanılır; böylece sadece değişen girdinin aşağısındaki
+aşamalar hesaplanır:
+
+    yeni_urun ──────────────────────────────────────┐
+    segmentasyon → kpi → depo_eslestirme → matris → ihtiyac → yasak → tahsis → sonuc
+         └→ siralama (varsayılan) ───────────────────┘
+                                                  (paralel modda ihtiyac+yasak+tahsis tek aşama)
+
+Polars motorunda hesaplamanın tamamı tek sorgu olduğundan tek aşamadır ('polars').
+
+Aşama anahtarları çıktılara bağlı olmadığından önce hepsi hesaplanır; sonra sonuçtan geriye
+doğru sadece gereken aşamalar çalışır. Bellekte sadece SAKLANAN_ASAMALAR'ın son çıktısı
+tutulur, anlık verinin genişletilmiş ara kopyaları tutulmaz: depo eşleştirmesi (matris
+düzenlemelerinde segmentasyon, KPI ve depo birleştirmeleri atlanır), küçük yeni ürün ve
+sıralama çıktıları ve sonuç tablosu (uygulamadaki sevkiyat_sonuc ile aynı nesne). Saklanmayan
+bir aşamanın çıktısı gerekirse saklanan en yakın önceki aşamadan yeniden hesaplanır.
+
+Depo eşleştirmesi matrislerden önce yapılır (sevkiyat_hazirla'da sonradır); satır sırası
+ve sonuç aynıdır. Girdi DataFrame'leri yerinde değiştirilmemelidir (uygulamada paylaşılan
+veriler salt okunurdur); bu verilerin özetleri nesne başına bir kez hesaplanır. Arayüzde
+düzenlenen matris ve sıralama tabloları küçüktür ve her hesaplamada yeniden özetlenir.
+
+Her hesaplanan aşama Olcum ile ölçülür (süre, CPU, tepe bellek artışı, girdi/çıktı satır sayısı).
+"""
+import hashlib
+import weakref
+
+import pandas as pd
+
+from .cekirdek import (
+    depo_eslestir, ihtiyac_hesapla, kpi_ekle, matrisleri_uygula, parametre_anahtari,
+    segmentasyon_uygula, sonuc_tablosu, talepleri_tahsis_et, varsayilan_matrisler,
+    varsayilan_siralama, veri_parmak_izi, yasak_uygula, yeni_urunleri_tespit_et
+)
+from .kodlama import KOD_KOLONLARI, kodlari_esitle
+from .olcum import Olcum, satir_sayisi
+from .tanimlar import VARSAYILAN_ARALIKLAR
+
+# Çıktısı hesaplamalar arasında saklanan aşamalar
+SAKLANAN_ASAMALAR = ('yeni_urun', 'siralama', 'depo_eslestirme', 'sonuc', 'polars')
+
+
+def _anahtar(*parcalar):
+    return hashlib.blake2b(repr(parcalar).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _varsayilan_siralama(segmentasyon):
+    """Segmentasyon çıktısındaki ürün/mağaza segmentleri için varsayılan sıralama"""
+    _, urun_agg, magaza_agg = segmentasyon
+    prod_segments = sorted([str(x) for x in urun_agg['segment'].unique() if pd.notna(x)])
+    store_segments = sorted([str(x) for x in magaza_agg['segment'].unique() if pd.notna(x)])
+    return varsayilan_siralama(prod_segments, store_segments)
+
+
+class HesaplamaAkisi:
+    """sevkiyat_hesapla ile aynı sonucu veren, aşama çıktılarını saklayan hesaplama.
+
+    Sadece SAKLANAN_ASAMALAR'ın son çıktısı tutulur. son_calisma: son hesaplamada kullanılan her
+    aşamanın {'Aşama', 'Durum' ('hesaplandı'/'önbellek'), 'Süre (sn)', 'CPU (sn)', 'Tepe Bellek Δ (MB)',
+    'Girdi Satır', 'Çıktı Satır'} kaydı; sonraki aşama önbellekten geldiği için gerekmeyenler listelenmez.
+    """
+
+    def __init__(self):
+        self._onbellek = {}
+        self._izler = {}
+        self.son_calisma = []
+
+    def temizle(self):
+        """Saklanan aşama çıktılarını bırakır"""
+        self._onbellek.clear()
+        self._izler.clear()
+        self.son_calisma = []
+
+    # ---- özetler ----
+    def _iz(self, df, indeksli=False, sabit=True):
+        """DataFrame içerik özeti.
+
+        sabit: yerinde değiştirilmeyen (paylaşılan, salt okunur) veri; özeti nesne başına bir kez
+        hesaplanır. Düzenlenebilen küçük tablolar (matrisler, sıralama) sabit=False ile her seferinde özetlenir.
+        """
+        if df is None:
+            return None
+        if not sabit:
+            return veri_parmak_izi(df.reset_index() if indeksli else df)
+        kayit = self._izler.get(id(df))
+        if kayit is not None and kayit[0]() is df:
+            return kayit[1]
+        iz = veri_parmak_izi(df.reset_index() if indeksli else df)
+        self._izler = {k: v for k, v in self._izler.items() if v[0]() is not None}
+        self._izler[id(df)] = (weakref.ref(df), iz)
+        return iz
+
+    def _calistir(self, asamalar, ad, sonuclar, ilerleme):
+        """ad aşamasının çıktısı: anahtarı değişmemiş saklı çıktı veya önceki aşamalarla hesaplanan.
+
+        asamalar: {ad: (anahtar, önceki aşama adları, fonksiyon(*önceki çıktılar), (yüzde, mesaj) veya None,
+        girdi)}; girdi verilmezse ilk önceki aşamanın çıktısı satır sayısı raporlanan girdidir.
+        sonuclar: bu hesaplamada alınmış çıktılar (her aşama bir kez çalışır).
+        """
+        if ad in sonuclar:
+            return sonuclar[ad]
+        anahtar, oncekiler, fonksiyon, mesaj, girdi = asamalar[ad]
+        kayit = self._onbellek.get(ad)
+        if kayit is not None and kayit[0] == anahtar:
+            with Olcum() as olcum:
+                sonuc = kayit[1]
+            durum, girdi = 'önbellek', None
+        else:
+            degerler = [self._calistir(asamalar, onceki, sonuclar, ilerleme) for onceki in oncekiler]
+            if girdi is None and degerler:
+                girdi = degerler[0]
+            if mesaj is not None:
+                ilerleme(*mesaj)
+            with Olcum() as olcum:
+                sonuc = fonksiyon(*degerler)
+            durum = 'hesaplandı'
+            if ad in SAKLANAN_ASAMALAR:
+                self._onbellek[ad] = (anahtar, sonuc)
+            else:
+                self._onbellek.pop(ad, None)
+        self.son_calisma.append({
+            'Aşama': ad, 'Durum': durum, **olcum.kayit(),
+            'Girdi Satır': satir_sayisi(girdi), 'Çıktı Satır': satir_sayisi(sonuc)
+        })
+        sonuclar[ad] = sonuc
+        return sonuc
+
+    # ---- hesaplama ----
+    def hesapla(self, urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+                yasak=None, segmentation_params=None, matrisler=None, siralama=None,
+                ilerleme=None, islem_sayisi=None, ozet=None, motor=None):
+        """Parametreler ve dönüş sevkiyat_hesapla ile aynıdır: (sevkiyat sonuç tablosu, yeni ürün listesi)
+
+        Motorlar aynı sonucu verdiği için motor aşama anahtarlarına girmez; Polars motoru
+        tüm girdilere bağlı tek aşama olarak çalışır.
+        """
+        if ilerleme is None:
+            ilerleme = lambda yuzde, mesaj: None
+        if segmentation_params is None:
+            segmentation_params = {'product_ranges': VARSAYILAN_ARALIKLAR, 'store_ranges': VARSAYILAN_ARALIKLAR}
+        matrisler = {**varsayilan_matrisler(), **{k: v for k, v in (matrisler or {}).items() if v is not None}}
+        self.son_calisma = []
+
+        # Girdi özetleri kodlama öncesi nesnelerden alınır; ortak kod sözlüğü ayrıca anahtara girer
+        iz = {
+            'urun_master': self._iz(urun_master),
+            'magaza_master': self._iz(magaza_master),
+            'depo_stok': self._iz(depo_stok),
+            'anlik_stok_satis': self._iz(anlik_stok_satis),
+            'kpi': self._iz(kpi),
+            'yasak': self._iz(yasak)
+        }
+        iz_matrisler = [(isim, self._iz(m, indeksli=True, sabit=False)) for isim, m in sorted(matrisler.items())]
+        urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak = kodlari_esitle(
+            urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak
+        )
+        sozluk = _anahtar(*[
+            tuple(anlik_stok_satis[k].cat.categories) if isinstance(anlik_stok_satis[k].dtype, pd.CategoricalDtype) else None
+            for k in KOD_KOLONLARI if k in anlik_stok_satis.columns
+        ])
+
+        if motor == 'polars':
+            from .polars_motoru import sevkiyat_hesapla as polars_sevkiyat_hesapla
+            k_polars = _anahtar(
+                'polars', sozluk, *[iz[k] for k in sorted(iz)], parametre_anahtari(segmentation_params),
+                *iz_matrisler, self._iz(siralama, sabit=False)
+            )
+            asamalar = {'polars': (k_polars, [], lambda: polars_sevkiyat_hesapla(
+                urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+                yasak=yasak, segmentation_params=segmentation_params, matrisler=matrisler, siralama=siralama,
+                ilerleme=ilerleme, ozet=ozet
+            ), None, anlik_stok_satis)}
+            return self._calistir(asamalar, 'polars', {}, ilerleme)
+
+        default_fc = kpi['forward_cover'].mean()
+
+        # Anahtarlar (çıktılardan bağımsız)
+        k_yeni = _anahtar('yeni_urun', sozluk, iz['anlik_stok_satis'], iz['depo_stok'])
+        k_seg = _anahtar('segmentasyon', sozluk, iz['anlik_stok_satis'], parametre_anahtari(segmentation_params))
+        k_kpi = _anahtar('kpi', k_seg, iz['urun_master'], iz['kpi'])
+        k_depo = _anahtar('depo_eslestirme', k_kpi, iz['magaza_master'])
+        k_matris = _anahtar('matris', k_depo, *iz_matrisler)
+        iz_siralama = ('varsayilan', k_seg) if siralama is None else self._iz(siralama, sabit=False)
+        k_siralama = _anahtar('siralama', iz_siralama)
+        k_ihtiyac = _anahtar('ihtiyac', k_matris, k_yeni, default_fc, iz_siralama)
+
+        asamalar = {
+            'yeni_urun': (k_yeni, [], lambda: yeni_urunleri_tespit_et(anlik_stok_satis, depo_stok, motor=motor),
+                          (10, "Yeni ürünler tespit ediliyor..."), anlik_stok_satis),
+            'segmentasyon': (k_seg, [], lambda: segmentasyon_uygula(anlik_stok_satis, segmentation_params, ozet=ozet, motor=motor),
+                             (25, "Segmentasyon yapılıyor..."), anlik_stok_satis),
+            'kpi': (k_kpi, ['segmentasyon'], lambda seg: kpi_ekle(seg[0], urun_master, kpi, motor=motor),
+                    (40, "KPI verileri hazırlanıyor..."), None),
+            'depo_eslestirme': (k_depo, ['kpi'], lambda df: depo_eslestir(df, magaza_master, motor=motor), None, None),
+            'matris': (k_matris, ['depo_eslestirme'], lambda df: matrisleri_uygula(df, matrisler),
+                       (55, "Matris değerleri uygulanıyor..."), None),
+            'siralama': (k_siralama, [] if siralama is not None else ['segmentasyon'],
+                         (lambda: siralama) if siralama is not None else _varsayilan_siralama, None, None)
+        }
+
+        if islem_sayisi is not None and islem_sayisi > 1:
+            from .paralel import depo_bazinda_hesapla
+            k_tahsis = _anahtar('depo_bazinda', k_ihtiyac, iz['yasak'], iz['depo_stok'])
+            asamalar['depo_bazinda'] = (k_tahsis, ['matris', 'yeni_urun', 'siralama'], lambda df, yeni, sira: depo_bazinda_hesapla(
+                {'anlik_df': df, 'yeni_urun_kodlari': yeni[0], 'default_fc': default_fc, 'siralama': sira},
+                depo_stok, yasak, islem_sayisi, ilerleme=ilerleme
+            ), (70, "Depo bazında hesaplanıyor..."), None)
+            tahsis = 'depo_bazinda'
+        else:
+            k_yasak = _anahtar('yasak', k_ihtiyac, iz['yasak'])
+            k_tahsis = _anahtar('tahsis', k_yasak, iz['depo_stok'])
+            asamalar.update({
+                'ihtiyac': (k_ihtiyac, ['matris', 'yeni_urun', 'siralama'], lambda df, yeni, sira: ihtiyac_hesapla(
+                    df, default_fc, yeni[0], sira, motor=motor
+                ), (70, "İhtiyaçlar hesaplanıyor..."), None),
+                'yasak': (k_yasak, ['ihtiyac'], lambda df: yasak_uygula(df, yasak, motor=motor),
+                          (85, "Yasak kontrolleri ve depo eşleştirme..."), None),
+                'tahsis': (k_tahsis, ['yasak'], lambda df: talepleri_tahsis_et(df, depo_stok),
+                           (95, "Depo stok kontrolleri yapılıyor..."), None)
+            })
+            tahsis = 'tahsis'
+
+        k_sonuc = _anahtar('sonuc', k_tahsis, iz['urun_master'], iz['magaza_master'])
+        asamalar['sonuc'] = (k_sonuc, [tahsis], lambda df: sonuc_tablosu(df, urun_master, magaza_master, motor=motor),
+                             None, None)
+
+        sonuclar = {}
+        result_final = self._calistir(asamalar, 'sonuc', sonuclar, ilerleme)
+        _, yeni_urun_listesi = self._calistir(asamalar, 'yeni_urun', sonuclar, ilerleme)
+
+        ilerleme(100, "Tamamlandı!")
+        return result_final, yeni_urun_listesi
@@ -0,0 +1,287 @@
+"""Sayfaların sıcak yollarının (hot path) süre ve bellek ölçümü.
+
+Her ölçek için sentetik veri (ornek_veri) üretilir, dosyaya yazılıp geri okunur ve şu
+adımlar ölçülür: veri yükleme ve kodlama, segmentasyon (veri_ozeti), Hesaplama aşamaları
+(HesaplamaAkisi ile aynı sıra) ve tek çağrıda toplamı, Alım Sipariş, Raporlar küpü ve
+İl haritası, Master Data oluşturma/dışa aktarma. Her adım için en iyi süre (tekrar sayısı kadar
+çalıştırılıp) ve tracemalloc ile ölçülen tepe bellek (ayrı bir çalıştırmada, süreyi
+etkilemesin diye; tracemalloc ölçümü yavaşlatır) raporlanır. Sonuç makinece okunabilir JSON'dur; zaman içindeki değişim izlenebilir.
+
+    python -m planlama.benchmark --olcekler kucuk orta buyuk --cikti benchmark.json [--motor duckdb]
+
+Not: tracemalloc Python ve numpy ayırmalarını görür; DuckDB/Polars/Arrow'un kendi
+bellekleri tepe bellekte görünmez (süreç tepe belleği ayrıca raporlanır).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .cekirdek import (
+    alim_siparis_hesapla, depo_eslestir, ihtiyac_hesapla, kpi_ekle, master_data_olustur, matrisleri_uygula,
+    segmentasyon_uygula, sevkiyat_hesapla, sonuc_tablosu, talepleri_tahsis_et, varsayilan_cover_matrisi,
+    varsayilan_matrisler, varsayilan_siralama, veri_ozeti, yasak_uygula, yeni_urunleri_tespit_et
+)
+from .kodlama import kodlari_esitle
+from .harita import harita_kullanilabilir, il_haritasi, il_koordinatlari
+from .kup import kup_olustur
+from .motor import MOTORLAR
+from .okuma import veri_oku
+from .ornek_veri import OLCEKLER, ornek_veri_olustur, ornek_veri_yaz
+from .tablo import disa_aktar
+from .tanimlar import VARSAYILAN_ARALIKLAR, VERI_TANIMLARI
+
+RAPOR_SURUMU = 1
+
+
+def _surec_tepe_bellegi_mb():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (RSS, MB); ölçülemiyorsa None"""
+    if resource is None:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return round(tepe / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+
+
+def adim_olc(ad, fonksiyon, tekrar=1, bellek=True):
+    """fonksiyon'u tekrar kez çalıştırıp en iyi süreyi, bellek=True ise ayrıca tepe belleği ölçer.
+
+    Dönüş: (son çalıştırmanın sonucu, {'adim', 'sure_sn', 'sureler_sn', 'tepe_bellek_mb'})
+    """
+    sureler = []
+    for _ in range(max(tekrar, 1)):
+        baslangic = time.perf_counter()
+        sonuc = fonksiyon()
+        sureler.append(time.perf_counter() - baslangic)
+
+    tepe = None
+    if bellek:
+        tracemalloc.start()
+        try:
+            sonuc = fonksiyon()
+            tepe = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 1)
+        finally:
+            tracemalloc.stop()
+
+    return sonuc, {
+        'adim': ad,
+        'sure_sn': round(min(sureler), 4),
+        'sureler_sn': [round(s, 4) for s in sureler],
+        'tepe_bellek_mb': tepe
+    }
+
+
+def _rapor_dilimleri(kup):
+    """Raporlar sayfasının küpten aldığı ürün, mağaza, il ve kayıp tabloları"""
+    urun, magaza = kup.seviye('urun_kod'), kup.seviye('magaza_kod')
+    return urun, magaza, kup.seviye('il'), urun[urun['kayip'] > 0], magaza[magaza['kayip'] > 0], kup.toplam()
+
+
+def _il_haritasi(kup):
+    """Raporlar sayfasının İl haritası: il merkezleri eklenir, 4 segmente ayrılıp çizilir.
+
+    Uygulamadaki gibi il kolonu kategoriktir (tipli okumada öyledir; burada garanti edilir).
+    """
+    il = kup.seviye('il')
+    il = il.assign(il=il['il'].astype('category'))
+    il[['lat', 'lon']] = il_koordinatlari(il['il'])
+    il = il[il['lat'].notna()]
+    il = il.assign(segment=pd.cut(il['sevkiyat'] / il['magaza_sayisi'], bins=4, labels=['1', '2', '3', '4']))
+    return il_haritasi(il, 'il', 'segment', {'1': 'red', '2': 'orange', '3': 'yellow', '4': 'green'},
+                       hover_kolonlari=['sevkiyat', 'magaza_sayisi'])
+
+
+def olcek_olc(ad, magaza_sayisi, urun_sayisi, depo_sayisi, kapsam=0.2, motor=None, tekrar=1, bellek=True,
+              bicim='parquet', seed=42, ilerleme=None):
+    """Tek ölçekte tüm adımları ölçer. Dönüş: rapordaki ölçek kaydı (dict)"""
+    if ilerleme is None:
+        ilerleme = lambda mesaj: None
+    olcumler = []
+
+    def olc(adim, fonksiyon):
+        ilerleme(f"{ad}: {adim}")
+        sonuc, olcum = adim_olc(adim, fonksiyon, tekrar=tekrar, bellek=bellek)
+        olcumler.append(olcum)
+        return sonuc
+
+    veriler = olc('veri_uretimi', lambda: ornek_veri_olustur(
+        magaza_sayisi=magaza_sayisi, urun_sayisi=urun_sayisi, depo_sayisi=depo_sayisi, kapsam=kapsam, seed=seed
+    ))
+    satirlar = {anahtar: len(df) for anahtar, df in veriler.items()}
+
+    # Veri Yükleme: dosyaya yazılıp şemayla geri okunur, kodlar ortak sözlüğe çevrilir
+    with tempfile.TemporaryDirectory(prefix='planlama_benchmark_') as dizin:
+        yollar = ornek_veri_yaz(veriler, dizin, bicim=bicim)
+        for anahtar, yol in yollar.items():
+            veriler[anahtar] = olc(f'veri_yukleme.{anahtar}', lambda yol=yol, anahtar=anahtar: veri_oku(
+                yol, VERI_TANIMLARI[anahtar]
+            ))
+    anahtarlar = list(veriler)
+    veriler = dict(zip(anahtarlar, olc('veri_yukleme.kodlama', lambda: kodlari_esitle(*veriler.values()))))
+
+    urun_master, magaza_master = veriler['urun_master'], veriler['magaza_master']
+    depo_stok, anlik, kpi, yasak = (
+        veriler['depo_stok'], veriler['anlik_stok_satis'], veriler['kpi'], veriler['yasak_master']
+    )
+    parametreler = {'product_ranges': VARSAYILAN_ARALIKLAR, 'store_ranges': VARSAYILAN_ARALIKLAR}
+
+    # Segmentasyon sayfası
+    ozet = olc('segmentasyon.veri_ozeti', lambda: veri_ozeti(anlik, parametreler, motor=motor))
+
+    # Hesaplama aşamaları (HesaplamaAkisi ile aynı sıra)
+    yeni_urun_kodlari, _ = olc('hesaplama.yeni_urun', lambda: yeni_urunleri_tespit_et(anlik, depo_stok, motor=motor))
+    anlik_df, urun_agg, magaza_agg = olc('hesaplama.segmentasyon', lambda: segmentasyon_uygula(
+        anlik, parametreler, ozet=ozet, motor=motor
+    ))
+    anlik_df = olc('hesaplama.kpi', lambda: kpi_ekle(anlik_df, urun_master, kpi, motor=motor))
+    anlik_df = olc('hesaplama.depo_eslestirme', lambda: depo_eslestir(anlik_df, magaza_master, motor=motor))
+    anlik_df = olc('hesaplama.matris', lambda: matrisleri_uygula(anlik_df, varsayilan_matrisler()))
+    siralama = varsayilan_siralama(
+        sorted(str(x) for x in urun_agg['segment'].unique() if pd.notna(x)),
+        sorted(str(x) for x in magaza_agg['segment'].unique() if pd.notna(x))
+    )
+    default_fc = kpi['forward_cover'].mean()
+    anlik_df = olc('hesaplama.ihtiyac', lambda: ihtiyac_hesapla(
+        anlik_df, default_fc, yeni_urun_kodlari, siralama, motor=motor
+    ))
+    # yasak_uygula ihtiyac kolonunu yerinde değiştirir; her tekrar kendi kopyasıyla çalışır
+    anlik_df = olc('hesaplama.yasak', lambda: yasak_uygula(anlik_df.copy(deep=False), yasak, motor=motor))
+    talepler = olc('hesaplama.tahsis', lambda: talepleri_tahsis_et(anlik_df, depo_stok))
+    sevkiyat_sonuc = olc('hesaplama.sonuc', lambda: sonuc_tablosu(talepler, urun_master, magaza_master, motor=motor))
+    satirlar['sevkiyat_sonuc'] = len(sevkiyat_sonuc)
+    # Hesaplama sayfasının tek çağrısı (Polars motorunda aşamalar tek sorgudur)
+    olc('hesaplama.toplam', lambda: sevkiyat_hesapla(
+        urun_master, magaza_master, depo_stok, anlik, kpi, yasak=yasak, segmentation_params=parametreler,
+        siralama=siralama, ozet=ozet, motor=motor
+    ))
+
+    # Alım Sipariş sayfası
+    olc('alim_siparis', lambda: alim_siparis_hesapla(
+        anlik, depo_stok, kpi, varsayilan_cover_matrisi(VARSAYILAN_ARALIKLAR), VARSAYILAN_ARALIKLAR,
+        12, 10.0, sevkiyat_sonuc=sevkiyat_sonuc, motor=motor
+    ))
+
+    # Raporlar sayfası: küp hesaplama işinde bir kez oluşturulur, tablolar küpten alınır
+    kup = olc('raporlar.kup', lambda: kup_olustur(sevkiyat_sonuc, urun_master, magaza_master, motor=motor))
+    olc('raporlar.dilimler', lambda: _rapor_dilimleri(kup))
+    if harita_kullanilabilir() and 'il' in kup.seviyeler:
+        olc('raporlar.il_haritasi', lambda: _il_haritasi(kup))
+
+    # Master Data sayfası
+    master_df = olc('master_data.olustur', lambda: master_data_olustur(
+        anlik, sevkiyat_sonuc=sevkiyat_sonuc, depo_stok=depo_stok, motor=motor
+    ))
+    olc('master_data.csv', lambda: disa_aktar(master_df, 'csv'))
+    olc('master_data.parquet', lambda: disa_aktar(master_df, 'parquet'))
+
+    return {
+        'olcek': ad,
+        'parametreler': {'magaza_sayisi': magaza_sayisi, 'urun_sayisi': urun_sayisi, 'depo_sayisi': depo_sayisi,
+                         'kapsam': kapsam, 'seed': seed, 'dosya_bicimi': bicim},
+        'satir_sayilari': satirlar,
+        'olcumler': olcumler,
+        'toplam_sure_sn': round(sum(o['sure_sn'] for o in olcumler), 4),
+        'surec_tepe_bellegi_mb': _surec_tepe_bellegi_mb()
+    }
+
+
+def _ortam():
+    surumler = {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__}
+    for modul in ('pyarrow', 'duckdb', 'polars'):
+        try:
+            surumler[modul] = __import__(modul).__version__
+        except ImportError:
+            surumler[modul] = None
+    return {'platform': platform.platform(), 'islemci_sayisi': os.cpu_count(), 'surumler': surumler}
+
+
+def benchmark_calistir(olcekler=('kucuk', 'orta'), motor=None, tekrar=1, bellek=True, bicim='parquet', kapsam=0.2,
+                       seed=42, ilerleme=None):
+    """Ölçekleri sırayla ölçer. olcekler: OLCEKLER anahtarları veya {'ad', 'magaza_sayisi', ...} sözlükleri.
+
+    Dönüş: JSON'a yazılabilir rapor {'surum', 'tarih', 'motor', 'ortam', 'olcekler': [...]}
+    """
+    if bicim != 'csv':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            bicim = 'csv'
+
+    sonuclar = []
+    for olcek in olcekler:
+        if isinstance(olcek, str):
+            if olcek not in OLCEKLER:
+                raise ValueError(f"Bilinmeyen ölçek: {olcek} ({', '.join(OLCEKLER)})")
+            olcek = {'ad': olcek, **OLCEKLER[olcek]}
+        olcek = {'kapsam': kapsam, **olcek}
+        sonuclar.append(olcek_olc(
+            olcek.pop('ad'), **olcek, motor=motor, tekrar=tekrar, bellek=bellek, bicim=bicim, seed=seed,
+            ilerleme=ilerleme
+        ))
+
+    return {
+        'surum': RAPOR_SURUMU,
+        'tarih': datetime.datetime.now().isoformat(timespec='seconds'),
+        'motor': motor or 'pandas',
+        'ortam': _ortam(),
+        'olcekler': sonuclar
+    }
+
+
+def rapor_tablosu(rapor):
+    """Raporu (ölçek, adım) satırlı özet tabloya çevirir"""
+    return pd.DataFrame([
+        {'Ölçek': olcek['olcek'], 'Adım': o['adim'], 'Süre (sn)': o['sure_sn'], 'Tepe Bellek (MB)': o['tepe_bellek_mb']}
+        for olcek in rapor['olcekler'] for o in olcek['olcumler']
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m planlama.benchmark',
+        description='Sentetik veriyle sayfaların sıcak yollarını ölçer ve JSON rapor yazar.'
+    )
+    parser.add_argument('--olcekler', nargs='+', default=['kucuk', 'orta'], choices=list(OLCEKLER),
+                        help='Ölçülecek hazır ölçekler')
+    parser.add_argument('--cikti', default='benchmark_raporu.json', help='JSON raporun yazılacağı dosya')
+    parser.add_argument('--motor', choices=list(MOTORLAR), default='pandas', help='Birleştirme/gruplama motoru')
+    parser.add_argument('--tekrar', type=int, default=1, help='Süre ölçümünde adım başına tekrar (en iyisi alınır)')
+    parser.add_argument('--bellek-yok', action='store_true', help='Tepe bellek ölçümünü (ek çalıştırma) atla')
+    parser.add_argument('--bicim', choices=['parquet', 'csv', 'feather'], default='parquet',
+                        help='Veri yükleme ölçümünde kullanılan dosya biçimi')
+    parser.add_argument('--kapsam', type=float, default=0.2, help='Mağaza başına ürün taşıma olasılığı (ornek_veri)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        rapor = benchmark_calistir(
+            args.olcekler, motor=args.motor, tekrar=args.tekrar, bellek=not args.bellek_yok, bicim=args.bicim,
+            kapsam=args.kapsam, seed=args.seed, ilerleme=lambda mesaj: print(f"⏱️ {mesaj}", file=sys.stderr)
+        )
+    except (ValueError, ImportError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    with open(args.cikti, 'w', encoding='utf-8') as f:
+        json.dump(rapor, f, ensure_ascii=False, indent=2)
+
+    print(rapor_tablosu(rapor).to_string(index=False))
+    print(f"💾 Rapor: {args.cikti}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
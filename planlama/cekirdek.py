@@ -0,0 +1,750 @@
+"""Sevkiyat ve alım sipariş hesaplamalarının arayüzden bağımsız çekirdeği.
+
+Tüm fonksiyonlar DataFrame alır/döndürür, girdileri değiştirmez ve Streamlit'e
+bağımlı değildir; aynı fonksiyonlar hem uygulama sayfalarından hem komut satırından
+(python -m planlama) çağrılır. Büyük birleştirme ve gruplamalar motor parametresine
+göre pandas'ta veya opsiyonel DuckDB'de çalışır; sevkiyat hesaplaması opsiyonel Polars
+motorunda tek sorgu olarak da yapılabilir (bkz. motor).
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .kodlama import kodlari_esitle
+from .motor import birlestir, grupla
+from .tanimlar import DURUMLAR, VARSAYILAN_ARALIKLAR
+
+
+# ============================================
+# SEGMENTASYON
+# ============================================
+def segment_etiketleri(ranges):
+    """Aralıklardan segment etiketleri: [(0, 4), (20, inf)] -> ['0-4', '20-inf']"""
+    return [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in ranges]
+
+
+def segmentle(degerler, ranges):
+    """Cover değerlerini aralıklara göre segmentlere ayırır (pd.cut)"""
+    return pd.cut(
+        degerler,
+        bins=[r[0] for r in ranges] + [ranges[-1][1]],
+        labels=segment_etiketleri(ranges),
+        include_lowest=True
+    )
+
+
+def segmentleri_sirala(segments):
+    """Segmentleri numerik değere göre sıralar: 0-4, 5-8, 9-12, 15-20, 20-inf"""
+    def get_sort_key(seg):
+        try:
+            # İlk sayıyı al (0-4 -> 0, 5-8 -> 5, 20-inf -> 20)
+            return int(seg.split('-')[0])
+        except:
+            return 9999  # inf veya parse edilemeyen değerler en sona
+
+    return sorted(segments, key=get_sort_key)
+
+
+def veri_parmak_izi(df):
+    """DataFrame içeriğinin özeti (kolonlar, tipler ve tüm değerler); aynı veri aynı izi verir"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(kolon, str(tip)) for kolon, tip in df.dtypes.items()]).encode('utf-8'))
+    # Kategori tipinin repr'i kısaltılmış olduğundan kategori listesi (kod sözlüğü) ayrıca eklenir
+    for tip in df.dtypes:
+        if isinstance(tip, pd.CategoricalDtype):
+            h.update(pd.util.hash_array(np.asarray(tip.categories, dtype=object)).tobytes())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def parametre_anahtari(segmentation_params):
+    """segmentation_params için karşılaştırılabilir anahtar"""
+    return repr((
+        [tuple(r) for r in segmentation_params['product_ranges']],
+        [tuple(r) for r in segmentation_params['store_ranges']]
+    ))
+
+
+def stok_satis_agregasyonu(anlik_df, anahtar, motor=None):
+    """Ürün veya mağaza bazında toplam stok/yol/satış/ciro ve cover (stok / satış)"""
+    kolonlar = [k for k in ['stok', 'yol', 'satis', 'ciro'] if k in anlik_df.columns]
+    agg = grupla(anlik_df, anahtar, dict.fromkeys(kolonlar, 'sum'), motor=motor)
+    return cover_ekle(agg)
+
+
+def cover_ekle(agg):
+    """Toplam stok / toplam satış (satışı 0 olanlarda stok)"""
+    agg['cover'] = agg['stok'] / agg['satis'].replace(0, 1)
+    return agg
+
+
+def veri_ozeti(anlik_df, segmentation_params, motor=None):
+    """Segmentasyon, Hedef Matris, Sıralama ve Hesaplama'nın ortak kullandığı özet.
+
+    Dönüş: {'urun': DataFrame(urun_kod, stok, yol, satis, ciro, cover, segment),
+            'magaza': DataFrame(magaza_kod, ..., cover, segment)}
+    """
+    urun_agg = stok_satis_agregasyonu(anlik_df, 'urun_kod', motor=motor)
+    magaza_agg = stok_satis_agregasyonu(anlik_df, 'magaza_kod', motor=motor)
+
+    urun_agg['segment'] = segmentle(urun_agg['cover'], segmentation_params['product_ranges'])
+    magaza_agg['segment'] = segmentle(magaza_agg['cover'], segmentation_params['store_ranges'])
+    return {'urun': urun_agg, 'magaza': magaza_agg}
+
+
+def segmentasyon_uygula(anlik_df, segmentation_params, ozet=None, motor=None):
+    """Ürün ve mağaza segmentlerini anlık veriye ekler.
+
+    ozet: aynı veri ve parametrelerle önceden hesaplanmış veri_ozeti (yoksa hesaplanır).
+    Dönüş: (anlik_df + urun_segment/magaza_segment, urun_agg, magaza_agg)
+    """
+    if ozet is None:
+        ozet = veri_ozeti(anlik_df, segmentation_params, motor=motor)
+    urun_agg = ozet['urun']
+    magaza_agg = ozet['magaza']
+
+    anlik_df = birlestir(anlik_df, urun_agg[['urun_kod', 'segment']], 'urun_kod', motor=motor).rename(columns={'segment': 'urun_segment'})
+    anlik_df = birlestir(anlik_df, magaza_agg[['magaza_kod', 'segment']], 'magaza_kod', motor=motor).rename(columns={'segment': 'magaza_segment'})
+
+    anlik_df['urun_segment'] = anlik_df['urun_segment'].astype(str)
+    anlik_df['magaza_segment'] = anlik_df['magaza_segment'].astype(str)
+    return anlik_df, urun_agg, magaza_agg
+
+
+def varsayilan_siralama(prod_segments, store_segments):
+    """Mağaza segmenti > ürün segmenti > RPT/Initial/Min sırasıyla artan öncelik tablosu"""
+    siralama_rows = []
+    oncelik = 1
+    for store_seg in store_segments:
+        for prod_seg in prod_segments:
+            for durum in DURUMLAR:
+                siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': durum, 'Oncelik': oncelik})
+                oncelik += 1
+    return pd.DataFrame(siralama_rows)
+
+
+def varsayilan_matrisler():
+    """Hedef Matris kaydedilmemişse kullanılan tek hücreli matrisler"""
+    return {
+        'sisme_orani': pd.DataFrame(0.5, index=["0-4"], columns=["0-4"]),
+        'genlestirme_orani': pd.DataFrame(1.0, index=["0-4"], columns=["0-4"]),
+        'min_oran': pd.DataFrame(1.0, index=["0-4"], columns=["0-4"]),
+        'initial_matris': pd.DataFrame(1.0, index=["0-4"], columns=["0-4"])
+    }
+
+
+# ============================================
+# YENİ ÜRÜN TESPİTİ
+# ============================================
+def yeni_urun_adaylari(depo_df, depo_stok_esigi=300):
+    """Toplam depo stoğu eşiği aşan ürünler. Dönüş: (aday kodları listesi, ürün bazında depo toplamı)"""
+    depo_toplam = depo_df.groupby('urun_kod', observed=True)['stok'].sum().reset_index()
+    depo_toplam.columns = ['urun_kod', 'depo_stok_toplam']
+    return depo_toplam[depo_toplam['depo_stok_toplam'] > depo_stok_esigi]['urun_kod'].tolist(), depo_toplam
+
+
+def yeni_urunleri_tespit_et(anlik_df, depo_df, depo_stok_esigi=300, magaza_orani_esigi=0.5, magaza_sayisi=None,
+                            motor=None):
+    """Depoda stoğu yüksek ama mağazaların az bir kısmında stoklu olan ürünler.
+
+    magaza_sayisi: toplam mağaza sayısı; verilmezse anlik_df'ten sayılır (parçalı hesaplamada
+    anlik_df sadece adayların stoklu mağaza/ürün çiftleridir).
+    Dönüş: (yeni ürün kodları listesi, yeni ürün tablosu)
+    """
+    adaylar, depo_toplam = yeni_urun_adaylari(depo_df, depo_stok_esigi)
+
+    toplam_magaza_sayisi = anlik_df['magaza_kod'].nunique() if magaza_sayisi is None else magaza_sayisi
+    urun_magaza_stok = anlik_df[anlik_df['urun_kod'].isin(adaylar) & (anlik_df['stok'] > 0)]
+
+    urun_stoklu_magaza = grupla(urun_magaza_stok, 'urun_kod', {'magaza_kod': 'nunique'}, motor=motor)
+    urun_stoklu_magaza.columns = ['urun_kod', 'stoklu_magaza_sayisi']
+    urun_stoklu_magaza['magaza_oran'] = urun_stoklu_magaza['stoklu_magaza_sayisi'] / toplam_magaza_sayisi
+
+    yeni_urunler = urun_stoklu_magaza[urun_stoklu_magaza['magaza_oran'] < magaza_orani_esigi].copy()
+    return yeni_urunler['urun_kod'].tolist(), yeni_urunler.merge(depo_toplam, on='urun_kod', how='left')
+
+
+# ============================================
+# KPI VE MATRİSLER
+# ============================================
+def kpi_ekle(anlik_df, urun_master, kpi_df, motor=None):
+    """Ürünün mal grubu (mg) üzerinden KPI min/max değerlerini ekler"""
+    if urun_master is None:
+        return anlik_df.assign(min_deger=0, max_deger=999999)
+
+    urun_master = urun_master[['urun_kod', 'mg']].copy()
+    urun_master['mg'] = urun_master['mg'].astype(object).fillna(0).astype(float).astype(int).astype(str)
+
+    anlik_df = birlestir(anlik_df, urun_master, 'urun_kod', motor=motor)
+
+    kpi_data = kpi_df[['mg_id', 'min_deger', 'max_deger']].rename(columns={'mg_id': 'mg'})
+    kpi_data['mg'] = kpi_data['mg'].astype(str)
+    anlik_df['mg'] = anlik_df['mg'].astype(str)
+
+    anlik_df = birlestir(anlik_df, kpi_data, 'mg', motor=motor)
+    anlik_df['min_deger'] = anlik_df['min_deger'].fillna(0)
+    anlik_df['max_deger'] = anlik_df['max_deger'].fillna(999999)
+    return anlik_df
+
+
+def _matris_hizala(matrix, urun_etiketleri, magaza_etiketleri, varsayilan):
+    """Matrisi verideki segment sırasına hizalar; eksik segmentler varsayılan değeri alır"""
+    matrix = matrix.loc[~matrix.index.duplicated(), ~matrix.columns.duplicated()]
+    hizali = matrix.reindex(index=urun_etiketleri, columns=magaza_etiketleri, fill_value=varsayilan)
+
+    # Son satır/kolon: segmenti boş (NaN) olan satırlar için varsayılan
+    tablo = np.full((len(urun_etiketleri) + 1, len(magaza_etiketleri) + 1), varsayilan, dtype=float)
+    tablo[:-1, :-1] = hizali.to_numpy(dtype=float)
+    return tablo
+
+
+def matris_degerleri(urun_segment, magaza_segment, matrisler, varsayilan=1.0):
+    """Segment çiftleri için tüm matrislerden değerleri tek vektörel indekslemeyle okur.
+
+    matrisler: {kolon_adi: DataFrame(index=ürün segmenti, columns=mağaza segmenti)}
+    Dönüş: {kolon_adi: numpy array}
+    """
+    # Segmentler bir kez tamsayı koda çevrilir (NaN -> -1 -> varsayılan satır/kolon)
+    urun_kod, urun_etiketleri = pd.factorize(urun_segment)
+    magaza_kod, magaza_etiketleri = pd.factorize(magaza_segment)
+
+    isimler = list(matrisler.keys())
+    tablo = np.stack([
+        _matris_hizala(matrisler[isim], urun_etiketleri, magaza_etiketleri, varsayilan)
+        for isim in isimler
+    ])
+
+    degerler = tablo[:, urun_kod, magaza_kod]
+    return dict(zip(isimler, degerler))
+
+
+def matrisleri_uygula(anlik_df, matrisler):
+    """genlestirme, sisme, min_oran ve initial_katsayi kolonlarını ekler"""
+    degerler = matris_degerleri(
+        anlik_df['urun_segment'],
+        anlik_df['magaza_segment'],
+        {
+            'genlestirme': matrisler['genlestirme_orani'],
+            'sisme': matrisler['sisme_orani'],
+            'min_oran': matrisler['min_oran'],
+            'initial_katsayi': matrisler['initial_matris']
+        }
+    )
+    return anlik_df.assign(**degerler)
+
+
+# ============================================
+# İHTİYAÇ
+# ============================================
+def ihtiyac_hesapla(anlik_df, default_fc, yeni_urun_kodlari, siralama_df, motor=None):
+    """RPT, Initial ve Min ihtiyaçlarını aynı satırda hesaplar, kazanan Durum'u seçer.
+
+    Her satır için en yüksek (max_deger ile sınırlanmış) ihtiyaç seçilir; eşitlikte
+    RPT > Initial > Min sırası geçerlidir. Seçilen Durum'un Oncelik değeri eklenir.
+    """
+    mevcut = anlik_df['stok'] + anlik_df['yol']
+    ihtiyac_rpt = (default_fc * anlik_df['satis'] * anlik_df['genlestirme']) - mevcut
+    ihtiyac_min = (anlik_df['min_oran'] * anlik_df['min_deger']) - mevcut
+    ihtiyac_initial = (anlik_df['min_deger'] * anlik_df['initial_katsayi']) - mevcut
+
+    # Initial sadece yeni ürünler için aday
+    yeni_urun = anlik_df['urun_kod'].isin(yeni_urun_kodlari).to_numpy()
+    adaylar = np.column_stack([
+        ihtiyac_rpt.to_numpy(dtype=float),
+        np.where(yeni_urun, ihtiyac_initial.to_numpy(dtype=float), np.nan),
+        ihtiyac_min.to_numpy(dtype=float)
+    ])
+    adaylar = np.maximum(adaylar, 0)
+
+    # max_deger kontrolü
+    max_sevkiyat = (anlik_df['max_deger'] - mevcut).clip(lower=0)
+    sinir = max_sevkiyat.to_numpy(dtype=float)[:, None]
+    adaylar = np.where(np.isnan(sinir), adaylar, np.minimum(adaylar, sinir))
+
+    # Kazanan Durum (NaN aday olamaz)
+    secim = np.argmax(np.where(np.isnan(adaylar), -np.inf, adaylar), axis=1)
+    durum = np.array(DURUMLAR)[secim]
+
+    # Seçilen Durum'un önceliği
+    siralama_df = siralama_df.drop_duplicates(['Magaza_Cluster', 'Urun_Cluster', 'Durum'])
+    oncelik = birlestir(
+        pd.DataFrame({
+            'magaza_segment': anlik_df['magaza_segment'].to_numpy(),
+            'urun_segment': anlik_df['urun_segment'].to_numpy(),
+            'Durum': durum
+        }),
+        siralama_df[['Magaza_Cluster', 'Urun_Cluster', 'Durum', 'Oncelik']].rename(
+            columns={'Magaza_Cluster': 'magaza_segment', 'Urun_Cluster': 'urun_segment'}
+        ),
+        ['magaza_segment', 'urun_segment', 'Durum'],
+        motor=motor
+    )
+
+    return anlik_df.assign(
+        ihtiyac_rpt=ihtiyac_rpt,
+        ihtiyac_min=ihtiyac_min,
+        ihtiyac_initial=ihtiyac_initial,
+        max_sevkiyat=max_sevkiyat,
+        Durum=durum,
+        Oncelik=oncelik['Oncelik'].to_numpy(),
+        ihtiyac=adaylar[np.arange(len(adaylar)), secim]
+    )
+
+
+def yasak_ekle(anlik_df, yasak_df, motor=None):
+    """Mağaza/ürün çiftinin yasak durumunu (yasak_durum) ekler"""
+    yasak_df = yasak_df[['urun_kod', 'magaza_kod', 'yasak_durum']]
+    return birlestir(anlik_df, yasak_df, ['urun_kod', 'magaza_kod'], motor=motor)
+
+
+def yasak_uygula(anlik_df, yasak_df, motor=None):
+    """Yasaklı mağaza/ürün çiftlerinin ihtiyacını sıfırlar.
+
+    yasak_durum kolonu önceden eklenmişse (yasak_ekle) yasak_df None verilir, birleştirme tekrarlanmaz.
+    """
+    if yasak_df is not None:
+        anlik_df = yasak_ekle(anlik_df, yasak_df, motor=motor)
+    if 'yasak_durum' not in anlik_df.columns:
+        return anlik_df
+
+    anlik_df.loc[anlik_df['yasak_durum'] == 'Yasak', 'ihtiyac'] = 0
+    return anlik_df
+
+
+def depo_eslestir(anlik_df, magaza_df, motor=None):
+    """Mağazanın bağlı olduğu depoyu (depo_kod) ekler"""
+    return birlestir(anlik_df, magaza_df[['magaza_kod', 'depo_kod']], 'magaza_kod', motor=motor)
+
+
+def en_yuksek_ihtiyac(anlik_df):
+    """Her mağaza/ürün için en yüksek ihtiyaçlı satırı seçip Oncelik'e göre sıralar.
+
+    Aynı Oncelik'te (magaza_kod, urun_kod) sırası korunur; böylece işlenme sırası
+    sıralama algoritmasına ve veri bölümlemesine bağlı değildir.
+    """
+    result_df = anlik_df[anlik_df['ihtiyac'] > 0]
+    result_df_max = result_df.loc[result_df.groupby(['magaza_kod', 'urun_kod'], observed=True)['ihtiyac'].idxmax()]
+    return result_df_max.sort_values('Oncelik', kind='stable').reset_index(drop=True)
+
+
+# ============================================
+# DEPO TAHSİSİ
+# ============================================
+def depo_tahsis_et(talepler, depo_df):
+    """Depo stoğunu talepler arasında öncelik sırasına göre tek geçişte paylaştırır.
+
+    talepler işlenme (Oncelik) sırasında olmalıdır. Her (depo_kod, urun_kod) grubunda
+    sevkiyat = clip(depo stoğu - önceki satırların kümülatif ihtiyacı, 0, ihtiyac).
+    Kod kolonları aynı kod sözlüğünde olmalıdır (kodlari_esitle).
+    Dönüş: talepler ile aynı sırada sevkiyat miktarları (numpy array)
+    """
+    # Depo stoğu: aynı depo/ürün birden fazla satırdaysa ilk kayıt geçerli
+    depo = pd.DataFrame({
+        'depo_kod': depo_df['depo_kod'].array,
+        'urun_kod': depo_df['urun_kod'].array,
+        'depo_stok': depo_df['stok'].to_numpy(dtype=float),
+        'depoda_var': True
+    }).drop_duplicates(['depo_kod', 'urun_kod'])
+
+    tahsis = pd.DataFrame({
+        'depo_kod': talepler['depo_kod'].array,
+        'urun_kod': talepler['urun_kod'].array,
+        'ihtiyac': talepler['ihtiyac'].to_numpy(dtype=float),
+        'sira': np.arange(len(talepler))
+    })
+    tahsis = tahsis.merge(depo, on=['depo_kod', 'urun_kod'], how='left')
+
+    # (depo_kod, urun_kod, Oncelik) sırası - aynı öncelikte mevcut işlenme sırası korunur
+    tahsis = tahsis.sort_values(['depo_kod', 'urun_kod', 'sira'], kind='stable')
+    grup_sirasi = tahsis.groupby(['depo_kod', 'urun_kod'], sort=False, observed=True).cumcount().to_numpy()
+    ilk_satir = grup_sirasi == 0
+    ihtiyac = tahsis['ihtiyac'].to_numpy()
+    depo_stok = tahsis['depo_stok'].to_numpy()
+
+    # Kalan stok = ((stok - ihtiyac1) - ihtiyac2) - ... ; her adımda tüm gruplar birlikte
+    # ilerler, düşüm sırası (ve kayan nokta sonucu) eski satır satır döngüyle aynıdır
+    kalan_once = np.where(ilk_satir, depo_stok, np.nan)
+    kalan_sonra = np.empty(len(tahsis))
+    katmanlar = np.argsort(grup_sirasi, kind='stable')
+    sinirlar = np.searchsorted(grup_sirasi[katmanlar], np.arange(grup_sirasi.max(initial=0) + 2))
+    for k in range(len(sinirlar) - 1):
+        satirlar = katmanlar[sinirlar[k]:sinirlar[k + 1]]
+        if k > 0:
+            kalan_once[satirlar] = kalan_sonra[satirlar - 1]
+        kalan_sonra[satirlar] = kalan_once[satirlar] - ihtiyac[satirlar]
+
+    # clip(kalan, 0, ihtiyac); ilk satırda depo stoğu olduğu gibi kullanılır
+    sevkiyat = np.where(
+        kalan_once >= ihtiyac,
+        ihtiyac,
+        np.where(ilk_satir, kalan_once, np.fmax(kalan_once, 0))
+    )
+    sevkiyat = np.where(tahsis['depoda_var'].notna().to_numpy(), sevkiyat, 0.0)
+
+    sonuc = np.empty(len(tahsis))
+    sonuc[tahsis['sira'].to_numpy()] = sevkiyat
+    return sonuc
+
+
+# ============================================
+# SEVKİYAT
+# ============================================
+def sonuc_tablosu(result_df_max, urun_master, magaza_master, motor=None):
+    """Tahsis sonucunu ürün/mağaza adlarıyla birlikte rapor kolonlarına dönüştürür"""
+    result_final = result_df_max[[
+        'Oncelik', 'magaza_kod', 'urun_kod',
+        'magaza_segment', 'urun_segment', 'Durum',
+        'stok', 'yol', 'satis', 'ihtiyac', 'sevkiyat_gercek', 'depo_kod', 'stok_yoklugu_kaybi'
+    ]].rename(columns={
+        'Oncelik': 'oncelik',
+        'Durum': 'durum',
+        'ihtiyac': 'ihtiyac_miktari',
+        'sevkiyat_gercek': 'sevkiyat_miktari',
+        'stok_yoklugu_kaybi': 'stok_yoklugu_satis_kaybi'
+    })
+
+    # Ürün ve mağaza adlarını master'lardan ekle
+    if urun_master is not None:
+        result_final = birlestir(result_final, urun_master[['urun_kod', 'urun_ad']], 'urun_kod', motor=motor)
+    else:
+        result_final['urun_ad'] = 'Bilinmiyor'
+
+    if magaza_master is not None:
+        result_final = birlestir(result_final, magaza_master[['magaza_kod', 'magaza_ad']], 'magaza_kod', motor=motor)
+    else:
+        result_final['magaza_ad'] = 'Bilinmiyor'
+
+    # Kolon sıralamasını düzenle
+    result_final = result_final[[
+        'oncelik', 'magaza_kod', 'magaza_ad', 'urun_kod', 'urun_ad',
+        'magaza_segment', 'urun_segment', 'durum',
+        'stok', 'yol', 'satis', 'ihtiyac_miktari', 'sevkiyat_miktari', 'depo_kod', 'stok_yoklugu_satis_kaybi'
+    ]]
+
+    result_final.insert(0, 'sira_no', range(1, len(result_final) + 1))
+    return result_final
+
+
+def sevkiyat_hazirla(urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+                     segmentation_params=None, matrisler=None, siralama=None, ilerleme=None, ozet=None,
+                     motor=None):
+    """Ülke geneli veriye ihtiyaç duyan adımlar: yeni ürün, segmentasyon, KPI, matrisler, depo eşleşmesi.
+
+    Dönüş: {'anlik_df', 'yeni_urun_kodlari', 'yeni_urun_listesi', 'default_fc', 'siralama'}
+    """
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+    if segmentation_params is None:
+        segmentation_params = {'product_ranges': VARSAYILAN_ARALIKLAR, 'store_ranges': VARSAYILAN_ARALIKLAR}
+    matrisler = {**varsayilan_matrisler(), **{k: v for k, v in (matrisler or {}).items() if v is not None}}
+
+    ilerleme(10, "Yeni ürünler tespit ediliyor...")
+
+    anlik_df = anlik_stok_satis
+    yeni_urun_kodlari, yeni_urun_listesi = yeni_urunleri_tespit_et(anlik_df, depo_stok, motor=motor)
+
+    ilerleme(25, "Segmentasyon yapılıyor...")
+
+    anlik_df, urun_agg, magaza_agg = segmentasyon_uygula(anlik_df, segmentation_params, ozet=ozet, motor=motor)
+
+    ilerleme(40, "KPI verileri hazırlanıyor...")
+
+    default_fc = kpi['forward_cover'].mean()
+    anlik_df = kpi_ekle(anlik_df, urun_master, kpi, motor=motor)
+
+    ilerleme(55, "Matris değerleri uygulanıyor...")
+
+    anlik_df = matrisleri_uygula(anlik_df, matrisler)
+    anlik_df = depo_eslestir(anlik_df, magaza_master, motor=motor)
+
+    if siralama is None:
+        prod_segments = sorted([str(x) for x in urun_agg['segment'].unique() if pd.notna(x)])
+        store_segments = sorted([str(x) for x in magaza_agg['segment'].unique() if pd.notna(x)])
+        siralama = varsayilan_siralama(prod_segments, store_segments)
+
+    return {
+        'anlik_df': anlik_df,
+        'yeni_urun_kodlari': yeni_urun_kodlari,
+        'yeni_urun_listesi': yeni_urun_listesi,
+        'default_fc': default_fc,
+        'siralama': siralama
+    }
+
+
+def depo_sevkiyati(anlik_df, depo_stok, yasak, default_fc, yeni_urun_kodlari, siralama, ilerleme=None, motor=None):
+    """İhtiyaç, yasak, kazanan satır seçimi ve depo tahsisi.
+
+    Mağazalar sadece bağlı oldukları depodan beslendiği için anlik_df tek bir depoya
+    ait satırlar da olabilir (paralel mod). Dönüş: öncelik sırasında tahsis edilmiş talepler.
+    """
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+
+    ilerleme(70, "İhtiyaçlar hesaplanıyor...")
+
+    anlik_df = ihtiyac_hesapla(anlik_df, default_fc, yeni_urun_kodlari, siralama, motor=motor)
+
+    ilerleme(85, "Yasak kontrolleri ve depo eşleştirme...")
+
+    anlik_df = yasak_uygula(anlik_df, yasak, motor=motor)
+
+    ilerleme(95, "Depo stok kontrolleri yapılıyor...")
+
+    return talepleri_tahsis_et(anlik_df, depo_stok)
+
+
+def talepleri_tahsis_et(anlik_df, depo_stok):
+    """Kazanan satırları seçip depo stoğunu tahsis eder; sevkiyat_gercek ve stok_yoklugu_kaybi eklenir"""
+    result_df_max = en_yuksek_ihtiyac(anlik_df)
+    result_df_max['sevkiyat_gercek'] = depo_tahsis_et(result_df_max, depo_stok)
+    result_df_max['stok_yoklugu_kaybi'] = result_df_max['ihtiyac'] - result_df_max['sevkiyat_gercek']
+    return result_df_max
+
+
+def sevkiyat_hesapla(urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+                     yasak=None, segmentation_params=None, matrisler=None, siralama=None,
+                     ilerleme=None, islem_sayisi=None, ozet=None, motor=None):
+    """Sevkiyat hesaplamasının tamamı.
+
+    matrisler: {'sisme_orani', 'genlestirme_orani', 'min_oran', 'initial_matris'}
+    (eksik olanlar için varsayılan matris), siralama: Sıralama tablosu veya None.
+    ilerleme: opsiyonel ilerleme(yuzde, mesaj) fonksiyonu.
+    islem_sayisi: 1'den büyükse ihtiyaç ve tahsis depo bazında paralel süreçlerde yapılır.
+    ozet: aynı veri ve segmentation_params ile hesaplanmış veri_ozeti (önbellekten).
+    motor: birleştirme/gruplama motoru (None/'pandas' veya 'duckdb'); paralel modda depo
+    bazındaki adımlar her süreçte pandas ile yapılır. 'polars' seçilirse hesaplamanın
+    tamamı polars_motoru'nda yapılır (islem_sayisi kullanılmaz).
+    Dönüş: (sevkiyat sonuç tablosu, yeni ürün listesi)
+    """
+    if motor == 'polars':
+        from .polars_motoru import sevkiyat_hesapla as polars_sevkiyat_hesapla
+        return polars_sevkiyat_hesapla(
+            urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+            yasak=yasak, segmentation_params=segmentation_params, matrisler=matrisler, siralama=siralama,
+            ilerleme=ilerleme, ozet=ozet
+        )
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+
+    # Kod kolonları ortak sözlükte değilse (ör. kodlanmamış veri) burada eşitlenir
+    urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak = kodlari_esitle(
+        urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak
+    )
+
+    hazirlik = sevkiyat_hazirla(
+        urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+        segmentation_params=segmentation_params, matrisler=matrisler, siralama=siralama,
+        ilerleme=ilerleme, ozet=ozet, motor=motor
+    )
+
+    if islem_sayisi is not None and islem_sayisi > 1:
+        from .paralel import depo_bazinda_hesapla
+        result_df_max = depo_bazinda_hesapla(hazirlik, depo_stok, yasak, islem_sayisi, ilerleme=ilerleme)
+    else:
+        result_df_max = depo_sevkiyati(
+            hazirlik['anlik_df'], depo_stok, yasak,
+            hazirlik['default_fc'], hazirlik['yeni_urun_kodlari'], hazirlik['siralama'],
+            ilerleme=ilerleme, motor=motor
+        )
+
+    result_final = sonuc_tablosu(result_df_max, urun_master, magaza_master, motor=motor)
+
+    ilerleme(100, "Tamamlandı!")
+    return result_final, hazirlik['yeni_urun_listesi']
+
+
+# ============================================
+# ALIM SİPARİŞ
+# ============================================
+def varsayilan_cover_matrisi(product_ranges):
+    """Her cover segmenti için 1.0 genişletme katsayısı"""
+    cover_segments = segmentleri_sirala(segment_etiketleri(product_ranges))
+    return pd.DataFrame({
+        'cover_segment': cover_segments,
+        'katsayi': [1.0] * len(cover_segments)
+    })
+
+
+def alim_siparis_hesapla(anlik_df, depo_df, kpi_df, cover_matrix, product_ranges,
+                         cover_threshold, margin_threshold, sevkiyat_sonuc=None, uyari=None, ilerleme=None,
+                         motor=None):
+    """Ürün bazında tedarikçiden alınması gereken miktar.
+
+    Formül: [satış × genişletme × (forward_cover + 2)] - [stok + yol + depo_stok] + min_sevk
+    uyari: opsiyonel uyari(mesaj) fonksiyonu.
+    ilerleme: opsiyonel ilerleme(yuzde, mesaj) fonksiyonu.
+    motor: gruplama motoru (None/'pandas' veya 'duckdb').
+    """
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+
+    ilerleme(10, "Ürün bazında toplanıyor...")
+
+    anlik_df, depo_df, sevkiyat_sonuc = kodlari_esitle(anlik_df, depo_df, sevkiyat_sonuc)
+
+    # Ürün bazında toplama
+    urun_toplam = grupla(anlik_df, 'urun_kod', {
+        'stok': 'sum',
+        'yol': 'sum',
+        'satis': 'sum',
+        'ciro': 'sum',
+        'smm': 'sum'
+    }, motor=motor)
+
+    # Depo stok ekle
+    depo_toplam = grupla(depo_df, 'urun_kod', {'stok': 'sum'}, motor=motor)
+    depo_toplam.columns = ['urun_kod', 'depo_stok']
+
+    urun_toplam = urun_toplam.merge(depo_toplam, on='urun_kod', how='left')
+    urun_toplam['depo_stok'] = urun_toplam['depo_stok'].fillna(0)
+
+    ilerleme(40, "Marj ve cover hesaplanıyor...")
+
+    # Brüt kar ve marj
+    if urun_toplam['smm'].mean() < urun_toplam['ciro'].mean() * 0.1:
+        if uyari is not None:
+            uyari("SMM birim maliyet olarak algılandı. Toplam maliyet = SMM × Satış")
+        urun_toplam['toplam_smm'] = urun_toplam['smm'] * urun_toplam['satis']
+    else:
+        urun_toplam['toplam_smm'] = urun_toplam['smm']
+
+    urun_toplam['brut_kar'] = urun_toplam['ciro'] - urun_toplam['toplam_smm']
+    urun_toplam['brut_kar_marji'] = np.where(
+        urun_toplam['ciro'] > 0,
+        (urun_toplam['brut_kar'] / urun_toplam['ciro'] * 100),
+        0
+    )
+
+    # Cover
+    urun_toplam['toplam_stok'] = urun_toplam['stok'] + urun_toplam['yol'] + urun_toplam['depo_stok']
+    urun_toplam['cover'] = np.where(
+        urun_toplam['satis'] > 0,
+        urun_toplam['toplam_stok'] / urun_toplam['satis'],
+        999
+    )
+
+    # Cover segment ve genişletme katsayısı
+    urun_toplam['cover_segment'] = segmentle(urun_toplam['cover'], product_ranges).astype(str)
+    urun_toplam = urun_toplam.merge(
+        cover_matrix.rename(columns={'katsayi': 'genlestirme_katsayisi'}),
+        on='cover_segment',
+        how='left'
+    )
+    urun_toplam['genlestirme_katsayisi'] = urun_toplam['genlestirme_katsayisi'].fillna(1.0)
+
+    ilerleme(70, "Alım miktarları hesaplanıyor...")
+
+    # Forward cover ve min sevk
+    urun_toplam['forward_cover'] = kpi_df['forward_cover'].mean()
+
+    if sevkiyat_sonuc is not None:
+        min_sevk = grupla(sevkiyat_sonuc, 'urun_kod', {'sevkiyat_miktari': 'sum'}, motor=motor)
+        min_sevk.columns = ['urun_kod', 'min_sevk_adeti']
+        urun_toplam = urun_toplam.merge(min_sevk, on='urun_kod', how='left')
+    else:
+        urun_toplam['min_sevk_adeti'] = 0
+
+    urun_toplam['min_sevk_adeti'] = urun_toplam['min_sevk_adeti'].fillna(0)
+
+    # Filtreler
+    urun_toplam['filtre_uygun'] = (
+        (urun_toplam['cover'] < cover_threshold) &
+        (urun_toplam['brut_kar_marji'] > margin_threshold)
+    )
+
+    # Alım sipariş
+    urun_toplam['talep'] = (
+        urun_toplam['satis'] *
+        urun_toplam['genlestirme_katsayisi'] *
+        (urun_toplam['forward_cover'] + 2)
+    )
+    urun_toplam['mevcut_stok'] = urun_toplam['stok'] + urun_toplam['yol'] + urun_toplam['depo_stok']
+    urun_toplam['alim_siparis_hesap'] = urun_toplam['talep'] - urun_toplam['mevcut_stok']
+
+    # Filtreye uygunsa ve pozitifse min_sevk ekle
+    urun_toplam['alim_siparis'] = np.where(
+        urun_toplam['filtre_uygun'] & (urun_toplam['alim_siparis_hesap'] > 0),
+        np.maximum(0, urun_toplam['alim_siparis_hesap'] + urun_toplam['min_sevk_adeti']),
+        0
+    )
+
+    sonuc_df = urun_toplam[[
+        'urun_kod', 'cover_segment',
+        'stok', 'yol', 'depo_stok', 'satis',
+        'ciro', 'toplam_smm', 'brut_kar', 'brut_kar_marji',
+        'cover', 'genlestirme_katsayisi', 'forward_cover',
+        'min_sevk_adeti', 'filtre_uygun', 'alim_siparis'
+    ]].copy()
+
+    ilerleme(100, "Tamamlandı!")
+    return sonuc_df.sort_values('alim_siparis', ascending=False).reset_index(drop=True)
+
+
+# ============================================
+# MASTER DATA
+# ============================================
+def master_data_olustur(anlik_df, sevkiyat_sonuc=None, depo_stok=None, motor=None):
+    """Anlık stok/satışa ihtiyac, sevkiyat, tip, oncelik, depo_stok ve alim_ihtiyaci kolonlarını ekler.
+
+    Alım ihtiyacı ürün bazındadır: İhtiyaç + (2×Satış) - (Stok+Yol+Depo), negatifse 0.
+    """
+    master_df = anlik_df.copy(deep=False)
+
+    # Yeni kolonları başlat
+    master_df['ihtiyac'] = 0
+    master_df['sevkiyat'] = 0
+    master_df['tip'] = ''
+    master_df['oncelik'] = 0
+    master_df['alim_ihtiyaci'] = 0
+    master_df['depo_stok'] = 0
+
+    # 1. Sevkiyat verilerini ekle
+    if sevkiyat_sonuc is not None:
+        master_df = birlestir(
+            master_df,
+            sevkiyat_sonuc[['magaza_kod', 'urun_kod', 'ihtiyac_miktari', 'sevkiyat_miktari', 'durum', 'oncelik']],
+            ['magaza_kod', 'urun_kod'],
+            motor=motor,
+            suffixes=('', '_sevk')
+        )
+
+        master_df['ihtiyac'] = master_df['ihtiyac_miktari'].fillna(0)
+        master_df['sevkiyat'] = master_df['sevkiyat_miktari'].fillna(0)
+        master_df['tip'] = master_df['durum'].fillna('')
+        master_df['oncelik'] = master_df['oncelik'].fillna(0)
+
+        master_df = master_df.drop(['ihtiyac_miktari', 'sevkiyat_miktari', 'durum'], axis=1, errors='ignore')
+
+    # 2. Ürün bazında toplam depo stoğu
+    if depo_stok is not None:
+        depo_toplam = grupla(depo_stok, 'urun_kod', {'stok': 'sum'}, motor=motor)
+        depo_toplam.columns = ['urun_kod', 'depo_stok_toplam']
+
+        master_df = birlestir(master_df, depo_toplam, 'urun_kod', motor=motor)
+        master_df['depo_stok'] = master_df['depo_stok_toplam'].fillna(0)
+        master_df = master_df.drop('depo_stok_toplam', axis=1, errors='ignore')
+
+    # 3. Alım ihtiyacı (ürün bazında)
+    urun_toplam = grupla(master_df, 'urun_kod', {
+        'stok': 'sum',
+        'yol': 'sum',
+        'satis': 'sum',
+        'ihtiyac': 'sum',
+        'depo_stok': 'first'  # Her satırda aynı
+    }, motor=motor)
+
+    urun_toplam['alim_ihtiyaci_hesap'] = (
+        urun_toplam['ihtiyac'] +
+        (2 * urun_toplam['satis']) -
+        (urun_toplam['stok'] + urun_toplam['yol'] + urun_toplam['depo_stok'])
+    ).clip(lower=0)
+
+    master_df = birlestir(master_df, urun_toplam[['urun_kod', 'alim_ihtiyaci_hesap']], 'urun_kod', motor=motor)
+    master_df['alim_ihtiyaci'] = master_df['alim_ihtiyaci_hesap'].fillna(0)
+    master_df = master_df.drop('alim_ihtiyaci_hesap', axis=1, errors='ignore')
+
+    # Orijinal kolonlar + yeni kolonlar
+    original_cols = [col for col in anlik_df.columns if col in master_df.columns]
+    new_cols = ['ihtiyac', 'sevkiyat', 'tip', 'oncelik', 'depo_stok', 'alim_ihtiyaci']
+    return master_df[original_cols + new_cols]
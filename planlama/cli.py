@@ -0,0 +1,336 @@
+"""Komut satırından toplu (batch) sevkiyat ve alım sipariş hesaplaması.
+
+Kullanım:
+    python -m planlama --veri-dizini veri/ --cikti-dizini sonuc/ [--parametreler param.json] [--islem-sayisi 8]
+                       [--motor duckdb|polars]
+    python -m planlama --veri-dizini veri/ --senaryolar senaryolar.json [--islem-sayisi 8]
+    python -m planlama --veri-dizini veri/ --cikti-dizini sonuc/ --parcali [--parca-boyutu 1000000]
+
+Veri dizinindeki CSV, Parquet ve Feather dosyaları, uygulamadaki çoklu yüklemeyle
+aynı kuralla (dosya adı) veri tiplerine eşleştirilir. Parametre dosyası (JSON) opsiyoneldir:
+
+    {
+        "segmentation_params": {"product_ranges": [[0, 4], [5, 8], [20, "inf"]],
+                                "store_ranges": [[0, 4], [5, 8], [20, "inf"]]},
+        "matrisler": {"sisme_orani": {"0-4": {"0-4": 0.5}}, ...},
+        "siralama": [{"Magaza_Cluster": "0-4", "Urun_Cluster": "0-4", "Durum": "RPT", "Oncelik": 1}, ...],
+        "alim": {"cover_threshold": 12, "margin_threshold": 10.0,
+                 "cover_segment_matrix": {"0-4": 1.0, ...}}
+    }
+
+Matrislerde dış anahtar ürün segmenti, iç anahtar mağaza segmentidir.
+
+Senaryo dosyası, temel parametrelerin üzerine uygulanan senaryoların listesidir;
+sevkiyat yerine senaryo karşılaştırma tablosu (senaryo_karsilastirma.csv) yazılır:
+
+    [
+        {"ad": "Genleştirme +10%", "matrisler": {"genlestirme_orani": {"0-4": {"0-4": 1.1}}}},
+        {"ad": "FC 6", "forward_cover": 6, "siralama": [...]}
+    ]
+
+--parcali: Anlık Stok/Satış dosyası belleğe alınmadan parça parça işlenir (bkz. planlama.parcali);
+sevkiyat sonucu doğrudan dosyaya yazılır.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .cekirdek import alim_siparis_hesapla, sevkiyat_hesapla, varsayilan_cover_matrisi
+from .kodlama import kodlari_esitle
+from .motor import MOTORLAR
+from .okuma import dosyalari_oku, kolonlari_kontrol_et
+from .parcali import parcali_sevkiyat_hesapla
+from .senaryo import senaryolari_hesapla
+from .tanimlar import DOSYA_UZANTILARI, VARSAYILAN_ARALIKLAR, VERI_TANIMLARI, dosya_eslestir
+
+
+def veri_dosyalari(dizin):
+    """Dizindeki CSV/Parquet/Feather dosyalarını veri tiplerine eşleştirir: {dosya yolu: definition}.
+
+    Eksik kolonu olan dosyalar ValueError verir.
+    """
+    eslesen = {}
+    dosyalar = [d for d in Path(dizin).iterdir() if d.suffix.lower().lstrip('.') in DOSYA_UZANTILARI]
+    for dosya in sorted(dosyalar):
+        key = dosya_eslestir(dosya.name)
+        if key is None:
+            print(f"⚠️ {dosya.name}: dosya adı tanımlı veri tiplerine uymuyor, atlandı")
+            continue
+
+        definition = VERI_TANIMLARI[key]
+        missing_cols, _ = kolonlari_kontrol_et(dosya, definition)
+        if missing_cols:
+            raise ValueError(f"{dosya.name}: eksik kolonlar: {', '.join(sorted(missing_cols))}")
+        eslesen[dosya] = definition
+    return eslesen
+
+
+def veri_dizini_oku(dizin, atla=()):
+    """Dizindeki CSV/Parquet/Feather dosyalarını okuyup {state_key: DataFrame} döndürür.
+
+    Önce tüm başlıklar doğrulanır, sonra dosyalar eşzamanlı okunur. Eksik kolonu olan
+    dosyalar ValueError verir; fazla kolonlar atılır. Ürün/mağaza/depo kodları tüm
+    dosyalar için ortak sözlüğe çevrilir.
+    atla: okunmayacak veri tipleri (state_key); zorunlu olsalar da eksik sayılmazlar.
+    """
+    isler = {
+        dosya: (dosya, definition) for dosya, definition in veri_dosyalari(dizin).items()
+        if definition['state_key'] not in atla
+    }
+
+    def ilerleme(dosya, sonuc, tamamlanan, toplam):
+        if sonuc['hata'] is None:
+            definition = isler[dosya][1]
+            print(f"✅ [{tamamlanan}/{toplam}] {definition['icon']} {definition['name']}: {dosya.name} "
+                  f"({len(sonuc['df']):,} satır, {sonuc['satir_hizi']:,.0f} satır/sn)")
+
+    veriler = {}
+    sonuclar = dosyalari_oku(isler, ilerleme=ilerleme)
+    for dosya in isler:
+        if sonuclar[dosya]['hata'] is not None:
+            raise ValueError(f"{dosya.name}: {sonuclar[dosya]['hata']}")
+        veriler[isler[dosya][1]['state_key']] = sonuclar[dosya]['df']
+
+    eksik = [d['name'] for d in VERI_TANIMLARI.values()
+             if d['required'] and d['state_key'] not in veriler and d['state_key'] not in atla]
+    if eksik:
+        raise ValueError(f"Eksik zorunlu veriler: {', '.join(eksik)}")
+    return dict(zip(veriler, kodlari_esitle(*veriler.values())))
+
+
+def _aralik(r):
+    ust = r[1]
+    if ust is None or str(ust).lower() == 'inf':
+        ust = float('inf')
+    return (r[0], ust)
+
+
+def _matris_ve_siralama(ham):
+    return {
+        'matrisler': {
+            isim: pd.DataFrame.from_dict(degerler, orient='index')
+            for isim, degerler in ham.get('matrisler', {}).items()
+        },
+        'siralama': pd.DataFrame(ham['siralama']) if ham.get('siralama') else None
+    }
+
+
+def senaryolari_oku(yol):
+    """JSON senaryo listesini senaryolari_hesapla'nın beklediği yapıya çevirir"""
+    with open(yol, encoding='utf-8') as f:
+        ham = json.load(f)
+    return [
+        {'ad': s.get('ad'), 'forward_cover': s.get('forward_cover'), **_matris_ve_siralama(s)}
+        for s in ham
+    ]
+
+
+def parametreleri_oku(yol):
+    """JSON parametre dosyasını hesaplama fonksiyonlarının beklediği yapıya çevirir"""
+    ham = {}
+    if yol is not None:
+        with open(yol, encoding='utf-8') as f:
+            ham = json.load(f)
+
+    seg = ham.get('segmentation_params', {})
+    parametreler = {
+        'segmentation_params': {
+            'product_ranges': [_aralik(r) for r in seg.get('product_ranges', VARSAYILAN_ARALIKLAR)],
+            'store_ranges': [_aralik(r) for r in seg.get('store_ranges', VARSAYILAN_ARALIKLAR)]
+        },
+        **_matris_ve_siralama(ham)
+    }
+
+    alim = ham.get('alim', {})
+    product_ranges = parametreler['segmentation_params']['product_ranges']
+    if 'cover_segment_matrix' in alim:
+        cover_matrix = pd.DataFrame({
+            'cover_segment': list(alim['cover_segment_matrix'].keys()),
+            'katsayi': [float(v) for v in alim['cover_segment_matrix'].values()]
+        })
+    else:
+        cover_matrix = varsayilan_cover_matrisi(product_ranges)
+
+    parametreler['alim'] = {
+        'cover_threshold': alim.get('cover_threshold', 12),
+        'margin_threshold': alim.get('margin_threshold', 10.0),
+        'cover_matrix': cover_matrix
+    }
+    return parametreler
+
+
+def calistir(veri_dizini, cikti_dizini, parametre_dosyasi=None, islem_sayisi=None, motor=None):
+    """Sevkiyat + alım sipariş hesaplar ve sonuçları CSV olarak yazar"""
+    veriler = veri_dizini_oku(veri_dizini)
+    parametreler = parametreleri_oku(parametre_dosyasi)
+
+    start_time = time.time()
+    sevkiyat_sonuc, yeni_urun_listesi = sevkiyat_hesapla(
+        veriler['urun_master'],
+        veriler['magaza_master'],
+        veriler['depo_stok'],
+        veriler['anlik_stok_satis'],
+        veriler['kpi'],
+        yasak=veriler.get('yasak_master'),
+        segmentation_params=parametreler['segmentation_params'],
+        matrisler=parametreler['matrisler'],
+        siralama=parametreler['siralama'],
+        ilerleme=lambda yuzde, mesaj: print(f"[{yuzde:3d}%] {mesaj}"),
+        islem_sayisi=islem_sayisi,
+        motor=motor
+    )
+    print(f"⏱️ Sevkiyat: {time.time() - start_time:.2f} sn, {len(sevkiyat_sonuc):,} satır")
+
+    alim = parametreler['alim']
+    alim_sonuc = alim_siparis_hesapla(
+        veriler['anlik_stok_satis'],
+        veriler['depo_stok'],
+        veriler['kpi'],
+        alim['cover_matrix'],
+        parametreler['segmentation_params']['product_ranges'],
+        alim['cover_threshold'],
+        alim['margin_threshold'],
+        sevkiyat_sonuc=sevkiyat_sonuc,
+        uyari=lambda mesaj: print(f"⚠️ {mesaj}"),
+        motor=motor
+    )
+
+    cikti = Path(cikti_dizini)
+    cikti.mkdir(parents=True, exist_ok=True)
+    sevkiyat_sonuc.to_csv(cikti / 'sevkiyat_sonuc.csv', index=False, encoding='utf-8-sig')
+    yeni_urun_listesi.to_csv(cikti / 'yeni_urunler.csv', index=False, encoding='utf-8-sig')
+    alim_sonuc.to_csv(cikti / 'alim_siparis.csv', index=False, encoding='utf-8-sig')
+
+    print(f"📦 Toplam İhtiyaç: {sevkiyat_sonuc['ihtiyac_miktari'].sum():,.0f}")
+    print(f"✅ Toplam Sevkiyat: {sevkiyat_sonuc['sevkiyat_miktari'].sum():,.0f}")
+    print(f"💵 Toplam Alım Sipariş: {alim_sonuc['alim_siparis'].sum():,.0f}")
+    print(f"💾 Sonuçlar: {cikti}")
+    return sevkiyat_sonuc, alim_sonuc
+
+
+def senaryolari_calistir(veri_dizini, cikti_dizini, senaryo_dosyasi, parametre_dosyasi=None, islem_sayisi=None,
+                         motor=None):
+    """Senaryoları hesaplar ve karşılaştırma tablosunu CSV olarak yazar"""
+    veriler = veri_dizini_oku(veri_dizini)
+    parametreler = parametreleri_oku(parametre_dosyasi)
+    senaryolar = senaryolari_oku(senaryo_dosyasi)
+
+    start_time = time.time()
+    karsilastirma = senaryolari_hesapla(
+        veriler['urun_master'],
+        veriler['magaza_master'],
+        veriler['depo_stok'],
+        veriler['anlik_stok_satis'],
+        veriler['kpi'],
+        senaryolar,
+        yasak=veriler.get('yasak_master'),
+        segmentation_params=parametreler['segmentation_params'],
+        matrisler=parametreler['matrisler'],
+        siralama=parametreler['siralama'],
+        ilerleme=lambda yuzde, mesaj: print(f"[{yuzde:3d}%] {mesaj}"),
+        islem_sayisi=islem_sayisi,
+        motor=motor
+    )
+    print(f"⏱️ {len(senaryolar)} senaryo: {time.time() - start_time:.2f} sn")
+
+    cikti = Path(cikti_dizini)
+    cikti.mkdir(parents=True, exist_ok=True)
+    karsilastirma.to_csv(cikti / 'senaryo_karsilastirma.csv', index=False, encoding='utf-8-sig')
+    print(karsilastirma.to_string(index=False))
+    print(f"💾 Sonuçlar: {cikti}")
+    return karsilastirma
+
+
+def parcali_calistir(veri_dizini, cikti_dizini, parametre_dosyasi=None, parca_boyutu=1_000_000):
+    """Anlık Stok/Satış dosyasını parça parça işleyerek sevkiyat + alım sipariş hesaplar"""
+    anlik_dosyalari = [
+        dosya for dosya, definition in veri_dosyalari(veri_dizini).items()
+        if definition['state_key'] == 'anlik_stok_satis'
+    ]
+    if not anlik_dosyalari:
+        raise ValueError(f"Eksik zorunlu veriler: {VERI_TANIMLARI['anlik_stok_satis']['name']}")
+    veriler = veri_dizini_oku(veri_dizini, atla=('anlik_stok_satis',))
+    parametreler = parametreleri_oku(parametre_dosyasi)
+
+    cikti = Path(cikti_dizini)
+    cikti.mkdir(parents=True, exist_ok=True)
+
+    start_time = time.time()
+    ozet = parcali_sevkiyat_hesapla(
+        anlik_dosyalari[0],
+        veriler['urun_master'],
+        veriler['magaza_master'],
+        veriler['depo_stok'],
+        veriler['kpi'],
+        cikti / 'sevkiyat_sonuc.csv',
+        yasak=veriler.get('yasak_master'),
+        segmentation_params=parametreler['segmentation_params'],
+        matrisler=parametreler['matrisler'],
+        siralama=parametreler['siralama'],
+        parca_boyutu=parca_boyutu,
+        gecici_dizin=cikti,
+        ilerleme=lambda yuzde, mesaj: print(f"[{yuzde:3d}%] {mesaj}")
+    )
+    print(f"⏱️ Sevkiyat: {time.time() - start_time:.2f} sn, {ozet['satir']:,} satır")
+
+    # Alım sipariş ürün bazında olduğundan ürün toplamları yeterlidir
+    alim = parametreler['alim']
+    alim_sonuc = alim_siparis_hesapla(
+        ozet['urun_toplam'],
+        veriler['depo_stok'],
+        veriler['kpi'],
+        alim['cover_matrix'],
+        parametreler['segmentation_params']['product_ranges'],
+        alim['cover_threshold'],
+        alim['margin_threshold'],
+        sevkiyat_sonuc=ozet['urun_sevkiyat'],
+        uyari=lambda mesaj: print(f"⚠️ {mesaj}")
+    )
+    ozet['yeni_urun_listesi'].to_csv(cikti / 'yeni_urunler.csv', index=False, encoding='utf-8-sig')
+    alim_sonuc.to_csv(cikti / 'alim_siparis.csv', index=False, encoding='utf-8-sig')
+
+    print(f"📦 Toplam İhtiyaç: {ozet['ihtiyac']:,.0f}")
+    print(f"✅ Toplam Sevkiyat: {ozet['sevkiyat']:,.0f}")
+    print(f"💵 Toplam Alım Sipariş: {alim_sonuc['alim_siparis'].sum():,.0f}")
+    print(f"💾 Sonuçlar: {cikti}")
+    return ozet, alim_sonuc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m planlama',
+        description='Sevkiyat ve alım sipariş hesaplamasını arayüz olmadan çalıştırır.'
+    )
+    parser.add_argument('--veri-dizini', required=True, help='CSV/Parquet/Feather dosyalarının bulunduğu dizin')
+    parser.add_argument('--cikti-dizini', default='cikti', help='Sonuç CSV dosyalarının yazılacağı dizin')
+    parser.add_argument('--parametreler', default=None, help='Segmentasyon/matris/sıralama parametreleri (JSON)')
+    parser.add_argument('--islem-sayisi', type=int, default=None,
+                        help='1\'den büyükse ihtiyaç ve tahsis depo bazında (senaryolarda senaryo bazında) '
+                             'bu kadar süreçte paralel hesaplanır')
+    parser.add_argument('--senaryolar', default=None,
+                        help='Senaryo listesi (JSON); verilirse senaryo karşılaştırma tablosu hesaplanır')
+    parser.add_argument('--motor', choices=list(MOTORLAR), default='pandas',
+                        help='Birleştirme ve gruplamaların motoru; polars sevkiyatı tek sorguda hesaplar '
+                             '(opsiyoneller: pip install duckdb / pip install polars)')
+    parser.add_argument('--parcali', action='store_true',
+                        help='Anlık Stok/Satış dosyasını belleğe almadan parça parça işler (pyarrow gerekir)')
+    parser.add_argument('--parca-boyutu', type=int, default=1_000_000,
+                        help='--parcali modunda parça başına satır sayısı')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.senaryolar:
+            senaryolari_calistir(args.veri_dizini, args.cikti_dizini, args.senaryolar,
+                                 args.parametreler, args.islem_sayisi, args.motor)
+        elif args.parcali:
+            parcali_calistir(args.veri_dizini, args.cikti_dizini, args.parametreler, args.parca_boyutu)
+        else:
+            calistir(args.veri_dizini, args.cikti_dizini, args.parametreler, args.islem_sayisi, args.motor)
+    except (ValueError, FileNotFoundError, ImportError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
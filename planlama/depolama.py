@@ -0,0 +1,145 @@
+"""Yüklenen veri setlerinin diskte kalıcı saklanması (Arrow IPC).
+
+Her veri seti içerik özetiyle (veri_parmak_izi) adlandırılmış, sıkıştırılmamış bir
+Arrow IPC dosyasına yazılır; aynı içerik ikinci kez yazılmaz. son_set.json en son
+yüklenen setin {state_key: özet} eşlemesini tutar. Uygulama açılışında bu dosyalar
+bellek eşlemeli (mmap) açılır, CSV ayrıştırması tekrarlanmaz.
+
+Dizin PLANLAMA_VERI_DIZINI ortam değişkeniyle değiştirilebilir. pyarrow kurulu
+değilse depolama devre dışıdır (veriler sadece oturumda kalır).
+
+OrtakVeriDeposu aynı süreçteki tüm oturumların paylaştığı bellek içi kayıttır: aynı
+içerik (özet) bellekte tek nesne olarak tutulur, oturumlar sadece referans taşır.
+"""
+import json
+import os
+import threading
+import weakref
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+VARSAYILAN_DIZIN = os.path.join(os.path.expanduser('~'), '.planlama', 'veri')
+SON_SET = 'son_set.json'
+
+
+def depolama_dizini():
+    """Veri dosyalarının dizini (PLANLAMA_VERI_DIZINI veya ~/.planlama/veri)"""
+    return os.environ.get('PLANLAMA_VERI_DIZINI', VARSAYILAN_DIZIN)
+
+
+def depolama_etkin():
+    return pa is not None
+
+
+def _dosya_yolu(dizin, ozet):
+    return os.path.join(dizin, f'{ozet}.arrow')
+
+
+def veri_seti_yaz(df, ozet, dizin=None):
+    """df'i içerik özetiyle adlandırılmış Arrow IPC dosyasına yazar (dosya varsa yazmaz)"""
+    dizin = dizin or depolama_dizini()
+    yol = _dosya_yolu(dizin, ozet)
+    if os.path.exists(yol):
+        return yol
+
+    os.makedirs(dizin, exist_ok=True)
+    tablo = pa.Table.from_pandas(df, preserve_index=False)
+    # Yarım kalan yazım son_set.json'daki dosyayı bozmasın diye önce geçici dosyaya
+    gecici = yol + '.tmp'
+    with pa.OSFile(gecici, 'wb') as f, pa.ipc.new_file(f, tablo.schema) as yazici:
+        yazici.write_table(tablo)
+    os.replace(gecici, yol)
+    return yol
+
+
+def veri_seti_oku(ozet, dizin=None):
+    """Arrow IPC dosyasını bellek eşlemeli açıp DataFrame döndürür"""
+    kaynak = pa.memory_map(_dosya_yolu(dizin or depolama_dizini(), ozet), 'r')
+    return pa.ipc.open_file(kaynak).read_all().to_pandas(split_blocks=True)
+
+
+def son_seti_kaydet(ozetler, dizin=None):
+    """{state_key: özet} eşlemesini son yüklenen set olarak kaydeder"""
+    dizin = dizin or depolama_dizini()
+    os.makedirs(dizin, exist_ok=True)
+    yol = os.path.join(dizin, SON_SET)
+    with open(yol + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(ozetler, f)
+    os.replace(yol + '.tmp', yol)
+
+
+def son_seti_oku(dizin=None):
+    """Son kaydedilen {state_key: özet} eşlemesi (yoksa boş)"""
+    yol = os.path.join(dizin or depolama_dizini(), SON_SET)
+    if not os.path.exists(yol):
+        return {}
+    try:
+        with open(yol, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def son_seti_yukle(dizin=None, bellekteki=None):
+    """Son kaydedilen seti okur. Dönüş: {state_key: (özet, DataFrame)}; eksik/bozuk dosyalar atlanır.
+
+    bellekteki: opsiyonel OrtakVeriDeposu; özeti zaten bellekte olan veri setleri diskten okunmaz.
+    """
+    if pa is None:
+        return {}
+
+    veriler = {}
+    for state_key, ozet in son_seti_oku(dizin).items():
+        df = bellekteki.al(ozet) if bellekteki is not None else None
+        if df is None:
+            try:
+                df = veri_seti_oku(ozet, dizin)
+            except (OSError, pa.ArrowInvalid):
+                continue
+        veriler[state_key] = (ozet, df)
+    return veriler
+
+
+def kullanilmayanlari_sil(dizin=None):
+    """son_set.json'da adı geçmeyen veri dosyalarını siler"""
+    dizin = dizin or depolama_dizini()
+    if not os.path.isdir(dizin):
+        return
+    kullanilan = {f'{ozet}.arrow' for ozet in son_seti_oku(dizin).values()}
+    for ad in os.listdir(dizin):
+        if (ad.endswith('.arrow') or ad.endswith('.tmp')) and ad not in kullanilan:
+            os.remove(os.path.join(dizin, ad))
+
+
+class OrtakVeriDeposu:
+    """İçerik özetine göre süreç genelinde paylaşılan, salt okunur veri setleri.
+
+    Aynı özetli veri ikinci kez eklendiğinde mevcut nesne döner. Kayıt zayıf referans
+    tuttuğu için hiçbir oturumun kullanmadığı veri seti bellekten düşer. Paylaşılan
+    DataFrame'ler yerinde değiştirilmemelidir; değişiklik yeni nesne üretmelidir.
+    """
+
+    def __init__(self):
+        self._veriler = weakref.WeakValueDictionary()
+        self._kilit = threading.Lock()
+
+    def paylas(self, ozet, df):
+        """ozet bellekte varsa mevcut nesneyi, yoksa df'i kaydedip döndürür"""
+        with self._kilit:
+            mevcut = self._veriler.get(ozet)
+            if mevcut is not None:
+                return mevcut
+            self._veriler[ozet] = df
+            return df
+
+    def al(self, ozet):
+        return self._veriler.get(ozet)
+
+    def ozet(self):
+        """(veri seti sayısı, toplam bellek MB)"""
+        with self._kilit:
+            veriler = list(self._veriler.values())
+        return len(veriler), sum(df.memory_usage(deep=True).sum() for df in veriler) / 1024 ** 2
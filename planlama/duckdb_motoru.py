@@ -0,0 +1,211 @@
+"""Opsiyonel DuckDB motoru: büyük birleştirme (merge) ve gruplamaların gömülü DuckDB'de çalıştırılması.
+
+DataFrame'ler süreç içi (in-process) bir DuckDB veritabanına tablo olarak kaydedilir
+(kopyalanmadan taranır) ve birleştirme/gruplama SQL ile çok çekirdekli yapılır; bellek
+yetmezse DuckDB geçici dizine taşar. SQL sadece satır eşleşmelerini ve toplamları
+üretir; sonuç kolonları pandas'ta orijinal tiplerle toplanır. Böylece sonuçlar
+(satır sırası, tipler, NaN'ler) pandas karşılığıyla aynıdır:
+
+    birlestir(sol, sag, on)      == sol.merge(sag, on=on, how='left')
+    grupla(df, anahtar, islemler) == df.groupby(anahtar, observed=True).agg(islemler).reset_index()
+
+Kayan noktalı toplamlar toplama sırasından dolayı son basamakta farklı olabilir.
+Ortak kod sözlüğündeki (kodlari_esitle) kategori kolonları tamsayı kodlarıyla eşleştirilir.
+duckdb kurulu değilse ImportError verilir: pip install duckdb
+"""
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Süreç başına tek veritabanı; her çağrı kendi bağlantısını (cursor) açar
+_vt = None
+_kilit = threading.Lock()
+
+# grupla'nın desteklediği işlemler
+ISLEMLER = ('sum', 'nunique', 'first', 'count')
+
+
+def kullanilabilir():
+    return duckdb is not None
+
+
+def _baglanti():
+    global _vt
+    if duckdb is None:
+        raise ImportError("DuckDB motoru için duckdb kurulu olmalı: pip install duckdb")
+    with _kilit:
+        if _vt is None:
+            _vt = duckdb.connect(config={
+                'temp_directory': os.path.join(tempfile.gettempdir(), 'planlama_duckdb'),
+                'preserve_insertion_order': False
+            })
+    return _vt.cursor()
+
+
+def _sorgula(tablolar, sorgu):
+    """tablolar: {ad: DataFrame} kaydedilip sorgu çalıştırılır. Dönüş: {kolon: numpy array}"""
+    baglanti = _baglanti()
+    try:
+        for ad, df in tablolar.items():
+            baglanti.register(ad, df)
+        return baglanti.execute(sorgu).fetchnumpy()
+    finally:
+        baglanti.close()
+
+
+def _numpy(dizi, bos=None):
+    """fetchnumpy sonucundaki maskeli diziyi düz diziye çevirir (NULL -> bos)"""
+    if isinstance(dizi, np.ma.MaskedArray):
+        return dizi.filled(bos) if bos is not None else dizi.data
+    return dizi
+
+
+def _ayni_sozluk(a, b):
+    return (isinstance(a.dtype, pd.CategoricalDtype) and isinstance(b.dtype, pd.CategoricalDtype)
+            and a.dtype.ordered == b.dtype.ordered and a.cat.categories.equals(b.cat.categories))
+
+
+def _degerler(seri):
+    """SQL'e gönderilecek değerler: kategori kolonlarında tamsayı kodlar, diğerlerinde değerler"""
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        return seri.cat.codes.to_numpy()
+    return seri.reset_index(drop=True)
+
+
+def _anahtar_degerleri(seri):
+    """Farklı sözlüklü kategori kolonları değerleriyle (kategorilerinin tipinde) eşleştirilir"""
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        seri = seri.astype(seri.cat.categories.dtype)
+    return seri.reset_index(drop=True)
+
+
+# ============================================
+# BİRLEŞTİRME
+# ============================================
+def birlestir(sol, sag, on, suffixes=('_x', '_y')):
+    """sol.merge(sag, on=on, how='left', suffixes=suffixes) ile aynı sonuç.
+
+    Eşleşmeler (sol satır no, sağ satır no) olarak DuckDB'de bulunur; sağdaki tekrarlı
+    anahtarlar pandas'taki gibi satır çoğaltır. Anahtar kolonları soldaki tipte kalır.
+    """
+    on = [on] if isinstance(on, str) else list(on)
+    sol_anahtar, sag_anahtar = {}, {}
+    for i, kolon in enumerate(on):
+        if _ayni_sozluk(sol[kolon], sag[kolon]):
+            sol_anahtar[f'k{i}'] = sol[kolon].cat.codes.to_numpy()
+            sag_anahtar[f'k{i}'] = sag[kolon].cat.codes.to_numpy()
+        else:
+            sol_anahtar[f'k{i}'] = _anahtar_degerleri(sol[kolon])
+            sag_anahtar[f'k{i}'] = _anahtar_degerleri(sag[kolon])
+
+    # pandas birleştirmesi gibi boş (NaN) anahtarlar birbiriyle eşleşir
+    kosul = ' AND '.join(f's.{k} IS NOT DISTINCT FROM r.{k}' for k in sol_anahtar)
+    eslesme = _sorgula(
+        {
+            'sol': pd.DataFrame({**sol_anahtar, '_sira': np.arange(len(sol))}),
+            'sag': pd.DataFrame({**sag_anahtar, '_sag': np.arange(len(sag))})
+        },
+        f"SELECT s._sira, r._sag FROM sol s LEFT JOIN sag r ON {kosul} ORDER BY s._sira, r._sag"
+    )
+    sira = _numpy(eslesme['_sira'])
+    sag_sira = _numpy(eslesme['_sag'], bos=-1)
+
+    sol_kolonlar = sol.reset_index(drop=True)
+    if len(sira) != len(sol):
+        sol_kolonlar = sol_kolonlar.take(sira).reset_index(drop=True)
+    # Eşleşmeyen satırlar (-1) NaN olur; tipler merge'deki gibi değişir (int -> float)
+    sag_kolonlar = sag.drop(columns=on).reset_index(drop=True).reindex(sag_sira).reset_index(drop=True)
+
+    ortak = set(sol_kolonlar.columns) & set(sag_kolonlar.columns)
+    if ortak:
+        sol_kolonlar = sol_kolonlar.rename(columns={k: f'{k}{suffixes[0]}' for k in ortak})
+        sag_kolonlar = sag_kolonlar.rename(columns={k: f'{k}{suffixes[1]}' for k in ortak})
+    return pd.concat([sol_kolonlar, sag_kolonlar], axis=1)
+
+
+# ============================================
+# GRUPLAMA
+# ============================================
+def _toplam_ifadesi(kolon, tip):
+    if pd.api.types.is_bool_dtype(tip) or pd.api.types.is_integer_dtype(tip):
+        return f'COALESCE(SUM({kolon}), 0)::BIGINT'
+    return f'COALESCE(SUM({kolon}::DOUBLE), 0)'
+
+
+def _toplam_tipi(tip):
+    """pandas groupby toplamının tipi (ör. int32 kolonun toplamı int32 kalır, bool toplamı int64 olur)"""
+    return pd.Series([0], dtype=tip).groupby([0]).sum().dtype
+
+
+def grupla(df, anahtar, islemler):
+    """df.groupby(anahtar, observed=True).agg(islemler).reset_index() ile aynı sonuç.
+
+    islemler: {kolon: 'sum' | 'nunique' | 'first' | 'count'}
+    Boş (NaN) anahtarlı satırlar atılır; gruplar anahtara göre sıralıdır.
+    """
+    anahtarlar = [anahtar] if isinstance(anahtar, str) else list(anahtar)
+    tablo = {'_sira': np.arange(len(df))}
+    secim, filtre = [], []
+    for i, kolon in enumerate(anahtarlar):
+        seri = df[kolon]
+        tablo[f'k{i}'] = _degerler(seri)
+        filtre.append(f'k{i} >= 0' if isinstance(seri.dtype, pd.CategoricalDtype) else f'k{i} IS NOT NULL')
+        secim.append(f'k{i}')
+
+    for j, (kolon, islem) in enumerate(islemler.items()):
+        if islem not in ISLEMLER:
+            raise ValueError(f"DuckDB motoru '{islem}' gruplamasını desteklemiyor ({', '.join(ISLEMLER)})")
+        seri = df[kolon]
+        kategori = isinstance(seri.dtype, pd.CategoricalDtype)
+        tablo[f'v{j}'] = _degerler(seri)
+        deger = f'v{j}'
+        dolu = f'{deger} >= 0' if kategori else f'{deger} IS NOT NULL'
+        if islem == 'sum':
+            secim.append(_toplam_ifadesi(deger, seri.dtype) + f' AS v{j}')
+        elif islem == 'nunique':
+            secim.append(f'COUNT(DISTINCT {deger}) FILTER (WHERE {dolu})::BIGINT AS v{j}')
+        elif islem == 'count':
+            secim.append(f'COUNT({deger}) FILTER (WHERE {dolu})::BIGINT AS v{j}')
+        else:
+            secim.append(f'arg_min({deger}, _sira) FILTER (WHERE {dolu}) AS v{j}')
+
+    anahtar_listesi = ', '.join(f'k{i}' for i in range(len(anahtarlar)))
+    sonuc = _sorgula(
+        {'veri': pd.DataFrame(tablo)},
+        f"SELECT {', '.join(secim)} FROM veri WHERE {' AND '.join(filtre)} "
+        f"GROUP BY {anahtar_listesi} ORDER BY {anahtar_listesi}"
+    )
+
+    kolonlar = {}
+    for i, kolon in enumerate(anahtarlar):
+        kolonlar[kolon] = _kolona_cevir(sonuc[f'k{i}'], df[kolon].dtype)
+    for j, (kolon, islem) in enumerate(islemler.items()):
+        tip = df[kolon].dtype
+        if islem == 'sum':
+            kolonlar[kolon] = _numpy(sonuc[f'v{j}']).astype(_toplam_tipi(tip))
+        elif islem == 'first':
+            kolonlar[kolon] = _kolona_cevir(sonuc[f'v{j}'], tip)
+        else:
+            kolonlar[kolon] = _numpy(sonuc[f'v{j}']).astype('int64')
+    return pd.DataFrame(kolonlar)
+
+
+def _kolona_cevir(dizi, tip):
+    """SQL'den dönen kod/değer dizisini kaynak kolonun tipine çevirir"""
+    if isinstance(tip, pd.CategoricalDtype):
+        return pd.Categorical.from_codes(_numpy(dizi, bos=-1).astype('int64'), dtype=tip)
+    bos = np.ma.getmaskarray(dizi).any() if isinstance(dizi, np.ma.MaskedArray) else False
+    seri = pd.Series(np.ma.filled(dizi.astype(object), np.nan) if bos else _numpy(dizi))
+    try:
+        return seri.astype(tip)
+    except (TypeError, ValueError):
+        # Boş değerli tamsayı kolon (pandas'ta da float olur)
+        return seri.astype('float64')
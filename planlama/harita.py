@@ -0,0 +1,126 @@
+"""İl bazında harita: pakete gömülü il merkezleriyle çevrimdışı nokta haritası.
+
+veri/iller.geojson her il için merkez noktasını (Point) ve özellikler il (ad), plaka ve merkez
+([boylam, enlem]) içerir. Pakette gerçek il sınırı verisi olmadığından il alanları çizilmez;
+her il merkezindeki bir işaretçiyle gösterilir ve işaretçi rengi ilin değerini taşır.
+
+Harita karo (tile) sunucusu kullanmaz: işaretçiler düz boylam/enlem eksenlerinde go.Scatter
+ile çizilir. Her renk grubu tek iz (trace) olduğundan figürdeki iz sayısı il sayısından
+bağımsızdır ve çizim süresi sınırlıdır.
+"""
+import functools
+import json
+import math
+import numbers
+import os
+
+import pandas as pd
+
+try:
+    import plotly.graph_objects as go
+except ImportError:
+    go = None
+
+IL_DOSYASI = os.path.join(os.path.dirname(__file__), 'veri', 'iller.geojson')
+
+# Verisi olmayan iller
+BOS_RENK = '#e0e0e0'
+
+
+def harita_kullanilabilir():
+    """plotly yüklü mü"""
+    return go is not None
+
+
+def il_anahtari(ad):
+    """Türkçe büyük/küçük harf ve boşluk farklarını yok sayan il adı anahtarı"""
+    if not isinstance(ad, str):
+        return None
+    return ' '.join(ad.replace('İ', 'i').replace('I', 'ı').lower().split())
+
+
+@functools.lru_cache(maxsize=None)
+def il_geometrileri(dosya=IL_DOSYASI):
+    """{il anahtarı: {'il', 'plaka', 'merkez': (boylam, enlem)}}"""
+    with open(dosya, encoding='utf-8') as f:
+        veri = json.load(f)
+
+    geometriler = {}
+    for ozellik in veri['features']:
+        ozellikler = ozellik['properties']
+        geometriler[il_anahtari(ozellikler['il'])] = {
+            'il': ozellikler['il'],
+            'plaka': ozellikler.get('plaka'),
+            'merkez': tuple(ozellikler['merkez'])
+        }
+    return geometriler
+
+
+def il_koordinatlari(iller):
+    """iller (il adları Series'i, kategorik olabilir) için lat/lon kolonları; bilinmeyen iller NaN"""
+    geometriler = il_geometrileri()
+    # Kategorik kolonlarda map kategori başına çalışır; demet döndüren fonksiyonlar desteklenmez
+    anahtarlar = iller.astype(str).map(il_anahtari)
+    return pd.DataFrame({
+        'lat': anahtarlar.map({anahtar: g['merkez'][1] for anahtar, g in geometriler.items()}).astype('float64'),
+        'lon': anahtarlar.map({anahtar: g['merkez'][0] for anahtar, g in geometriler.items()}).astype('float64')
+    }, index=iller.index)
+
+
+def il_haritasi(il_df, il_kolonu, renk_kolonu, renkler, hover_kolonlari=(), baslik=None, yukseklik=600):
+    """İl merkezlerinde renkli işaretçilerden oluşan harita figürü.
+
+    il_df: il başına bir satır; renk_kolonu değerleri renkler {değer: renk} ile boyanır, sözlük
+    sırası lejant sırasıdır. hover_kolonlari işaretçinin üzerine gelince gösterilir.
+    """
+    if go is None:
+        raise ImportError("Harita için plotly gerekli: pip install plotly")
+
+    geometriler = il_geometrileri()
+    anahtarlar = il_df[il_kolonu].astype(str).map(il_anahtari)
+    tablo = il_df[anahtarlar.isin(geometriler.keys())]
+    anahtarlar = anahtarlar[tablo.index]
+
+    fig = go.Figure()
+
+    # Verisi olmayan iller küçük gri noktalar
+    verili = set(anahtarlar)
+    bos = [g for anahtar, g in geometriler.items() if anahtar not in verili]
+    if bos:
+        fig.add_trace(go.Scatter(
+            x=[g['merkez'][0] for g in bos], y=[g['merkez'][1] for g in bos], mode='markers',
+            marker=dict(size=7, color=BOS_RENK), text=[g['il'] for g in bos],
+            hovertemplate='%{text}<extra></extra>', name='Veri yok'
+        ))
+
+    # Bilgi metinleri
+    metinler = []
+    for (_, satir), anahtar in zip(tablo.iterrows(), anahtarlar):
+        satirlar = [f"<b>{geometriler[anahtar]['il']}</b>"]
+        for kolon in hover_kolonlari:
+            deger = satir[kolon]
+            satirlar.append(f"{kolon}: {deger:,.0f}" if isinstance(deger, numbers.Number) else f"{kolon}: {deger}")
+        metinler.append('<br>'.join(satirlar))
+    metinler = pd.Series(metinler, index=tablo.index, dtype=object)
+
+    # Her renk grubu tek iz
+    for deger, renk in renkler.items():
+        secim = (tablo[renk_kolonu] == deger).to_numpy()
+        if not secim.any():
+            continue
+        merkezler = [geometriler[anahtar]['merkez'] for anahtar in anahtarlar[secim]]
+        fig.add_trace(go.Scatter(
+            x=[m[0] for m in merkezler], y=[m[1] for m in merkezler], mode='markers',
+            marker=dict(size=16, color=renk, line=dict(color='rgba(40, 40, 40, 0.6)', width=1)),
+            text=metinler[secim].tolist(), hovertemplate='%{text}<extra></extra>', name=str(deger)
+        ))
+
+    # Boylam/enlem oranı Türkiye'nin orta enleminde sabit (eşdikdörtgen izdüşüm)
+    fig.update_xaxes(visible=False, range=[25.5, 45.0])
+    fig.update_yaxes(visible=False, range=[35.6, 42.3], scaleanchor='x', scaleratio=1 / math.cos(math.radians(39.0)))
+    fig.update_layout(
+        title=baslik, height=yukseklik, plot_bgcolor='white', hovermode='closest',
+        margin={"r": 0, "t": 30 if baslik else 0, "l": 0, "b": 0},
+        legend=dict(orientation='h', yanchor='bottom', y=0, xanchor='left', x=0)
+    )
+    return fig
@@ -0,0 +1,161 @@
+"""Uzun hesaplamaları arka plan iş parçacığında çalıştıran işler (job).
+
+İş, ilerleme(yuzde, mesaj) parametresi alan bir çekirdek fonksiyonunu (sevkiyat_hesapla,
+alim_siparis_hesapla, ...) ayrı bir iş parçacığında çalıştırır. Her yeni mesaj (sondaki
+(i/n) sayacı hariç) bir aşama başlatır; aşama süreleri, CPU süresi, tepe bellek artışı ve satır/sn ölçülür. İptal, fonksiyonun bir sonraki
+ilerleme çağrısında IsIptalEdildi fırlatılarak yapılır.
+
+Genel ilerleme yüzdesi, aynı adlı işin önceki çalışmasındaki aşama sürelerinden
+hesaplanır; ilk çalışmada fonksiyonun bildirdiği yüzde kullanılır. İş, Streamlit'e
+bağımlı değildir; sonucu session state'e yazmak çağıranın işidir.
+"""
+import re
+import threading
+import time
+import traceback
+
+from .olcum import Olcum
+
+# İş adı -> son başarılı çalışmadaki {aşama: süre}
+_onceki_sureler = {}
+
+# "Depo bazında hesaplanıyor... (3/12)" gibi sayaçlar aşama adına dahil edilmez
+_SAYAC = re.compile(r'\s*\(\d+/\d+\)\s*$')
+
+
+def asama_adi(mesaj):
+    """İlerleme mesajından aşama adı (sondaki (i/n) sayacı atılır)"""
+    return _SAYAC.sub('', mesaj)
+
+
+class IsIptalEdildi(Exception):
+    """Kullanıcı işi iptal etti"""
+
+
+class ArkaPlanIsi:
+    """fonksiyon(ilerleme=..., **parametreler) çağrısını arka planda çalıştırır.
+
+    durum: 'bekliyor', 'calisiyor', 'bitti', 'hata' veya 'iptal'
+    satir_sayisi: satır/sn hesabı için işlenen girdi satırı sayısı (opsiyonel).
+    """
+
+    def __init__(self, ad, fonksiyon, satir_sayisi=None, **parametreler):
+        self.ad = ad
+        self.satir_sayisi = satir_sayisi
+        self.parametreler = parametreler
+        self.durum = 'bekliyor'
+        self.mesaj = ''
+        self.asama = ''
+        self.sonuc = None
+        self.hata = None
+        self.hata_detayi = None
+        self.uyarilar = []
+        self.asamalar = []
+        self.baslangic = None
+        self.bitis = None
+
+        self._bildirilen_yuzde = 0
+        self._asama_baslangic = None
+        self._asama_olcumu = None
+        self._iptal = threading.Event()
+        self._kilit = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._calistir, args=(fonksiyon,), name=f'is-{ad}', daemon=True
+        )
+
+    # ---- kontrol ----
+    def baslat(self):
+        self.durum = 'calisiyor'
+        self.baslangic = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def iptal_et(self):
+        self._iptal.set()
+
+    @property
+    def calisiyor(self):
+        return self.durum == 'calisiyor'
+
+    def uyari(self, mesaj):
+        """Çekirdek fonksiyonların uyari(mesaj) parametresine verilebilir"""
+        with self._kilit:
+            self.uyarilar.append(mesaj)
+
+    # ---- durum ----
+    def gecen_sure(self):
+        if self.baslangic is None:
+            return 0.0
+        return (self.bitis or time.perf_counter()) - self.baslangic
+
+    def yuzde(self):
+        """Genel ilerleme (0-100); önceki çalışmanın aşama süreleri biliniyorsa onlara göre"""
+        if self.durum == 'bitti':
+            return 100
+        onceki = _onceki_sureler.get(self.ad)
+        with self._kilit:
+            biten = [a['Aşama'] for a in self.asamalar]
+            asama, asama_baslangic = self.asama, self._asama_baslangic
+        if not onceki or any(a not in onceki for a in biten + [asama]):
+            return self._bildirilen_yuzde
+
+        toplam = sum(onceki.values())
+        tamamlanan = sum(onceki[a] for a in biten)
+        if asama_baslangic is not None:
+            tamamlanan += min(time.perf_counter() - asama_baslangic, onceki[asama])
+        return int(99 * tamamlanan / toplam) if toplam > 0 else self._bildirilen_yuzde
+
+    def asama_tablosu(self):
+        """Biten aşamalar: [{'Aşama', 'Süre (sn)', 'CPU (sn)', 'Tepe Bellek Δ (MB)', 'Satır/sn'}]"""
+        with self._kilit:
+            return list(self.asamalar)
+
+    # ---- iş parçacığı ----
+    def _ilerleme(self, yuzde, mesaj):
+        if self._iptal.is_set():
+            raise IsIptalEdildi()
+        simdi = time.perf_counter()
+        with self._kilit:
+            self._bildirilen_yuzde = yuzde
+            if yuzde >= 100:
+                self._asamayi_kapat(simdi)
+                return
+            self.mesaj = mesaj
+            if asama_adi(mesaj) != self.asama:
+                self._asamayi_kapat(simdi)
+                self.asama = asama_adi(mesaj)
+                self._asama_baslangic = simdi
+                self._asama_olcumu = Olcum().baslat()
+
+    def _asamayi_kapat(self, simdi):
+        if self._asama_baslangic is None:
+            return
+        sure = simdi - self._asama_baslangic
+        olcum = self._asama_olcumu.bitir().kayit()
+        self.asamalar.append({
+            'Aşama': self.asama,
+            'Süre (sn)': round(sure, 3),
+            'CPU (sn)': olcum['CPU (sn)'],
+            'Tepe Bellek Δ (MB)': olcum['Tepe Bellek Δ (MB)'],
+            'Satır/sn': round(self.satir_sayisi / sure) if self.satir_sayisi and sure > 0 else None
+        })
+        self._asama_baslangic = None
+        self._asama_olcumu = None
+
+    def _calistir(self, fonksiyon):
+        try:
+            self.sonuc = fonksiyon(ilerleme=self._ilerleme, **self.parametreler)
+            durum = 'bitti'
+        except IsIptalEdildi:
+            durum = 'iptal'
+        except Exception as e:
+            self.hata = e
+            self.hata_detayi = traceback.format_exc()
+            durum = 'hata'
+
+        with self._kilit:
+            self._asamayi_kapat(time.perf_counter())
+            if durum == 'bitti':
+                _onceki_sureler[self.ad] = {a['Aşama']: a['Süre (sn)'] for a in self.asamalar}
+        self.bitis = time.perf_counter()
+        self.durum = durum
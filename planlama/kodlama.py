@@ -0,0 +1,91 @@
+"""Ürün, mağaza ve depo kodları için ortak (global) sözlük kodlaması.
+
+Tüm veri setlerindeki kodların birleşimi bir kez sıralanır ve her kod kolonuna aynı
+CategoricalDtype verilir. Böylece merge, groupby ve depo tahsisi metin yerine yoğun
+tamsayı id'ler (kategori kodları) üzerinde çalışır. Kodlar sadece gösterim ve dışa
+aktarımda metne döner; pandas bunu kategoriler üzerinden kendisi yapar.
+
+Kategoriler metin sırasındadır, bu yüzden kodlara göre sıralama/gruplama eski
+metin anahtarlarla aynı sırayı verir.
+"""
+import numpy as np
+import pandas as pd
+
+KOD_KOLONLARI = ('urun_kod', 'magaza_kod', 'depo_kod')
+
+
+def kod_metni(x):
+    """Tek bir kodu metne çevirir; '123.0' gibi float'tan dönmüş kodlar '123' olur.
+
+    Sadece rakamdan oluşan kodların baştaki sıfırları atılır ('0123' -> '123'): kod kolonu
+    bir dosyada sayı, diğerinde metin olarak okunduğunda aynı kod eşleşir. Bu yüzden sadece
+    baştaki sıfırlarla ayrılan kodlar ('0123', '00123' ve '123') tek koda birleşir; bunlar farklı
+    ürün/mağaza/depo ise kodlar sıfırsız yazımda da farklı olmalıdır. 'U0123' gibi harf içeren
+    kodlar olduğu gibi kalır.
+    """
+    if pd.isna(x):
+        return x
+    x = str(x)
+    if x.isascii() and x.isdigit():
+        return str(int(x))
+    try:
+        return str(int(float(x))) if '.' in x else x
+    except ValueError:
+        return x
+
+
+def _benzersiz_kodlar(seri):
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        return seri.cat.categories
+    return pd.unique(seri.dropna())
+
+
+def _ayni_sozluk(tip, sozluk_tipi):
+    # Sırasız kategorilerde == sırayı dikkate almaz; kodların aynı olması için sıra da aynı olmalı
+    return (
+        isinstance(tip, pd.CategoricalDtype)
+        and tip == sozluk_tipi
+        and tip.categories.equals(sozluk_tipi.categories)
+    )
+
+
+def kod_sozlugu_olustur(*veriler):
+    """Verilen DataFrame'lerdeki kodların birleşiminden {kolon: CategoricalDtype} sözlüğü"""
+    sozluk = {}
+    for kolon in KOD_KOLONLARI:
+        kodlar = set()
+        for df in veriler:
+            if df is not None and kolon in df.columns:
+                kodlar.update(kod_metni(x) for x in _benzersiz_kodlar(df[kolon]))
+        sozluk[kolon] = pd.CategoricalDtype(sorted(kodlar))
+    return sozluk
+
+
+def kodla(df, sozluk):
+    """df'in kod kolonlarını sözlükteki ortak kategorilere çevirir (sözlükte olmayan kod NaN olur)"""
+    yeni = {}
+    for kolon in KOD_KOLONLARI:
+        if kolon not in df.columns or _ayni_sozluk(df[kolon].dtype, sozluk[kolon]):
+            continue
+        # Dönüşüm benzersiz değerler üzerinden yapılır, satırlara kod dizisiyle yayılır
+        kodlar, benzersiz = pd.factorize(df[kolon])
+        hedef = sozluk[kolon].categories.get_indexer([kod_metni(x) for x in benzersiz])
+        yeni[kolon] = pd.Categorical.from_codes(np.append(hedef, -1)[kodlar], dtype=sozluk[kolon])
+    return df.assign(**yeni) if yeni else df
+
+
+def kodlari_esitle(*veriler):
+    """DataFrame'leri ortak kod sözlüğüne çevirir; None olanlar None kalır.
+
+    Tüm kod kolonları zaten aynı sözlükteyse girdiler olduğu gibi döner.
+    """
+    mevcut = [df for df in veriler if df is not None]
+    for kolon in KOD_KOLONLARI:
+        tipler = [df[kolon].dtype for df in mevcut if kolon in df.columns]
+        if tipler and not all(_ayni_sozluk(t, tipler[0]) for t in tipler):
+            break
+    else:
+        return list(veriler)
+
+    sozluk = kod_sozlugu_olustur(*mevcut)
+    return [None if df is None else kodla(df, sozluk) for df in veriler]
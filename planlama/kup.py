@@ -0,0 +1,118 @@
+"""sevkiyat_sonuc üzerinde hesaplama bitince bir kez oluşturulan rapor küpü (OLAP).
+
+En ince tanecik (magaza_kod, urun_kod, durum) hücreleridir; ölçüler ihtiyaç, sevkiyat ve
+kayıptır. Tahsis sonucunda her (mağaza, ürün) tek satır olduğundan hücreler sonuç
+satırlarının sadece gereken kolonlarıdır (adlar ve stok kolonları alınmaz). Hücrelere ürün
+boyutu (urun_segment, urun_master'dan mg, marka, kategori) ve mağaza boyutu (magaza_segment,
+magaza_master'dan il, bolge, tip) eklenir ve her seviyenin toplamı bir kez hesaplanır.
+Raporlar bu toplamları süzer/sıralar; sevkiyat_sonuc'u yeniden taramaz.
+
+Seviye toplamlarının kolonları: seviye kolonu (hiyerarşilerde ad kolonu da), ihtiyac,
+sevkiyat, kayip ve farklı ürün/mağaza sayıları urun_sayisi, magaza_sayisi, kayipli_urun,
+kayipli_magaza (kayipli_*: kaybı olan hücrelerde; urun_kod seviyesinde ürün, magaza_kod
+seviyesinde mağaza sayısı yoktur). Gruplar seviye değerine göre sıralıdır, boş değerler atılır.
+"""
+from .motor import birlestir, grupla
+
+# sevkiyat_sonuc kolonu -> küp ölçüsü
+OLCULER = {'ihtiyac_miktari': 'ihtiyac', 'sevkiyat_miktari': 'sevkiyat', 'stok_yoklugu_satis_kaybi': 'kayip'}
+
+# Seviye -> ad kolonu (master'da varsa toplamlara eklenir)
+URUN_SEVIYELERI = {'urun_kod': None, 'urun_segment': None, 'mg': 'mg_ad', 'marka_kod': 'marka_ad', 'kategori_kod': 'kategori_ad'}
+MAGAZA_SEVIYELERI = {'magaza_kod': None, 'magaza_segment': None, 'il': None, 'bolge': None, 'tip': None}
+
+# Seviye -> arayüzde görünen ad
+SEVIYE_ADLARI = {
+    'urun_kod': 'Ürün', 'urun_segment': 'Ürün Segmenti', 'mg': 'Mal Grubu', 'marka_kod': 'Marka',
+    'kategori_kod': 'Kategori', 'magaza_kod': 'Mağaza', 'magaza_segment': 'Mağaza Segmenti',
+    'il': 'İl', 'bolge': 'Bölge', 'tip': 'Mağaza Tipi', 'durum': 'Durum'
+}
+
+
+def _seviye_toplami(hucreler, seviye, sayilacaklar, motor=None):
+    """seviye bazında ölçü toplamları ve sayilacaklar {kolon: ad} için farklı değer sayıları"""
+    islemler = {**dict.fromkeys(OLCULER.values(), 'sum'), **dict.fromkeys(sayilacaklar, 'nunique')}
+    toplam = grupla(hucreler, seviye, islemler, motor=motor).rename(
+        columns={kolon: f'{ad}_sayisi' for kolon, ad in sayilacaklar.items()}
+    )
+    kayipli = grupla(hucreler[hucreler['kayip'] > 0], seviye, dict.fromkeys(sayilacaklar, 'nunique'), motor=motor)
+    kayipli = kayipli.rename(columns={kolon: f'kayipli_{ad}' for kolon, ad in sayilacaklar.items()})
+    toplam = toplam.merge(kayipli, on=seviye, how='left')
+    for ad in sayilacaklar.values():
+        toplam[f'kayipli_{ad}'] = toplam[f'kayipli_{ad}'].fillna(0).astype('int64')
+    return toplam
+
+
+class SevkiyatKupu:
+    """kup_olustur sonucu: hücreler ve seviye toplamları.
+
+    hucreler: hücre DataFrame'i (boyut kolonlarıyla); toplamlar: {seviye: toplam DataFrame'i}
+    """
+
+    def __init__(self, hucreler, toplamlar):
+        self.hucreler = hucreler
+        self.toplamlar = toplamlar
+
+    @property
+    def seviyeler(self):
+        return list(self.toplamlar)
+
+    def seviye(self, ad):
+        """Seviye toplamları (paylaşılan nesne; değiştirmeden kullanın)"""
+        return self.toplamlar[ad]
+
+    def toplam(self):
+        """Genel toplamlar: ölçüler, ürün/mağaza sayıları ve sevkiyatı olan ürün/mağaza sayıları"""
+        urun, magaza = self.toplamlar['urun_kod'], self.toplamlar['magaza_kod']
+        return {
+            **{olcu: self.hucreler[olcu].sum() for olcu in OLCULER.values()},
+            'urun_sayisi': len(urun),
+            'magaza_sayisi': len(magaza),
+            'sevkli_urun': int((urun['sevkiyat'] > 0).sum()),
+            'sevkli_magaza': int((magaza['sevkiyat'] > 0).sum())
+        }
+
+    def dilim(self, seviyeler, filtre=None, motor=None):
+        """Önceden toplanmamış seviye birleşimleri (örn. ['mg', 'il']) için hücrelerden ölçü toplamları.
+
+        filtre: {kolon: değer listesi}; sadece bu değerlerdeki hücreler toplanır.
+        """
+        hucreler = self.hucreler
+        for kolon, degerler in (filtre or {}).items():
+            hucreler = hucreler[hucreler[kolon].isin(degerler)]
+        return grupla(hucreler, list(seviyeler), dict.fromkeys(OLCULER.values(), 'sum'), motor=motor)
+
+
+def kup_olustur(sevkiyat_sonuc, urun_master=None, magaza_master=None, motor=None):
+    """sevkiyat_sonuc'tan SevkiyatKupu oluşturur; master'lar yoksa sadece segment/durum seviyeleri olur"""
+    hucreler = sevkiyat_sonuc[
+        ['magaza_kod', 'urun_kod', 'durum', 'urun_segment', 'magaza_segment', *OLCULER]
+    ].rename(columns=OLCULER)
+
+    urun_seviyeleri = ['urun_kod', 'urun_segment']
+    magaza_seviyeleri = ['magaza_kod', 'magaza_segment']
+    adlar = {}
+    for master, anahtar, seviyeler, liste in (
+        (urun_master, 'urun_kod', URUN_SEVIYELERI, urun_seviyeleri),
+        (magaza_master, 'magaza_kod', MAGAZA_SEVIYELERI, magaza_seviyeleri)
+    ):
+        if master is None:
+            continue
+        boyut = [kolon for kolon in seviyeler if kolon in master.columns and kolon != anahtar]
+        hucreler = birlestir(hucreler, master[[anahtar, *boyut]], anahtar, motor=motor)
+        liste.extend(k for k in boyut if k not in liste)
+        for kolon in boyut:
+            ad = seviyeler[kolon]
+            if ad is not None and ad in master.columns:
+                adlar[kolon] = master[[kolon, ad]].drop_duplicates(kolon)
+
+    toplamlar = {}
+    for seviye in [*urun_seviyeleri, *magaza_seviyeleri, 'durum']:
+        sayilacaklar = {kolon: ad for kolon, ad in (('urun_kod', 'urun'), ('magaza_kod', 'magaza')) if kolon != seviye}
+        toplamlar[seviye] = _seviye_toplami(hucreler, seviye, sayilacaklar, motor=motor)
+
+    for seviye, ad_tablosu in adlar.items():
+        toplam = toplamlar[seviye].merge(ad_tablosu, on=seviye, how='left')
+        toplamlar[seviye] = toplam[[seviye, ad_tablosu.columns[1], *[k for k in toplam.columns if k not in ad_tablosu.columns]]]
+
+    return SevkiyatKupu(hucreler, toplamlar)
@@ -0,0 +1,41 @@
+"""Büyük birleştirme ve gruplamaların çalıştırılacağı motor seçimi.
+
+Çekirdek fonksiyonların motor parametresi: None / 'pandas' (varsayılan), 'duckdb'
+(opsiyonel, bkz. duckdb_motoru) veya 'polars' (opsiyonel, bkz. polars_motoru). Motorlar
+aynı sonucu verir; seçim sadece hızı ve bellek kullanımını değiştirir.
+
+Polars motoru sevkiyat hesaplamasının tamamını tek sorguda yapar (cekirdek.sevkiyat_hesapla);
+diğer fonksiyonlardaki tekil birleştirme/gruplamalar 'polars' seçiliyken pandas'ta çalışır.
+"""
+
+# Motor kodu -> görünen ad
+MOTORLAR = {'pandas': 'pandas', 'duckdb': 'DuckDB', 'polars': 'Polars'}
+
+
+def kullanilabilir_motorlar():
+    """Bu ortamda kurulu olan motorların kodları"""
+    from . import duckdb_motoru, polars_motoru
+    kurulu = {'duckdb': duckdb_motoru.kullanilabilir(), 'polars': polars_motoru.kullanilabilir()}
+    return [m for m in MOTORLAR if kurulu.get(m, True)]
+
+
+def _motor_kontrol(motor):
+    if motor not in (None, *MOTORLAR):
+        raise ValueError(f"Bilinmeyen hesaplama motoru: {motor} ({', '.join(MOTORLAR)})")
+    return motor == 'duckdb'
+
+
+def birlestir(sol, sag, on, motor=None, suffixes=('_x', '_y')):
+    """sol.merge(sag, on=on, how='left') seçilen motorda"""
+    if _motor_kontrol(motor):
+        from .duckdb_motoru import birlestir as duckdb_birlestir
+        return duckdb_birlestir(sol, sag, on, suffixes=suffixes)
+    return sol.merge(sag, on=on, how='left', suffixes=suffixes)
+
+
+def grupla(df, anahtar, islemler, motor=None):
+    """df.groupby(anahtar, observed=True).agg(islemler).reset_index() seçilen motorda"""
+    if _motor_kontrol(motor):
+        from .duckdb_motoru import grupla as duckdb_grupla
+        return duckdb_grupla(df, anahtar, islemler)
+    return df.groupby(anahtar, observed=True).agg(islemler).reset_index()
@@ -0,0 +1,242 @@
+"""Veri tanımlarındaki şemaya göre tipli, düşük bellekli CSV/Parquet/Feather okuma.
+
+Sadece tanımlı kolonlar okunur (usecols), kodlar/adlar kategori, adetler int32,
+tutarlar float32 olur. CSV için pyarrow kuruluysa çok iş parçacıklı Arrow CSV
+okuyucusu, değilse pandas C motoru kullanılır; Parquet ve Feather pyarrow ile
+sadece gerekli kolonlar seçilerek okunur. Birden fazla dosya, başlıkları
+doğrulandıktan sonra iş parçacığı havuzunda eşzamanlı okunur (dosyalari_oku).
+Belleğe sığmayan dosyalar parcali_oku ile parça parça okunabilir.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+
+from .kodlama import kod_metni
+from .tanimlar import DOSYA_UZANTILARI, KATEGORI
+
+
+def _okuma_tipi(tip):
+    # Tamsayı kolonları boş hücre içerebilir; önce float64 okunup sonra küçültülür
+    return 'float64' if tip.startswith('int') else tip
+
+
+def _tamsayiya_kucult(seri, tip):
+    """Tüm değerler dolu ve tamsayıysa int32/int16'ya, değilse float32'ye çevirir"""
+    degerler = seri.to_numpy()
+    sinir = np.iinfo(tip)
+    if len(degerler) == 0 or (
+        not np.isnan(degerler).any()
+        and np.array_equal(degerler, np.floor(degerler))
+        and sinir.min <= degerler.min() and degerler.max() <= sinir.max
+    ):
+        return seri.astype(tip)
+    return seri.astype('float32')
+
+
+def _kod_temizle(seri):
+    """'123.0' gibi float'tan dönmüş kodları kategori seviyesinde '123' yapar"""
+    kategoriler = [str(k) for k in seri.cat.categories]
+    temiz = [kod_metni(k) for k in kategoriler]
+    if temiz == kategoriler:
+        return seri
+    if len(set(temiz)) == len(temiz):
+        return seri.cat.rename_categories(temiz)
+    return seri.map(dict(zip(seri.cat.categories, temiz))).astype(KATEGORI)
+
+
+def dosya_bicimi(kaynak):
+    """Dosya adının uzantısından biçim: 'csv', 'parquet' veya 'feather' (tanımsızsa 'csv')"""
+    ad = str(getattr(kaynak, 'name', kaynak)).lower()
+    uzanti = ad.rsplit('.', 1)[-1] if '.' in ad else ''
+    return uzanti if uzanti in DOSYA_UZANTILARI else 'csv'
+
+
+def _arrow_gerekli(bicim):
+    if pa is None:
+        raise ImportError(f"{bicim.capitalize()} dosyaları için pyarrow kurulu olmalı: pip install pyarrow")
+
+
+def _sema_kolonlari(kaynak, bicim):
+    """Dosyadaki kolon adları; veri satırları okunmaz"""
+    if bicim == 'parquet':
+        _arrow_gerekli(bicim)
+        return pa_parquet.read_schema(kaynak).names
+    if bicim == 'feather':
+        _arrow_gerekli(bicim)
+        return pa.ipc.open_file(kaynak).schema.names
+    return pd.read_csv(kaynak, nrows=0).columns
+
+
+def kolonlari_kontrol_et(kaynak, definition):
+    """Sadece başlık satırını (Parquet/Feather'da şemayı) okur. Dönüş: (eksik kolonlar, fazla kolonlar)"""
+    mevcut = set(_sema_kolonlari(kaynak, dosya_bicimi(kaynak)))
+    if hasattr(kaynak, 'seek'):
+        kaynak.seek(0)
+    gerekli = set(definition['columns'])
+    return gerekli - mevcut, mevcut - gerekli
+
+
+def _tipleri_uygula(df, tipler):
+    """Okunan kolonları şemadaki tiplere getirir (tamsayı küçültme, kategori, kod temizliği)"""
+    for kolon, tip in tipler.items():
+        if tip.startswith('int'):
+            df[kolon] = _tamsayiya_kucult(df[kolon].astype('float64'), tip)
+        elif tip == KATEGORI:
+            if not isinstance(df[kolon].dtype, pd.CategoricalDtype):
+                df[kolon] = df[kolon].astype(KATEGORI)
+            if kolon.endswith('_kod') or kolon in ('mg', 'mg_id'):
+                df[kolon] = _kod_temizle(df[kolon])
+        elif df[kolon].dtype != tip:
+            df[kolon] = df[kolon].astype(tip)
+    return df
+
+
+def _csv_secenekleri(definition):
+    arrow_tipleri = {
+        KATEGORI: pa.dictionary(pa.int32(), pa.string()),
+        'float32': pa.float32(),
+        'float64': pa.float64()
+    }
+    return pa_csv.ConvertOptions(
+        include_columns=definition['columns'],
+        column_types={k: arrow_tipleri[_okuma_tipi(t)] for k, t in definition['dtypes'].items()},
+        strings_can_be_null=True
+    )
+
+
+def csv_oku(kaynak, definition):
+    """CSV'yi tanımdaki kolon ve tiplerle okur (kaynak: dosya yolu veya dosya nesnesi)"""
+    kolonlar = definition['columns']
+    tipler = definition['dtypes']
+
+    if pa is not None:
+        tablo = pa_csv.read_csv(kaynak, convert_options=_csv_secenekleri(definition))
+        df = tablo.to_pandas()
+    else:
+        df = pd.read_csv(
+            kaynak,
+            usecols=kolonlar,
+            dtype={k: _okuma_tipi(t) for k, t in tipler.items()},
+            engine='c'
+        )
+
+    return _tipleri_uygula(df, tipler)[kolonlar]
+
+
+def _arrow_tablosu_oku(kaynak, definition, bicim):
+    """Parquet/Feather dosyasından sadece tanımlı kolonları okur"""
+    _arrow_gerekli(bicim)
+    kolonlar = definition['columns']
+    if bicim == 'parquet':
+        tablo = pa_parquet.read_table(kaynak, columns=kolonlar)
+    else:
+        tablo = pa_feather.read_table(kaynak, columns=kolonlar)
+    return _arrow_tablosunu_cevir(tablo, definition)
+
+
+def _arrow_tablosunu_cevir(tablo, definition):
+    # Kategori kolonları CSV'deki gibi metin olur ve sözlük kodlu (kategori) olarak pandas'a geçer
+    for i, alan in enumerate(tablo.schema):
+        if definition['dtypes'].get(alan.name) != KATEGORI or pa.types.is_dictionary(alan.type):
+            continue
+        kolon = tablo.column(i)
+        if not pa.types.is_string(alan.type):
+            kolon = kolon.cast(pa.string())
+        tablo = tablo.set_column(i, alan.name, kolon.dictionary_encode())
+
+    return _tipleri_uygula(tablo.to_pandas(), definition['dtypes'])[definition['columns']]
+
+
+def _arrow_parcalari(kaynak, definition, bicim, satir_sayisi):
+    """Dosyanın Arrow kayıt gruplarını (RecordBatch) yaklaşık satir_sayisi satırlık tablolara toplar"""
+    kolonlar = definition['columns']
+    if bicim == 'csv':
+        okuyucu = pa_csv.open_csv(kaynak, convert_options=_csv_secenekleri(definition))
+        gruplar = iter(okuyucu)
+    elif bicim == 'parquet':
+        gruplar = pa_parquet.ParquetFile(kaynak).iter_batches(batch_size=satir_sayisi, columns=kolonlar)
+    else:
+        if isinstance(kaynak, (str, os.PathLike)):
+            kaynak = pa.memory_map(os.fspath(kaynak), 'r')
+        okuyucu = pa.ipc.open_file(kaynak)
+        gruplar = (okuyucu.get_batch(i).select(kolonlar) for i in range(okuyucu.num_record_batches))
+
+    biriken, satir = [], 0
+    for grup in gruplar:
+        for baslangic in range(0, max(grup.num_rows, 1), satir_sayisi):
+            parca = grup.slice(baslangic, satir_sayisi)
+            biriken.append(parca)
+            satir += parca.num_rows
+            if satir >= satir_sayisi:
+                yield pa.Table.from_batches(biriken).unify_dictionaries()
+                biriken, satir = [], 0
+    if biriken:
+        yield pa.Table.from_batches(biriken).unify_dictionaries()
+
+
+def parcali_oku(kaynak, definition, satir_sayisi=1_000_000):
+    """Dosyayı yaklaşık satir_sayisi satırlık DataFrame parçaları halinde okur (generator).
+
+    Parçalar veri_oku ile aynı kolon ve tiplerdedir; ancak tamsayı kolonların int32/float32
+    kararı ve kategori kolonlarının kategorileri parça başınadır. pyarrow gerekir.
+    """
+    bicim = dosya_bicimi(kaynak)
+    _arrow_gerekli(bicim)
+    for tablo in _arrow_parcalari(kaynak, definition, bicim, satir_sayisi):
+        yield _arrow_tablosunu_cevir(tablo, definition)
+
+
+def veri_oku(kaynak, definition):
+    """Dosyayı uzantısına göre (CSV, Parquet, Feather) tanımdaki kolon ve tiplerle okur"""
+    bicim = dosya_bicimi(kaynak)
+    if bicim == 'csv':
+        return csv_oku(kaynak, definition)
+    return _arrow_tablosu_oku(kaynak, definition, bicim)
+
+
+def _zamanli_oku(kaynak, definition):
+    baslangic = time.perf_counter()
+    df = veri_oku(kaynak, definition)
+    return df, time.perf_counter() - baslangic
+
+
+def dosyalari_oku(isler, is_parcacigi=None, ilerleme=None):
+    """Başlıkları doğrulanmış dosyaları iş parçacığı havuzunda eşzamanlı okur.
+
+    isler: {anahtar: (kaynak, definition)}
+    ilerleme: opsiyonel ilerleme(anahtar, sonuc, tamamlanan, toplam); her dosya
+    bittiğinde çağıran iş parçacığında çağrılır.
+    Dönüş: {anahtar: {'df', 'hata', 'sure', 'satir_hizi'}} (hata varsa df None)
+    """
+    sonuclar = {}
+    if not isler:
+        return sonuclar
+
+    with ThreadPoolExecutor(max_workers=is_parcacigi or len(isler)) as havuz:
+        gorevler = {
+            havuz.submit(_zamanli_oku, kaynak, definition): anahtar
+            for anahtar, (kaynak, definition) in isler.items()
+        }
+        for tamamlanan, gorev in enumerate(as_completed(gorevler), start=1):
+            anahtar = gorevler[gorev]
+            try:
+                df, sure = gorev.result()
+                sonuc = {'df': df, 'hata': None, 'sure': sure,
+                         'satir_hizi': len(df) / sure if sure > 0 else float('inf')}
+            except Exception as e:
+                sonuc = {'df': None, 'hata': e, 'sure': None, 'satir_hizi': None}
+            sonuclar[anahtar] = sonuc
+            if ilerleme is not None:
+                ilerleme(anahtar, sonuc, tamamlanan, len(isler))
+    return sonuclar
@@ -0,0 +1,129 @@
+"""Aşama ölçümleri: duvar saati, CPU süresi, tepe bellek (RSS) artışı ve satır sayıları.
+
+Olcum bir aşamayı ölçer ('with' bloğu veya baslat()/bitir()). Tepe RSS, aşama süresince
+arka plan iş parçacığında örneklenir (/proc/self/statm); bu dosya yoksa sürecin tepe
+RSS değeri (resource.getrusage) kullanılır ve sadece önceki tepeyi aşan artış görülür.
+CPU süresi sürecin tamamınındır: motorların iş parçacıkları dahil, alt süreçler hariç.
+
+olcum_gunlugune_yaz her hesaplamayı yerel bir JSONL dosyasına tek satır olarak ekler;
+dosya PLANLAMA_OLCUM_GUNLUGU ortam değişkeniyle değiştirilebilir, boş değer günlüğü kapatır.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+VARSAYILAN_GUNLUK = os.path.join(os.path.expanduser('~'), '.planlama', 'olcum.jsonl')
+_MB = 1024 * 1024
+
+
+def _anlik_rss():
+    """Sürecin şu anki RSS'i (bayt); ölçülemiyorsa None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _tepe_rss():
+    """Sürecin başından beri tepe RSS (bayt); ölçülemiyorsa None"""
+    if resource is None:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt döndürür
+    return tepe if sys.platform == 'darwin' else tepe * 1024
+
+
+def satir_sayisi(nesne):
+    """DataFrame'in (veya demetteki ilk DataFrame'in) satır sayısı; yoksa None"""
+    if isinstance(nesne, tuple):
+        nesne = next((n for n in nesne if hasattr(n, 'shape')), None)
+    if nesne is None or not hasattr(nesne, 'shape'):
+        return None
+    return int(nesne.shape[0])
+
+
+class Olcum:
+    """Bir aşamanın süre, CPU ve tepe bellek artışı ölçümü.
+
+    sure, cpu (sn) ve bellek_mb (aşama başındaki RSS'e göre tepe artış) bitir()'den sonra dolar.
+    """
+
+    def __init__(self, aralik=0.01):
+        self.aralik = aralik
+        self.sure = None
+        self.cpu = None
+        self.bellek_mb = None
+        self._dur = threading.Event()
+        self._ornekleyici = None
+
+    def baslat(self):
+        self._rss = _anlik_rss()
+        self._tepe = self._rss
+        self._tepe_baslangic = _tepe_rss() if self._rss is None else None
+        if self._rss is not None:
+            self._ornekleyici = threading.Thread(target=self._ornekle, name='olcum-rss', daemon=True)
+            self._ornekleyici.start()
+        self._cpu = time.process_time()
+        self._baslangic = time.perf_counter()
+        return self
+
+    def bitir(self):
+        self.sure = time.perf_counter() - self._baslangic
+        self.cpu = time.process_time() - self._cpu
+        if self._ornekleyici is not None:
+            self._dur.set()
+            self._ornekleyici.join()
+            self._tepe = max(self._tepe, _anlik_rss() or 0)
+            self.bellek_mb = (self._tepe - self._rss) / _MB
+        elif self._tepe_baslangic is not None:
+            self.bellek_mb = (_tepe_rss() - self._tepe_baslangic) / _MB
+        return self
+
+    def _ornekle(self):
+        while not self._dur.wait(self.aralik):
+            rss = _anlik_rss()
+            if rss is not None and rss > self._tepe:
+                self._tepe = rss
+
+    def __enter__(self):
+        return self.baslat()
+
+    def __exit__(self, *hata):
+        self.bitir()
+        return False
+
+    def kayit(self):
+        """Aşama tablolarında kullanılan kolonlar"""
+        return {
+            'Süre (sn)': round(self.sure, 3),
+            'CPU (sn)': round(self.cpu, 3),
+            'Tepe Bellek Δ (MB)': None if self.bellek_mb is None else round(self.bellek_mb, 1)
+        }
+
+
+def olcum_gunlugu():
+    """Ölçüm günlüğü dosyası; günlük kapalıysa None"""
+    dosya = os.environ.get('PLANLAMA_OLCUM_GUNLUGU', VARSAYILAN_GUNLUK)
+    return dosya or None
+
+
+def olcum_gunlugune_yaz(kayit, dosya=None):
+    """kayit sözlüğünü zaman damgasıyla JSONL günlüğüne bir satır olarak ekler; yazılan dosyayı döndürür"""
+    dosya = dosya or olcum_gunlugu()
+    if dosya is None:
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(dosya)), exist_ok=True)
+    satir = json.dumps({'zaman': datetime.now().isoformat(timespec='seconds'), **kayit},
+                       ensure_ascii=False, default=str)
+    with open(dosya, 'a', encoding='utf-8') as f:
+        f.write(satir + '\n')
+    return dosya
@@ -0,0 +1,267 @@
+"""Performans ölçümü ve deneme için sentetik, birbiriyle tutarlı veri setleri.
+
+Tüm veri tipleri (VERI_TANIMLARI) aynı kod evreninden üretilir: anlık stok/satıştaki her
+ürün ürün master'da, her mağaza mağaza master'da, her mağazanın deposu depo stokta vardır.
+Satışlar ürün popülerliğine (Pareto) ve mağaza büyüklüğüne göre çarpıktır; depoda stoğu
+yüksek ama az mağazada bulunan yeni ürünler, yasaklı çiftler ve haftalık trend geçmişi
+de üretilir. Aynı parametreler ve seed aynı veriyi verir.
+
+    veriler = ornek_veri_olustur(magaza_sayisi=500, urun_sayisi=50_000, depo_sayisi=12)
+    ornek_veri_yaz(veriler, 'veri/')   # python -m planlama --veri-dizini veri/ ile okunabilir
+"""
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from .okuma import _tipleri_uygula
+from .tanimlar import VERI_TANIMLARI
+
+# Hazır ölçekler (benchmark ve arayüz için)
+OLCEKLER = {
+    'kucuk': {'magaza_sayisi': 50, 'urun_sayisi': 2_000, 'depo_sayisi': 3},
+    'orta': {'magaza_sayisi': 200, 'urun_sayisi': 10_000, 'depo_sayisi': 6},
+    'buyuk': {'magaza_sayisi': 500, 'urun_sayisi': 50_000, 'depo_sayisi': 12}
+}
+
+# Coğrafi bölge -> iller (mağazaların il/bölge bilgisi)
+BOLGE_ILLERI = {
+    'Marmara': ['İstanbul', 'Bursa', 'Kocaeli', 'Tekirdağ', 'Balıkesir', 'Sakarya', 'Çanakkale', 'Edirne',
+                'Kırklareli', 'Yalova', 'Bilecik'],
+    'Ege': ['İzmir', 'Manisa', 'Aydın', 'Denizli', 'Muğla', 'Afyonkarahisar', 'Kütahya', 'Uşak'],
+    'Akdeniz': ['Antalya', 'Adana', 'Mersin', 'Hatay', 'Kahramanmaraş', 'Isparta', 'Osmaniye', 'Burdur'],
+    'İç Anadolu': ['Ankara', 'Konya', 'Kayseri', 'Eskişehir', 'Sivas', 'Yozgat', 'Aksaray', 'Niğde', 'Nevşehir',
+                   'Kırıkkale', 'Karaman', 'Kırşehir', 'Çankırı'],
+    'Karadeniz': ['Samsun', 'Trabzon', 'Ordu', 'Zonguldak', 'Tokat', 'Çorum', 'Giresun', 'Rize', 'Amasya',
+                  'Kastamonu', 'Düzce', 'Bolu', 'Karabük', 'Artvin', 'Bartın', 'Sinop', 'Gümüşhane', 'Bayburt'],
+    'Doğu Anadolu': ['Erzurum', 'Malatya', 'Van', 'Elazığ', 'Ağrı', 'Kars', 'Muş', 'Erzincan', 'Bingöl', 'Bitlis',
+                     'Iğdır', 'Hakkari', 'Tunceli', 'Ardahan'],
+    'Güneydoğu Anadolu': ['Gaziantep', 'Şanlıurfa', 'Diyarbakır', 'Mardin', 'Batman', 'Adıyaman', 'Siirt',
+                          'Şırnak', 'Kilis']
+}
+
+MAGAZA_TIPLERI = {'Hipermarket': 3.0, 'Süpermarket': 1.0, 'Ekspres': 0.4}
+
+
+def _isimli(onek, kodlar, ad):
+    """Kod dizisinden (kod, ad) kolonları: 'MG012', 'Mal Grubu 12'"""
+    return np.char.add(onek, kodlar.astype(str)), np.char.add(ad + ' ', kodlar.astype(str))
+
+
+def _urunler(rng, urun_sayisi):
+    """Ürün master ve ürün bazında popülerlik, fiyat, marj ve yeni ürün bilgisi"""
+    mg_sayisi = max(urun_sayisi // 1000, 10)
+    mg = rng.integers(0, mg_sayisi, urun_sayisi)
+    # Her marka tek bir mal grubunda (klasman × marka kombinasyonları sınırlı kalır)
+    mg_marka_sayisi = max(urun_sayisi // 40 // mg_sayisi, 1)
+    marka = mg * mg_marka_sayisi + rng.integers(0, mg_marka_sayisi, urun_sayisi)
+    klasman = mg // 2
+    satici = marka // 5
+
+    urun_kod = np.char.add('U', np.char.zfill(np.arange(urun_sayisi).astype(str), 6))
+    satici_kod, satici_ad = _isimli('S', satici, 'Satıcı')
+    kategori_kod, kategori_ad = _isimli('K', mg // 10, 'Kategori')
+    umg, umg_ad = _isimli('UMG', mg // 5, 'Üst Mal Grubu')
+    marka_kod, marka_ad = _isimli('MR', marka, 'Marka')
+    klasman_kod, klasman_ad = _isimli('KL', klasman, 'Klasman')
+    ithal = (rng.random(urun_sayisi) < 0.2).astype(int)
+
+    urun_master = pd.DataFrame({
+        'urun_kod': urun_kod,
+        'urun_ad': np.char.add('Ürün ', np.arange(urun_sayisi).astype(str)),
+        'satici_kod': satici_kod, 'satici_ad': satici_ad,
+        'kategori_kod': kategori_kod, 'kategori_ad': kategori_ad,
+        'umg': umg, 'umg_ad': umg_ad,
+        # KPI ile mal grubu (mg) üzerinden eşleşir; sayısal kod
+        'mg': (100 + mg).astype(str), 'mg_ad': np.char.add('Mal Grubu ', mg.astype(str)),
+        'marka_kod': marka_kod, 'marka_ad': marka_ad,
+        'klasman_kod': klasman_kod, 'klasman_ad': klasman_ad,
+        'nitelik': np.where(rng.random(urun_sayisi) < 0.5, 'Temel', 'Moda'),
+        'durum': np.where(rng.random(urun_sayisi) < 0.95, 'Aktif', 'Pasif'),
+        'ithal': ithal.astype(str),
+        'ithal_ad': np.where(ithal == 1, 'İthal', 'Yerli'),
+        'tanim': np.char.add('Tanım ', np.arange(urun_sayisi).astype(str))
+    })
+
+    # Pareto popülerlik: az sayıda ürün satışın büyük kısmını yapar
+    populerlik = rng.pareto(1.2, urun_sayisi) + 1
+    ozellik = {
+        'mg': mg,
+        'populerlik': populerlik / populerlik.mean(),
+        'fiyat': rng.lognormal(3.0, 0.8, urun_sayisi).astype('float32'),
+        'marj': rng.uniform(-0.05, 0.45, urun_sayisi).astype('float32'),
+        'yeni': rng.random(urun_sayisi) < 0.02
+    }
+    return urun_master, ozellik
+
+
+def _magazalar(rng, magaza_sayisi, depo_sayisi):
+    """Mağaza master ve mağaza büyüklükleri; aynı ildeki mağazalar aynı depodan beslenir"""
+    iller = [(il, bolge) for bolge, liste in BOLGE_ILLERI.items() for il in liste]
+    # Büyük illerde daha çok mağaza
+    agirlik = 1 / np.arange(1, len(iller) + 1) ** 0.8
+    il_no = rng.choice(len(iller), magaza_sayisi, p=agirlik / agirlik.sum())
+    tipler = np.array(list(MAGAZA_TIPLERI))
+    tip = rng.choice(len(tipler), magaza_sayisi, p=[0.2, 0.5, 0.3])
+    buyukluk = np.array(list(MAGAZA_TIPLERI.values()))[tip] * rng.lognormal(0, 0.3, magaza_sayisi)
+    depo_no = il_no % depo_sayisi
+
+    magaza_master = pd.DataFrame({
+        'magaza_kod': np.char.add('M', np.char.zfill(np.arange(magaza_sayisi).astype(str), 4)),
+        'magaza_ad': np.char.add('Mağaza ', np.arange(magaza_sayisi).astype(str)),
+        'il': [iller[i][0] for i in il_no],
+        'bolge': [iller[i][1] for i in il_no],
+        'tip': tipler[tip],
+        'adres_kod': np.char.add('ADR', np.arange(magaza_sayisi).astype(str)),
+        'sm': np.round(buyukluk * 1500).astype(int).astype(str),
+        'bs': np.char.add('BS', (np.arange(magaza_sayisi) % 20).astype(str)),
+        'depo_kod': np.char.add('D', np.char.zfill(depo_no.astype(str), 3))
+    })
+    return magaza_master, buyukluk, depo_no
+
+
+def _anlik_stok_satis(rng, urun, buyukluk, kapsam):
+    """Mağaza başına ürün çeşidi (büyüklük ve popülerliğe göre) ve stok/yol/satış/ciro/smm"""
+    urun_sayisi = len(urun['populerlik'])
+    # Popüler ürünler daha çok mağazada; yeni ürünler az mağazada
+    tasima = np.clip(urun['populerlik'], 0.2, 3.0)
+    tasima = np.where(urun['yeni'], 0.05, tasima)
+
+    magazalar, urunler = [], []
+    for m, b in enumerate(buyukluk):
+        secilen = np.flatnonzero(rng.random(urun_sayisi) < np.minimum(kapsam * b * tasima, 1.0))
+        magazalar.append(np.full(len(secilen), m, dtype='int32'))
+        urunler.append(secilen.astype('int32'))
+    magaza_no = np.concatenate(magazalar)
+    urun_no = np.concatenate(urunler)
+
+    satis = rng.poisson(2.0 * buyukluk[magaza_no] * urun['populerlik'][urun_no]).astype('int32')
+    cover = rng.lognormal(np.log(6), 0.7, len(satis))
+    stok = np.round((satis + rng.poisson(1.0, len(satis))) * cover).astype('int32')
+    stok[rng.random(len(stok)) < 0.08] = 0
+    yol = np.where(rng.random(len(satis)) < 0.3, rng.poisson(satis + 1), 0).astype('int32')
+    ciro = (satis * urun['fiyat'][urun_no]).astype('float32')
+    return magaza_no, urun_no, stok, yol, satis, ciro, (ciro * (1 - urun['marj'][urun_no])).astype('float32')
+
+
+def _haftalik_trend(rng, urun_master, satis_toplam, fiyat, hafta_sayisi, bitis=datetime.date(2025, 10, 6)):
+    """(klasman, marka) bazında mevsimsel haftalık stok/satış geçmişi"""
+    gruplar = pd.DataFrame({
+        'klasman_kod': urun_master['klasman_kod'], 'marka_kod': urun_master['marka_kod'],
+        'satis': satis_toplam, 'ciro': satis_toplam * fiyat
+    }).groupby(['klasman_kod', 'marka_kod'], sort=True).sum().reset_index()
+
+    haftalar = [(bitis - datetime.timedelta(weeks=h)).isocalendar() for h in range(hafta_sayisi - 1, -1, -1)]
+    grup_no = np.repeat(np.arange(len(gruplar)), hafta_sayisi)
+    hafta_no = np.tile(np.arange(hafta_sayisi), len(gruplar))
+    hafta = np.array([h.week for h in haftalar])[hafta_no]
+    mevsim = 1 + 0.3 * np.sin(2 * np.pi * hafta / 52) * rng.uniform(0.5, 1.5, len(gruplar))[grup_no]
+
+    satis = rng.poisson(gruplar['satis'].to_numpy()[grup_no] * mevsim)
+    birim = (gruplar['ciro'] / gruplar['satis'].clip(lower=1)).to_numpy()[grup_no]
+    stok = np.round(satis * rng.lognormal(np.log(5), 0.4, len(satis))).astype(int)
+    ciro = satis * birim
+    return pd.DataFrame({
+        'klasman_kod': gruplar['klasman_kod'].to_numpy()[grup_no],
+        'marka_kod': gruplar['marka_kod'].to_numpy()[grup_no],
+        'yil': np.array([h.year for h in haftalar])[hafta_no],
+        'hafta': hafta,
+        'stok': stok,
+        'satis': satis,
+        'ciro': ciro,
+        'smm': ciro * rng.uniform(0.55, 0.95, len(satis)),
+        'iftutar': stok * birim
+    })
+
+
+def ornek_veri_olustur(magaza_sayisi=500, urun_sayisi=50_000, depo_sayisi=12, kapsam=0.2, hafta_sayisi=52,
+                       yasak_orani=0.01, seed=42):
+    """Tüm veri tipleri için sentetik veri.
+
+    kapsam: ortalama büyüklükteki mağazanın ortalama popülerlikteki ürünü taşıma olasılığı
+    (anlık stok/satış satır sayısı yaklaşık magaza_sayisi × urun_sayisi × kapsam).
+    yasak_orani: anlık satırlardan yasaklı (ürün, mağaza) çifti olanların oranı.
+    Dönüş: {state_key: DataFrame}; kolonlar ve tipler dosyadan okunmuş veriyle aynıdır.
+    """
+    rng = np.random.default_rng(seed)
+
+    urun_master, urun = _urunler(rng, urun_sayisi)
+    magaza_master, buyukluk, depo_no = _magazalar(rng, magaza_sayisi, depo_sayisi)
+    magaza_no, urun_no, stok, yol, satis, ciro, smm = _anlik_stok_satis(rng, urun, buyukluk, kapsam)
+
+    anlik_stok_satis = pd.DataFrame({
+        'magaza_kod': magaza_master['magaza_kod'].to_numpy()[magaza_no],
+        'urun_kod': urun_master['urun_kod'].to_numpy()[urun_no],
+        'stok': stok, 'yol': yol, 'satis': satis, 'ciro': ciro, 'smm': smm
+    })
+
+    # Depo stoğu: deponun mağazalarındaki satışın birkaç katı; yeni ürünlerde yüksek stok
+    depo_urun = depo_no[magaza_no].astype('int64') * urun_sayisi + urun_no
+    depo_satis = np.bincount(depo_urun, weights=satis, minlength=depo_sayisi * urun_sayisi)
+    depo_stok_miktari = np.round(depo_satis * rng.lognormal(np.log(4), 0.8, len(depo_satis)))
+    yeni = np.tile(urun['yeni'], depo_sayisi)
+    depo_stok_miktari = np.where(yeni, rng.integers(500, 5000, len(depo_satis)), depo_stok_miktari)
+    depo_stok_miktari[rng.random(len(depo_satis)) < 0.05] = 0
+    satirlar = np.flatnonzero((depo_satis > 0) | yeni)
+    depo_kodlari = np.char.add('D', np.char.zfill(np.arange(depo_sayisi).astype(str), 3))
+    depo_stok = pd.DataFrame({
+        'depo_kod': depo_kodlari[satirlar // urun_sayisi],
+        'depo_ad': np.char.add('Depo ', (satirlar // urun_sayisi).astype(str)),
+        'urun_kod': urun_master['urun_kod'].to_numpy()[satirlar % urun_sayisi],
+        'stok': depo_stok_miktari[satirlar].astype('int32')
+    })
+
+    mg = np.unique(urun['mg'])
+    min_deger = rng.integers(2, 10, len(mg)).astype(float)
+    kpi = pd.DataFrame({
+        'mg_id': (100 + mg).astype(str),
+        'min_deger': min_deger,
+        'max_deger': min_deger + rng.integers(20, 200, len(mg)),
+        'forward_cover': np.round(rng.uniform(1.0, 4.0, len(mg)), 1)
+    })
+
+    yasakli = rng.random(len(anlik_stok_satis)) < yasak_orani
+    yasak_master = pd.DataFrame({
+        'urun_kod': anlik_stok_satis['urun_kod'].to_numpy()[yasakli],
+        'magaza_kod': anlik_stok_satis['magaza_kod'].to_numpy()[yasakli],
+        'yasak_durum': 'Yasak'
+    })
+
+    satis_toplam = np.bincount(urun_no, weights=satis, minlength=urun_sayisi)
+    haftalik_trend = _haftalik_trend(rng, urun_master, satis_toplam, urun['fiyat'], hafta_sayisi)
+
+    veriler = {
+        'urun_master': urun_master,
+        'magaza_master': magaza_master,
+        'depo_stok': depo_stok,
+        'anlik_stok_satis': anlik_stok_satis,
+        'kpi': kpi,
+        'yasak_master': yasak_master,
+        'haftalik_trend': haftalik_trend
+    }
+    return {
+        anahtar: _tipleri_uygula(df, VERI_TANIMLARI[anahtar]['dtypes'])[VERI_TANIMLARI[anahtar]['columns']]
+        for anahtar, df in veriler.items()
+    }
+
+
+def ornek_veri_yaz(veriler, dizin, bicim='csv'):
+    """Veri setlerini dizine '<veri tipi>.<bicim>' adlarıyla yazar (dosya_eslestir ile eşleşir).
+
+    bicim: 'csv', 'parquet' veya 'feather' (son ikisi için pyarrow gerekir). Dönüş: {anahtar: dosya yolu}
+    """
+    os.makedirs(dizin, exist_ok=True)
+    yollar = {}
+    for anahtar, df in veriler.items():
+        yol = os.path.join(dizin, f'{anahtar}.{bicim}')
+        if bicim == 'csv':
+            df.to_csv(yol, index=False)
+        elif bicim == 'parquet':
+            df.to_parquet(yol, index=False)
+        elif bicim == 'feather':
+            df.reset_index(drop=True).to_feather(yol)
+        else:
+            raise ValueError(f"Bilinmeyen dosya biçimi: {bicim} (csv, parquet, feather)")
+        yollar[anahtar] = yol
+    return yollar
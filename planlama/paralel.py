@@ -0,0 +1,164 @@
+"""Depo bazında paralel sevkiyat hesaplaması.
+
+Her mağaza sadece magaza_master.depo_kod ile bağlı olduğu depodan beslenir; bu yüzden
+ihtiyaç, yasak, kazanan satır seçimi ve tahsis her depo için bağımsızdır. Ülke geneli
+adımlar (yeni ürün, segmentasyon, KPI, matrisler) ana süreçte bir kez yapılır, satırlar
+depoya göre sıralanır ve her depo ayrı bir süreçte hesaplanır.
+
+Sayısal kolonlar süreçlere pickle edilmez, multiprocessing.shared_memory üzerinden
+paylaşılır; kod kolonları (mağaza, ürün, segment) int32 kod + kategori tipi ya da
+benzersiz değerler olarak süreç başına bir kez gönderilir. Bir mağaza magaza_master'da birden fazla depoya
+bağlıysa ilk kaydı geçerlidir.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .cekirdek import depo_sevkiyati
+
+# Süreçlere paylaşılan bellekten giden kolonlar
+SAYISAL_KOLONLAR = ['stok', 'yol', 'satis', 'min_deger', 'max_deger',
+                    'genlestirme', 'sisme', 'min_oran', 'initial_katsayi']
+KOD_KOLONLARI = ['magaza_kod', 'urun_kod', 'magaza_segment', 'urun_segment']
+
+# Alt süreçteki ortak veri (_surec_baslat ile bir kez doldurulur)
+_ortak = {}
+
+
+def _paylasima_yaz(dizi):
+    """Diziyi yeni bir paylaşılan bellek bloğuna kopyalar"""
+    shm = shared_memory.SharedMemory(create=True, size=max(dizi.nbytes, 1))
+    np.ndarray(dizi.shape, dtype=dizi.dtype, buffer=shm.buf)[:] = dizi
+    return shm
+
+
+def _surec_baslat(bloklar, benzersizler, parametreler):
+    """Alt süreç başlangıcı: paylaşılan bloklara bağlanır, ortak parametreleri saklar"""
+    _ortak['bloklar'] = {}
+    _ortak['diziler'] = {}
+    for kolon, (isim, dtype, uzunluk) in bloklar.items():
+        shm = shared_memory.SharedMemory(name=isim)
+        _ortak['bloklar'][kolon] = shm
+        _ortak['diziler'][kolon] = np.ndarray((uzunluk,), dtype=dtype, buffer=shm.buf)
+    _ortak['benzersizler'] = benzersizler
+    _ortak.update(parametreler)
+
+
+def _depo_hesapla(baslangic, bitis, depo_kod, depo_parcasi, yasak_parcasi):
+    """Tek depo: paylaşılan bellekteki [baslangic, bitis) satırları için ihtiyaç ve tahsis"""
+    diziler = _ortak['diziler']
+    veri = {}
+    for kolon in KOD_KOLONLARI:
+        benzersiz = _ortak['benzersizler'][kolon]
+        kodlar = diziler[kolon][baslangic:bitis]
+        if isinstance(benzersiz, pd.CategoricalDtype):
+            veri[kolon] = pd.Categorical.from_codes(kodlar, dtype=benzersiz)
+        else:
+            veri[kolon] = benzersiz[kodlar]
+    for kolon in SAYISAL_KOLONLAR:
+        veri[kolon] = diziler[kolon][baslangic:bitis].copy()
+
+    anlik_df = pd.DataFrame(veri)
+    anlik_df['depo_kod'] = depo_kod
+
+    return depo_sevkiyati(
+        anlik_df, depo_parcasi, yasak_parcasi,
+        _ortak['default_fc'], _ortak['yeni_urun_kodlari'], _ortak['siralama']
+    )
+
+
+def depo_bazinda_hesapla(hazirlik, depo_stok, yasak, islem_sayisi, ilerleme=None):
+    """sevkiyat_hazirla çıktısını depolara bölüp süreç havuzunda hesaplar.
+
+    Dönüş: tek süreçli depo_sevkiyati ile aynı (öncelik sırasında) tahsis tablosu.
+    """
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+
+    anlik_df = hazirlik['anlik_df']
+
+    # Satırları depoya göre sırala: her depo paylaşılan dizilerde ardışık bir dilim olur
+    depo_kodlari, depolar = pd.factorize(anlik_df['depo_kod'], use_na_sentinel=False)
+    sira = np.argsort(depo_kodlari, kind='stable')
+    sinirlar = np.concatenate([[0], np.cumsum(np.bincount(depo_kodlari, minlength=len(depolar)))])
+
+    bloklar = {}
+    paylasilan = []
+    benzersizler = {}
+    try:
+        for kolon in KOD_KOLONLARI:
+            seri = anlik_df[kolon]
+            if isinstance(seri.dtype, pd.CategoricalDtype):
+                # Ortak kod sözlüğündeki kolonlar kendi kategori kodlarıyla gider
+                kodlar = seri.cat.codes.to_numpy()
+                benzersizler[kolon] = seri.dtype
+            else:
+                kodlar, benzersiz = pd.factorize(seri, use_na_sentinel=False)
+                benzersizler[kolon] = np.asarray(benzersiz, dtype=object)
+            shm = _paylasima_yaz(kodlar.astype(np.int32)[sira])
+            paylasilan.append(shm)
+            bloklar[kolon] = (shm.name, np.int32, len(sira))
+        for kolon in SAYISAL_KOLONLAR:
+            dizi = anlik_df[kolon].to_numpy()[sira]
+            shm = _paylasima_yaz(dizi)
+            paylasilan.append(shm)
+            bloklar[kolon] = (shm.name, dizi.dtype, len(sira))
+
+        parametreler = {
+            'default_fc': hazirlik['default_fc'],
+            'yeni_urun_kodlari': hazirlik['yeni_urun_kodlari'],
+            'siralama': hazirlik['siralama']
+        }
+
+        # Depo ve yasak tabloları sadece ilgili deponun satırlarıyla gönderilir
+        if yasak is not None:
+            magaza_depo = anlik_df.drop_duplicates('magaza_kod').set_index('magaza_kod')['depo_kod']
+
+        ilerleme(70, f"Depo bazında hesaplanıyor... (0/{len(depolar)})")
+
+        # Streamlit gibi çok iş parçacıklı süreçlerde fork güvenli değil
+        baglam = multiprocessing.get_context('spawn')
+        parcalar = [None] * len(depolar)
+        with ProcessPoolExecutor(
+            max_workers=min(islem_sayisi, max(len(depolar), 1)),
+            mp_context=baglam,
+            initializer=_surec_baslat,
+            initargs=(bloklar, benzersizler, parametreler)
+        ) as havuz:
+            isler = {}
+            for i, depo_kod in enumerate(depolar):
+                depo_parcasi = depo_stok[depo_stok['depo_kod'].isin([depo_kod])]
+                yasak_parcasi = None
+                if yasak is not None:
+                    magazalar = magaza_depo.index[magaza_depo.isin([depo_kod])]
+                    yasak_parcasi = yasak[yasak['magaza_kod'].isin(magazalar)]
+                is_ = havuz.submit(_depo_hesapla, int(sinirlar[i]), int(sinirlar[i + 1]),
+                                   depo_kod, depo_parcasi, yasak_parcasi)
+                isler[is_] = i
+
+            try:
+                for tamamlanan, is_ in enumerate(as_completed(isler), start=1):
+                    parcalar[isler[is_]] = is_.result()
+                    ilerleme(70 + int(25 * tamamlanan / len(isler)),
+                             f"Depo bazında hesaplanıyor... ({tamamlanan}/{len(isler)})")
+            except BaseException:
+                # Hata veya iptal: sırada bekleyen depolar başlatılmasın
+                havuz.shutdown(cancel_futures=True)
+                raise
+    finally:
+        for shm in paylasilan:
+            shm.close()
+            shm.unlink()
+
+    parcalar = [p for p in parcalar if p is not None and len(p) > 0]
+    if not parcalar:
+        return depo_sevkiyati(anlik_df.iloc[:0], depo_stok, yasak, hazirlik['default_fc'],
+                              hazirlik['yeni_urun_kodlari'], hazirlik['siralama'])
+
+    # Depo sonuçlarını tek süreçteki işlenme sırasına getir: Oncelik, sonra mağaza/ürün
+    result_df_max = pd.concat(parcalar, ignore_index=True)
+    result_df_max['depo_kod'] = result_df_max['depo_kod'].astype(anlik_df['depo_kod'].dtype)
+    return result_df_max.sort_values(['Oncelik', 'magaza_kod', 'urun_kod'], kind='stable').reset_index(drop=True)
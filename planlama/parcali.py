@@ -0,0 +1,223 @@
+"""Belleğe sığmayan anlik_stok_satis için parçalı (out-of-core) sevkiyat hesaplaması.
+
+anlik_stok_satis dosyası hiçbir zaman tamamen belleğe alınmaz; diğer veriler (master'lar,
+depo stok, KPI, yasak) bellekte kalır. Dört geçiş yapılır:
+
+1. Dosya parça parça okunup ürün/mağaza toplamları, yeni ürün adaylarının stoklu
+   mağazaları ve tamsayı kolonların nihai tipleri (int32/float32) çıkarılır.
+2. Dosya tekrar okunur; her parçada segment, KPI, depo, matris, ihtiyaç ve yasak satır
+   bazında hesaplanır. İhtiyacı olan satırlar (depo_kod, urun_kod) özetine göre
+   kovalara bölünüp geçici Parquet dosyalarına yazılır.
+3. Her kova tek başına okunur: kazanan satır seçimi ve depo tahsisi. Bir depo/ürün
+   çiftinin ve bir mağaza/ürün çiftinin tüm satırları aynı kovadadır. Sonuçlar
+   önceliğe göre bölünerek tekrar diske yazılır.
+4. Öncelikler sırayla okunup mağaza/ürün sırasına dizilir ve sonuç dosyasına eklenir.
+
+Sonuç sevkiyat_hesapla ile aynıdır (mağaza birden fazla depoya bağlıysa ilk kayıt
+geçerlidir). En yüksek bellek kullanımı parça boyutuna, kova boyutuna ve en büyük
+öncelik grubunun sonuç satırlarına bağlıdır; veri setinin boyutuna bağlı değildir.
+pyarrow gerekir.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+
+from .cekirdek import (
+    cover_ekle, depo_eslestir, ihtiyac_hesapla, kpi_ekle, matrisleri_uygula, segmentasyon_uygula,
+    segmentle, sonuc_tablosu, talepleri_tahsis_et, varsayilan_matrisler, varsayilan_siralama,
+    yasak_uygula, yeni_urun_adaylari, yeni_urunleri_tespit_et
+)
+from .kodlama import KOD_KOLONLARI
+from .okuma import parcali_oku
+from .tanimlar import VARSAYILAN_ARALIKLAR, VERI_TANIMLARI
+
+# Kovalara yazılan (tahsis ve sonuç tablosu için gereken) kolonlar
+TALEP_KOLONLARI = ['Oncelik', 'magaza_kod', 'urun_kod', 'magaza_segment', 'urun_segment', 'Durum',
+                   'stok', 'yol', 'satis', 'ihtiyac', 'depo_kod']
+TAMSAYI_KOLONLARI = ['stok', 'yol', 'satis']
+TOPLAM_KOLONLARI = ['stok', 'yol', 'satis', 'ciro', 'smm']
+
+
+def _kodlari_metne(df):
+    """Kod kolonlarını metin yapar; parçaların kategorileri birbirinden farklı olduğu için
+    birleştirmeler metin anahtarlar üzerinden yapılır"""
+    if df is None:
+        return None
+    return df.assign(**{k: df[k].astype('str') for k in KOD_KOLONLARI if k in df.columns})
+
+
+def _topla(onceki, parca, anahtar, kolonlar):
+    toplam = parca.groupby(anahtar, observed=True)[kolonlar].sum()
+    return toplam if onceki is None else pd.concat([onceki, toplam]).groupby(level=0).sum()
+
+
+def _oncelik_adi(oncelik):
+    return 'yok' if pd.isna(oncelik) else repr(float(oncelik))
+
+
+def parcali_sevkiyat_hesapla(kaynak, urun_master, magaza_master, depo_stok, kpi, cikti,
+                             yasak=None, segmentation_params=None, matrisler=None, siralama=None,
+                             parca_boyutu=1_000_000, kova_sayisi=16, gecici_dizin=None, ilerleme=None):
+    """anlik_stok_satis dosyasını (kaynak) parça parça işleyip sevkiyat sonucunu cikti'ya yazar.
+
+    cikti: .csv veya .parquet dosya yolu; sütunlar sevkiyat_hesapla sonucuyla aynıdır.
+    Diğer parametreler sevkiyat_hesapla ile aynıdır.
+    Dönüş: {'satir', 'ihtiyac', 'sevkiyat', 'kayip', 'yeni_urun_listesi', 'urun_toplam', 'urun_sevkiyat'}
+    urun_toplam (ürün bazında stok/yol/satış/ciro/smm) alım sipariş hesabına anlik_df yerine verilebilir.
+    """
+    if pa is None:
+        raise ImportError("Parçalı hesaplama için pyarrow kurulu olmalı: pip install pyarrow")
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+    if segmentation_params is None:
+        segmentation_params = {'product_ranges': VARSAYILAN_ARALIKLAR, 'store_ranges': VARSAYILAN_ARALIKLAR}
+    matrisler = {**varsayilan_matrisler(), **{k: v for k, v in (matrisler or {}).items() if v is not None}}
+    definition = VERI_TANIMLARI['anlik_stok_satis']
+
+    urun_master, magaza_master, depo_stok, yasak = (
+        _kodlari_metne(df) for df in (urun_master, magaza_master, depo_stok, yasak)
+    )
+    # Mağaza birden fazla depoya bağlıysa ilk kayıt (tek süreçli hesaplamada da ilk depo kazanır)
+    magaza_depo = magaza_master.drop_duplicates('magaza_kod')
+    adaylar = set(yeni_urun_adaylari(depo_stok)[0])
+
+    # ---- 1. geçiş: toplamlar ----
+    urun_toplam = magaza_toplam = None
+    aday_ciftleri = None
+    tamsayi = dict.fromkeys(TAMSAYI_KOLONLARI, True)
+    for i, parca in enumerate(parcali_oku(kaynak, definition, parca_boyutu), start=1):
+        ilerleme(10, f"Ürün/mağaza toplamları hesaplanıyor... ({i} parça)")
+        parca = _kodlari_metne(parca)
+        for kolon in TAMSAYI_KOLONLARI:
+            tamsayi[kolon] &= pd.api.types.is_integer_dtype(parca[kolon].dtype)
+        urun_toplam = _topla(urun_toplam, parca, 'urun_kod', TOPLAM_KOLONLARI)
+        magaza_toplam = _topla(magaza_toplam, parca, 'magaza_kod', TOPLAM_KOLONLARI[:4])
+        ciftler = parca.loc[parca['urun_kod'].isin(adaylar) & (parca['stok'] > 0), ['urun_kod', 'magaza_kod']]
+        aday_ciftleri = pd.concat([aday_ciftleri, ciftler]).drop_duplicates()
+
+    if urun_toplam is None:
+        raise ValueError("Anlık Stok/Satış dosyası boş")
+    tipler = {k: 'int32' if tamsayi[k] else 'float32' for k in TAMSAYI_KOLONLARI}
+
+    urun_agg = cover_ekle(urun_toplam[TOPLAM_KOLONLARI[:4]].reset_index())
+    magaza_agg = cover_ekle(magaza_toplam.reset_index())
+    urun_agg['segment'] = segmentle(urun_agg['cover'], segmentation_params['product_ranges'])
+    magaza_agg['segment'] = segmentle(magaza_agg['cover'], segmentation_params['store_ranges'])
+    ozet = {'urun': urun_agg, 'magaza': magaza_agg}
+
+    yeni_urun_kodlari, yeni_urun_listesi = yeni_urunleri_tespit_et(
+        aday_ciftleri.assign(stok=1), depo_stok, magaza_sayisi=len(magaza_agg)
+    )
+    default_fc = kpi['forward_cover'].mean()
+    if siralama is None:
+        prod_segments = sorted([str(x) for x in urun_agg['segment'].unique() if pd.notna(x)])
+        store_segments = sorted([str(x) for x in magaza_agg['segment'].unique() if pd.notna(x)])
+        siralama = varsayilan_siralama(prod_segments, store_segments)
+
+    sema = pa.schema(
+        [('Oncelik', pa.float64())]
+        + [(k, pa.string()) for k in ['magaza_kod', 'urun_kod', 'magaza_segment', 'urun_segment', 'Durum']]
+        + [(k, pa.from_numpy_dtype(np.dtype(tipler[k]))) for k in TAMSAYI_KOLONLARI]
+        + [('ihtiyac', pa.float64()), ('depo_kod', pa.string())]
+    )
+
+    with tempfile.TemporaryDirectory(prefix='planlama_', dir=gecici_dizin) as dizin:
+        # ---- 2. geçiş: satır bazında ihtiyaç, kovalara yazma ----
+        yazicilar = {}
+        oncelik_tamsayi = True
+        try:
+            for i, parca in enumerate(parcali_oku(kaynak, definition, parca_boyutu), start=1):
+                ilerleme(40, f"İhtiyaçlar hesaplanıyor... ({i} parça)")
+                parca = _kodlari_metne(parca).astype(tipler)
+                anlik_df, _, _ = segmentasyon_uygula(parca, segmentation_params, ozet=ozet)
+                anlik_df = kpi_ekle(anlik_df, urun_master, kpi)
+                anlik_df = depo_eslestir(anlik_df, magaza_depo)
+                anlik_df = matrisleri_uygula(anlik_df, matrisler)
+                anlik_df = ihtiyac_hesapla(anlik_df, default_fc, yeni_urun_kodlari, siralama)
+                anlik_df = yasak_uygula(anlik_df, yasak)
+                oncelik_tamsayi &= pd.api.types.is_integer_dtype(anlik_df['Oncelik'].dtype)
+
+                talepler = anlik_df.loc[anlik_df['ihtiyac'] > 0, TALEP_KOLONLARI]
+                kovalar = pd.util.hash_pandas_object(talepler[['depo_kod', 'urun_kod']], index=False).to_numpy() % kova_sayisi
+                for kova in np.unique(kovalar):
+                    if kova not in yazicilar:
+                        yazicilar[kova] = pa_parquet.ParquetWriter(os.path.join(dizin, f'kova_{kova}.parquet'), sema)
+                    yazicilar[kova].write_table(
+                        pa.Table.from_pandas(talepler[kovalar == kova], schema=sema, preserve_index=False)
+                    )
+        finally:
+            for yazici in yazicilar.values():
+                yazici.close()
+
+        # ---- 3. geçiş: kova bazında tahsis, önceliğe göre bölme ----
+        oncelik_dizini = os.path.join(dizin, 'oncelik')
+        oncelikler = set()
+        for j, kova in enumerate(sorted(yazicilar), start=1):
+            ilerleme(70, f"Depo stok tahsisi yapılıyor... ({j}/{len(yazicilar)})")
+            talepler = pa_parquet.read_table(os.path.join(dizin, f'kova_{kova}.parquet')).to_pandas()
+            tahsis = talepleri_tahsis_et(talepler, depo_stok)
+            for oncelik, grup in tahsis.groupby('Oncelik', dropna=False, sort=False):
+                ad = _oncelik_adi(oncelik)
+                os.makedirs(os.path.join(oncelik_dizini, ad), exist_ok=True)
+                grup.to_parquet(os.path.join(oncelik_dizini, ad, f'kova_{kova}.parquet'), index=False)
+                oncelikler.add(oncelik if pd.notna(oncelik) else np.nan)
+
+        # ---- 4. geçiş: öncelik sırasında sonuç dosyasına yazma ----
+        sirali = sorted(o for o in oncelikler if pd.notna(o)) + [np.nan] * any(pd.isna(o) for o in oncelikler)
+        ozet_sonuc = {'satir': 0, 'ihtiyac': 0.0, 'sevkiyat': 0.0, 'kayip': 0.0}
+        urun_sevkiyat = None
+        parquet_yazici = None
+        try:
+            for j, oncelik in enumerate(sirali, start=1):
+                ilerleme(90, f"Sonuç yazılıyor... ({j}/{len(sirali)})")
+                grup = pd.read_parquet(os.path.join(oncelik_dizini, _oncelik_adi(oncelik)))
+                grup = grup.sort_values(['magaza_kod', 'urun_kod'], kind='stable').reset_index(drop=True)
+                if oncelik_tamsayi:
+                    grup['Oncelik'] = grup['Oncelik'].astype('int64')
+                sonuc = sonuc_tablosu(grup, urun_master, magaza_master)
+                sonuc['sira_no'] += ozet_sonuc['satir']
+
+                if str(cikti).lower().endswith('.parquet'):
+                    tablo = pa.Table.from_pandas(sonuc, preserve_index=False)
+                    if parquet_yazici is None:
+                        parquet_yazici = pa_parquet.ParquetWriter(cikti, tablo.schema)
+                    parquet_yazici.write_table(tablo.cast(parquet_yazici.schema))
+                elif ozet_sonuc['satir'] == 0:
+                    sonuc.to_csv(cikti, index=False, encoding='utf-8-sig')
+                else:
+                    sonuc.to_csv(cikti, index=False, header=False, mode='a', encoding='utf-8')
+
+                ozet_sonuc['satir'] += len(sonuc)
+                ozet_sonuc['ihtiyac'] += sonuc['ihtiyac_miktari'].sum()
+                ozet_sonuc['sevkiyat'] += sonuc['sevkiyat_miktari'].sum()
+                ozet_sonuc['kayip'] += sonuc['stok_yoklugu_satis_kaybi'].sum()
+                urun_sevkiyat = _topla(urun_sevkiyat, sonuc, 'urun_kod', ['sevkiyat_miktari'])
+        finally:
+            if parquet_yazici is not None:
+                parquet_yazici.close()
+
+    if ozet_sonuc['satir'] == 0:
+        # Hiç ihtiyaç yoksa sadece başlık satırı
+        bos = sonuc_tablosu(pd.DataFrame(columns=TALEP_KOLONLARI + ['sevkiyat_gercek', 'stok_yoklugu_kaybi']),
+                            urun_master, magaza_master)
+        if str(cikti).lower().endswith('.parquet'):
+            bos.to_parquet(cikti, index=False)
+        else:
+            bos.to_csv(cikti, index=False, encoding='utf-8-sig')
+
+    ilerleme(100, "Tamamlandı!")
+    return {
+        **ozet_sonuc,
+        'yeni_urun_listesi': yeni_urun_listesi,
+        'urun_toplam': urun_toplam.reset_index(),
+        'urun_sevkiyat': (urun_sevkiyat.reset_index() if urun_sevkiyat is not None
+                          else pd.DataFrame(columns=['urun_kod', 'sevkiyat_miktari']))
+    }
@@ -0,0 +1,447 @@
+"""Opsiyonel Polars motoru: sevkiyat hesaplamasının tamamı tek bir tembel (lazy) Polars sorgusunda.
+
+cekirdek.sevkiyat_hesapla(motor='polars') bu modüle yönlendirilir. Yeni ürün tespiti,
+segmentasyon, KPI/mg birleştirmesi, matris değerleri, ihtiyaç, yasak, depo eşleştirme ve
+(depo, ürün) grubu içinde kümülatif toplamla depo tahsisi Polars'ta çok çekirdekli çalışır.
+Kod kolonları ortak sözlüğün (kodlari_esitle) tamsayı kodlarıyla işlenir (-1 = boş; pandas
+birleştirmesindeki gibi -1'ler birbiriyle eşleşir). Sonuç tablosu pandas'ta orijinal
+tiplerle toplanır; satır sırası, tipler, NaN'ler ve kayan noktalı değerler pandas motoruyla
+birebir aynıdır.
+
+Küçük tablolar (depo toplamları, KPI, ortalama forward cover) pandas'ta hazırlanır; stok/satış
+kayan noktalı ise segment özetleri de pandas'ta hesaplanır (toplama sırası sonucu değiştirmesin).
+polars kurulu değilse ImportError verilir: pip install polars
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+from .cekirdek import (
+    segment_etiketleri, segmentle, veri_ozeti, varsayilan_matrisler, varsayilan_siralama, yeni_urun_adaylari
+)
+from .kodlama import kodlari_esitle
+from .tanimlar import DURUMLAR, VARSAYILAN_ARALIKLAR
+
+# Hesaplamadaki kolon -> matrisler sözlüğündeki matris
+MATRIS_KOLONLARI = {
+    'genlestirme': 'genlestirme_orani',
+    'sisme': 'sisme_orani',
+    'min_oran': 'min_oran',
+    'initial_katsayi': 'initial_matris'
+}
+
+
+def kullanilabilir():
+    return pl is not None
+
+
+def _kodlar(seri):
+    """Kategori kolonunun tamsayı kodları (NaN -> -1)"""
+    return seri.cat.codes.to_numpy().astype('int32')
+
+
+def _metinler(seri):
+    """Metin kolonunu Polars'a çevirir (NaN -> null).
+
+    Dönüş: (pl.Series, gecerli): metin olmayan değerler (ör. sayı) pandas'ta segment
+    etiketleriyle hiç eşleşmez; gecerli=False olan satırlar atılmalıdır.
+    """
+    degerler = seri.astype(object).to_numpy()
+    bos = pd.isna(degerler)
+    gecerli = bos | np.array([isinstance(d, str) for d in degerler], dtype=bool)
+    return pl.Series(np.where(bos | ~gecerli, None, degerler).tolist(), dtype=pl.Utf8), gecerli
+
+
+def _sifirdan_buyuk(ifade):
+    """np.maximum(ifade, 0): NaN korunur"""
+    return pl.when(ifade.is_nan() | (ifade >= 0)).then(ifade).otherwise(0.0)
+
+
+# ============================================
+# YENİ ÜRÜN VE SEGMENTASYON
+# ============================================
+def _stoklu_magazalar(veri, anlik_df, depo_df):
+    """yeni_urunleri_tespit_et'in anlık veri kısmı: aday ürünlerin stoklu mağaza sayıları"""
+    adaylar, depo_toplam = yeni_urun_adaylari(depo_df)
+    aday_kodlari = pd.Categorical(adaylar, dtype=anlik_df['urun_kod'].dtype).codes.astype('int32')
+
+    stoklu = (
+        veri.filter(pl.col('u').is_in(aday_kodlari) & pl.col('stok').is_not_nan() & (pl.col('stok') > 0)
+                    & (pl.col('m') >= 0))
+        .group_by('u')
+        .agg(pl.col('m').n_unique().cast(pl.Int64).alias('stoklu_magaza_sayisi'))
+        .sort('u')
+    )
+    toplam = veri.filter(pl.col('m') >= 0).select(pl.col('m').n_unique().alias('magaza_sayisi'))
+    return stoklu, toplam, depo_toplam
+
+
+def _yeni_urun_listesi(stoklu, toplam_magaza_sayisi, depo_toplam, urun_tipi, magaza_orani_esigi=0.5):
+    """Stoklu mağaza sayılarından yeni ürün kodları ve tablosu (yeni_urunleri_tespit_et ile aynı)"""
+    urun_stoklu_magaza = pd.DataFrame({
+        'urun_kod': pd.Categorical.from_codes(stoklu['u'].to_numpy().astype('int64'), dtype=urun_tipi),
+        'stoklu_magaza_sayisi': stoklu['stoklu_magaza_sayisi'].to_numpy().astype('int64')
+    })
+    urun_stoklu_magaza['magaza_oran'] = urun_stoklu_magaza['stoklu_magaza_sayisi'] / toplam_magaza_sayisi
+
+    yeni_urunler = urun_stoklu_magaza[urun_stoklu_magaza['magaza_oran'] < magaza_orani_esigi].copy()
+    return yeni_urunler['urun_kod'].tolist(), yeni_urunler.merge(depo_toplam, on='urun_kod', how='left')
+
+
+def _segment_ifadesi(cover, ranges):
+    """pd.cut(..., include_lowest=True) karşılığı: (alt, üst] aralıkları, ilk aralıkta alt sınır dahil"""
+    # Geçersiz aralıklarda (ör. artmayan sınırlar) pandas motoruyla aynı hata verilir
+    segmentle(pd.Series([], dtype=float), ranges)
+    kenarlar = [r[0] for r in ranges] + [ranges[-1][1]]
+    etiketler = segment_etiketleri(ranges)
+
+    ifade = pl.when(cover.is_nan()).then(pl.lit(None, dtype=pl.Utf8))
+    ifade = ifade.when(cover == kenarlar[0]).then(pl.lit(etiketler[0]))
+    for alt, ust, etiket in zip(kenarlar, kenarlar[1:], etiketler):
+        ifade = ifade.when((cover > alt) & (cover <= ust)).then(pl.lit(etiket))
+    return ifade.otherwise(pl.lit(None, dtype=pl.Utf8))
+
+
+def _segment_tablosu(veri, kod, ranges):
+    """Ürün veya mağaza bazında cover (toplam stok / toplam satış) ve segment"""
+    satis = pl.col('satis')
+    return (
+        veri.filter(pl.col(kod) >= 0)
+        .group_by(kod)
+        .agg(pl.col('stok').cast(pl.Int64).sum(), satis.cast(pl.Int64).sum())
+        .select(kod, _segment_ifadesi(pl.col('stok') / pl.when(satis == 0).then(1).otherwise(satis), ranges)
+                .alias('segment'))
+        .sort(kod)
+    )
+
+
+def _ozetten_segmentler(tablo, kolon, tip, kod):
+    """veri_ozeti tablosundaki segmentler (kod, segment) olarak"""
+    segmentler, _ = _metinler(tablo['segment'])
+    return pl.DataFrame({kod: pd.Categorical(tablo[kolon], dtype=tip).codes.astype('int32'), 'segment': segmentler})
+
+
+# ============================================
+# KPI, MATRİSLER, SIRALAMA VE YASAK TABLOLARI
+# ============================================
+def _kpi_tablolari(urun_master, kpi_df):
+    """kpi_ekle'deki mg normalizasyonuyla (ürün kodu -> mg) ve (mg -> min/max) tabloları"""
+    urun_master = urun_master[['urun_kod', 'mg']].copy()
+    urun_master['mg'] = urun_master['mg'].astype(object).fillna(0).astype(float).astype(int).astype(str)
+
+    kpi_data = kpi_df[['mg_id', 'min_deger', 'max_deger']].rename(columns={'mg_id': 'mg'})
+    kpi_data['mg'] = kpi_data['mg'].astype(str)
+
+    urun_mg = pl.LazyFrame({'u': _kodlar(urun_master['urun_kod']), 'mg': _metinler(urun_master['mg'])[0]})
+    kpi_mg = pl.LazyFrame({
+        'mg': _metinler(kpi_data['mg'])[0],
+        'min_deger': kpi_data['min_deger'].to_numpy(dtype=float),
+        'max_deger': kpi_data['max_deger'].to_numpy(dtype=float)
+    })
+    return urun_mg, kpi_mg
+
+
+def _matris_tablosu(matrix, kolon):
+    """Matrisi (urun_segment, magaza_segment, değer) satırlarına açar; NaN hücreler NaN kalır"""
+    matrix = matrix.loc[~matrix.index.duplicated(), ~matrix.columns.duplicated()]
+    # Segmentler metin olduğundan sadece metin etiketli satır/kolonlar eşleşebilir
+    matrix = matrix.loc[
+        np.array([isinstance(e, str) for e in matrix.index], dtype=bool),
+        np.array([isinstance(e, str) for e in matrix.columns], dtype=bool)
+    ]
+    satir, kolon_sayisi = matrix.shape
+    return pl.LazyFrame({
+        'urun_segment': pl.Series(np.repeat(matrix.index.to_numpy(dtype=object), kolon_sayisi).tolist(), dtype=pl.Utf8),
+        'magaza_segment': pl.Series(np.tile(matrix.columns.to_numpy(dtype=object), satir).tolist(), dtype=pl.Utf8),
+        kolon: matrix.to_numpy(dtype=float).ravel()
+    })
+
+
+def _siralama_tablosu(siralama_df):
+    """(magaza_segment, urun_segment, Durum) -> Oncelik; dönüş: (tablo, Oncelik tamsayı mı)"""
+    siralama_df = siralama_df.drop_duplicates(['Magaza_Cluster', 'Urun_Cluster', 'Durum'])
+    tamsayi = pd.api.types.is_integer_dtype(siralama_df['Oncelik'].dtype)
+
+    kolonlar, gecerli = {}, np.ones(len(siralama_df), dtype=bool)
+    for kolon, ad in [('Magaza_Cluster', 'magaza_segment'), ('Urun_Cluster', 'urun_segment'), ('Durum', 'Durum')]:
+        kolonlar[ad], kolon_gecerli = _metinler(siralama_df[kolon])
+        gecerli &= kolon_gecerli
+    kolonlar['Oncelik'] = siralama_df['Oncelik'].to_numpy(dtype='int64' if tamsayi else float)
+    return pl.DataFrame(kolonlar).filter(pl.Series(gecerli)).lazy(), tamsayi
+
+
+def _yasakli_ciftler(yasak_df):
+    """Tüm kayıtları 'Yasak' olan (ürün, mağaza) çiftleri.
+
+    pandas'ta tekrarlı yasak kayıtları satırı çoğaltır; en yüksek ihtiyaç seçiminde
+    'Yasak' olmayan kopya kazanır. Bu yüzden çift ancak tüm kayıtları yasaksa elenir.
+    """
+    yasak_df = yasak_df[['urun_kod', 'magaza_kod', 'yasak_durum']]
+    return (
+        pl.LazyFrame({
+            'u': _kodlar(yasak_df['urun_kod']),
+            'm': _kodlar(yasak_df['magaza_kod']),
+            '_yasak': (yasak_df['yasak_durum'] == 'Yasak').to_numpy(dtype=bool, na_value=False)
+        })
+        .group_by(['u', 'm'])
+        .agg(pl.col('_yasak').all())
+        .filter(pl.col('_yasak'))
+    )
+
+
+# ============================================
+# İHTİYAÇ VE TAHSİS
+# ============================================
+def _ihtiyac_kolonlari(default_fc, yeni_urun_kodlari):
+    """ihtiyac_hesapla karşılığı: aday ihtiyaçlar, kazanan Durum (secim) ve ihtiyac"""
+    mevcut = pl.col('mevcut').cast(pl.Float64)
+    min_deger = pl.col('min_deger')
+    adaylar = [
+        ((pl.lit(default_fc, dtype=pl.Float64) * pl.col('satis').cast(pl.Float64)) * pl.col('genlestirme')) - mevcut,
+        (min_deger * pl.col('initial_katsayi')) - mevcut,
+        (pl.col('min_oran') * min_deger) - mevcut
+    ]
+    adaylar = [_sifirdan_buyuk(aday) for aday in adaylar]
+    # Initial sadece yeni ürünler için aday
+    adaylar[1] = pl.when(pl.col('u').is_in(yeni_urun_kodlari)).then(adaylar[1]).otherwise(float('nan'))
+
+    # max_deger kontrolü (np.minimum; sınır NaN ise aday olduğu gibi kalır)
+    sinir = _sifirdan_buyuk(pl.col('max_deger') - mevcut)
+    adaylar = [
+        pl.when(sinir.is_nan() | aday.is_nan() | (aday <= sinir)).then(aday).otherwise(sinir)
+        for aday in adaylar
+    ]
+
+    # Kazanan Durum: ilk en büyük aday (NaN aday olamaz); eşitlikte RPT > Initial > Min
+    k = [pl.when(aday.is_nan()).then(float('-inf')).otherwise(aday) for aday in adaylar]
+    secim = pl.when((k[0] >= k[1]) & (k[0] >= k[2])).then(0).when(k[1] >= k[2]).then(1).otherwise(2)
+    return [
+        secim.alias('secim'),
+        pl.when(secim == 0).then(adaylar[0]).when(secim == 1).then(adaylar[1]).otherwise(adaylar[2]).alias('ihtiyac'),
+        pl.when(secim == 0).then(pl.lit(DURUMLAR[0])).when(secim == 1).then(pl.lit(DURUMLAR[1]))
+        .otherwise(pl.lit(DURUMLAR[2])).alias('Durum')
+    ]
+
+
+def _depo_tahsisi(talepler, depo_df):
+    """depo_tahsis_et karşılığı: grup içi kümülatif toplamla tek geçişte tahsis.
+
+    kalan_sonra = ((stok - ihtiyac1) - ihtiyac2) - ... ; çıkarma sırası pandas motoruyla aynıdır.
+    """
+    depo = pl.LazyFrame({
+        'd': _kodlar(depo_df['depo_kod']),
+        'u': _kodlar(depo_df['urun_kod']),
+        'depo_stok': depo_df['stok'].to_numpy(dtype=float)
+    }).unique(['d', 'u'], keep='first', maintain_order=True)
+
+    grup = ['d', 'u']
+    ihtiyac = pl.col('ihtiyac')
+    ilk_satir = pl.col('sira') == pl.col('sira').min().over(grup)
+    kalan_sonra = (
+        pl.when(ilk_satir).then(pl.col('depo_stok') - ihtiyac).otherwise(-ihtiyac).cum_sum().over(grup)
+    )
+    kalan_once = pl.col('kalan_once')
+    sevkiyat = (
+        pl.when(pl.col('depo_stok').is_null()).then(0.0)
+        .when(kalan_once.is_not_nan() & (kalan_once >= ihtiyac)).then(ihtiyac)
+        .when(ilk_satir).then(kalan_once)
+        # np.fmax(kalan, 0): NaN -> 0
+        .when(kalan_once.is_nan() | (kalan_once < 0)).then(0.0)
+        .otherwise(kalan_once)
+    )
+    return (
+        talepler.join(depo, on=grup, how='left', maintain_order='left')
+        .sort(['d', 'u', 'sira'])
+        .with_columns(kalan_sonra.alias('kalan_sonra'))
+        .with_columns(
+            pl.when(ilk_satir).then(pl.col('depo_stok'))
+            .otherwise(pl.col('kalan_sonra').shift(1).over(grup)).alias('kalan_once')
+        )
+        .with_columns(sevkiyat.alias('sevkiyat'))
+        .with_columns((ihtiyac - pl.col('sevkiyat')).alias('kayip'))
+        .sort('sira')
+    )
+
+
+def _satirlar(df, kolon, satirlar):
+    """df[kolon]'un satır numaralarındaki değerleri; -1 -> NaN (left merge'deki gibi)"""
+    return df[kolon].reset_index(drop=True).reindex(satirlar).reset_index(drop=True)
+
+
+# ============================================
+# SEVKİYAT
+# ============================================
+def sevkiyat_hesapla(urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+                     yasak=None, segmentation_params=None, matrisler=None, siralama=None,
+                     ilerleme=None, islem_sayisi=None, ozet=None):
+    """cekirdek.sevkiyat_hesapla ile aynı girdi ve sonuç (Polars'ta).
+
+    islem_sayisi kullanılmaz; Polars sorguyu kendi iş parçacıklarıyla paralel çalıştırır.
+    Dönüş: (sevkiyat sonuç tablosu, yeni ürün listesi)
+    """
+    if pl is None:
+        raise ImportError("Polars motoru için polars kurulu olmalı: pip install polars")
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+    if segmentation_params is None:
+        segmentation_params = {'product_ranges': VARSAYILAN_ARALIKLAR, 'store_ranges': VARSAYILAN_ARALIKLAR}
+    matrisler = {**varsayilan_matrisler(), **{k: v for k, v in (matrisler or {}).items() if v is not None}}
+
+    urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak = kodlari_esitle(
+        urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak
+    )
+    anlik_df = anlik_stok_satis
+
+    veri = pl.LazyFrame({
+        '_sira': np.arange(len(anlik_df)),
+        'm': _kodlar(anlik_df['magaza_kod']),
+        'u': _kodlar(anlik_df['urun_kod']),
+        'stok': anlik_df['stok'].to_numpy(),
+        'satis': anlik_df['satis'].to_numpy(),
+        # stok + yol pandas'taki tiple (ör. int32) hesaplanır
+        'mevcut': (anlik_df['stok'] + anlik_df['yol']).to_numpy()
+    })
+
+    ilerleme(10, "Yeni ürünler tespit ediliyor...")
+
+    stoklu, toplam, depo_toplam = _stoklu_magazalar(veri, anlik_df, depo_stok)
+    sorgular = [stoklu, toplam]
+
+    ilerleme(25, "Segmentasyon yapılıyor...")
+
+    tamsayi = all(pd.api.types.is_integer_dtype(anlik_df[k].dtype) for k in ('stok', 'satis'))
+    if ozet is None and not tamsayi:
+        ozet = veri_ozeti(anlik_df, segmentation_params)
+    if ozet is None:
+        sorgular += [
+            _segment_tablosu(veri, 'u', segmentation_params['product_ranges']),
+            _segment_tablosu(veri, 'm', segmentation_params['store_ranges'])
+        ]
+    sonuclar = pl.collect_all(sorgular)
+    if ozet is None:
+        urun_segmentleri, magaza_segmentleri = sonuclar[2], sonuclar[3]
+    else:
+        urun_segmentleri = _ozetten_segmentler(ozet['urun'], 'urun_kod', anlik_df['urun_kod'].dtype, 'u')
+        magaza_segmentleri = _ozetten_segmentler(ozet['magaza'], 'magaza_kod', anlik_df['magaza_kod'].dtype, 'm')
+
+    yeni_urun_kodlari, yeni_urun_listesi = _yeni_urun_listesi(
+        sonuclar[0], sonuclar[1]['magaza_sayisi'][0], depo_toplam, anlik_df['urun_kod'].dtype
+    )
+    yeni_kodlar = pd.Categorical(yeni_urun_kodlari, dtype=anlik_df['urun_kod'].dtype).codes.astype('int32')
+
+    if siralama is None:
+        prod_segments = sorted(urun_segmentleri['segment'].drop_nulls().unique().to_list())
+        store_segments = sorted(magaza_segmentleri['segment'].drop_nulls().unique().to_list())
+        siralama = varsayilan_siralama(prod_segments, store_segments)
+
+    ilerleme(40, "KPI verileri hazırlanıyor...")
+
+    default_fc = float(kpi['forward_cover'].mean())
+    sol = dict(how='left', maintain_order='left_right')
+    veri = (
+        veri.join(urun_segmentleri.lazy().rename({'segment': 'urun_segment'}), on='u', **sol)
+        .join(magaza_segmentleri.lazy().rename({'segment': 'magaza_segment'}), on='m', **sol)
+    )
+    if urun_master is not None:
+        urun_mg, kpi_mg = _kpi_tablolari(urun_master, kpi)
+        veri = veri.join(urun_mg, on='u', **sol).join(kpi_mg, on='mg', nulls_equal=True, **sol)
+        veri = veri.with_columns(
+            pl.col('min_deger').fill_null(0.0).fill_nan(0.0),
+            pl.col('max_deger').fill_null(999999.0).fill_nan(999999.0)
+        )
+    else:
+        veri = veri.with_columns(min_deger=pl.lit(0.0), max_deger=pl.lit(999999.0))
+
+    ilerleme(55, "Matris değerleri uygulanıyor...")
+
+    for kolon, matris in MATRIS_KOLONLARI.items():
+        veri = veri.join(_matris_tablosu(matrisler[matris], kolon), on=['urun_segment', 'magaza_segment'],
+                         how='left', maintain_order='left')
+    veri = veri.with_columns(pl.col(list(MATRIS_KOLONLARI)).fill_null(1.0))
+
+    # Depo eşleştirmesi; depo_kod sonuçta magaza_master satırından (_mm) alınır
+    veri = veri.join(
+        pl.LazyFrame({
+            'm': _kodlar(magaza_master['magaza_kod']),
+            'd': _kodlar(magaza_master['depo_kod']),
+            '_mm': np.arange(len(magaza_master))
+        }),
+        on='m', **sol
+    ).with_columns(pl.col('d').fill_null(-1))
+
+    ilerleme(70, "İhtiyaçlar hesaplanıyor...")
+
+    siralama_tablosu, oncelik_tamsayi = _siralama_tablosu(siralama)
+    veri = veri.with_columns(_ihtiyac_kolonlari(default_fc, yeni_kodlar)).join(
+        siralama_tablosu, on=['magaza_segment', 'urun_segment', 'Durum'], how='left',
+        nulls_equal=True, maintain_order='left'
+    )
+    if not oncelik_tamsayi:
+        # NaN öncelikler pandas sıralamasındaki gibi boşlarla birlikte en sona
+        veri = veri.with_columns(pl.col('Oncelik').fill_nan(None))
+    oncelik_bos = veri.select(pl.col('Oncelik').is_null().any())
+
+    ilerleme(85, "Yasak kontrolleri ve depo eşleştirme...")
+
+    if yasak is not None:
+        veri = veri.join(_yasakli_ciftler(yasak), on=['u', 'm'], how='left', maintain_order='left').with_columns(
+            pl.when(pl.col('_yasak').fill_null(False)).then(0.0).otherwise(pl.col('ihtiyac')).alias('ihtiyac')
+        )
+
+    ilerleme(95, "Depo stok kontrolleri yapılıyor...")
+
+    # Her mağaza/ürün için ilk en yüksek ihtiyaçlı satır; Oncelik, sonra (magaza_kod, urun_kod) sırası
+    ihtiyac = pl.col('ihtiyac')
+    talepler = (
+        veri.filter(ihtiyac.is_not_nan() & (ihtiyac > 0) & (pl.col('m') >= 0) & (pl.col('u') >= 0))
+        .filter(ihtiyac == ihtiyac.max().over(['m', 'u']))
+        .unique(['m', 'u'], keep='first', maintain_order=True)
+        .sort(['Oncelik', 'm', 'u'], nulls_last=True, maintain_order=True)
+        .with_row_index('sira')
+    )
+    talepler = _depo_tahsisi(talepler, depo_stok)
+
+    # Ürün ve mağaza adları master satırlarından (tekrarlı kodlar satır çoğaltır)
+    if urun_master is not None:
+        talepler = talepler.join(
+            pl.LazyFrame({'u': _kodlar(urun_master['urun_kod']), '_um': np.arange(len(urun_master))}), on='u', **sol
+        )
+    talepler = talepler.join(
+        pl.LazyFrame({'m': _kodlar(magaza_master['magaza_kod']), '_ma': np.arange(len(magaza_master))}), on='m', **sol
+    )
+    sonuc, oncelik_bos = pl.collect_all([talepler, oncelik_bos])
+
+    sira = sonuc['_sira'].to_numpy()
+    oncelik = sonuc['Oncelik']
+    if oncelik_tamsayi and not oncelik_bos.item():
+        oncelik = oncelik.to_numpy().astype('int64')
+    else:
+        oncelik = oncelik.cast(pl.Float64).to_numpy()
+
+    kaynak = anlik_df[['magaza_kod', 'urun_kod', 'stok', 'yol', 'satis']].take(sira).reset_index(drop=True)
+    result_final = pd.DataFrame({
+        'oncelik': oncelik,
+        'magaza_kod': kaynak['magaza_kod'],
+        'magaza_ad': _satirlar(magaza_master, 'magaza_ad', sonuc['_ma'].fill_null(-1).to_numpy()),
+        'urun_kod': kaynak['urun_kod'],
+        'urun_ad': (_satirlar(urun_master, 'urun_ad', sonuc['_um'].fill_null(-1).to_numpy())
+                    if urun_master is not None else 'Bilinmiyor'),
+        'magaza_segment': pd.Categorical(sonuc['magaza_segment'].to_list()).astype(str),
+        'urun_segment': pd.Categorical(sonuc['urun_segment'].to_list()).astype(str),
+        'durum': np.array(DURUMLAR)[sonuc['secim'].to_numpy()],
+        'stok': kaynak['stok'],
+        'yol': kaynak['yol'],
+        'satis': kaynak['satis'],
+        'ihtiyac_miktari': sonuc['ihtiyac'].to_numpy(),
+        'sevkiyat_miktari': sonuc['sevkiyat'].to_numpy(),
+        'depo_kod': _satirlar(magaza_master, 'depo_kod', sonuc['_mm'].fill_null(-1).to_numpy()),
+        'stok_yoklugu_satis_kaybi': sonuc['kayip'].to_numpy()
+    })
+    result_final.insert(0, 'sira_no', range(1, len(result_final) + 1))
+
+    ilerleme(100, "Tamamlandı!")
+    return result_final, yeni_urun_listesi
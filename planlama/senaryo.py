@@ -0,0 +1,167 @@
+"""Çok sayıda hedef matris / sıralama / forward cover senaryosunun toplu karşılaştırması.
+
+Senaryolar sadece matris değerlerini, sıralamayı ve forward cover'ı değiştirir; yeni ürün
+tespiti, segmentasyon, KPI, depo ve yasak birleştirmeleri tüm senaryolarda aynıdır. Bu
+adımlar bir kez yapılır, her senaryo için sadece matris değerleri, ihtiyaç ve depo
+tahsisi hesaplanır. Senaryolar süreç havuzunda paralel çalışır; ortak veri her sürece
+bir kez gönderilir, süreçler sadece senaryonun özet satırını döndürür.
+
+Senaryo: {'ad': str, 'matrisler': {...}, 'siralama': DataFrame, 'forward_cover': float}
+(hepsi opsiyonel; verilmeyenler için temel parametreler kullanılır).
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .cekirdek import (
+    depo_sevkiyati, matrisleri_uygula, sevkiyat_hazirla, varsayilan_matrisler, yasak_ekle
+)
+from .kodlama import kodlari_esitle
+
+# Matris çarpanı tablosundaki kolonlar (carpanlarla_senaryolar)
+MATRIS_ADLARI = ['genlestirme_orani', 'min_oran', 'initial_matris', 'sisme_orani']
+
+# Alt süreçteki ortak veri (_surec_baslat ile bir kez doldurulur)
+_ortak = {}
+
+
+def _surec_baslat(ortak):
+    _ortak.update(ortak)
+
+
+def senaryo_ozeti(ad, result_df_max, urun_sayisi, magaza_sayisi):
+    """Tahsis sonucundan karşılaştırma satırı: ihtiyaç, sevkiyat, kayıp ve SKU/mağaza kapsamı"""
+    ihtiyac = result_df_max['ihtiyac'].sum()
+    kayip = result_df_max['stok_yoklugu_kaybi'].sum()
+    sevk_var = result_df_max[result_df_max['sevkiyat_gercek'] > 0]
+    sku = sevk_var['urun_kod'].nunique()
+    magaza = sevk_var['magaza_kod'].nunique()
+    return {
+        'Senaryo': ad,
+        'Toplam İhtiyaç': ihtiyac,
+        'Toplam Sevkiyat': result_df_max['sevkiyat_gercek'].sum(),
+        'Stok Kaybı': kayip,
+        'Kayıp Oranı %': kayip / ihtiyac * 100 if ihtiyac > 0 else 0.0,
+        'SKU Sayısı': sku,
+        'SKU Kapsamı %': sku / urun_sayisi * 100 if urun_sayisi else 0.0,
+        'Mağaza Sayısı': magaza,
+        'Mağaza Kapsamı %': magaza / magaza_sayisi * 100 if magaza_sayisi else 0.0
+    }
+
+
+def _senaryo_hesapla(senaryo):
+    """Tek senaryo: ortak hazırlık üzerinde matris, ihtiyaç, yasak ve depo tahsisi"""
+    matrisler = {**_ortak['matrisler'], **{k: v for k, v in (senaryo.get('matrisler') or {}).items() if v is not None}}
+    anlik_df = matrisleri_uygula(_ortak['anlik_df'], matrisler)
+
+    forward_cover = senaryo.get('forward_cover')
+    siralama = senaryo.get('siralama')
+    result_df_max = depo_sevkiyati(
+        anlik_df, _ortak['depo_stok'], None,
+        _ortak['default_fc'] if forward_cover is None or pd.isna(forward_cover) else float(forward_cover),
+        _ortak['yeni_urun_kodlari'],
+        _ortak['siralama'] if siralama is None else siralama,
+        motor=_ortak['motor']
+    )
+    return senaryo_ozeti(senaryo['ad'], result_df_max, _ortak['urun_sayisi'], _ortak['magaza_sayisi'])
+
+
+def senaryolari_hesapla(urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi, senaryolar,
+                        yasak=None, segmentation_params=None, matrisler=None, siralama=None,
+                        ilerleme=None, islem_sayisi=None, ozet=None, motor=None):
+    """Senaryoları tek seferde hesaplayıp karşılaştırma tablosu döndürür.
+
+    matrisler / siralama: senaryoda verilmeyenler için temel değerler (sevkiyat_hesapla ile aynı).
+    islem_sayisi: 1'den büyükse senaryolar bu kadar süreçte paralel hesaplanır.
+    motor: birleştirme/gruplama motoru (None/'pandas' veya 'duckdb').
+    Dönüş: senaryo başına bir satır (senaryolar listesindeki sırayla).
+    """
+    if ilerleme is None:
+        ilerleme = lambda yuzde, mesaj: None
+
+    urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak = kodlari_esitle(
+        urun_master, magaza_master, depo_stok, anlik_stok_satis, yasak
+    )
+
+    # Ülke geneli adımlar ve birleştirmeler tüm senaryolar için bir kez
+    hazirlik = sevkiyat_hazirla(
+        urun_master, magaza_master, depo_stok, anlik_stok_satis, kpi,
+        segmentation_params=segmentation_params, matrisler=matrisler, siralama=siralama,
+        ilerleme=ilerleme, ozet=ozet, motor=motor
+    )
+    anlik_df = hazirlik['anlik_df']
+    if yasak is not None:
+        anlik_df = yasak_ekle(anlik_df, yasak, motor=motor)
+
+    ortak = {
+        'anlik_df': anlik_df,
+        'depo_stok': depo_stok,
+        'matrisler': {**varsayilan_matrisler(), **{k: v for k, v in (matrisler or {}).items() if v is not None}},
+        'default_fc': hazirlik['default_fc'],
+        'yeni_urun_kodlari': hazirlik['yeni_urun_kodlari'],
+        'siralama': hazirlik['siralama'],
+        'urun_sayisi': anlik_stok_satis['urun_kod'].nunique(),
+        'magaza_sayisi': anlik_stok_satis['magaza_kod'].nunique(),
+        'motor': motor
+    }
+    senaryolar = [{**s, 'ad': s.get('ad') or f"Senaryo {i + 1}"} for i, s in enumerate(senaryolar)]
+    satirlar = [None] * len(senaryolar)
+
+    def bildir(tamamlanan):
+        ilerleme(70 + int(29 * tamamlanan / len(senaryolar)),
+                 f"Senaryolar hesaplanıyor... ({tamamlanan}/{len(senaryolar)})")
+
+    bildir(0)
+    if islem_sayisi is None or islem_sayisi <= 1 or len(senaryolar) <= 1:
+        _surec_baslat(ortak)
+        try:
+            for i, senaryo in enumerate(senaryolar):
+                satirlar[i] = _senaryo_hesapla(senaryo)
+                bildir(i + 1)
+        finally:
+            _ortak.clear()
+    else:
+        # Streamlit gibi çok iş parçacıklı süreçlerde fork güvenli değil
+        with ProcessPoolExecutor(
+            max_workers=min(islem_sayisi, len(senaryolar)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_surec_baslat,
+            initargs=(ortak,)
+        ) as havuz:
+            isler = {havuz.submit(_senaryo_hesapla, senaryo): i for i, senaryo in enumerate(senaryolar)}
+            try:
+                for tamamlanan, is_ in enumerate(as_completed(isler), start=1):
+                    satirlar[isler[is_]] = is_.result()
+                    bildir(tamamlanan)
+            except BaseException:
+                # Hata veya iptal: sırada bekleyen senaryolar başlatılmasın
+                havuz.shutdown(cancel_futures=True)
+                raise
+
+    ilerleme(100, "Tamamlandı!")
+    return pd.DataFrame(satirlar)
+
+
+def carpanlarla_senaryolar(tablo, matrisler=None):
+    """Çarpan tablosundan senaryo listesi.
+
+    tablo: her satır bir senaryo; 'Senaryo' (ad), MATRIS_ADLARI kolonları (temel matrisin
+    çarpılacağı katsayı, boş = 1) ve 'forward_cover' (boş = KPI ortalaması).
+    matrisler: çarpılacak temel matrisler (eksik olanlar için varsayılan matris).
+    """
+    temel = {**varsayilan_matrisler(), **{k: v for k, v in (matrisler or {}).items() if v is not None}}
+    senaryolar = []
+    for _, satir in tablo.iterrows():
+        senaryo_matrisleri = {}
+        for isim in MATRIS_ADLARI:
+            carpan = satir.get(isim)
+            if carpan is not None and pd.notna(carpan) and float(carpan) != 1.0:
+                senaryo_matrisleri[isim] = temel[isim] * float(carpan)
+        forward_cover = satir.get('forward_cover')
+        senaryolar.append({
+            'ad': satir.get('Senaryo') if pd.notna(satir.get('Senaryo')) else None,
+            'matrisler': senaryo_matrisleri,
+            'forward_cover': None if forward_cover is None or pd.isna(forward_cover) else float(forward_cover)
+        })
+    return senaryolar
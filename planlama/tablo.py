@@ -0,0 +1,96 @@
+"""Büyük tabloların sunucu tarafında süzülmesi, sıralanması, sayfalanması ve dışa aktarılması.
+
+Arayüz tabloların tamamını tarayıcıya göndermez: arama ve sıralama burada tüm tablo
+üzerinde yapılır, sadece görünen sayfa seçilip biçimlendirilir. Sıralamada sadece sıralama
+kolonu sıralanır; sayfanın satırları konumlarıyla alınır (diğer kolonlar kopyalanmaz).
+disa_aktar indirme dosyalarının içeriğini üretir; arayüz bunu sadece indirme istendiğinde çağırır.
+"""
+import io
+import math
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+VARSAYILAN_SAYFA_BOYUTU = 100
+
+
+def metin_kolonlari(df):
+    """Aramada kullanılan kolonlar: metin ve kategori kolonları"""
+    return df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
+
+
+def tablo_suz(df, arama=None, arama_kolonlari=None):
+    """arama metnini (büyük/küçük harf duyarsız, düz metin) arama_kolonlari'ndan birinde içeren satırlar"""
+    arama = (arama or '').strip()
+    if not arama:
+        return df
+    kolonlar = [k for k in (arama_kolonlari or metin_kolonlari(df)) if k in df.columns]
+    if not kolonlar:
+        return df
+
+    maske = np.zeros(len(df), dtype=bool)
+    for kolon in kolonlar:
+        # Boş hücreler eşleşmez (pandas sürümüne göre astype(str) NaN'i 'nan' yapabilir)
+        dolu = df[kolon].notna().to_numpy()
+        maske |= dolu & df[kolon].astype(str).str.contains(arama, case=False, regex=False, na=False).to_numpy()
+    return df[maske]
+
+
+def sayfa_sayisi(satir_sayisi, sayfa_boyutu=VARSAYILAN_SAYFA_BOYUTU):
+    """En az 1"""
+    return max(1, math.ceil(satir_sayisi / sayfa_boyutu))
+
+
+def tablo_sayfasi(df, sayfa=1, sayfa_boyutu=VARSAYILAN_SAYFA_BOYUTU, siralama=None, artan=True):
+    """df'nin siralama kolonuna göre sıralanmış halinin sayfa'ıncı (1'den) sayfası.
+
+    Sıralama kararlıdır, boş değerler sona gider; siralama None ise df'nin kendi sırası kullanılır.
+    Sayfa aralık dışındaysa son/ilk sayfaya çekilir.
+    """
+    sayfa = min(max(1, int(sayfa)), sayfa_sayisi(len(df), sayfa_boyutu))
+    baslangic = (sayfa - 1) * sayfa_boyutu
+    bitis = baslangic + sayfa_boyutu
+
+    if siralama is None or siralama not in df.columns:
+        return df.iloc[baslangic:bitis]
+
+    sira = df[siralama].reset_index(drop=True).sort_values(ascending=artan, kind='stable', na_position='last')
+    return df.iloc[sira.index[baslangic:bitis]]
+
+
+# Dışa aktarma biçimi -> MIME türü
+DISA_AKTARMA_BICIMLERI = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'parquet': 'application/octet-stream',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'zip': 'application/zip'
+}
+
+
+def disa_aktar(veri, bicim='csv'):
+    """Tabloyu indirme dosyası içeriğine (bayt) çevirir.
+
+    veri: DataFrame; xlsx ve zip için {sayfa/dosya adı: DataFrame}. csv UTF-8 BOM'ludur (Excel
+    Türkçe karakterleri doğru açar), json kayıt listesidir, zip her tabloyu bir csv olarak içerir.
+    """
+    if bicim == 'csv':
+        return veri.to_csv(index=False).encode('utf-8-sig')
+    if bicim == 'json':
+        return veri.to_json(orient='records', force_ascii=False).encode('utf-8')
+
+    tampon = io.BytesIO()
+    if bicim == 'parquet':
+        veri.to_parquet(tampon, index=False)
+    elif bicim == 'xlsx':
+        with pd.ExcelWriter(tampon, engine='openpyxl') as yazici:
+            for ad, df in veri.items():
+                df.to_excel(yazici, sheet_name=ad, index=False)
+    elif bicim == 'zip':
+        with zipfile.ZipFile(tampon, 'w', zipfile.ZIP_DEFLATED) as arsiv:
+            for ad, df in veri.items():
+                arsiv.writestr(ad, disa_aktar(df, 'csv'))
+    else:
+        raise ValueError(f"Bilinmeyen dışa aktarma biçimi: {bicim}")
+    return tampon.getvalue()
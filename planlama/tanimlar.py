@@ -0,0 +1,96 @@
+"""Veri tanımları ve ortak sabitler"""
+
+# Varsayılan segment aralıkları (Toplam Stok / Toplam Satış)
+VARSAYILAN_ARALIKLAR = [(0, 4), (5, 8), (9, 12), (12, 15), (15, 20), (20, float('inf'))]
+
+# Sevkiyat tipleri - eşit ihtiyaçta soldaki kazanır
+DURUMLAR = ['RPT', 'Initial', 'Min']
+
+# Kolon tipleri (okuma şeması):
+#   'category' - kodlar ve adlar, metin olarak okunur; sadece rakamdan oluşan kodların baştaki
+#                sıfırları atılır ('001' -> '1', bkz. kodlama.kod_metni), harfli kodlar olduğu gibi kalır
+#   'int32'    - adet kolonları; tamsayı değilse veya boş hücre varsa float32 kalır
+#   'int16'    - yıl/hafta gibi küçük tamsayılar (aynı kural)
+#   'float32'  - tutarlar ve oranlar
+#   'float64'  - küçük tablolardaki parametreler
+KATEGORI = 'category'
+
+# Yüklenebilen dosya biçimleri (Parquet/Feather için pyarrow gerekir)
+DOSYA_UZANTILARI = ['csv', 'parquet', 'feather']
+
+# Veri tanımları
+VERI_TANIMLARI = {
+    'urun_master': {
+        'name': 'Ürün Master',
+        'required': True,
+        'columns': ['urun_kod', 'urun_ad', 'satici_kod', 'satici_ad', 'kategori_kod', 'kategori_ad', 
+                   'umg', 'umg_ad', 'mg', 'mg_ad', 'marka_kod', 'marka_ad', 'klasman_kod', 'klasman_ad',
+                   'nitelik', 'durum', 'ithal', 'ithal_ad', 'tanim'],
+        'dtypes': {kolon: KATEGORI for kolon in [
+            'urun_kod', 'urun_ad', 'satici_kod', 'satici_ad', 'kategori_kod', 'kategori_ad',
+            'umg', 'umg_ad', 'mg', 'mg_ad', 'marka_kod', 'marka_ad', 'klasman_kod', 'klasman_ad',
+            'nitelik', 'durum', 'ithal', 'ithal_ad', 'tanim']},
+        'state_key': 'urun_master',
+        'icon': '📦'
+    },
+    'magaza_master': {
+        'name': 'Mağaza Master',
+        'required': True,
+        'columns': ['magaza_kod', 'magaza_ad', 'il', 'bolge', 'tip', 'adres_kod', 'sm', 'bs', 'depo_kod'],
+        'dtypes': {kolon: KATEGORI for kolon in [
+            'magaza_kod', 'magaza_ad', 'il', 'bolge', 'tip', 'adres_kod', 'sm', 'bs', 'depo_kod']},
+        'state_key': 'magaza_master',
+        'icon': '🏪'
+    },
+    'depo_stok': {
+        'name': 'Depo Stok',
+        'required': True,
+        'columns': ['depo_kod', 'depo_ad', 'urun_kod', 'stok'],
+        'dtypes': {'depo_kod': KATEGORI, 'depo_ad': KATEGORI, 'urun_kod': KATEGORI, 'stok': 'int32'},
+        'state_key': 'depo_stok',
+        'icon': '📦'
+    },
+    'anlik_stok_satis': {
+        'name': 'Anlık Stok/Satış',
+        'required': True,
+        'columns': ['magaza_kod', 'urun_kod', 'stok', 'yol', 'satis', 'ciro', 'smm'],
+        'dtypes': {'magaza_kod': KATEGORI, 'urun_kod': KATEGORI, 'stok': 'int32', 'yol': 'int32',
+                   'satis': 'int32', 'ciro': 'float32', 'smm': 'float32'},
+        'state_key': 'anlik_stok_satis',
+        'icon': '📊'
+    },
+    'kpi': {
+        'name': 'KPI',
+        'required': True,
+        'columns': ['mg_id', 'min_deger', 'max_deger', 'forward_cover'],
+        'dtypes': {'mg_id': KATEGORI, 'min_deger': 'float64', 'max_deger': 'float64', 'forward_cover': 'float64'},
+        'state_key': 'kpi',
+        'icon': '🎯'
+    },
+    'yasak_master': {
+        'name': 'Yasak',
+        'required': False,
+        'columns': ['urun_kod', 'magaza_kod', 'yasak_durum'],
+        'dtypes': {'urun_kod': KATEGORI, 'magaza_kod': KATEGORI, 'yasak_durum': KATEGORI},
+        'state_key': 'yasak_master',
+        'icon': '🚫'
+    },
+    'haftalik_trend': {
+        'name': 'Haftalık Trend',
+        'required': False,
+        'columns': ['klasman_kod', 'marka_kod', 'yil', 'hafta', 'stok', 'satis', 'ciro', 'smm', 'iftutar'],
+        'dtypes': {'klasman_kod': KATEGORI, 'marka_kod': KATEGORI, 'yil': 'int16', 'hafta': 'int16',
+                   'stok': 'int32', 'satis': 'int32', 'ciro': 'float32', 'smm': 'float32', 'iftutar': 'float32'},
+        'state_key': 'haftalik_trend',
+        'icon': '📈'
+    }
+}
+
+
+def dosya_eslestir(dosya_adi):
+    """Dosya adından veri tipini bulur (bulamazsa None)"""
+    dosya_adi = dosya_adi.lower()
+    for key, definition in VERI_TANIMLARI.items():
+        if key in dosya_adi or definition['name'].lower().replace(' ', '_') in dosya_adi:
+            return key
+    return None
@@ -1,8 +1,26 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import importlib.util
+import os
 import time
 
+from planlama import (
+    VARSAYILAN_ARALIKLAR, VERI_TANIMLARI, DOSYA_UZANTILARI, dosya_eslestir, kolonlari_kontrol_et, dosyalari_oku,
+    segmentle, segment_etiketleri, segmentleri_sirala, varsayilan_siralama,
+    veri_parmak_izi, parametre_anahtari, veri_ozeti, kodlari_esitle,
+    varsayilan_matrisler, varsayilan_cover_matrisi,
+    alim_siparis_hesapla, master_data_olustur, ornek_veri_olustur, OLCEKLER, ArkaPlanIsi, HesaplamaAkisi, senaryolari_hesapla, carpanlarla_senaryolar,
+    MOTORLAR, kullanilabilir_motorlar, olcum_gunlugu, olcum_gunlugune_yaz, kup_olustur
+)
+from planlama.kup import SEVIYE_ADLARI
+from planlama.harita import harita_kullanilabilir, il_koordinatlari, il_haritasi
+from planlama.tablo import sayfa_sayisi, tablo_suz, tablo_sayfasi, disa_aktar, DISA_AKTARMA_BICIMLERI
+from planlama.depolama import (
+    OrtakVeriDeposu, depolama_etkin, depolama_dizini, veri_seti_yaz, son_seti_kaydet, son_seti_yukle,
+    kullanilmayanlari_sil
+)
+
 # Sayfa konfigürasyonu
 st.set_page_config(
     page_title="Retail Sevkiyat Planlama",
@@ -27,8 +45,8 @@ if 'kpi' not in st.session_state:
     st.session_state.kpi = None
 if 'segmentation_params' not in st.session_state:
     st.session_state.segmentation_params = {
-        'product_ranges': [(0, 4), (5, 8), (9, 12), (12, 15), (15, 20), (20, float('inf'))],
-        'store_ranges': [(0, 4), (5, 8), (9, 12), (12, 15), (15, 20), (20, float('inf'))]
+        'product_ranges': list(VARSAYILAN_ARALIKLAR),
+        'store_ranges': list(VARSAYILAN_ARALIKLAR)
     }
 if 'initial_matris' not in st.session_state:
     st.session_state.initial_matris = None
@@ -44,10 +62,362 @@ if 'siralama_data' not in st.session_state:
     st.session_state.siralama_data = None
 if 'sevkiyat_sonuc' not in st.session_state:
     st.session_state.sevkiyat_sonuc = None
+if 'sevkiyat_surumu' not in st.session_state:
+    # sevkiyat_sonuc her değiştiğinde artar; rapor önbellekleri bu sürüme bağlıdır
+    st.session_state.sevkiyat_surumu = 0
+if 'rapor_onbellek' not in st.session_state:
+    st.session_state.rapor_onbellek = {}
+if 'indirme_onbellek' not in st.session_state:
+    # (anahtar, biçim) -> son üretilen indirme içeriği ve sürümü
+    st.session_state.indirme_onbellek = {}
 if 'yeni_urun_listesi' not in st.session_state:
     st.session_state.yeni_urun_listesi = None
+if 'veri_parmak_izleri' not in st.session_state:
+    st.session_state.veri_parmak_izleri = {}
+if 'veri_ozeti_onbellek' not in st.session_state:
+    st.session_state.veri_ozeti_onbellek = None
+if 'isler' not in st.session_state:
+    st.session_state.isler = {}
+if 'son_isler' not in st.session_state:
+    st.session_state.son_isler = {}
+if 'hesaplama_motoru' not in st.session_state:
+    # Büyük birleştirme/gruplamaların motoru: 'pandas' (varsayılan), 'duckdb' veya 'polars' (kuruluysa)
+    st.session_state.hesaplama_motoru = 'pandas'
+if 'hesaplama_akisi' not in st.session_state:
+    # Hesaplama aşamalarının çıktıları; sadece değişen girdilerin aşağısındaki aşamalar yeniden çalışır
+    st.session_state.hesaplama_akisi = HesaplamaAkisi()
+
+# ============================================
+# VERİ ÖZETİ ÖNBELLEĞİ
+# ============================================
+@st.cache_resource
+def ortak_veri_deposu():
+    """Tüm oturumların paylaştığı salt okunur veri setleri (süreç başına bir tane)"""
+    return OrtakVeriDeposu()
+
+
+def veri_kaydet(state_key, df, parmak_izi=None):
+    """Veriyi içerik parmak iziyle ortak depoya koyar; oturum sadece referans tutar.
+
+    Aynı içerik başka bir oturumda zaten yüklüyse o nesne kullanılır (iz biliniyorsa
+    yeniden hesaplanmaz). Matris, sıralama ve segment aralıkları oturuma özel kalır.
+    """
+    if df is not None:
+        if parmak_izi is None:
+            parmak_izi = veri_parmak_izi(df)
+        df = ortak_veri_deposu().paylas(parmak_izi, df)
+    st.session_state[state_key] = df
+    st.session_state.veri_parmak_izleri[state_key] = parmak_izi
+
+
+def diske_yaz():
+    """Yüklü veri setlerini diske yazar (aynı içerik tekrar yazılmaz) ve son set olarak işaretler"""
+    if not depolama_etkin():
+        return
+    ozetler = {}
+    for definition in VERI_TANIMLARI.values():
+        state_key = definition['state_key']
+        df = st.session_state.get(state_key)
+        if df is None:
+            continue
+        ozet = st.session_state.veri_parmak_izleri.get(state_key) or veri_parmak_izi(df)
+        veri_seti_yaz(df, ozet)
+        ozetler[state_key] = ozet
+    son_seti_kaydet(ozetler)
+
+
+def kod_sozlugunu_guncelle():
+    """Yüklü tüm verilerin ürün/mağaza/depo kodlarını ortak sözlüğe (tamsayı kodlar) çevirir"""
+    anahtarlar = [d['state_key'] for d in VERI_TANIMLARI.values() if st.session_state.get(d['state_key']) is not None]
+    veriler = kodlari_esitle(*[st.session_state[k] for k in anahtarlar])
+    for anahtar, df in zip(anahtarlar, veriler):
+        if df is not st.session_state[anahtar]:
+            veri_kaydet(anahtar, df)
+
+
+def veri_ozeti_al():
+    """anlik_stok_satis'in ürün/mağaza özetleri ve segmentleri.
+
+    Sadece yeni dosya yüklendiğinde veya segmentasyon aralıkları kaydedildiğinde
+    yeniden hesaplanır; diğer tüm yeniden çalıştırmalarda önbellekten gelir.
+    """
+    izler = st.session_state.veri_parmak_izleri
+    if izler.get('anlik_stok_satis') is None:
+        izler['anlik_stok_satis'] = veri_parmak_izi(st.session_state.anlik_stok_satis)
+
+    anahtar = (izler['anlik_stok_satis'], parametre_anahtari(st.session_state.segmentation_params))
+    onbellek = st.session_state.veri_ozeti_onbellek
+    if onbellek is None or onbellek['anahtar'] != anahtar:
+        onbellek = {'anahtar': anahtar, **veri_ozeti(st.session_state.anlik_stok_satis, st.session_state.segmentation_params,
+                                                     motor=st.session_state.hesaplama_motoru)}
+        st.session_state.veri_ozeti_onbellek = onbellek
+    return onbellek
+
+
+def sevkiyat_sonucunu_ata(df, kup=None):
+    """sevkiyat_sonuc'u değiştirir ve sürümünü artırır (sürüme bağlı önbellekler geçersiz olur).
+
+    kup: hesaplama işinde hazırlanmış rapor küpü; verilmezse ilk kullanımda oluşturulur.
+    """
+    st.session_state.sevkiyat_sonuc = df
+    st.session_state.sevkiyat_surumu += 1
+    if kup is not None:
+        st.session_state.rapor_onbellek = {'surum': sevkiyat_surumu(), 'kup': kup}
+
+
+def sevkiyat_surumu():
+    """Rapor önbelleklerinin anahtarı: sevkiyat sonucu sürümü ve birleştirilen master verilerin izleri"""
+    izler = st.session_state.veri_parmak_izleri
+    return (st.session_state.sevkiyat_surumu, izler.get('urun_master'), izler.get('magaza_master'))
+
+
+def rapor_hesapla(ad, fonksiyon):
+    """Rapor hesaplamasını sevkiyat sonucu sürümü başına bir kez çalıştırır.
+
+    Sadece güncel sürümün sonuçları tutulur; sürüm değişince önceki sonuçlar bırakılır.
+    """
+    onbellek = st.session_state.rapor_onbellek
+    surum = sevkiyat_surumu()
+    if onbellek.get('surum') != surum:
+        onbellek.clear()
+        onbellek['surum'] = surum
+    if ad not in onbellek:
+        onbellek[ad] = fonksiyon()
+    return onbellek[ad]
+
+
+def sevkiyat_kupu():
+    """Güncel sevkiyat sonucunun rapor küpü (tüm rapor toplamları bundan alınır)"""
+    return rapor_hesapla('kup', lambda: kup_olustur(
+        st.session_state.sevkiyat_sonuc, st.session_state.urun_master, st.session_state.magaza_master,
+        motor=st.session_state.hesaplama_motoru
+    ))
+
+
+# ============================================
+# ARKA PLAN İŞLERİ
+# ============================================
+def is_baslat(anahtar, ad, fonksiyon, satir_sayisi=None, uyarilari_topla=False, **parametreler):
+    """Hesaplamayı arka plan iş parçacığında başlatır; sayfalar arasında gezinmek ve
+    matrisleri düzenlemek iş sürerken de mümkündür. İşe verilen veriler başlangıç anının
+    kopyası değil referansıdır; düzenlemeler yeni nesne ürettiği için işi etkilemez.
+
+    uyarilari_topla: fonksiyonun uyari(mesaj) çağrıları iş üzerinde toplanır (sonuçla gösterilir).
+    """
+    is_ = ArkaPlanIsi(ad, fonksiyon, satir_sayisi=satir_sayisi, **parametreler)
+    if uyarilari_topla:
+        is_.parametreler['uyari'] = is_.uyari
+    st.session_state.isler[anahtar] = is_.baslat()
+
+
+def sevkiyat_ve_kup_hesapla(akis, ilerleme, **parametreler):
+    """HesaplamaAkisi hesaplaması; raporlar beklemesin diye küp de aynı işte oluşturulur"""
+    result_final, yeni_urun_listesi = akis.hesapla(
+        ilerleme=lambda yuzde, mesaj: ilerleme(yuzde, mesaj) if yuzde < 100 else None, **parametreler
+    )
+    ilerleme(97, "Rapor küpü oluşturuluyor...")
+    kup = kup_olustur(result_final, parametreler['urun_master'], parametreler['magaza_master'],
+                      motor=parametreler.get('motor'))
+    ilerleme(100, "Tamamlandı!")
+    return result_final, yeni_urun_listesi, kup
+
+
+def _sevkiyat_sonucunu_yaz(is_):
+    result_final, yeni_urun_listesi, kup = is_.sonuc
+    st.session_state.yeni_urun_listesi = yeni_urun_listesi
+    sevkiyat_sonucunu_ata(result_final, kup=kup)
+
+
+def _senaryo_sonucunu_yaz(is_):
+    st.session_state.senaryo_sonuc = is_.sonuc
+
+
+def _alim_sonucunu_yaz(is_):
+    st.session_state.alim_siparis_sonuc = is_.sonuc
+    st.session_state.alim_siparis_filtreleri = {
+        'cover_threshold': is_.parametreler['cover_threshold'],
+        'margin_threshold': is_.parametreler['margin_threshold']
+    }
+
+
+# İş anahtarı -> biten işin sonucunu session state'e yazan fonksiyon
+IS_SONUCLARI = {
+    'sevkiyat': _sevkiyat_sonucunu_yaz,
+    'senaryo': _senaryo_sonucunu_yaz,
+    'alim': _alim_sonucunu_yaz
+}
+
+
+def is_asamalari(anahtar, is_):
+    """İşin aşama ölçümleri; sevkiyat için HesaplamaAkisi'nin satır sayılı aşama kayıtları"""
+    if anahtar == 'sevkiyat' and st.session_state.hesaplama_akisi.son_calisma:
+        return st.session_state.hesaplama_akisi.son_calisma
+    return is_.asama_tablosu()
+
+
+def olcumu_gunluge_yaz(anahtar, is_):
+    """Biten işin aşama ölçümlerini yerel JSONL günlüğüne ekler (regresyon takibi için)"""
+    try:
+        olcum_gunlugune_yaz({
+            'is': anahtar,
+            'durum': is_.durum,
+            'motor': is_.parametreler.get('motor'),
+            'girdi_satir': is_.satir_sayisi,
+            'toplam_sn': round(is_.gecen_sure(), 3),
+            'asamalar': is_asamalari(anahtar, is_)
+        })
+    except OSError as e:
+        st.toast(f"⚠️ Ölçüm günlüğü yazılamadı: {e}")
+
+
+def isleri_tamamla():
+    """Biten işlerin sonuçlarını session state'e yazar (script iş parçacığında, iş parçacığında değil)"""
+    for anahtar, is_ in list(st.session_state.isler.items()):
+        if is_.calisiyor:
+            continue
+        del st.session_state.isler[anahtar]
+        st.session_state.son_isler[anahtar] = is_
+        olcumu_gunluge_yaz(anahtar, is_)
+        if is_.durum == 'bitti':
+            IS_SONUCLARI[anahtar](is_)
+            st.toast(f"✅ {is_.ad} tamamlandı ({is_.gecen_sure():.1f} sn)")
+        elif is_.durum == 'iptal':
+            st.toast(f"⛔ {is_.ad} iptal edildi")
+        else:
+            st.toast(f"❌ {is_.ad} hata ile bitti")
+
+
+@st.fragment(run_every=1)
+def is_paneli(anahtar, detay=False):
+    """Çalışan işin ilerlemesi ve iptal butonu; iş bitince tüm sayfa yeniden çalışır"""
+    is_ = st.session_state.isler.get(anahtar)
+    if is_ is None or not is_.calisiyor:
+        st.rerun()
+
+    st.progress(is_.yuzde() / 100, text=f"⏳ {is_.ad}: {is_.mesaj or 'Başlatılıyor...'}")
+    st.caption(f"Geçen süre: {is_.gecen_sure():.1f} sn")
+    if detay and is_.asama_tablosu():
+        st.dataframe(pd.DataFrame(is_.asama_tablosu()), use_container_width=True, hide_index=True)
+    if st.button("⛔ İptal Et", key=f"iptal_{anahtar}_{detay}"):
+        is_.iptal_et()
+        st.info("İptal isteği gönderildi, iş mevcut aşamanın sonunda duracak.")
+
+
+def is_ozeti_goster(anahtar):
+    """Son biten işin durumu, uyarıları ve aşama ölçümleri"""
+    is_ = st.session_state.son_isler.get(anahtar)
+    if is_ is None:
+        return
+    if is_.durum == 'hata':
+        st.error(f"❌ Hata oluştu: {str(is_.hata)}")
+        st.code(is_.hata_detayi)
+    elif is_.durum == 'iptal':
+        st.warning(f"⛔ Son {is_.ad.lower()} hesaplaması iptal edildi.")
+    for mesaj in is_.uyarilar:
+        st.warning(f"⚠️ {mesaj}")
+    asamalar = is_asamalari(anahtar, is_)
+    if asamalar:
+        with st.expander(f"⏱️ Son çalışmanın aşama ölçümleri ({is_.gecen_sure():.1f} sn)"):
+            asama_df = pd.DataFrame(asamalar)
+            st.dataframe(asama_df, use_container_width=True, hide_index=True)
+            toplam = f"Toplam: {is_.gecen_sure():.2f} sn"
+            if 'CPU (sn)' in asama_df:
+                toplam += f", CPU {asama_df['CPU (sn)'].sum():.2f} sn"
+            if 'Tepe Bellek Δ (MB)' in asama_df and asama_df['Tepe Bellek Δ (MB)'].notna().any():
+                toplam += f", en yüksek bellek artışı {asama_df['Tepe Bellek Δ (MB)'].max():.1f} MB"
+            gunluk = olcum_gunlugu()
+            st.caption(toplam + (f" · Ölçümler {gunluk} dosyasına ekleniyor" if gunluk else ""))
+
+
+def sayfali_tablo(df, anahtar, bicimler=None, arama_kolonlari=None, siralama=None, artan=True, height=400,
+                  **dataframe_args):
+    """Sunucu tarafında aranan, sıralanan ve sayfalanan tablo; sadece görünen sayfa biçimlendirilip gönderilir.
+
+    bicimler: Styler.format sözlüğü; siralama/artan: ilk açılıştaki sıralama. Aramadan sonraki tabloyu döndürür.
+    """
+    kolonlar = list(df.columns)
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        arama = st.text_input("🔎 Tabloda Ara", key=f"{anahtar}_arama", placeholder="Kod, ad, segment...")
+    with col2:
+        siralama = st.selectbox(
+            "Sırala", [None, *kolonlar], index=kolonlar.index(siralama) + 1 if siralama in kolonlar else 0,
+            format_func=lambda kolon: "(Tablo sırası)" if kolon is None else str(kolon), key=f"{anahtar}_siralama"
+        )
+    with col3:
+        artan = st.selectbox("Yön", [True, False], index=0 if artan else 1,
+                             format_func=lambda a: "Artan" if a else "Azalan", key=f"{anahtar}_yon")
+    with col4:
+        sayfa_boyutu = st.selectbox("Satır/Sayfa", [50, 100, 250, 500], index=1, key=f"{anahtar}_boyut")
+
+    suzulen = tablo_suz(df, arama, arama_kolonlari)
+    sayfa_adedi = sayfa_sayisi(len(suzulen), sayfa_boyutu)
+    # Arama sonrası sayfa sayısı azaldıysa son sayfaya çek
+    if st.session_state.get(f"{anahtar}_sayfa", 1) > sayfa_adedi:
+        st.session_state[f"{anahtar}_sayfa"] = sayfa_adedi
+    sayfa = st.number_input(f"Sayfa (toplam {sayfa_adedi:,})", min_value=1, max_value=sayfa_adedi, step=1,
+                            key=f"{anahtar}_sayfa")
+
+    gorunen = tablo_sayfasi(suzulen, sayfa, sayfa_boyutu, siralama, artan)
+    if bicimler:
+        gorunen = gorunen.style.format({k: v for k, v in bicimler.items() if k in kolonlar})
+    st.dataframe(gorunen, use_container_width=True, height=height, **dataframe_args)
+
+    baslangic = (sayfa - 1) * sayfa_boyutu
+    ozet = f"Toplam {len(df):,} satır"
+    if len(suzulen) != len(df):
+        ozet += f" (aramaya uyan {len(suzulen):,})"
+    if len(suzulen):
+        ozet += f" · {baslangic + 1:,}–{min(baslangic + sayfa_boyutu, len(suzulen)):,}. satırlar gösteriliyor"
+    st.caption(ozet)
+    return suzulen
+
+
+def indirme_butonu(label, veri, file_name, bicim='csv', surum=None, anahtar=None, **kwargs):
+    """İçeriği sadece tıklanınca üreten indirme butonu.
+
+    veri: DataFrame, {ad: DataFrame} (xlsx/zip) veya bunlardan birini döndüren fonksiyon. İçerik
+    (anahtar, bicim) başına sürüm için bir kez üretilir; surum verilmezse veri nesnesinin kendisi
+    sürümdür (DataFrame sürümleri nesne kimliğiyle karşılaştırılır). Sürüm değişmişse eski içerik
+    buton çizilirken atılır.
+    """
+    onbellek = st.session_state.indirme_onbellek
+    kayit_anahtari = (anahtar or file_name, bicim)
+    if surum is None or isinstance(surum, pd.DataFrame):
+        # Sürüm nesne kimliğidir; kayıt nesneyi tuttuğu için kimlik başka bir nesneye geçemez
+        nesne = veri if surum is None else surum
+        surum = ('nesne', id(nesne))
+    else:
+        nesne = None
+    kayit = onbellek.get(kayit_anahtari)
+    if kayit is not None and kayit['surum'] != surum:
+        del onbellek[kayit_anahtari]
 
-# Sidebar menü 
+    def icerik():
+        # Tıklamada ayrı iş parçacığında çalışır; st.session_state yerine yakalanan sözlük kullanılır
+        kayit = onbellek.get(kayit_anahtari)
+        if kayit is None or kayit['surum'] != surum:
+            kayit = {'surum': surum, 'nesne': nesne, 'icerik': disa_aktar(veri() if callable(veri) else veri, bicim)}
+            onbellek[kayit_anahtari] = kayit
+        return kayit['icerik']
+
+    kwargs.setdefault('mime', DISA_AKTARMA_BICIMLERI[bicim])
+    return st.download_button(label=label, data=icerik, file_name=file_name, **kwargs)
+
+
+# Oturum açılışı: son yüklenen veri seti diskte varsa bellek eşlemeli olarak geri yükle
+if 'diskten_yuklendi' not in st.session_state:
+    st.session_state.diskten_yuklendi = True
+    yuklenenler = son_seti_yukle(bellekteki=ortak_veri_deposu())
+    for state_key, (ozet, df) in yuklenenler.items():
+        veri_kaydet(state_key, df, parmak_izi=ozet)
+    if yuklenenler:
+        st.toast(f"💾 Son yüklenen {len(yuklenenler)} veri seti diskten açıldı")
+
+
+isleri_tamamla()
+
+# Sidebar menü
 st.sidebar.title("📦 Sevkiyat ve WSSI Alım Sipariş Sistemi")
 menu = st.sidebar.radio(
     "Menü",
@@ -55,6 +425,28 @@ menu = st.sidebar.radio(
      "🎲 Hedef Matris", "🔢 Sıralama", "📐 Hesaplama", "💵 Alım Sipariş", "📈 Raporlar", "💾 Master Data"]
 )
 
+# Hesaplama motoru tüm sayfalarda geçerlidir; sonuçlar motordan bağımsızdır
+motorlar = kullanilabilir_motorlar()
+if st.session_state.hesaplama_motoru not in motorlar:
+    st.session_state.hesaplama_motoru = 'pandas'
+st.sidebar.selectbox(
+    "⚙️ Hesaplama motoru",
+    motorlar,
+    format_func=MOTORLAR.get,
+    key='hesaplama_motoru',
+    help="Segmentasyon, Hesaplama, Alım Sipariş, Raporlar ve Master Data'daki büyük birleştirme ve "
+         "gruplamaları çalıştıran motor. DuckDB çok çekirdekli çalışır ve bellek yetmezse diske taşar "
+         "(pip install duckdb). Polars sevkiyat hesaplamasının tamamını tek sorguda çok çekirdekli "
+         "yapar; diğer sayfalarda pandas kullanılır (pip install polars)."
+)
+
+# Çalışan işler her sayfada sidebar'da izlenir
+if st.session_state.isler:
+    with st.sidebar:
+        st.markdown("---")
+        for anahtar in list(st.session_state.isler):
+            is_paneli(anahtar)
+
 # ============================================
 # 🏠 ANA SAYFA
 # ============================================
@@ -65,7 +457,7 @@ if menu == "🏠 Ana Sayfa":
    
     st.markdown("### 📋 İşlem Adımları")
     st.info("""
-    1. **Veri Yükleme**: Tüm CSV dosyalarını yükleyin
+    1. **Veri Yükleme**: Tüm CSV (veya Parquet/Feather) dosyalarını yükleyin
     2. **Segmentasyon**: Ürün ve mağaza gruplama aralıklarını belirleyin (opsiyonel)
     3. **Hedef Matris**: Her segment için parametreleri girin (opsiyonel)
     4. **Sıralama**: Öncelikleri belirleyin (opsiyonel)
@@ -161,174 +553,209 @@ elif menu == "📤 Veri Yükleme":
         cols = st.columns(4)
         for idx, (filename, df) in enumerate(example_csvs.items()):
             with cols[idx % 4]:
-                st.download_button(
-                    label=f"📥 {filename}",
-                    data=df.to_csv(index=False, encoding='utf-8-sig'),
-                    file_name=filename,
-                    mime="text/csv",
+                indirme_butonu(
+                    f"📥 {filename}", df, filename,
+                    surum='ornek',
                     key=f"download_{filename}"
                 )
     
+    # Sentetik test verisi (performans denemeleri için)
+    with st.expander("🎲 Sentetik Test Verisi Oluştur", expanded=False):
+        st.info("Tüm veri tipleri için birbiriyle tutarlı sentetik veri üretip yükler: çarpık satışlar, "
+                "yeni ürünler, yasaklı çiftler ve haftalık trend geçmişi. Yüklü veriler değiştirilir.")
+        olcek = OLCEKLER['kucuk']
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            sentetik_magaza = st.number_input("Mağaza", min_value=1, value=olcek['magaza_sayisi'], step=50)
+        with col2:
+            sentetik_urun = st.number_input("Ürün", min_value=1, value=olcek['urun_sayisi'], step=1000)
+        with col3:
+            sentetik_depo = st.number_input("Depo", min_value=1, value=olcek['depo_sayisi'], step=1)
+        with col4:
+            sentetik_kapsam = st.number_input(
+                "Kapsam", min_value=0.01, max_value=1.0, value=0.2, step=0.05,
+                help="Mağazanın ortalama bir ürünü taşıma olasılığı; anlık satır sayısı ≈ mağaza × ürün × kapsam"
+            )
+        hazir_olcekler = ", ".join(
+            f"{ad} {o['magaza_sayisi']}×{o['urun_sayisi']:,}" for ad, o in OLCEKLER.items()
+        )
+        st.caption(f"Tahmini Anlık Stok/Satış: ~{int(sentetik_magaza * sentetik_urun * sentetik_kapsam):,} satır "
+                   f"(benchmark ölçekleri: {hazir_olcekler})")
+        
+        if st.button("🎲 Oluştur ve Yükle", use_container_width=True):
+            with st.spinner("🎲 Sentetik veri üretiliyor..."):
+                veriler = ornek_veri_olustur(
+                    magaza_sayisi=int(sentetik_magaza), urun_sayisi=int(sentetik_urun),
+                    depo_sayisi=int(sentetik_depo), kapsam=float(sentetik_kapsam)
+                )
+                for state_key, df in veriler.items():
+                    veri_kaydet(state_key, df)
+                kod_sozlugunu_guncelle()
+                try:
+                    diske_yaz()
+                    st.session_state.disk_hatasi = None
+                except Exception as e:
+                    st.session_state.disk_hatasi = str(e)
+            st.success("✅ " + ", ".join(
+                f"{VERI_TANIMLARI[k]['name']}: {len(df):,}" for k, df in veriler.items()
+            ) + " satır yüklendi")
+    
     st.markdown("---")
     
     # Veri tanımları
-    data_definitions = {
-        'urun_master': {
-            'name': 'Ürün Master',
-            'required': True,
-            'columns': ['urun_kod', 'urun_ad', 'satici_kod', 'satici_ad', 'kategori_kod', 'kategori_ad', 
-                       'umg', 'umg_ad', 'mg', 'mg_ad', 'marka_kod', 'marka_ad', 'klasman_kod', 'klasman_ad',
-                       'nitelik', 'durum', 'ithal', 'ithal_ad', 'tanim'],
-            'state_key': 'urun_master',
-            'icon': '📦'
-        },
-        'magaza_master': {
-            'name': 'Mağaza Master',
-            'required': True,
-            'columns': ['magaza_kod', 'magaza_ad', 'il', 'bolge', 'tip', 'adres_kod', 'sm', 'bs', 'depo_kod'],
-            'state_key': 'magaza_master',
-            'icon': '🏪'
-        },
-        'depo_stok': {
-            'name': 'Depo Stok',
-            'required': True,
-            'columns': ['depo_kod', 'depo_ad', 'urun_kod', 'stok'],
-            'state_key': 'depo_stok',
-            'icon': '📦'
-        },
-        'anlik_stok_satis': {
-            'name': 'Anlık Stok/Satış',
-            'required': True,
-            'columns': ['magaza_kod', 'urun_kod', 'stok', 'yol', 'satis', 'ciro', 'smm'],
-            'state_key': 'anlik_stok_satis',
-            'icon': '📊'
-        },
-        'kpi': {
-            'name': 'KPI',
-            'required': True,
-            'columns': ['mg_id', 'min_deger', 'max_deger', 'forward_cover'],
-            'state_key': 'kpi',
-            'icon': '🎯'
-        },
-        'yasak_master': {
-            'name': 'Yasak',
-            'required': False,
-            'columns': ['urun_kod', 'magaza_kod', 'yasak_durum'],
-            'state_key': 'yasak_master',
-            'icon': '🚫'
-        },
-        'haftalik_trend': {
-            'name': 'Haftalık Trend',
-            'required': False,
-            'columns': ['klasman_kod', 'marka_kod', 'yil', 'hafta', 'stok', 'satis', 'ciro', 'smm', 'iftutar'],
-            'state_key': 'haftalik_trend',
-            'icon': '📈'
-        }
-    }
+    data_definitions = VERI_TANIMLARI
     
     # ÇOKLU DOSYA YÜKLEME
     st.subheader("📤 Çoklu Dosya Yükleme")
     
+    if depolama_etkin():
+        st.caption(f"💾 Yüklenen veriler diskte saklanır ve sonraki açılışta otomatik gelir: `{depolama_dizini()}`")
+    else:
+        st.caption("💾 pyarrow kurulu olmadığı için veriler sadece bu oturumda tutulur")
+    ortak_sayi, ortak_mb = ortak_veri_deposu().ozet()
+    st.caption(f"🧠 Tüm oturumların paylaştığı bellekte {ortak_sayi} veri seti ({ortak_mb:,.1f} MB)")
+    
     uploaded_files = st.file_uploader(
-        "CSV dosyalarını seçin (birden fazla seçebilirsiniz)",
-        type=['csv'],
+        "CSV, Parquet veya Feather dosyalarını seçin (birden fazla seçebilirsiniz)",
+        type=DOSYA_UZANTILARI,
         accept_multiple_files=True,
-        key="multi_upload"
+        key="multi_upload",
+        help="Sadece rakamdan oluşan kodların baştaki sıfırları atılır ('0123' ve '123' aynı koddur); "
+             "harf içeren kodlar ('U0123') olduğu gibi kalır."
     )
     
     if uploaded_files:
         st.write(f"**{len(uploaded_files)} dosya seçildi**")
         
         if st.button("🚀 Tüm Dosyaları Yükle", type="primary", use_container_width=True):
-            upload_results = []
+            upload_results = {}
+            okunacaklar = {}
+            fazla_kolonlu = set()
             
-            for uploaded_file in uploaded_files:
-                filename = uploaded_file.name.lower()
-                
+            # 1. Tüm dosyaların başlıklarını doğrula (sadece ilk satır okunur)
+            for i, uploaded_file in enumerate(uploaded_files):
                 # Dosya adından veri tipini bul
-                matched_key = None
-                for key, definition in data_definitions.items():
-                    if key in filename or definition['name'].lower().replace(' ', '_') in filename:
-                        matched_key = key
-                        break
+                matched_key = dosya_eslestir(uploaded_file.name)
                 
                 if not matched_key:
-                    upload_results.append({
+                    upload_results[i] = {
                         'Dosya': uploaded_file.name,
                         'Veri Tipi': '❓ Bilinmiyor',
                         'Durum': '❌ Eşleştirilemedi',
                         'Detay': 'Dosya adı tanımlı veri tiplerine uymuyor'
-                    })
+                    }
                     continue
                 
                 definition = data_definitions[matched_key]
                 
                 try:
-                    df = pd.read_csv(uploaded_file)
-                    
-                    # Kolon kontrolü
-                    existing_cols = set(df.columns)
-                    required_cols = set(definition['columns'])
-                    missing_cols = required_cols - existing_cols
-                    extra_cols = existing_cols - required_cols
-                    
-                    if missing_cols:
-                        upload_results.append({
-                            'Dosya': uploaded_file.name,
-                            'Veri Tipi': f"{definition['icon']} {definition['name']}",
-                            'Durum': '❌ Başarısız',
-                            'Detay': f"Eksik kolonlar: {', '.join(list(missing_cols)[:3])}"
-                        })
-                    else:
-                        # Sadece gerekli kolonları al
-                        df_clean = df[definition['columns']].copy()
-                        st.session_state[definition['state_key']] = df_clean
-                        
-                        detay = f"✅ {len(df_clean):,} satır"
-                        if extra_cols:
-                            detay += f" (fazla kolonlar kaldırıldı)"
-                        
-                        upload_results.append({
-                            'Dosya': uploaded_file.name,
-                            'Veri Tipi': f"{definition['icon']} {definition['name']}",
-                            'Durum': '✅ Başarılı',
-                            'Detay': detay
-                        })
-                
+                    missing_cols, extra_cols = kolonlari_kontrol_et(uploaded_file, definition)
                 except Exception as e:
-                    upload_results.append({
+                    upload_results[i] = {
                         'Dosya': uploaded_file.name,
                         'Veri Tipi': f"{definition['icon']} {definition['name']}",
                         'Durum': '❌ Hata',
                         'Detay': str(e)[:50]
+                    }
+                    continue
+                
+                if missing_cols:
+                    upload_results[i] = {
+                        'Dosya': uploaded_file.name,
+                        'Veri Tipi': f"{definition['icon']} {definition['name']}",
+                        'Durum': '❌ Başarısız',
+                        'Detay': f"Eksik kolonlar: {', '.join(list(missing_cols)[:3])}"
+                    }
+                    continue
+                
+                upload_results[i] = {
+                    'Dosya': uploaded_file.name,
+                    'Veri Tipi': f"{definition['icon']} {definition['name']}",
+                    'Durum': '⏳ Okunuyor',
+                    'Detay': ''
+                }
+                okunacaklar[i] = (uploaded_file, definition)
+                if extra_cols:
+                    fazla_kolonlu.add(i)
+            
+            # 2. Geçerli dosyaları eşzamanlı oku, her dosya bitince tabloyu güncelle
+            ilerleme_cubugu = st.progress(0, text=f"📥 {len(okunacaklar)} dosya okunuyor...")
+            ilerleme_tablosu = st.empty()
+            
+            def dosya_okundu(i, sonuc, tamamlanan, toplam):
+                satir = upload_results[i]
+                if sonuc['hata'] is None:
+                    df_clean = sonuc['df']
+                    detay = f"✅ {len(df_clean):,} satır, {df_clean.memory_usage(deep=True).sum() / 1024**2:,.1f} MB"
+                    if i in fazla_kolonlu:
+                        detay += " (fazla kolonlar kaldırıldı)"
+                    satir.update({
+                        'Durum': '✅ Başarılı',
+                        'Detay': detay,
+                        'Süre (sn)': round(sonuc['sure'], 2),
+                        'Satır/sn': f"{sonuc['satir_hizi']:,.0f}"
                     })
+                else:
+                    satir.update({'Durum': '❌ Hata', 'Detay': str(sonuc['hata'])[:50]})
+                ilerleme_cubugu.progress(tamamlanan / toplam, text=f"📥 {tamamlanan}/{toplam} dosya okundu")
+                ilerleme_tablosu.dataframe(
+                    pd.DataFrame([upload_results[k] for k in sorted(upload_results)]),
+                    use_container_width=True,
+                    hide_index=True
+                )
             
-            # Sonuçları göster
-            st.markdown("---")
-            st.subheader("📋 Yükleme Sonuçları")
-            
-            results_df = pd.DataFrame(upload_results)
+            okunanlar = dosyalari_oku(okunacaklar, ilerleme=dosya_okundu)
+            ilerleme_cubugu.empty()
+            ilerleme_tablosu.empty()
             
-            def highlight_upload_results(row):
-                if '✅ Başarılı' in row['Durum']:
-                    return ['background-color: #d4edda'] * len(row)
-                elif '❌' in row['Durum']:
-                    return ['background-color: #f8d7da'] * len(row)
-                else:
-                    return ['background-color: #fff3cd'] * len(row)
+            # Session state sadece ana iş parçacığından güncellenir (dosya sırasıyla)
+            for i in sorted(okunanlar):
+                if okunanlar[i]['hata'] is None:
+                    veri_kaydet(okunacaklar[i][1]['state_key'], okunanlar[i]['df'])
+            upload_results = [upload_results[k] for k in sorted(upload_results)]
             
-            st.dataframe(
-                results_df.style.apply(highlight_upload_results, axis=1),
-                use_container_width=True,
-                hide_index=True
-            )
+            # Kodları tüm veriler için ortak sözlüğe çevir
+            kod_sozlugunu_guncelle()
             
-            success_count = sum(1 for r in upload_results if '✅ Başarılı' in r['Durum'])
-            st.success(f"✅ {success_count} / {len(upload_results)} dosya başarıyla yüklendi!")
+            # Sonraki oturumlar için diske yaz
+            try:
+                diske_yaz()
+                st.session_state.disk_hatasi = None
+            except Exception as e:
+                st.session_state.disk_hatasi = str(e)
             
-            time.sleep(1)
+            # Sonuçlar yeniden çalıştırmadan sonra da gösterilir
+            st.session_state.yukleme_sonuclari = upload_results
             st.rerun()
     
+    if st.session_state.get('yukleme_sonuclari'):
+        upload_results = st.session_state.yukleme_sonuclari
+        
+        # Sonuçları göster
+        st.markdown("---")
+        st.subheader("📋 Yükleme Sonuçları")
+        
+        results_df = pd.DataFrame(upload_results)
+        
+        def highlight_upload_results(row):
+            if '✅ Başarılı' in row['Durum']:
+                return ['background-color: #d4edda'] * len(row)
+            elif '❌' in row['Durum']:
+                return ['background-color: #f8d7da'] * len(row)
+            else:
+                return ['background-color: #fff3cd'] * len(row)
+        
+        st.dataframe(
+            results_df.style.apply(highlight_upload_results, axis=1),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        success_count = sum(1 for r in upload_results if '✅ Başarılı' in r['Durum'])
+        st.success(f"✅ {success_count} / {len(upload_results)} dosya başarıyla yüklendi!")
+        if st.session_state.get('disk_hatasi'):
+            st.warning(f"⚠️ Veriler diske yazılamadı, sadece bu oturumda kullanılabilir: {st.session_state.disk_hatasi}")
+    
     st.markdown("---")
     
     # VERİ DURUMU TABLOSU
@@ -424,7 +851,12 @@ elif menu == "📤 Veri Yükleme":
     with col4:
         if st.button("🗑️ Tümünü Sil", use_container_width=True):
             for def_data in data_definitions.values():
-                st.session_state[def_data['state_key']] = None
+                veri_kaydet(def_data['state_key'], None)
+            st.session_state.yukleme_sonuclari = None
+            st.session_state.hesaplama_akisi.temizle()
+            if depolama_etkin():
+                son_seti_kaydet({})
+                kullanilmayanlari_sil()
             st.success("✅ Tüm veriler silindi!")
             time.sleep(0.5)
             st.rerun()
@@ -473,44 +905,26 @@ elif menu == "🫧 Segmentasyon":
         st.warning("⚠️ Önce 'Veri Yükleme' bölümünden anlık stok/satış verisini yükleyin!")
         st.stop()
     
-    # Ürün bazında toplam stok/satış hesapla
-    data = st.session_state.anlik_stok_satis.copy()
+    # Ürün ve mağaza bazında toplam stok/satış (önbellekten)
+    ozet = veri_ozeti_al()
     
-    # Ürün bazında gruplama - SADECE MEVCUT KOLONLAR
-    urun_aggregated = data.groupby('urun_kod').agg({
-        'stok': 'sum',
-        'yol': 'sum',
-        'satis': 'sum',
-        'ciro': 'sum'
-    }).reset_index()
-    urun_aggregated['stok_satis_orani'] = urun_aggregated['stok'] / urun_aggregated['satis'].replace(0, 1)
-    urun_aggregated['cover'] = urun_aggregated['stok_satis_orani']
+    urun_aggregated = ozet['urun'].drop(columns='segment')
+    urun_aggregated['stok_satis_orani'] = urun_aggregated['cover']
     
     # Ürün adını master'dan ekle
     if st.session_state.urun_master is not None:
-        urun_master = st.session_state.urun_master[['urun_kod', 'urun_ad', 'marka_ad']].copy()
-        urun_master['urun_kod'] = urun_master['urun_kod'].astype(str)
-        urun_aggregated['urun_kod'] = urun_aggregated['urun_kod'].astype(str)
+        urun_master = st.session_state.urun_master[['urun_kod', 'urun_ad', 'marka_ad']]
         urun_aggregated = urun_aggregated.merge(urun_master, on='urun_kod', how='left')
     else:
         urun_aggregated['urun_ad'] = 'Bilinmiyor'
         urun_aggregated['marka_ad'] = 'Bilinmiyor'
     
-    # Mağaza bazında gruplama - SADECE MEVCUT KOLONLAR
-    magaza_aggregated = data.groupby('magaza_kod').agg({
-        'stok': 'sum',
-        'yol': 'sum',
-        'satis': 'sum',
-        'ciro': 'sum'
-    }).reset_index()
-    magaza_aggregated['stok_satis_orani'] = magaza_aggregated['stok'] / magaza_aggregated['satis'].replace(0, 1)
-    magaza_aggregated['cover'] = magaza_aggregated['stok_satis_orani']
+    magaza_aggregated = ozet['magaza'].drop(columns='segment')
+    magaza_aggregated['stok_satis_orani'] = magaza_aggregated['cover']
     
     # Mağaza adını master'dan ekle
     if st.session_state.magaza_master is not None:
-        magaza_master = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']].copy()
-        magaza_master['magaza_kod'] = magaza_master['magaza_kod'].astype(str)
-        magaza_aggregated['magaza_kod'] = magaza_aggregated['magaza_kod'].astype(str)
+        magaza_master = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']]
         magaza_aggregated = magaza_aggregated.merge(magaza_master, on='magaza_kod', how='left')
     else:
         magaza_aggregated['magaza_ad'] = 'Bilinmiyor'
@@ -542,15 +956,8 @@ elif menu == "🫧 Segmentasyon":
     if urun_aggregated is not None and len(urun_aggregated) > 0:
         temp_prod = urun_aggregated.copy()
         
-        # Segment labels
-        product_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in product_ranges]
-        
-        temp_prod['segment'] = pd.cut(
-            temp_prod['stok_satis_orani'], 
-            bins=[r[0] for r in product_ranges] + [product_ranges[-1][1]],
-            labels=product_labels,
-            include_lowest=True
-        )
+        product_labels = segment_etiketleri(product_ranges)
+        temp_prod['segment'] = segmentle(temp_prod['stok_satis_orani'], product_ranges)
         
         st.write("**Ürün Dağılımı Önizleme:**")
         segment_dist = temp_prod['segment'].value_counts().sort_index()
@@ -584,15 +991,15 @@ elif menu == "🫧 Segmentasyon":
         filtered_urun = urun_detail[urun_detail['Segment'].isin(selected_segment_prod)]
         
         st.write(f"**Toplam {len(filtered_urun)} ürün gösteriliyor**")
-        st.dataframe(
-            filtered_urun.style.format({
+        sayfali_tablo(
+            filtered_urun, "seg_urun_tablosu",
+            bicimler={
                 'Toplam Stok': '{:,.0f}',
                 'Toplam Yol': '{:,.0f}',
                 'Toplam Satış': '{:,.0f}',
                 'Toplam Ciro': '{:,.2f}',
                 'Stok/Satış Oranı': '{:.2f}'
-            }),
-            use_container_width=True,
+            },
             height=400
         )
         
@@ -620,11 +1027,9 @@ elif menu == "🫧 Segmentasyon":
         )
         
         # CSV İndir - ÜRÜN
-        st.download_button(
-            label="📥 Ürün Segmentasyon Detayı İndir (CSV)",
-            data=urun_detail.to_csv(index=False, encoding='utf-8-sig'),
-            file_name="urun_segmentasyon_detay.csv",
-            mime="text/csv",
+        indirme_butonu(
+            "📥 Ürün Segmentasyon Detayı İndir (CSV)", urun_detail, "urun_segmentasyon_detay.csv",
+            surum=(ozet['anahtar'], repr(product_ranges)),
             key="download_urun_segment"
         )
     
@@ -655,15 +1060,8 @@ elif menu == "🫧 Segmentasyon":
     if magaza_aggregated is not None and len(magaza_aggregated) > 0:
         temp_store = magaza_aggregated.copy()
         
-        # Segment labels
-        store_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in store_ranges]
-        
-        temp_store['segment'] = pd.cut(
-            temp_store['stok_satis_orani'], 
-            bins=[r[0] for r in store_ranges] + [store_ranges[-1][1]],
-            labels=store_labels,
-            include_lowest=True
-        )
+        store_labels = segment_etiketleri(store_ranges)
+        temp_store['segment'] = segmentle(temp_store['stok_satis_orani'], store_ranges)
         
         st.write("**Mağaza Dağılımı Önizleme:**")
         segment_dist_store = temp_store['segment'].value_counts().sort_index()
@@ -697,15 +1095,15 @@ elif menu == "🫧 Segmentasyon":
         filtered_magaza = magaza_detail[magaza_detail['Segment'].isin(selected_segment_store)]
         
         st.write(f"**Toplam {len(filtered_magaza)} mağaza gösteriliyor**")
-        st.dataframe(
-            filtered_magaza.style.format({
+        sayfali_tablo(
+            filtered_magaza, "seg_magaza_tablosu",
+            bicimler={
                 'Toplam Stok': '{:,.0f}',
                 'Toplam Yol': '{:,.0f}',
                 'Toplam Satış': '{:,.0f}',
                 'Toplam Ciro': '{:,.2f}',
                 'Stok/Satış Oranı': '{:.2f}'
-            }),
-            use_container_width=True,
+            },
             height=400
         )
         
@@ -733,11 +1131,9 @@ elif menu == "🫧 Segmentasyon":
         )
         
         # CSV İndir - MAĞAZA
-        st.download_button(
-            label="📥 Mağaza Segmentasyon Detayı İndir (CSV)",
-            data=magaza_detail.to_csv(index=False, encoding='utf-8-sig'),
-            file_name="magaza_segmentasyon_detay.csv",
-            mime="text/csv",
+        indirme_butonu(
+            "📥 Mağaza Segmentasyon Detayı İndir (CSV)", magaza_detail, "magaza_segmentasyon_detay.csv",
+            surum=(ozet['anahtar'], repr(store_ranges)),
             key="download_magaza_segment"
         )
     
@@ -762,55 +1158,31 @@ elif menu == "🫧 Segmentasyon":
     
     col1, col2 = st.columns(2)
     
+    # İki tablo tek dosyada; içerik tıklanınca üretilir
+    segment_surumu = (ozet['anahtar'], repr(product_ranges), repr(store_ranges))
+    
     with col1:
         # Excel formatında (iki sheet)
-        if st.button("📊 Excel İndir (Ürün + Mağaza)", use_container_width=True):
-            try:
-                import io
-                from io import BytesIO
-                
-                # Excel writer oluştur
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    urun_detail.to_excel(writer, sheet_name='Ürün Segmentasyon', index=False)
-                    magaza_detail.to_excel(writer, sheet_name='Mağaza Segmentasyon', index=False)
-                
-                output.seek(0)
-                
-                st.download_button(
-                    label="⬇️ Excel Dosyasını İndir",
-                    data=output.getvalue(),
-                    file_name="segmentasyon_tam_detay.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            except ImportError:
-                st.error("❌ Excel export için 'openpyxl' kütüphanesi gerekli. Lütfen yükleyin: pip install openpyxl")
+        if importlib.util.find_spec('openpyxl') is not None:
+            indirme_butonu(
+                "📊 Excel İndir (Ürün + Mağaza)",
+                {'Ürün Segmentasyon': urun_detail, 'Mağaza Segmentasyon': magaza_detail},
+                "segmentasyon_tam_detay.xlsx",
+                bicim='xlsx', surum=segment_surumu, use_container_width=True
+            )
+        else:
+            st.button("📊 Excel İndir (Ürün + Mağaza)", disabled=True, use_container_width=True,
+                      help="❌ Excel export için 'openpyxl' kütüphanesi gerekli. Lütfen yükleyin: pip install openpyxl")
     
     with col2:
         # ZIP formatında (iki CSV)
-        if st.button("📦 ZIP İndir (2 CSV)", use_container_width=True):
-            import zipfile
-            import io
-            
-            zip_buffer = io.BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Ürün CSV
-                urun_csv = urun_detail.to_csv(index=False, encoding='utf-8-sig')
-                zip_file.writestr('urun_segmentasyon.csv', urun_csv.encode('utf-8-sig'))
-                
-                # Mağaza CSV
-                magaza_csv = magaza_detail.to_csv(index=False, encoding='utf-8-sig')
-                zip_file.writestr('magaza_segmentasyon.csv', magaza_csv.encode('utf-8-sig'))
-            
-            zip_buffer.seek(0)
-            
-            st.download_button(
-                label="⬇️ ZIP Dosyasını İndir",
-                data=zip_buffer.getvalue(),
-                file_name="segmentasyon_detay.zip",
-                mime="application/zip"
-            ) 
+        indirme_butonu(
+            "📦 ZIP İndir (2 CSV)",
+            {'urun_segmentasyon.csv': urun_detail, 'magaza_segmentasyon.csv': magaza_detail},
+            "segmentasyon_detay.zip",
+            bicim='zip', surum=segment_surumu, use_container_width=True
+        )
+
 # ============================================
 # 🎲 HEDEF MATRİS
 # ============================================
@@ -821,56 +1193,10 @@ elif menu == "🎲 Hedef Matris":
     if st.session_state.anlik_stok_satis is None:
         st.warning("⚠️ Önce 'Veri Yükleme' bölümünden anlık stok/satış verisini yükleyin!")
     else:
-        # Segmentasyon yap
-        data = st.session_state.anlik_stok_satis.copy()
-        
-        # Ürün bazında toplam stok/satış
-        urun_aggregated = data.groupby('urun_kod').agg({
-            'stok': 'sum',
-            'satis': 'sum'
-        }).reset_index()
-        urun_aggregated['stok_satis_orani'] = urun_aggregated['stok'] / urun_aggregated['satis'].replace(0, 1)
-        
-        # Mağaza bazında toplam stok/satış
-        magaza_aggregated = data.groupby('magaza_kod').agg({
-            'stok': 'sum',
-            'satis': 'sum'
-        }).reset_index()
-        magaza_aggregated['stok_satis_orani'] = magaza_aggregated['stok'] / magaza_aggregated['satis'].replace(0, 1)
-        
-        # Segmentasyon parametrelerini al
-        product_ranges = st.session_state.segmentation_params['product_ranges']
-        store_ranges = st.session_state.segmentation_params['store_ranges']
-        
-        # Ürün segmentasyonu
-        product_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in product_ranges]
-        urun_aggregated['urun_segment'] = pd.cut(
-            urun_aggregated['stok_satis_orani'], 
-            bins=[r[0] for r in product_ranges] + [product_ranges[-1][1]],
-            labels=product_labels,
-            include_lowest=True
-        )
-        
-        # Mağaza segmentasyonu
-        store_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in store_ranges]
-        magaza_aggregated['magaza_segment'] = pd.cut(
-            magaza_aggregated['stok_satis_orani'],
-            bins=[r[0] for r in store_ranges] + [store_ranges[-1][1]],
-            labels=store_labels,
-            include_lowest=True
-        )
-        
-        # Segment sıralama fonksiyonu
-        def sort_segments(segments):
-            """Segmentleri numerik değere göre sıralar: 0-4, 5-8, 9-12, 15-20, 20-inf"""
-            def get_sort_key(seg):
-                try:
-                    # İlk sayıyı al (0-4 -> 0, 5-8 -> 5, 20-inf -> 20)
-                    return int(seg.split('-')[0])
-                except:
-                    return 9999  # inf veya parse edilemeyen değerler en sona
-            
-            return sorted(segments, key=get_sort_key)
+        # Segmentasyon (önbellekten)
+        ozet = veri_ozeti_al()
+        urun_aggregated = ozet['urun'].rename(columns={'segment': 'urun_segment'})
+        magaza_aggregated = ozet['magaza'].rename(columns={'segment': 'magaza_segment'})
         
         # Segmentasyon sonuçları
         st.subheader("📊 Segmentasyon Sonuçları")
@@ -895,8 +1221,8 @@ elif menu == "🎲 Hedef Matris":
         prod_segments_raw = [str(x) for x in urun_aggregated['urun_segment'].unique() if pd.notna(x)]
         store_segments_raw = [str(x) for x in magaza_aggregated['magaza_segment'].unique() if pd.notna(x)]
         
-        prod_segments = sort_segments(prod_segments_raw)
-        store_segments = sort_segments(store_segments_raw)
+        prod_segments = segmentleri_sirala(prod_segments_raw)
+        store_segments = segmentleri_sirala(store_segments_raw)
         
         st.info(f"**Ürün Segmentleri:** {', '.join(prod_segments)}")
         st.info(f"**Mağaza Segmentleri:** {', '.join(store_segments)}")
@@ -1048,30 +1374,10 @@ elif menu == "🔢 Sıralama":
     else:
         st.info("Mağaza ve ürün cluster bazında sevkiyat önceliklerini belirleyin")
         
-        # Segmentleri al
-        data = st.session_state.anlik_stok_satis.copy()
-        
-        urun_aggregated = data.groupby('urun_kod').agg({'stok': 'sum', 'satis': 'sum'}).reset_index()
-        urun_aggregated['stok_satis_orani'] = urun_aggregated['stok'] / urun_aggregated['satis'].replace(0, 1)
-        
-        magaza_aggregated = data.groupby('magaza_kod').agg({'stok': 'sum', 'satis': 'sum'}).reset_index()
-        magaza_aggregated['stok_satis_orani'] = magaza_aggregated['stok'] / magaza_aggregated['satis'].replace(0, 1)
-        
-        product_ranges = st.session_state.segmentation_params['product_ranges']
-        urun_aggregated['urun_segment'] = pd.cut(
-            urun_aggregated['stok_satis_orani'], 
-            bins=[r[0] for r in product_ranges] + [product_ranges[-1][1]],
-            labels=[f"{r[0]}-{r[1]}" for r in product_ranges],
-            include_lowest=True
-        )
-        
-        store_ranges = st.session_state.segmentation_params['store_ranges']
-        magaza_aggregated['magaza_segment'] = pd.cut(
-            magaza_aggregated['stok_satis_orani'],
-            bins=[r[0] for r in store_ranges] + [store_ranges[-1][1]],
-            labels=[f"{r[0]}-{r[1]}" for r in store_ranges],
-            include_lowest=True
-        )
+        # Segmentleri al (önbellekten)
+        ozet = veri_ozeti_al()
+        urun_aggregated = ozet['urun'].rename(columns={'segment': 'urun_segment'})
+        magaza_aggregated = ozet['magaza'].rename(columns={'segment': 'magaza_segment'})
         
         prod_segments = sorted([str(x) for x in urun_aggregated['urun_segment'].unique() if pd.notna(x)])
         store_segments = sorted([str(x) for x in magaza_aggregated['magaza_segment'].unique() if pd.notna(x)])
@@ -1087,29 +1393,7 @@ elif menu == "🔢 Sıralama":
         if st.session_state.siralama_data is not None:
             siralama_df = st.session_state.siralama_data
         else:
-            def sort_segments(segments):
-                def get_sort_key(seg):
-                    try:
-                        return int(seg.split('-')[0])
-                    except:
-                        return 999
-                return sorted(segments, key=get_sort_key)
-            
-            sorted_store = sort_segments(store_segments)
-            sorted_prod = sort_segments(prod_segments)
-            
-            siralama_rows = []
-            oncelik = 1
-            for store_seg in sorted_store:
-                for prod_seg in sorted_prod:
-                    siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': 'RPT', 'Oncelik': oncelik})
-                    oncelik += 1
-                    siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': 'Initial', 'Oncelik': oncelik})
-                    oncelik += 1
-                    siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': 'Min', 'Oncelik': oncelik})
-                    oncelik += 1
-            
-            siralama_df = pd.DataFrame(siralama_rows)
+            siralama_df = varsayilan_siralama(segmentleri_sirala(prod_segments), segmentleri_sirala(store_segments))
         
         st.markdown("---")
         st.subheader("📋 Tüm Kombinasyonlar")
@@ -1163,19 +1447,19 @@ elif menu == "📐 Hesaplama":
     if st.session_state.sevkiyat_sonuc is not None:
         st.success("✅ Daha önce hesaplanmış sevkiyat sonuçları mevcut!")
         
-        # Önceki sonuçları hızlıca göster
-        result_final = st.session_state.sevkiyat_sonuc.copy()
+        # Önceki sonuçların özeti küpün genel toplamlarından (sonuç taranmaz, kopyalanmaz)
+        toplam = sevkiyat_kupu().toplam()
         
         # Özet metrikler
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("📦 Toplam İhtiyaç", f"{result_final['ihtiyac_miktari'].sum():,.0f}")
+            st.metric("📦 Toplam İhtiyaç", f"{toplam['ihtiyac']:,.0f}")
         with col2:
-            st.metric("✅ Toplam Sevkiyat", f"{result_final['sevkiyat_miktari'].sum():,.0f}")
+            st.metric("✅ Toplam Sevkiyat", f"{toplam['sevkiyat']:,.0f}")
         with col3:
-            st.metric("⚠️ Satış Kaybı", f"{result_final['stok_yoklugu_satis_kaybi'].sum():,.0f}")
+            st.metric("⚠️ Satış Kaybı", f"{toplam['kayip']:,.0f}")
         with col4:
-            st.metric("🏪 Mağaza Sayısı", f"{result_final['magaza_kod'].nunique()}")
+            st.metric("🏪 Mağaza Sayısı", f"{toplam['magaza_sayisi']}")
         
         st.info("Yeni hesaplama yapmak isterseniz aşağıdaki butonu kullanın.")
         st.markdown("---")
@@ -1226,355 +1510,135 @@ elif menu == "📐 Hesaplama":
             st.metric("Yasak", yasak_count)
         
         st.markdown("---")
+        
+        depo_sayisi = st.session_state.magaza_master['depo_kod'].nunique()
+        paralel = st.checkbox(
+            f"⚡ Depo bazında paralel hesapla ({depo_sayisi} depo, {os.cpu_count()} çekirdek)",
+            value=False,
+            help="İhtiyaç ve depo tahsisi her depo için ayrı süreçte hesaplanır. Sonuç tek süreçli hesaplamayla aynıdır."
+        )
               
-        if st.button("🚀 Sevkiyat Hesapla", type="primary", use_container_width=True):
-            start_time = time.time()
-           
-            with st.spinner("📊 Hesaplama yapılıyor..."):
-                progress_bar = st.progress(0, text="Veri hazırlanıyor...")
-                
-                anlik_df = st.session_state.anlik_stok_satis.copy()
-                magaza_df = st.session_state.magaza_master.copy()
-                depo_df = st.session_state.depo_stok.copy()
-                kpi_df = st.session_state.kpi.copy()
-                
-                # Default matrisler
-                if st.session_state.sisme_orani is None:
-                    st.session_state.sisme_orani = pd.DataFrame(0.5, index=["0-4"], columns=["0-4"])
-                if st.session_state.genlestirme_orani is None:
-                    st.session_state.genlestirme_orani = pd.DataFrame(1.0, index=["0-4"], columns=["0-4"])
-                if st.session_state.min_oran is None:
-                    st.session_state.min_oran = pd.DataFrame(1.0, index=["0-4"], columns=["0-4"])
-                if st.session_state.initial_matris is None:
-                    st.session_state.initial_matris = pd.DataFrame(1.0, index=["0-4"], columns=["0-4"])
-                
-                progress_bar.progress(10, text="Yeni ürünler tespit ediliyor...")
-
-                # YENİ ÜRÜN TESPİTİ
-                depo_df_temp = depo_df.copy()
-                depo_df_temp['urun_kod'] = depo_df_temp['urun_kod'].astype(str).apply(
-                    lambda x: str(int(float(x))) if '.' in str(x) else str(x)
-                )
-                depo_toplam = depo_df_temp.groupby('urun_kod')['stok'].sum().reset_index()
-                depo_toplam.columns = ['urun_kod', 'depo_stok_toplam']
-                yeni_urun_adaylari = depo_toplam[depo_toplam['depo_stok_toplam'] > 300]['urun_kod'].tolist()
-                
-                toplam_magaza_sayisi = anlik_df['magaza_kod'].nunique()
-                anlik_df['urun_kod'] = anlik_df['urun_kod'].astype(str)
-                urun_magaza_stok = anlik_df[anlik_df['urun_kod'].isin(yeni_urun_adaylari)].copy()
-                urun_magaza_stok = urun_magaza_stok[urun_magaza_stok['stok'] > 0]
-                
-                urun_stoklu_magaza = urun_magaza_stok.groupby('urun_kod')['magaza_kod'].nunique().reset_index()
-                urun_stoklu_magaza.columns = ['urun_kod', 'stoklu_magaza_sayisi']
-                urun_stoklu_magaza['magaza_oran'] = urun_stoklu_magaza['stoklu_magaza_sayisi'] / toplam_magaza_sayisi
-                
-                yeni_urunler = urun_stoklu_magaza[urun_stoklu_magaza['magaza_oran'] < 0.5].copy()
-                yeni_urun_kodlari = yeni_urunler['urun_kod'].tolist()
-                
-                st.session_state.yeni_urun_listesi = yeni_urunler.merge(depo_toplam, on='urun_kod', how='left')
-                
-                progress_bar.progress(25, text="Segmentasyon yapılıyor...")
-                
-                # Segmentasyon
-                urun_agg = anlik_df.groupby('urun_kod').agg({'stok': 'sum', 'satis': 'sum'}).reset_index()
-                urun_agg['cover'] = urun_agg['stok'] / urun_agg['satis'].replace(0, 1)
-                
-                magaza_agg = anlik_df.groupby('magaza_kod').agg({'stok': 'sum', 'satis': 'sum'}).reset_index()
-                magaza_agg['cover'] = magaza_agg['stok'] / magaza_agg['satis'].replace(0, 1)
-                
-                product_ranges = st.session_state.segmentation_params['product_ranges']
-                store_ranges = st.session_state.segmentation_params['store_ranges']
-                
-                product_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in product_ranges]
-                store_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in store_ranges]
-                
-                urun_agg['segment'] = pd.cut(
-                    urun_agg['cover'],
-                    bins=[r[0] for r in product_ranges] + [product_ranges[-1][1]],
-                    labels=product_labels,
-                    include_lowest=True
-                )
-                
-                magaza_agg['segment'] = pd.cut(
-                    magaza_agg['cover'],
-                    bins=[r[0] for r in store_ranges] + [store_ranges[-1][1]],
-                    labels=store_labels,
-                    include_lowest=True
-                )
-                
-                anlik_df = anlik_df.merge(urun_agg[['urun_kod', 'segment']], on='urun_kod', how='left').rename(columns={'segment': 'urun_segment'})
-                anlik_df = anlik_df.merge(magaza_agg[['magaza_kod', 'segment']], on='magaza_kod', how='left').rename(columns={'segment': 'magaza_segment'})
-                
-                anlik_df['urun_segment'] = anlik_df['urun_segment'].astype(str)
-                anlik_df['magaza_segment'] = anlik_df['magaza_segment'].astype(str)
-                
-                progress_bar.progress(40, text="KPI verileri hazırlanıyor...")
-                
-                # KPI
-                default_fc = kpi_df['forward_cover'].mean()
-                
-                if st.session_state.urun_master is not None:
-                    urun_master = st.session_state.urun_master[['urun_kod', 'mg']].copy()
-                    urun_master['urun_kod'] = urun_master['urun_kod'].astype(str)
-                    anlik_df['urun_kod'] = anlik_df['urun_kod'].astype(str)
-                    urun_master['mg'] = urun_master['mg'].fillna(0).astype(float).astype(int).astype(str)
-                    
-                    anlik_df = anlik_df.merge(urun_master, on='urun_kod', how='left')
-                    
-                    kpi_data = kpi_df[['mg_id', 'min_deger', 'max_deger']].rename(columns={'mg_id': 'mg'})
-                    kpi_data['mg'] = kpi_data['mg'].astype(str)
-                    anlik_df['mg'] = anlik_df['mg'].astype(str)
-                    
-                    anlik_df = anlik_df.merge(kpi_data, on='mg', how='left')
-                    anlik_df['min_deger'] = anlik_df['min_deger'].fillna(0)
-                    anlik_df['max_deger'] = anlik_df['max_deger'].fillna(999999)
-                else:
-                    anlik_df['min_deger'] = 0
-                    anlik_df['max_deger'] = 999999
-                
-                progress_bar.progress(55, text="Matris değerleri uygulanıyor...")
-                
-                # Matris değerleri
-                def get_matrix_value(magaza_seg, urun_seg, matrix):
-                    try:
-                        return matrix.loc[urun_seg, magaza_seg]
-                    except:
-                        return 1.0
-                
-                anlik_df['genlestirme'] = anlik_df.apply(
-                    lambda row: get_matrix_value(row['magaza_segment'], row['urun_segment'], st.session_state.genlestirme_orani), axis=1
-                )
-                anlik_df['sisme'] = anlik_df.apply(
-                    lambda row: get_matrix_value(row['magaza_segment'], row['urun_segment'], st.session_state.sisme_orani), axis=1
-                )
-                anlik_df['min_oran'] = anlik_df.apply(
-                    lambda row: get_matrix_value(row['magaza_segment'], row['urun_segment'], st.session_state.min_oran), axis=1
-                )
-                anlik_df['initial_katsayi'] = anlik_df.apply(
-                    lambda row: get_matrix_value(row['magaza_segment'], row['urun_segment'], st.session_state.initial_matris), axis=1
-                )
-                
-                progress_bar.progress(70, text="İhtiyaçlar hesaplanıyor...")
-                
-                # RPT, Initial, Min satırları oluştur
-                anlik_rpt = anlik_df.copy()
-                anlik_rpt['Durum'] = 'RPT'
-                
-                anlik_min = anlik_df.copy()
-                anlik_min['Durum'] = 'Min'
-                
-                if len(yeni_urun_kodlari) > 0:
-                    anlik_initial = anlik_df[anlik_df['urun_kod'].astype(str).isin(yeni_urun_kodlari)].copy()
-                    anlik_initial['Durum'] = 'Initial'
-                    anlik_df = pd.concat([anlik_rpt, anlik_initial, anlik_min], ignore_index=True)
-                else:
-                    anlik_df = pd.concat([anlik_rpt, anlik_min], ignore_index=True)
-                
-                # Sıralama
-                if st.session_state.siralama_data is not None:
-                    siralama_df = st.session_state.siralama_data.copy()
-                else:
-                    prod_segments = sorted([str(x) for x in urun_agg['segment'].unique() if pd.notna(x)])
-                    store_segments = sorted([str(x) for x in magaza_agg['segment'].unique() if pd.notna(x)])
-                    
-                    siralama_rows = []
-                    oncelik_counter = 1
-                    for store_seg in store_segments:
-                        for prod_seg in prod_segments:
-                            siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': 'RPT', 'Oncelik': oncelik_counter})
-                            oncelik_counter += 1
-                            siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': 'Initial', 'Oncelik': oncelik_counter})
-                            oncelik_counter += 1
-                            siralama_rows.append({'Magaza_Cluster': store_seg, 'Urun_Cluster': prod_seg, 'Durum': 'Min', 'Oncelik': oncelik_counter})
-                            oncelik_counter += 1
-                    
-                    siralama_df = pd.DataFrame(siralama_rows)
-                
-                anlik_df = anlik_df.merge(
-                    siralama_df,
-                    left_on=['magaza_segment', 'urun_segment', 'Durum'],
-                    right_on=['Magaza_Cluster', 'Urun_Cluster', 'Durum'],
-                    how='left'
-                )
-                
-                # İhtiyaç hesapla
-                anlik_df['ihtiyac_rpt'] = (default_fc * anlik_df['satis'] * anlik_df['genlestirme']) - (anlik_df['stok'] + anlik_df['yol'])
-                anlik_df['ihtiyac_min'] = (anlik_df['min_oran'] * anlik_df['min_deger']) - (anlik_df['stok'] + anlik_df['yol'])
-                anlik_df['ihtiyac_initial'] = (anlik_df['min_deger'] * anlik_df['initial_katsayi']) - (anlik_df['stok'] + anlik_df['yol'])
-                
-                anlik_df['ihtiyac'] = anlik_df.apply(
-                    lambda row: (row['ihtiyac_rpt'] if row['Durum'] == 'RPT' 
-                                else row['ihtiyac_min'] if row['Durum'] == 'Min'
-                                else row['ihtiyac_initial']),
-                    axis=1
+        if st.button("🚀 Sevkiyat Hesapla", type="primary", use_container_width=True,
+                     disabled='sevkiyat' in st.session_state.isler):
+            # Default matrisler
+            varsayilanlar = varsayilan_matrisler()
+            for anahtar in ['sisme_orani', 'genlestirme_orani', 'min_oran', 'initial_matris']:
+                if st.session_state[anahtar] is None:
+                    st.session_state[anahtar] = varsayilanlar[anahtar]
+
+            is_baslat(
+                'sevkiyat', "Sevkiyat", sevkiyat_ve_kup_hesapla,
+                satir_sayisi=len(st.session_state.anlik_stok_satis),
+                akis=st.session_state.hesaplama_akisi,
+                urun_master=st.session_state.urun_master,
+                magaza_master=st.session_state.magaza_master,
+                depo_stok=st.session_state.depo_stok,
+                anlik_stok_satis=st.session_state.anlik_stok_satis,
+                kpi=st.session_state.kpi,
+                yasak=st.session_state.yasak_master,
+                segmentation_params=st.session_state.segmentation_params,
+                matrisler={
+                    'sisme_orani': st.session_state.sisme_orani,
+                    'genlestirme_orani': st.session_state.genlestirme_orani,
+                    'min_oran': st.session_state.min_oran,
+                    'initial_matris': st.session_state.initial_matris
+                },
+                siralama=st.session_state.siralama_data,
+                islem_sayisi=os.cpu_count() if paralel else None,
+                ozet=veri_ozeti_al(),
+                motor=st.session_state.hesaplama_motoru
+            )
+            st.rerun()
+
+        # Hesaplama arka planda sürerken diğer sayfalarda çalışmaya devam edilebilir
+        if 'sevkiyat' in st.session_state.isler:
+            st.info("ℹ️ Hesaplama arka planda çalışıyor. Bu sırada matrisleri düzenleyebilir veya raporlara bakabilirsiniz; sonuç bitince kaydedilir.")
+            is_paneli('sevkiyat', detay=True)
+        else:
+            is_ozeti_goster('sevkiyat')
+            onbellekten = [r['Aşama'] for r in st.session_state.hesaplama_akisi.son_calisma if r['Durum'] == 'önbellek']
+            if onbellekten:
+                st.caption(f"♻️ Girdileri değişmeyen aşamalar tekrar hesaplanmadı: {', '.join(onbellekten)}")
+
+        # ------------------------------------------
+        # 🧪 SENARYO KARŞILAŞTIRMA
+        # ------------------------------------------
+        st.markdown("---")
+        with st.expander("🧪 Senaryo Karşılaştırma (toplu hesaplama)"):
+            st.caption(
+                "Her satır bir senaryodur. Matris kolonları Hedef Matris'teki mevcut matrisin çarpanıdır "
+                "(boş = 1); forward_cover boşsa KPI ortalaması kullanılır. Segmentasyon ve birleştirmeler "
+                "tüm senaryolar için bir kez yapılır, senaryolar paralel süreçlerde hesaplanır."
+            )
+            if 'senaryo_tablosu' not in st.session_state:
+                st.session_state.senaryo_tablosu = pd.DataFrame({
+                    'Senaryo': ['Mevcut', 'Genleştirme +20%', 'Min Oran -20%'],
+                    'genlestirme_orani': [1.0, 1.2, 1.0],
+                    'min_oran': [1.0, 1.0, 0.8],
+                    'initial_matris': [1.0, 1.0, 1.0],
+                    'sisme_orani': [1.0, 1.0, 1.0],
+                    'forward_cover': [None, None, None]
+                }).astype({'forward_cover': float})
+
+            senaryo_tablosu = st.data_editor(
+                st.session_state.senaryo_tablosu,
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True
+            )
+
+            if st.button("🧪 Senaryoları Hesapla", use_container_width=True,
+                         disabled='senaryo' in st.session_state.isler or len(senaryo_tablosu) == 0):
+                st.session_state.senaryo_tablosu = senaryo_tablosu
+                matrisler = {
+                    'sisme_orani': st.session_state.sisme_orani,
+                    'genlestirme_orani': st.session_state.genlestirme_orani,
+                    'min_oran': st.session_state.min_oran,
+                    'initial_matris': st.session_state.initial_matris
+                }
+                is_baslat(
+                    'senaryo', "Senaryo", senaryolari_hesapla,
+                    satir_sayisi=len(st.session_state.anlik_stok_satis),
+                    urun_master=st.session_state.urun_master,
+                    magaza_master=st.session_state.magaza_master,
+                    depo_stok=st.session_state.depo_stok,
+                    anlik_stok_satis=st.session_state.anlik_stok_satis,
+                    kpi=st.session_state.kpi,
+                    senaryolar=carpanlarla_senaryolar(senaryo_tablosu, matrisler),
+                    yasak=st.session_state.yasak_master,
+                    segmentation_params=st.session_state.segmentation_params,
+                    matrisler=matrisler,
+                    siralama=st.session_state.siralama_data,
+                    islem_sayisi=os.cpu_count(),
+                    ozet=veri_ozeti_al(),
+                    motor=st.session_state.hesaplama_motoru
                 )
-                
-                anlik_df['ihtiyac'] = anlik_df['ihtiyac'].clip(lower=0)
-                
-                # max_deger kontrolü
-                anlik_df['max_sevkiyat'] = anlik_df['max_deger'] - (anlik_df['stok'] + anlik_df['yol'])
-                anlik_df['max_sevkiyat'] = anlik_df['max_sevkiyat'].clip(lower=0)
-                anlik_df['ihtiyac'] = anlik_df.apply(
-                    lambda row: min(row['ihtiyac'], row['max_sevkiyat']) if pd.notna(row['max_sevkiyat']) else row['ihtiyac'],
-                    axis=1
+                st.rerun()
+
+            if 'senaryo' in st.session_state.isler:
+                is_paneli('senaryo', detay=True)
+            else:
+                is_ozeti_goster('senaryo')
+
+            if st.session_state.get('senaryo_sonuc') is not None:
+                senaryo_sonuc = st.session_state.senaryo_sonuc
+                st.dataframe(
+                    senaryo_sonuc.style.format({
+                        'Toplam İhtiyaç': '{:,.0f}',
+                        'Toplam Sevkiyat': '{:,.0f}',
+                        'Stok Kaybı': '{:,.0f}',
+                        'Kayıp Oranı %': '{:.1f}%',
+                        'SKU Kapsamı %': '{:.1f}%',
+                        'Mağaza Kapsamı %': '{:.1f}%'
+                    }),
+                    use_container_width=True,
+                    hide_index=True
                 )
-                
-                progress_bar.progress(85, text="Yasak kontrolleri ve depo eşleştirme...")
-                
-                # Yasak kontrolü
-                if st.session_state.yasak_master is not None:
-                    yasak_df = st.session_state.yasak_master.copy()
-                    yasak_df['urun_kod'] = yasak_df['urun_kod'].astype(str)
-                    yasak_df['magaza_kod'] = yasak_df['magaza_kod'].astype(str)
-                    anlik_df['urun_kod'] = anlik_df['urun_kod'].astype(str)
-                    anlik_df['magaza_kod'] = anlik_df['magaza_kod'].astype(str)
-                    
-                    anlik_df = anlik_df.merge(yasak_df[['urun_kod', 'magaza_kod', 'yasak_durum']], on=['urun_kod', 'magaza_kod'], how='left')
-                    anlik_df.loc[anlik_df['yasak_durum'] == 'Yasak', 'ihtiyac'] = 0
-                
-                # Depo eşleşmesi
-                magaza_df['magaza_kod'] = magaza_df['magaza_kod'].astype(str)
-                anlik_df['magaza_kod'] = anlik_df['magaza_kod'].astype(str)
-                anlik_df = anlik_df.merge(magaza_df[['magaza_kod', 'depo_kod']], on='magaza_kod', how='left')
-                
-                progress_bar.progress(95, text="Depo stok kontrolleri yapılıyor...")
-                
-                # Önceliğe göre sırala
-                result_df = anlik_df[anlik_df['ihtiyac'] > 0].copy()
-                result_df_max = result_df.loc[result_df.groupby(['magaza_kod', 'urun_kod'])['ihtiyac'].idxmax()].copy()
-                result_df_max = result_df_max.sort_values('Oncelik').reset_index(drop=True)
-
-                # Depo stok kontrolü
-                depo_stok_dict = {}
-                for _, row in depo_df.iterrows():
-                    depo_kod_str = str(row['depo_kod'])
-                    urun_kod_raw = str(row['urun_kod'])
-                    try:
-                        if '.' in urun_kod_raw:
-                            urun_kod_str = str(int(float(urun_kod_raw)))
-                        else:
-                            urun_kod_str = urun_kod_raw
-                    except:
-                        urun_kod_str = urun_kod_raw
-                    
-                    key = (depo_kod_str, urun_kod_str)
-                    if key not in depo_stok_dict:
-                        depo_stok_dict[key] = float(row['stok'])
-                
-                result_df_max['urun_kod_clean'] = result_df_max['urun_kod'].astype(str).apply(
-                    lambda x: str(int(float(x))) if ('.' in str(x)) else str(x)
+                indirme_butonu(
+                    "📥 Senaryo Karşılaştırma CSV İndir", senaryo_sonuc, "senaryo_karsilastirma.csv",
+                    use_container_width=True
                 )
-                result_df_max['depo_kod_clean'] = result_df_max['depo_kod'].astype(str)
-                
-                # Sevkiyat hesapla
-                sevkiyat_gercek = []
-                for idx, row in result_df_max.iterrows():
-                    depo_kod = str(row['depo_kod'])
-                    urun_kod_raw = str(row['urun_kod'])
-                    try:
-                        if '.' in urun_kod_raw:
-                            urun_kod = str(int(float(urun_kod_raw)))
-                        else:
-                            urun_kod = urun_kod_raw
-                    except:
-                        urun_kod = urun_kod_raw
-                    
-                    ihtiyac = float(row['ihtiyac'])
-                    key = (depo_kod, urun_kod)
-                    
-                    if key in depo_stok_dict:
-                        kalan_stok = depo_stok_dict[key]
-                        if kalan_stok >= ihtiyac:
-                            sevkiyat = ihtiyac
-                            depo_stok_dict[key] -= ihtiyac
-                        else:
-                            sevkiyat = kalan_stok
-                            depo_stok_dict[key] = 0
-                    else:
-                        sevkiyat = 0
-                    
-                    sevkiyat_gercek.append(sevkiyat)
-                
-                result_df_max['sevkiyat_gercek'] = sevkiyat_gercek
-                result_df_max['stok_yoklugu_kaybi'] = result_df_max['ihtiyac'] - result_df_max['sevkiyat_gercek']
-                result_df_max = result_df_max[result_df_max['ihtiyac'] > 0].copy()
-                
-                # Sonuç tablosu
-                result_final = result_df_max[[
-                    'Oncelik', 'magaza_kod', 'urun_kod',
-                    'magaza_segment', 'urun_segment', 'Durum',
-                    'stok', 'yol', 'satis', 'ihtiyac', 'sevkiyat_gercek', 'depo_kod', 'stok_yoklugu_kaybi'
-                ]].rename(columns={
-                    'Oncelik': 'oncelik',
-                    'Durum': 'durum',
-                    'ihtiyac': 'ihtiyac_miktari',
-                    'sevkiyat_gercek': 'sevkiyat_miktari',
-                    'stok_yoklugu_kaybi': 'stok_yoklugu_satis_kaybi'
-                })
-                
-                # Ürün ve mağaza adlarını master'lardan ekle
-                if st.session_state.urun_master is not None:
-                    urun_master = st.session_state.urun_master[['urun_kod', 'urun_ad']].copy()
-                    urun_master['urun_kod'] = urun_master['urun_kod'].astype(str)
-                    result_final['urun_kod'] = result_final['urun_kod'].astype(str)
-                    result_final = result_final.merge(urun_master, on='urun_kod', how='left')
-                else:
-                    result_final['urun_ad'] = 'Bilinmiyor'
-                
-                if st.session_state.magaza_master is not None:
-                    magaza_master = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']].copy()
-                    magaza_master['magaza_kod'] = magaza_master['magaza_kod'].astype(str)
-                    result_final['magaza_kod'] = result_final['magaza_kod'].astype(str)
-                    result_final = result_final.merge(magaza_master, on='magaza_kod', how='left')
-                else:
-                    result_final['magaza_ad'] = 'Bilinmiyor'
-                
-                # Kolon sıralamasını düzenle
-                result_final = result_final[[
-                    'oncelik', 'magaza_kod', 'magaza_ad', 'urun_kod', 'urun_ad',
-                    'magaza_segment', 'urun_segment', 'durum',
-                    'stok', 'yol', 'satis', 'ihtiyac_miktari', 'sevkiyat_miktari', 'depo_kod', 'stok_yoklugu_satis_kaybi'
-                ]]
-                
-                result_final.insert(0, 'sira_no', range(1, len(result_final) + 1))
-                
-                # Hesaplama süresini hesapla
-                end_time = time.time()
-                calculation_time = end_time - start_time
-                
-                progress_bar.progress(100, text="Tamamlandı!")
-                
-                # SONUÇLARI SESSION STATE'E KAYDET - BU ÇOK ÖNEMLİ!
-                st.session_state.sevkiyat_sonuc = result_final.copy()
-                
-                # Hesaplama tamamlandı mesajını BURADA göster
-                st.success("✅ Hesaplama tamamlandı! Sonuçlar kaydedildi.")
-            
-            # -------------------------------
-            # CSV İNDİRME BUTONU (Hesaplama Sonrası)
-            # -------------------------------
-            if 'result_df' in locals() and not result_df.empty:
-                try:
-                    # CSV için gerekli sütunları filtrele
-                    detayli_df = result_df[[
-                        'urun_kod', 'magaza_kod', 'mağaza_grup', 'ürün_grup',
-                        'satış', 'stok', 'yol', 'ihtiyaç', 'depo_stok'
-                    ]].copy()
-
-                    # CSV'yi bellek üzerinden indirilebilir hale getir
-                    csv_bytes = detayli_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
-
-                    st.download_button(
-                        label="📥 Detaylı Sevkiyat CSV İndir",
-                        data=csv_bytes,
-                        file_name=f"detayli_sevkiyat_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime='text/csv',
-                        use_container_width=True
-                    )
-                except Exception as e:
-                    st.warning(f"CSV oluşturulurken hata oluştu: {e}")
- 
-             
+
 
     # Sayfa yüklendiğinde sonuçları göster (yeniden hesaplama yapılmadıysa)
         # Sayfa yüklendiğinde sonuçları göster (yeniden hesaplama yapılmadıysa)
@@ -1582,23 +1646,26 @@ elif menu == "📐 Hesaplama":
         st.markdown("---")
         st.subheader("📊 Mevcut Sevkiyat Sonuçları")
         
-        result_final = st.session_state.sevkiyat_sonuc.copy()
+        result_final = st.session_state.sevkiyat_sonuc
         
         # Ana metrikler tablosu
         st.markdown("### 📈 Performans Özeti")
         
-        # Ana metrikler
-        toplam_ihtiyac = result_final['ihtiyac_miktari'].sum()
-        toplam_sevkiyat = result_final['sevkiyat_miktari'].sum()
-        toplam_kayip = result_final['stok_yoklugu_satis_kaybi'].sum()
-        sku_count = result_final[result_final['sevkiyat_miktari'] > 0]['urun_kod'].nunique()
-        magaza_count = result_final[result_final['sevkiyat_miktari'] > 0]['magaza_kod'].nunique()
+        # Ana metrikler (rapor küpünden)
+        kup = sevkiyat_kupu()
+        genel = kup.toplam()
+        toplam_ihtiyac = genel['ihtiyac']
+        toplam_sevkiyat = genel['sevkiyat']
+        toplam_kayip = genel['kayip']
+        sku_count = genel['sevkli_urun']
+        magaza_count = genel['sevkli_magaza']
         kayip_oran = (toplam_kayip / toplam_ihtiyac * 100) if toplam_ihtiyac > 0 else 0
         
         # Durum bazlı sevkiyatlar
-        rpt_sevk = result_final[result_final['durum'] == 'RPT']['sevkiyat_miktari'].sum()
-        initial_sevk = result_final[result_final['durum'] == 'Initial']['sevkiyat_miktari'].sum()
-        min_sevk = result_final[result_final['durum'] == 'Min']['sevkiyat_miktari'].sum()
+        durum_sevk = kup.seviye('durum').set_index('durum')['sevkiyat']
+        rpt_sevk = durum_sevk.get('RPT', 0)
+        initial_sevk = durum_sevk.get('Initial', 0)
+        min_sevk = durum_sevk.get('Min', 0)
         
         # Tablo oluştur
         summary_data = {
@@ -1633,15 +1700,17 @@ elif menu == "📐 Hesaplama":
         # ------------------------------------------
         # 📥 DETAYLI SEVKİYAT CSV İNDİRME BUTONU
         # ------------------------------------------
-        try:
-            detayli_df = result_final[[
-                'urun_kod', 'magaza_kod',
-                'magaza_segment', 'urun_segment',
-                'satis', 'stok', 'yol',
-                'ihtiyac_miktari', 'sevkiyat_miktari', 'durum'
-            ]].copy()
-
-            detayli_df = detayli_df.rename(columns={
+        detayli_kolonlar = [
+            'urun_kod', 'magaza_kod',
+            'magaza_segment', 'urun_segment',
+            'satis', 'stok', 'yol',
+            'ihtiyac_miktari', 'sevkiyat_miktari', 'durum'
+        ]
+        eksik_kolonlar = [k for k in detayli_kolonlar if k not in result_final.columns]
+
+        def detayli_sevkiyat():
+            # Sadece indirme istendiğinde oluşturulur
+            return result_final[detayli_kolonlar].rename(columns={
                 'magaza_segment': 'mağaza_grup',
                 'urun_segment': 'ürün_grup',
                 'satis': 'satış',
@@ -1650,17 +1719,15 @@ elif menu == "📐 Hesaplama":
                 'durum': 'svk_tipi'
             })
 
-            csv_bytes = detayli_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
-
-            st.download_button(
-                label="📥 Detaylı Sevkiyat CSV İndir",
-                data=csv_bytes,
-                file_name=f"detayli_sevkiyat_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime='text/csv',
+        if eksik_kolonlar:
+            st.warning(f"CSV oluşturulurken hata oluştu: eksik kolonlar {eksik_kolonlar}")
+        else:
+            indirme_butonu(
+                "📥 Detaylı Sevkiyat CSV İndir", detayli_sevkiyat,
+                f"detayli_sevkiyat_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                surum=sevkiyat_surumu(), anahtar="detayli_sevkiyat",
                 use_container_width=True
             )
-        except Exception as e:
-            st.warning(f"CSV oluşturulurken hata oluştu: {e}")
 
         # ------------------------------------------
         # 🧾 SONUÇLARI TEMİZLE BUTONU
@@ -1669,7 +1736,7 @@ elif menu == "📐 Hesaplama":
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             if st.button("🗑️ Sonuçları Temizle", type="secondary"):
-                st.session_state.sevkiyat_sonuc = None
+                sevkiyat_sonucunu_ata(None)
                 st.success("✅ Sonuçlar temizlendi!")
                 st.rerun()
 
@@ -1740,25 +1807,11 @@ elif menu == "💵 Alım Sipariş":
     product_ranges = st.session_state.segmentation_params['product_ranges']
     
     # Cover segmentlerini oluştur
-    cover_segments = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in product_ranges]
-    
-    # Segment sıralama fonksiyonu
-    def sort_segments(segments):
-        def get_sort_key(seg):
-            try:
-                return int(seg.split('-')[0])
-            except:
-                return 9999
-        return sorted(segments, key=get_sort_key)
-    
-    cover_segments_sorted = sort_segments(cover_segments)
+    cover_segments_sorted = segmentleri_sirala(segment_etiketleri(product_ranges))
     
     if 'cover_segment_matrix' not in st.session_state or st.session_state.cover_segment_matrix is None:
         # Default katsayı tablosu
-        st.session_state.cover_segment_matrix = pd.DataFrame({
-            'cover_segment': cover_segments_sorted,
-            'katsayi': [1.0] * len(cover_segments_sorted)
-        })
+        st.session_state.cover_segment_matrix = varsayilan_cover_matrisi(product_ranges)
     else:
         # Mevcut matrisi güncelle - yeni segmentler eklenmişse
         existing_df = st.session_state.cover_segment_matrix.copy()
@@ -1809,322 +1862,173 @@ elif menu == "💵 Alım Sipariş":
     
     st.markdown("---")
     
-    if st.button("🚀 Alım Sipariş Hesapla", type="primary", use_container_width=True):
-        try:
-            with st.spinner("📊 Hesaplama yapılıyor..."):
-                
-                # 1. VERİLERİ HAZIRLA
-                anlik_df = st.session_state.anlik_stok_satis.copy()
-                depo_df = st.session_state.depo_stok.copy()
-                kpi_df = st.session_state.kpi.copy()
-                cover_matrix = st.session_state.cover_segment_matrix.copy()
-                
-                st.write("**📊 Debug: Veri boyutları**")
-                st.write(f"- Anlık Stok/Satış: {len(anlik_df):,} satır")
-                st.write(f"- Depo Stok: {len(depo_df):,} satır")
-                st.write(f"- KPI: {len(kpi_df)} satır")
-                st.write(f"- Cover Segment Matrix: {len(cover_matrix)} segment")
-                
-                # Veri tiplerini düzelt
-                anlik_df['urun_kod'] = anlik_df['urun_kod'].astype(str)
-                depo_df['urun_kod'] = depo_df['urun_kod'].astype(str).apply(
-                    lambda x: str(int(float(x))) if '.' in str(x) else str(x)
-                )
-                
-                # 2. ÜRÜN BAZINDA TOPLAMA
-                urun_toplam = anlik_df.groupby('urun_kod').agg({
-                    'urun_kod': 'first',
-                    'stok': 'sum',
-                    'yol': 'sum',
-                    'satis': 'sum',
-                    'ciro': 'sum',
-                    'smm': 'sum'
-                }).reset_index(drop=True)
-                
-                st.write(f"**🏷️  Ürün bazında toplam:** {len(urun_toplam):,} ürün")
-                
-                # 3. DEPO STOK EKLE
-                depo_toplam = depo_df.groupby('urun_kod')['stok'].sum().reset_index()
-                depo_toplam.columns = ['urun_kod', 'depo_stok']
-                
-                st.write(f"**📦 Depo stok:** {len(depo_toplam):,} ürün, Toplam: {depo_toplam['depo_stok'].sum():,.0f}")
-                
-                urun_toplam = urun_toplam.merge(depo_toplam, on='urun_kod', how='left')
-                urun_toplam['depo_stok'] = urun_toplam['depo_stok'].fillna(0)
-                
-                # 4. BRÜT KAR VE MARJ HESAPLA
-                st.write("**💰  SMM ve Ciro kontrol (ilk 5 ürün):**")
-                sample = urun_toplam[['urun_kod', 'satis', 'ciro', 'smm']].head(5)
-                st.dataframe(sample)
-                
-                ortalama_smm = urun_toplam['smm'].mean()
-                ortalama_ciro = urun_toplam['ciro'].mean()
-                
-                if ortalama_smm < ortalama_ciro * 0.1:
-                    st.warning("⚠️ SMM birim maliyet olarak algılandı. Toplam maliyet = SMM × Satış")
-                    urun_toplam['toplam_smm'] = urun_toplam['smm'] * urun_toplam['satis']
-                else:
-                    urun_toplam['toplam_smm'] = urun_toplam['smm']
-                
-                urun_toplam['brut_kar'] = urun_toplam['ciro'] - urun_toplam['toplam_smm']
-                
-                # Brüt kar marjı
-                urun_toplam['brut_kar_marji'] = np.where(
-                    urun_toplam['ciro'] > 0,
-                    (urun_toplam['brut_kar'] / urun_toplam['ciro'] * 100),
-                    0
-                )
-                
-                
-                # 5. COVER HESAPLA
-                urun_toplam['toplam_stok'] = (
-                    urun_toplam['stok'] + 
-                    urun_toplam['yol'] + 
-                    urun_toplam['depo_stok']
-                )
-                
-                urun_toplam['cover'] = np.where(
-                    urun_toplam['satis'] > 0,
-                    urun_toplam['toplam_stok'] / urun_toplam['satis'],
-                    999
-                )
-                
-                
-                # 6. COVER SEGMENT ATAMASI
-                # Segmentasyon range'lerini al
-                product_ranges = st.session_state.segmentation_params['product_ranges']
-                product_labels = [f"{int(r[0])}-{int(r[1]) if r[1] != float('inf') else 'inf'}" for r in product_ranges]
-                
-                urun_toplam['cover_segment'] = pd.cut(
-                    urun_toplam['cover'],
-                    bins=[r[0] for r in product_ranges] + [product_ranges[-1][1]],
-                    labels=product_labels,
-                    include_lowest=True
-                )
-                
-                urun_toplam['cover_segment'] = urun_toplam['cover_segment'].astype(str)
-                
-                st.write(f"**🎯 Debug: Cover segment dağılımı:**")
-                st.write(urun_toplam['cover_segment'].value_counts().sort_index())
-                
-                # 7. GENİŞLETME KATSAYISINI EKLE
-                urun_toplam = urun_toplam.merge(
-                    cover_matrix.rename(columns={'katsayi': 'genlestirme_katsayisi'}),
-                    on='cover_segment',
-                    how='left'
-                )
-                urun_toplam['genlestirme_katsayisi'] = urun_toplam['genlestirme_katsayisi'].fillna(1.0)
-                
-                # 8. FORWARD COVER VE MIN SEVK EKLE
-                default_fc = kpi_df['forward_cover'].mean()
-                urun_toplam['forward_cover'] = default_fc
-                
-                # Min sevk adeti
-                if st.session_state.sevkiyat_sonuc is not None:
-                    sevk_df = st.session_state.sevkiyat_sonuc.copy()
-                    sevk_df['urun_kod'] = sevk_df['urun_kod'].astype(str)
-                    
-                    min_sevk = sevk_df.groupby('urun_kod')['sevkiyat_miktari'].sum().reset_index()
-                    min_sevk.columns = ['urun_kod', 'min_sevk_adeti']
-                    
-                    urun_toplam = urun_toplam.merge(min_sevk, on='urun_kod', how='left')
-                else:
-                    urun_toplam['min_sevk_adeti'] = 0
-                
-                urun_toplam['min_sevk_adeti'] = urun_toplam['min_sevk_adeti'].fillna(0)
-                
-                # 9. FİLTRELERİ UYGULA
-                urun_toplam['filtre_uygun'] = (
-                    (urun_toplam['cover'] < cover_threshold) &
-                    (urun_toplam['brut_kar_marji'] > margin_threshold)
-                )
-                
-                filtre_sayisi = urun_toplam['filtre_uygun'].sum()
-                st.write(f"**✅ Filtreye uygun ürün:** {filtre_sayisi}")
-                st.write(f"   - Cover < {cover_threshold}: {(urun_toplam['cover'] < cover_threshold).sum()}")
-                st.write(f"   - Brüt Kar Marjı > {margin_threshold}%: {(urun_toplam['brut_kar_marji'] > margin_threshold).sum()}")
-                
-                # 10. ALIM SİPARİŞ HESAPLA
-                # Formül: [(satış × genişletme × (forward_cover + 2)] - [stok + yol + depo_stok] + min_sevk
-                
-                urun_toplam['talep'] = (
-                    urun_toplam['satis'] * 
-                    urun_toplam['genlestirme_katsayisi'] * 
-                    (urun_toplam['forward_cover'] + 2)
-                )
-                
-                urun_toplam['mevcut_stok'] = (
-                    urun_toplam['stok'] + 
-                    urun_toplam['yol'] + 
-                    urun_toplam['depo_stok']
-                )
-                
-                urun_toplam['alim_siparis_hesap'] = (
-                    urun_toplam['talep'] - urun_toplam['mevcut_stok']
-                )
-                
-                # Filtreye uygunsa ve pozitifse min_sevk ekle
-                urun_toplam['alim_siparis'] = urun_toplam.apply(
-                    lambda row: (
-                        max(0, row['alim_siparis_hesap'] + row['min_sevk_adeti'])
-                        if row['filtre_uygun'] and row['alim_siparis_hesap'] > 0
-                        else 0
-                    ),
-                    axis=1
-                )
-                
-                st.write(f"**📦  Alım sipariş > 0 olan ürün:** {(urun_toplam['alim_siparis'] > 0).sum()}")
-                st.write(f"**📦  Toplam alım sipariş:** {urun_toplam['alim_siparis'].sum():,.0f}")
-                
-                # 11. SONUÇLARI HAZIRLA
-                sonuc_df = urun_toplam[[
-                    'urun_kod', 'cover_segment',
-                    'stok', 'yol', 'depo_stok', 'satis',
-                    'ciro', 'toplam_smm', 'brut_kar', 'brut_kar_marji',
-                    'cover', 'genlestirme_katsayisi', 'forward_cover',
-                    'min_sevk_adeti', 'filtre_uygun', 'alim_siparis'
-                ]].copy()
-                
-                sonuc_df = sonuc_df.sort_values('alim_siparis', ascending=False).reset_index(drop=True)
-                
-                st.session_state.alim_siparis_sonuc = sonuc_df
-                
-                st.success("✅ Alım sipariş hesaplaması tamamlandı!")
-                st.balloons()
-                
-                # SONUÇLAR
-                st.markdown("---")
-                st.subheader("📊 Alım Sipariş Sonuçları")
-                
-                # Metrikler
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    toplam_alim = sonuc_df['alim_siparis'].sum()
-                    st.metric("📦 Toplam Alım Sipariş", f"{toplam_alim:,.0f}")
-                
-                with col2:
-                    alim_sku = (sonuc_df['alim_siparis'] > 0).sum()
-                    st.metric("🏷️ Alım Gereken SKU", f"{alim_sku}")
-                
-                with col3:
-                    filtre_uygun = sonuc_df['filtre_uygun'].sum()
-                    st.metric("✅ Filtreye Uygun", f"{filtre_uygun}")
-                
-                with col4:
-                    if alim_sku > 0:
-                        ort_alim = toplam_alim / alim_sku
-                        st.metric("📊 Ort. Alım/SKU", f"{ort_alim:,.0f}")
-                    else:
-                        st.metric("📊 Ort. Alım/SKU", "0")
-                
-                st.markdown("---")
-                
-                # Cover Segment bazında özet
-                st.subheader("🎯 Cover Segment Bazında Analiz")
-                
-                if (sonuc_df['alim_siparis'] > 0).sum() > 0:
-                    cover_dist = sonuc_df[sonuc_df['alim_siparis'] > 0].groupby('cover_segment').agg({
-                        'urun_kod': 'count',
-                        'alim_siparis': 'sum'
-                    }).reset_index()
-                    cover_dist.columns = ['Cover Segment', 'Ürün Sayısı', 'Toplam Alım']
-                    
-                    # Sırala
-                    cover_dist['sort_key'] = cover_dist['Cover Segment'].apply(
-                        lambda x: int(x.split('-')[0]) if x.split('-')[0].isdigit() else 9999
-                    )
-                    cover_dist = cover_dist.sort_values('sort_key').drop('sort_key', axis=1)
-                    
-                    st.dataframe(cover_dist, use_container_width=True)
-                
-                st.markdown("---")
-                
-                # Detaylı tablo
-                st.subheader("📋 Detaylı Alım Sipariş Tablosu")
-                
-                show_all = st.checkbox("Tüm ürünleri göster (alım sipariş=0 dahil)", value=False)
-                
-                if show_all:
-                    display_df = sonuc_df
-                else:
-                    display_df = sonuc_df[sonuc_df['alim_siparis'] > 0]
-                
-                st.write(f"**Gösterilen ürün sayısı:** {len(display_df)}")
-                
-                if len(display_df) > 0:
-                    st.dataframe(
-                        display_df.style.format({
-                            'stok': '{:,.0f}',
-                            'yol': '{:,.0f}',
-                            'depo_stok': '{:,.0f}',
-                            'satis': '{:,.0f}',
-                            'ciro': '{:,.2f}',
-                            'toplam_smm': '{:,.2f}',
-                            'brut_kar': '{:,.2f}',
-                            'brut_kar_marji': '{:.2f}%',
-                            'cover': '{:.2f}',
-                            'genlestirme_katsayisi': '{:.2f}',
-                            'forward_cover': '{:.2f}',
-                            'min_sevk_adeti': '{:,.0f}',
-                            'alim_siparis': '{:,.0f}'
-                        }),
-                        use_container_width=True,
-                        height=500
-                    )
-                    
-                    st.markdown("---")
-                    
-                    # Top 10
-                    st.subheader("🏆 En Yüksek Alım Siparişli 10 Ürün")
-                    
-                    top_10 = display_df.nlargest(10, 'alim_siparis')[[
-                        'urun_kod', 'cover_segment', 'cover',
-                        'brut_kar_marji', 'satis', 'alim_siparis'
-                    ]]
-                    
-                    st.dataframe(
-                        top_10.style.format({
-                            'cover': '{:.2f}',
-                            'brut_kar_marji': '{:.2f}%',
-                            'satis': '{:,.0f}',
-                            'alim_siparis': '{:,.0f}'
-                        }),
-                        use_container_width=True
-                    )
-                else:
-                    st.info("ℹ️ Filtreye uygun ürün bulunamadı. Filtre değerlerini ayarlayın.")
-                
-                st.markdown("---")
-                
-                # Export
-                st.subheader("📥 Sonuçları Dışa Aktar")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.download_button(
-                        label="📥 CSV İndir (Tümü)",
-                        data=sonuc_df.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="alim_siparis_tum.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
-                
-                with col2:
-                    alim_var = sonuc_df[sonuc_df['alim_siparis'] > 0]
-                    st.download_button(
-                        label="📥 CSV İndir (Alım>0)",
-                        data=alim_var.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="alim_siparis_pozitif.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
+    if st.button("🚀 Alım Sipariş Hesapla", type="primary", use_container_width=True,
+                 disabled='alim' in st.session_state.isler):
+        # 2-11. ÜRÜN BAZINDA TOPLAMA, MARJ, COVER, KATSAYI VE ALIM SİPARİŞ
+        # Formül: [(satış × genişletme × (forward_cover + 2)] - [stok + yol + depo_stok] + min_sevk
+        is_baslat(
+            'alim', "Alım Sipariş", alim_siparis_hesapla,
+            satir_sayisi=len(st.session_state.anlik_stok_satis),
+            anlik_df=st.session_state.anlik_stok_satis,
+            depo_df=st.session_state.depo_stok,
+            kpi_df=st.session_state.kpi,
+            cover_matrix=st.session_state.cover_segment_matrix.copy(),
+            product_ranges=st.session_state.segmentation_params['product_ranges'],
+            cover_threshold=cover_threshold,
+            margin_threshold=margin_threshold,
+            sevkiyat_sonuc=st.session_state.sevkiyat_sonuc,
+            uyarilari_topla=True,
+            motor=st.session_state.hesaplama_motoru
+        )
+        st.rerun()
+
+    if 'alim' in st.session_state.isler:
+        st.info("ℹ️ Alım sipariş hesaplaması arka planda çalışıyor.")
+        is_paneli('alim', detay=True)
+    else:
+        is_ozeti_goster('alim')
+
+    if st.session_state.get('alim_siparis_sonuc') is not None and 'alim' not in st.session_state.isler:
+        sonuc_df = st.session_state.alim_siparis_sonuc
+        filtreler = st.session_state.alim_siparis_filtreleri
+        anlik_df = st.session_state.anlik_stok_satis
+        depo_df = st.session_state.depo_stok
+        kpi_df = st.session_state.kpi
+
+        with st.expander("🔎 Girdi ve filtre özeti", expanded=False):
+            st.dataframe(pd.DataFrame([
+                {'Ölçü': 'Anlık Stok/Satış satırı', 'Değer': len(anlik_df)},
+                {'Ölçü': 'Depo Stok satırı', 'Değer': len(depo_df)},
+                {'Ölçü': 'KPI satırı', 'Değer': len(kpi_df)},
+                {'Ölçü': 'Ürün', 'Değer': len(sonuc_df)},
+                {'Ölçü': f"Cover < {filtreler['cover_threshold']}", 'Değer': int((sonuc_df['cover'] < filtreler['cover_threshold']).sum())},
+                {'Ölçü': f"Brüt Kar Marjı > {filtreler['margin_threshold']}%", 'Değer': int((sonuc_df['brut_kar_marji'] > filtreler['margin_threshold']).sum())},
+                {'Ölçü': 'Filtreye uygun ürün', 'Değer': int(sonuc_df['filtre_uygun'].sum())}
+            ]), use_container_width=True, hide_index=True)
+
+        st.success("✅ Alım sipariş hesaplaması tamamlandı!")
+
+        # SONUÇLAR
+        st.markdown("---")
+        st.subheader("📊 Alım Sipariş Sonuçları")
+    
+        # Metrikler
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            toplam_alim = sonuc_df['alim_siparis'].sum()
+            st.metric("📦 Toplam Alım Sipariş", f"{toplam_alim:,.0f}")
+    
+        with col2:
+            alim_sku = (sonuc_df['alim_siparis'] > 0).sum()
+            st.metric("🏷️ Alım Gereken SKU", f"{alim_sku}")
+    
+        with col3:
+            filtre_uygun = sonuc_df['filtre_uygun'].sum()
+            st.metric("✅ Filtreye Uygun", f"{filtre_uygun}")
+    
+        with col4:
+            if alim_sku > 0:
+                ort_alim = toplam_alim / alim_sku
+                st.metric("📊 Ort. Alım/SKU", f"{ort_alim:,.0f}")
+            else:
+                st.metric("📊 Ort. Alım/SKU", "0")
+    
+        st.markdown("---")
+    
+        # Cover Segment bazında özet
+        st.subheader("🎯 Cover Segment Bazında Analiz")
+    
+        if (sonuc_df['alim_siparis'] > 0).sum() > 0:
+            cover_dist = sonuc_df[sonuc_df['alim_siparis'] > 0].groupby('cover_segment').agg({
+                'urun_kod': 'count',
+                'alim_siparis': 'sum'
+            }).reset_index()
+            cover_dist.columns = ['Cover Segment', 'Ürün Sayısı', 'Toplam Alım']
+        
+            # Sırala
+            cover_dist['sort_key'] = cover_dist['Cover Segment'].apply(
+                lambda x: int(x.split('-')[0]) if x.split('-')[0].isdigit() else 9999
+            )
+            cover_dist = cover_dist.sort_values('sort_key').drop('sort_key', axis=1)
+        
+            st.dataframe(cover_dist, use_container_width=True)
+    
+        st.markdown("---")
+    
+        # Detaylı tablo
+        st.subheader("📋 Detaylı Alım Sipariş Tablosu")
+    
+        show_all = st.checkbox("Tüm ürünleri göster (alım sipariş=0 dahil)", value=False)
+    
+        if show_all:
+            display_df = sonuc_df
+        else:
+            display_df = sonuc_df[sonuc_df['alim_siparis'] > 0]
+    
+        st.write(f"**Gösterilen ürün sayısı:** {len(display_df)}")
+    
+        if len(display_df) > 0:
+            sayfali_tablo(
+                display_df, "alim_tablosu",
+                bicimler={
+                    'stok': '{:,.0f}',
+                    'yol': '{:,.0f}',
+                    'depo_stok': '{:,.0f}',
+                    'satis': '{:,.0f}',
+                    'ciro': '{:,.2f}',
+                    'toplam_smm': '{:,.2f}',
+                    'brut_kar': '{:,.2f}',
+                    'brut_kar_marji': '{:.2f}%',
+                    'cover': '{:.2f}',
+                    'genlestirme_katsayisi': '{:.2f}',
+                    'forward_cover': '{:.2f}',
+                    'min_sevk_adeti': '{:,.0f}',
+                    'alim_siparis': '{:,.0f}'
+                },
+                height=500
+            )
+        
+            st.markdown("---")
+        
+            # Top 10
+            st.subheader("🏆 En Yüksek Alım Siparişli 10 Ürün")
+        
+            top_10 = display_df.nlargest(10, 'alim_siparis')[[
+                'urun_kod', 'cover_segment', 'cover',
+                'brut_kar_marji', 'satis', 'alim_siparis'
+            ]]
         
-        except Exception as e:
-            st.error(f"❌ Hata oluştu: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+            st.dataframe(
+                top_10.style.format({
+                    'cover': '{:.2f}',
+                    'brut_kar_marji': '{:.2f}%',
+                    'satis': '{:,.0f}',
+                    'alim_siparis': '{:,.0f}'
+                }),
+                use_container_width=True
+            )
+        else:
+            st.info("ℹ️ Filtreye uygun ürün bulunamadı. Filtre değerlerini ayarlayın.")
+    
+        st.markdown("---")
+    
+        # Export
+        st.subheader("📥 Sonuçları Dışa Aktar")
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            indirme_butonu(
+                "📥 CSV İndir (Tümü)", sonuc_df, "alim_siparis_tum.csv",
+                use_container_width=True
+            )
+    
+        with col2:
+            indirme_butonu(
+                "📥 CSV İndir (Alım>0)", lambda: sonuc_df[sonuc_df['alim_siparis'] > 0], "alim_siparis_pozitif.csv",
+                surum=sonuc_df, use_container_width=True
+            )
 
 # ============================================
 # 📈 RAPORLAR - TAMAMI DÜZELTİLMİŞ
@@ -2173,11 +2077,12 @@ elif menu == "📈 Raporlar":
                 'depo_kod': ['D001', 'D001', 'D002'],
                 'stok_yoklugu_satis_kaybi': [20, 30, 20]
             })
-            st.session_state.sevkiyat_sonuc = test_data
+            sevkiyat_sonucunu_ata(test_data)
             st.success("✅ Test verisi oluşturuldu! Sayfayı yenileyin.")
             st.rerun()
     else:
-        result_df = st.session_state.sevkiyat_sonuc.copy()
+        # Raporlar sevkiyat sonucunu sadece okur; kopya alınmaz
+        result_df = st.session_state.sevkiyat_sonuc
         
         # Debug: Veri yapısını göster
         with st.expander("🔍 Veri Yapısı (Debug)", expanded=False):
@@ -2197,73 +2102,93 @@ elif menu == "📈 Raporlar":
             if ihtiyac_kolon_adi in result_df.columns:
                 st.write(f"- İhtiyaç miktarı > 0: {(result_df[ihtiyac_kolon_adi] > 0).sum()}")
         
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "📦 Ürün Analizi",
-            "🏪 Mağaza Analizi", 
-            "⚠️ Satış Kaybı Analizi",
-            "🗺️ İl Bazında Harita"
-        ])
+        # Hiyerarşi toplamları küpte hazırdır; seviye seçimi sadece tabloyu değiştirir
+        with st.expander("🧊 Hiyerarşi Bazında Özet", expanded=False):
+            kup = sevkiyat_kupu()
+            kup_seviyesi = st.selectbox(
+                "Seviye", kup.seviyeler, format_func=lambda seviye: SEVIYE_ADLARI.get(seviye, seviye),
+                key="kup_seviyesi",
+                help="Ürün hiyerarşisi: Mal Grubu, Marka, Kategori · Mağaza hiyerarşisi: İl, Bölge, Mağaza Tipi"
+            )
+            sayfali_tablo(
+                kup.seviye(kup_seviyesi), f"kup_tablosu_{kup_seviyesi}",
+                height=400,
+                hide_index=True,
+                column_config={
+                    'ihtiyac': st.column_config.NumberColumn("İhtiyaç", format="%.0f"),
+                    'sevkiyat': st.column_config.NumberColumn("Sevkiyat", format="%.0f"),
+                    'kayip': st.column_config.NumberColumn("Satış Kaybı", format="%.0f"),
+                    'urun_sayisi': "Ürün Sayısı",
+                    'magaza_sayisi': "Mağaza Sayısı",
+                    'kayipli_urun': "Kayıplı Ürün",
+                    'kayipli_magaza': "Kayıplı Mağaza"
+                }
+            )
+        
+        # Sadece seçili sekme çalışır (st.tabs tüm sekmeleri her seferinde çalıştırır); sekmelerin
+        # ağır gruplamaları rapor_hesapla ile sonuç sürümü başına bir kez hesaplanır
+        rapor_sekmesi = st.radio(
+            "Rapor",
+            ["📦 Ürün Analizi", "🏪 Mağaza Analizi", "⚠️ Satış Kaybı Analizi", "🗺️ İl Bazında Harita"],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="rapor_sekmesi"
+        )
         
         # ============================================
         # ÜRÜN ANALİZİ - DÜZELTİLMİŞ
         # ============================================
-        with tab1:
+        if rapor_sekmesi == "📦 Ürün Analizi":
             st.subheader("📦 Ürün Bazında Analiz")
             
-            # KOLON ADI DÜZELTMESİ
-            sevkiyat_kolon = 'sevkiyat_miktari' if 'sevkiyat_miktari' in result_df.columns else 'sevkiyat_gercek'
-            ihtiyac_kolon = 'ihtiyac_miktari' if 'ihtiyac_miktari' in result_df.columns else 'ihtiyac'
-            kayip_kolon = 'stok_yoklugu_satis_kaybi' if 'stok_yoklugu_satis_kaybi' in result_df.columns else 'stok_yoklugu_kaybi'
-            
-            # Ürün bazında toplamlar
-            urun_sevkiyat = result_df.groupby('urun_kod').agg({
-                ihtiyac_kolon: 'sum',
-                sevkiyat_kolon: 'sum',
-                kayip_kolon: 'sum',
-                'magaza_kod': 'nunique'
-            }).reset_index()
+            def urun_analizi():
+                # Ürün bazında toplamlar (küpün ürün seviyesi)
+                urun_sevkiyat = sevkiyat_kupu().seviye('urun_kod')[
+                    ['urun_kod', 'ihtiyac', 'sevkiyat', 'kayip', 'magaza_sayisi']
+                ].copy()
 
-            urun_sevkiyat.columns = ['urun_kod', 'İhtiyaç', 'Sevkiyat', 'Satış Kaybı', 'Mağaza Sayısı']
-            
-            # Hesaplamalar
-            urun_sevkiyat['Sevkiyat/İhtiyaç %'] = np.where(
-                urun_sevkiyat['İhtiyaç'] > 0,
-                (urun_sevkiyat['Sevkiyat'] / urun_sevkiyat['İhtiyaç'] * 100),
-                0
-            ).round(2)
-            
-            urun_sevkiyat['Kayıp Oranı %'] = np.where(
-                urun_sevkiyat['İhtiyaç'] > 0,
-                (urun_sevkiyat['Satış Kaybı'] / urun_sevkiyat['İhtiyaç'] * 100),
-                0
-            ).round(2)
-            
-            # Ürün master'dan detayları ekle
-            if st.session_state.urun_master is not None:
-                urun_detay = st.session_state.urun_master[['urun_kod', 'urun_ad', 'marka_ad', 'mg_ad']].copy()
-                urun_detay['urun_kod'] = urun_detay['urun_kod'].astype(str)
-                urun_sevkiyat['urun_kod'] = urun_sevkiyat['urun_kod'].astype(str)
-                
-                urun_sevkiyat = urun_sevkiyat.merge(urun_detay, on='urun_kod', how='left')
-                
-                # Kolon sıralaması
-                urun_sevkiyat = urun_sevkiyat[[
-                    'urun_kod', 'urun_ad', 'marka_ad', 'mg_ad', 
-                    'İhtiyaç', 'Sevkiyat', 'Sevkiyat/İhtiyaç %', 
-                    'Satış Kaybı', 'Kayıp Oranı %', 'Mağaza Sayısı'
-                ]]
+                urun_sevkiyat.columns = ['urun_kod', 'İhtiyaç', 'Sevkiyat', 'Satış Kaybı', 'Mağaza Sayısı']
+            
+                # Hesaplamalar
+                urun_sevkiyat['Sevkiyat/İhtiyaç %'] = np.where(
+                    urun_sevkiyat['İhtiyaç'] > 0,
+                    (urun_sevkiyat['Sevkiyat'] / urun_sevkiyat['İhtiyaç'] * 100),
+                    0
+                ).round(2)
+            
+                urun_sevkiyat['Kayıp Oranı %'] = np.where(
+                    urun_sevkiyat['İhtiyaç'] > 0,
+                    (urun_sevkiyat['Satış Kaybı'] / urun_sevkiyat['İhtiyaç'] * 100),
+                    0
+                ).round(2)
+            
+                # Ürün master'dan detayları ekle
+                if st.session_state.urun_master is not None:
+                    urun_detay = st.session_state.urun_master[['urun_kod', 'urun_ad', 'marka_ad', 'mg_ad']]
                 
-                urun_sevkiyat.columns = [
-                    'Ürün Kodu', 'Ürün Adı', 'Marka', 'Mal Grubu', 
-                    'İhtiyaç', 'Sevkiyat', 'Sevkiyat/İhtiyaç %',
-                    'Satış Kaybı', 'Kayıp Oranı %', 'Mağaza Sayısı'
-                ]
-            else:
-                # Ürün master yoksa sadece kodlarla çalış
-                urun_sevkiyat.columns = [
-                    'Ürün Kodu', 'İhtiyaç', 'Sevkiyat', 'Satış Kaybı', 'Mağaza Sayısı',
-                    'Sevkiyat/İhtiyaç %', 'Kayıp Oranı %'
-                ]
+                    urun_sevkiyat = urun_sevkiyat.merge(urun_detay, on='urun_kod', how='left')
+                
+                    # Kolon sıralaması
+                    urun_sevkiyat = urun_sevkiyat[[
+                        'urun_kod', 'urun_ad', 'marka_ad', 'mg_ad', 
+                        'İhtiyaç', 'Sevkiyat', 'Sevkiyat/İhtiyaç %', 
+                        'Satış Kaybı', 'Kayıp Oranı %', 'Mağaza Sayısı'
+                    ]]
+                
+                    urun_sevkiyat.columns = [
+                        'Ürün Kodu', 'Ürün Adı', 'Marka', 'Mal Grubu', 
+                        'İhtiyaç', 'Sevkiyat', 'Sevkiyat/İhtiyaç %',
+                        'Satış Kaybı', 'Kayıp Oranı %', 'Mağaza Sayısı'
+                    ]
+                else:
+                    # Ürün master yoksa sadece kodlarla çalış
+                    urun_sevkiyat.columns = [
+                        'Ürün Kodu', 'İhtiyaç', 'Sevkiyat', 'Satış Kaybı', 'Mağaza Sayısı',
+                        'Sevkiyat/İhtiyaç %', 'Kayıp Oranı %'
+                    ]
+                return urun_sevkiyat
+
+            urun_sevkiyat = rapor_hesapla('urun_analizi', urun_analizi)
             
             # En yüksek sevkiyatlı 10 ürün
             top_10_urun = urun_sevkiyat.nlargest(10, 'Sevkiyat')
@@ -2309,16 +2234,16 @@ elif menu == "📈 Raporlar":
             
             with col1:
                 st.subheader("📊 Ürün Performans Tablosu")
-                st.dataframe(
-                    filtered_urun.style.format({
+                sayfali_tablo(
+                    filtered_urun, "rapor_urun_tablosu",
+                    bicimler={
                         'İhtiyaç': '{:,.0f}',
                         'Sevkiyat': '{:,.0f}',
                         'Sevkiyat/İhtiyaç %': '{:.1f}%',
                         'Satış Kaybı': '{:,.0f}',
                         'Kayıp Oranı %': '{:.1f}%',
                         'Mağaza Sayısı': '{:.0f}'
-                    }),
-                    use_container_width=True,
+                    },
                     height=400
                 )
             
@@ -2357,73 +2282,61 @@ elif menu == "📈 Raporlar":
             # İndirme butonları
             col1, col2 = st.columns(2)
             with col1:
-                st.download_button(
-                    label="📥 Tüm Ürün Analizi İndir (CSV)",
-                    data=urun_sevkiyat.to_csv(index=False, encoding='utf-8-sig'),
-                    file_name="urun_analizi_tum.csv",
-                    mime="text/csv",
-                    use_container_width=True
+                indirme_butonu(
+                    "📥 Tüm Ürün Analizi İndir (CSV)", urun_sevkiyat, "urun_analizi_tum.csv",
+                    surum=sevkiyat_surumu(), use_container_width=True
                 )
             with col2:
-                st.download_button(
-                    label="📥 Filtrelenmiş Ürünler İndir (CSV)",
-                    data=filtered_urun.to_csv(index=False, encoding='utf-8-sig'),
-                    file_name="urun_analizi_filtreli.csv",
-                    mime="text/csv",
-                    use_container_width=True
+                indirme_butonu(
+                    "📥 Filtrelenmiş Ürünler İndir (CSV)", filtered_urun, "urun_analizi_filtreli.csv",
+                    surum=(sevkiyat_surumu(), min_sevkiyat, min_mağaza), use_container_width=True
                 )
         
         # ============================================
         # MAĞAZA ANALİZİ - DÜZELTİLMİŞ
         # ============================================
-        with tab2:
+        elif rapor_sekmesi == "🏪 Mağaza Analizi":
             st.subheader("🏪 Mağaza Bazında Analiz")
             
-            # KOLON ADI DÜZELTMESİ
-            sevkiyat_kolon = 'sevkiyat_miktari' if 'sevkiyat_miktari' in result_df.columns else 'sevkiyat_gercek'
-            ihtiyac_kolon = 'ihtiyac_miktari' if 'ihtiyac_miktari' in result_df.columns else 'ihtiyac'
-            kayip_kolon = 'stok_yoklugu_satis_kaybi' if 'stok_yoklugu_satis_kaybi' in result_df.columns else 'stok_yoklugu_kaybi'
-            
-            # Mağaza bazında toplamlar
-            magaza_ozet = result_df.groupby('magaza_kod').agg({
-                ihtiyac_kolon: 'sum',
-                sevkiyat_kolon: 'sum',
-                kayip_kolon: 'sum',
-                'urun_kod': 'nunique'
-            }).reset_index()
+            def magaza_analizi():
+                # Mağaza bazında toplamlar (küpün mağaza seviyesi)
+                magaza_ozet = sevkiyat_kupu().seviye('magaza_kod')[
+                    ['magaza_kod', 'ihtiyac', 'sevkiyat', 'kayip', 'urun_sayisi']
+                ].copy()
             
-            magaza_ozet.columns = ['magaza_kod', 'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']
+                magaza_ozet.columns = ['magaza_kod', 'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']
             
-            # Mağaza adlarını ekle - VERİ TİPİ DÜZELTMESİ
-            if st.session_state.magaza_master is not None:
-                magaza_detay = st.session_state.magaza_master[['magaza_kod', 'magaza_ad', 'il', 'bolge']].copy()
-                magaza_detay['magaza_kod'] = magaza_detay['magaza_kod'].astype(str)
-                magaza_ozet['magaza_kod'] = magaza_ozet['magaza_kod'].astype(str)
+                # Mağaza adlarını ekle - VERİ TİPİ DÜZELTMESİ
+                if st.session_state.magaza_master is not None:
+                    magaza_detay = st.session_state.magaza_master[['magaza_kod', 'magaza_ad', 'il', 'bolge']]
                 
-                magaza_ozet = magaza_ozet.merge(magaza_detay, left_on='magaza_kod', right_on='magaza_kod', how='left')
+                    magaza_ozet = magaza_ozet.merge(magaza_detay, left_on='magaza_kod', right_on='magaza_kod', how='left')
                 
-                # Kolon sıralaması
-                magaza_ozet = magaza_ozet[['magaza_kod', 'magaza_ad', 'il', 'bolge', 
-                                         'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']]
-                magaza_ozet.columns = ['Mağaza Kod', 'Mağaza Adı', 'İl', 'Bölge', 
-                                     'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']
-            else:
-                magaza_ozet.columns = ['Mağaza Kod', 'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']
+                    # Kolon sıralaması
+                    magaza_ozet = magaza_ozet[['magaza_kod', 'magaza_ad', 'il', 'bolge', 
+                                             'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']]
+                    magaza_ozet.columns = ['Mağaza Kod', 'Mağaza Adı', 'İl', 'Bölge', 
+                                         'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']
+                else:
+                    magaza_ozet.columns = ['Mağaza Kod', 'Toplam İhtiyaç', 'Toplam Sevkiyat', 'Satış Kaybı', 'Ürün Sayısı']
             
-            # Hesaplamalar
-            magaza_ozet['Gerçekleşme %'] = np.where(
-                magaza_ozet['Toplam İhtiyaç'] > 0,
-                (magaza_ozet['Toplam Sevkiyat'] / magaza_ozet['Toplam İhtiyaç'] * 100),
-                0
-            ).round(2)
+                # Hesaplamalar
+                magaza_ozet['Gerçekleşme %'] = np.where(
+                    magaza_ozet['Toplam İhtiyaç'] > 0,
+                    (magaza_ozet['Toplam Sevkiyat'] / magaza_ozet['Toplam İhtiyaç'] * 100),
+                    0
+                ).round(2)
             
-            magaza_ozet['Kayıp Oranı %'] = np.where(
-                magaza_ozet['Toplam İhtiyaç'] > 0,
-                (magaza_ozet['Satış Kaybı'] / magaza_ozet['Toplam İhtiyaç'] * 100),
-                0
-            ).round(2)
+                magaza_ozet['Kayıp Oranı %'] = np.where(
+                    magaza_ozet['Toplam İhtiyaç'] > 0,
+                    (magaza_ozet['Satış Kaybı'] / magaza_ozet['Toplam İhtiyaç'] * 100),
+                    0
+                ).round(2)
             
-            magaza_ozet = magaza_ozet.sort_values('Toplam İhtiyaç', ascending=False)
+                magaza_ozet = magaza_ozet.sort_values('Toplam İhtiyaç', ascending=False)
+                return magaza_ozet
+
+            magaza_ozet = rapor_hesapla('magaza_analizi', magaza_analizi)
             
             # Metrikler
             col1, col2, col3, col4 = st.columns(4)
@@ -2462,16 +2375,16 @@ elif menu == "📈 Raporlar":
             st.write(f"**Filtrelenmiş Mağaza Sayısı:** {len(filtered_magaza)}")
             
             # Ana tablo
-            st.dataframe(
-                filtered_magaza.style.format({
+            sayfali_tablo(
+                filtered_magaza, "rapor_magaza_tablosu",
+                bicimler={
                     'Toplam İhtiyaç': '{:,.0f}',
                     'Toplam Sevkiyat': '{:,.0f}',
                     'Satış Kaybı': '{:,.0f}',
                     'Ürün Sayısı': '{:.0f}',
                     'Gerçekleşme %': '{:.1f}%',
                     'Kayıp Oranı %': '{:.1f}%'
-                }),
-                use_container_width=True,
+                },
                 height=400
             )
             
@@ -2500,7 +2413,7 @@ elif menu == "📈 Raporlar":
             if 'Bölge' in filtered_magaza.columns and len(filtered_magaza) > 0:
                 st.subheader("🗺️ Bölge Bazında Performans")
                 
-                bolge_ozet = filtered_magaza.groupby('Bölge').agg({
+                bolge_ozet = filtered_magaza.groupby('Bölge', observed=True).agg({
                     'Mağaza Kod': 'count',
                     'Toplam İhtiyaç': 'sum',
                     'Toplam Sevkiyat': 'sum',
@@ -2532,27 +2445,85 @@ elif menu == "📈 Raporlar":
                     bolge_chart = bolge_ozet.set_index('Bölge')[['Ortalama Sevkiyat/Mağaza']]
                     st.bar_chart(bolge_chart)
             
-            st.download_button(
-                label="📥 Mağaza Analizi İndir (CSV)",
-                data=filtered_magaza.to_csv(index=False, encoding='utf-8-sig'),
-                file_name="magaza_analizi.csv",
-                mime="text/csv",
-                use_container_width=True
+            indirme_butonu(
+                "📥 Mağaza Analizi İndir (CSV)", filtered_magaza, "magaza_analizi.csv",
+                surum=(sevkiyat_surumu(), min_ihtiyac, tuple(bolge_filtre)), use_container_width=True
             )
         
         # ============================================
         # SATIŞ KAYBI ANALİZİ - DÜZELTİLMİŞ
         # ============================================
-        with tab3:
+        elif rapor_sekmesi == "⚠️ Satış Kaybı Analizi":
             st.subheader("⚠️ Stok Yokluğu Kaynaklı Satış Kaybı Analizi")
             
             # KOLON ADI DÜZELTMESİ
+            sevkiyat_kolon = 'sevkiyat_miktari' if 'sevkiyat_miktari' in result_df.columns else 'sevkiyat_gercek'
             kayip_kolon = 'stok_yoklugu_satis_kaybi' if 'stok_yoklugu_satis_kaybi' in result_df.columns else 'stok_yoklugu_kaybi'
             ihtiyac_kolon = 'ihtiyac_miktari' if 'ihtiyac_miktari' in result_df.columns else 'ihtiyac'
             
-            kayip_df = result_df[result_df[kayip_kolon] > 0].copy()
+            def kayip_analizi():
+                kup = sevkiyat_kupu()
+                kayip_df = result_df[result_df[kayip_kolon] > 0]
+                sonuc = {'kayip_df': kayip_df, 'toplam_ihtiyac': kup.toplam()['ihtiyac']}
+                if len(kayip_df) == 0:
+                    return sonuc
+                
+                def kayipli(seviye, sayi):
+                    """Küp seviyesinin kaybı olan satırları: seviye, toplam kayıp, etkilenen mağaza/ürün"""
+                    toplam = kup.seviye(seviye)
+                    return toplam.loc[toplam['kayip'] > 0, [seviye, 'kayip', sayi]].reset_index(drop=True)
+                
+                # En fazla kayıp olan 20 satır
+                top_kayip = kayip_df.nlargest(20, kayip_kolon)[[
+                    'magaza_kod', 'magaza_ad', 'urun_kod', 'urun_ad', 
+                    ihtiyac_kolon, sevkiyat_kolon, kayip_kolon
+                ]]
+                top_kayip.columns = ['magaza_kod', 'magaza_ad', 'urun_kod', 'urun_ad', 
+                                   'ihtiyac_miktari', 'sevkiyat_miktari', 'stok_yoklugu_satis_kaybi']
+                
+                # Ürün bazında kayıp ve ürün adları
+                urun_kayip = kayipli('urun_kod', 'kayipli_magaza')
+                if st.session_state.urun_master is not None:
+                    urun_detay = st.session_state.urun_master[['urun_kod', 'urun_ad']]
+                    urun_kayip = urun_kayip.merge(urun_detay, on='urun_kod', how='left')
+                    urun_kayip = urun_kayip[['urun_kod', 'urun_ad', 'kayip', 'kayipli_magaza']]
+                    urun_kayip.columns = ['Ürün Kodu', 'Ürün Adı', 'Toplam Kayıp', 'Etkilenen Mağaza']
+                else:
+                    urun_kayip.columns = ['Ürün Kodu', 'Toplam Kayıp', 'Etkilenen Mağaza']
+                
+                # Mağaza bazında kayıp ve mağaza adları - VERİ TİPİ DÜZELTMESİ
+                magaza_kayip = kayipli('magaza_kod', 'kayipli_urun')
+                if st.session_state.magaza_master is not None:
+                    magaza_detay = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']]
+                    magaza_kayip = magaza_kayip.merge(magaza_detay, on='magaza_kod', how='left')
+                    magaza_kayip = magaza_kayip[['magaza_kod', 'magaza_ad', 'kayip', 'kayipli_urun']]
+                    magaza_kayip.columns = ['Mağaza Kodu', 'Mağaza Adı', 'Toplam Kayıp', 'Etkilenen Ürün']
+                else:
+                    magaza_kayip.columns = ['Mağaza Kodu', 'Toplam Kayıp', 'Etkilenen Ürün']
+                
+                # Segment bazında kayıp
+                urun_segment_kayip = kayipli('urun_segment', 'kayipli_magaza')
+                urun_segment_kayip.columns = ['Ürün Segmenti', 'Toplam Kayıp', 'Etkilenen Mağaza']
+                
+                magaza_segment_kayip = kayipli('magaza_segment', 'kayipli_urun')
+                magaza_segment_kayip.columns = ['Mağaza Segmenti', 'Toplam Kayıp', 'Etkilenen Ürün']
+                
+                sonuc.update({
+                    'top_kayip': top_kayip,
+                    'urun_kayip': urun_kayip,
+                    'magaza_kayip': magaza_kayip,
+                    'urun_segment_kayip': urun_segment_kayip.sort_values('Toplam Kayıp', ascending=False),
+                    'magaza_segment_kayip': magaza_segment_kayip.sort_values('Toplam Kayıp', ascending=False)
+                })
+                return sonuc
+            
+            kayip = rapor_hesapla('kayip_analizi', kayip_analizi)
+            kayip_df = kayip['kayip_df']
             
             if len(kayip_df) > 0:
+                urun_kayip = kayip['urun_kayip']
+                magaza_kayip = kayip['magaza_kayip']
+                
                 # Metrikler
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
@@ -2561,7 +2532,7 @@ elif menu == "📈 Raporlar":
                     toplam_kayip = kayip_df[kayip_kolon].sum()
                     st.metric("Toplam Satış Kaybı", f"{toplam_kayip:,.0f}")
                 with col3:
-                    toplam_ihtiyac = result_df[ihtiyac_kolon].sum()
+                    toplam_ihtiyac = kayip['toplam_ihtiyac']
                     kayip_oran = (toplam_kayip / toplam_ihtiyac * 100) if toplam_ihtiyac > 0 else 0
                     st.metric("Kayıp Oranı", f"{kayip_oran:.2f}%")
                 with col4:
@@ -2575,17 +2546,8 @@ elif menu == "📈 Raporlar":
                 
                 # En fazla kayıp olan 20 satır
                 st.write("**En Fazla Kayıp Olan 20 Satır:**")
-                top_kayip = kayip_df.nlargest(20, kayip_kolon)[[
-                    'magaza_kod', 'magaza_ad', 'urun_kod', 'urun_ad', 
-                    ihtiyac_kolon, sevkiyat_kolon, kayip_kolon
-                ]]
-                
-                # Kolon isimlerini düzelt
-                top_kayip.columns = ['magaza_kod', 'magaza_ad', 'urun_kod', 'urun_ad', 
-                                   'ihtiyac_miktari', 'sevkiyat_miktari', 'stok_yoklugu_satis_kaybi']
-                
                 st.dataframe(
-                    top_kayip.style.format({
+                    kayip['top_kayip'].style.format({
                         'ihtiyac_miktari': '{:,.0f}',
                         'sevkiyat_miktari': '{:,.0f}',
                         'stok_yoklugu_satis_kaybi': '{:,.0f}'
@@ -2601,22 +2563,6 @@ elif menu == "📈 Raporlar":
                 
                 with col1:
                     st.write("**Ürün Bazında Toplam Kayıp (Top 15):**")
-                    urun_kayip = kayip_df.groupby('urun_kod').agg({
-                        kayip_kolon: 'sum',
-                        'magaza_kod': 'nunique'
-                    }).reset_index()
-                    
-                    # Ürün adlarını ekle
-                    if st.session_state.urun_master is not None:
-                        urun_detay = st.session_state.urun_master[['urun_kod', 'urun_ad']].copy()
-                        urun_detay['urun_kod'] = urun_detay['urun_kod'].astype(str)
-                        urun_kayip['urun_kod'] = urun_kayip['urun_kod'].astype(str)
-                        urun_kayip = urun_kayip.merge(urun_detay, on='urun_kod', how='left')
-                        urun_kayip = urun_kayip[['urun_kod', 'urun_ad', kayip_kolon, 'magaza_kod']]
-                        urun_kayip.columns = ['Ürün Kodu', 'Ürün Adı', 'Toplam Kayıp', 'Etkilenen Mağaza']
-                    else:
-                        urun_kayip.columns = ['Ürün Kodu', 'Toplam Kayıp', 'Etkilenen Mağaza']
-                    
                     top_15_urun = urun_kayip.nlargest(15, 'Toplam Kayıp')
                     st.dataframe(
                         top_15_urun.style.format({
@@ -2628,22 +2574,6 @@ elif menu == "📈 Raporlar":
                 
                 with col2:
                     st.write("**Mağaza Bazında Toplam Kayıp (Top 15):**")
-                    magaza_kayip = kayip_df.groupby('magaza_kod').agg({
-                        kayip_kolon: 'sum',
-                        'urun_kod': 'nunique'
-                    }).reset_index()
-                    
-                    # Mağaza adlarını ekle - VERİ TİPİ DÜZELTMESİ
-                    if st.session_state.magaza_master is not None:
-                        magaza_detay = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']].copy()
-                        magaza_detay['magaza_kod'] = magaza_detay['magaza_kod'].astype(str)
-                        magaza_kayip['magaza_kod'] = magaza_kayip['magaza_kod'].astype(str)
-                        magaza_kayip = magaza_kayip.merge(magaza_detay, on='magaza_kod', how='left')
-                        magaza_kayip = magaza_kayip[['magaza_kod', 'magaza_ad', kayip_kolon, 'urun_kod']]
-                        magaza_kayip.columns = ['Mağaza Kodu', 'Mağaza Adı', 'Toplam Kayıp', 'Etkilenen Ürün']
-                    else:
-                        magaza_kayip.columns = ['Mağaza Kodu', 'Toplam Kayıp', 'Etkilenen Ürün']
-                    
                     top_15_magaza = magaza_kayip.nlargest(15, 'Toplam Kayıp')
                     st.dataframe(
                         top_15_magaza.style.format({
@@ -2662,15 +2592,8 @@ elif menu == "📈 Raporlar":
                 
                 with col1:
                     st.write("**Ürün Segmenti Bazında Kayıp:**")
-                    urun_segment_kayip = kayip_df.groupby('urun_segment').agg({
-                        kayip_kolon: 'sum',
-                        'magaza_kod': 'nunique'
-                    }).reset_index()
-                    urun_segment_kayip.columns = ['Ürün Segmenti', 'Toplam Kayıp', 'Etkilenen Mağaza']
-                    urun_segment_kayip = urun_segment_kayip.sort_values('Toplam Kayıp', ascending=False)
-                    
                     st.dataframe(
-                        urun_segment_kayip.style.format({
+                        kayip['urun_segment_kayip'].style.format({
                             'Toplam Kayıp': '{:,.0f}',
                             'Etkilenen Mağaza': '{:.0f}'
                         }),
@@ -2679,15 +2602,8 @@ elif menu == "📈 Raporlar":
                 
                 with col2:
                     st.write("**Mağaza Segmenti Bazında Kayıp:**")
-                    magaza_segment_kayip = kayip_df.groupby('magaza_segment').agg({
-                        kayip_kolon: 'sum',
-                        'urun_kod': 'nunique'
-                    }).reset_index()
-                    magaza_segment_kayip.columns = ['Mağaza Segmenti', 'Toplam Kayıp', 'Etkilenen Ürün']
-                    magaza_segment_kayip = magaza_segment_kayip.sort_values('Toplam Kayıp', ascending=False)
-                    
                     st.dataframe(
-                        magaza_segment_kayip.style.format({
+                        kayip['magaza_segment_kayip'].style.format({
                             'Toplam Kayıp': '{:,.0f}',
                             'Etkilenen Ürün': '{:.0f}'
                         }),
@@ -2702,30 +2618,21 @@ elif menu == "📈 Raporlar":
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    st.download_button(
-                        label="📥 Detaylı Kayıp Raporu",
-                        data=kayip_df.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="detayli_kayip_raporu.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 Detaylı Kayıp Raporu", kayip_df, "detayli_kayip_raporu.csv",
+                        surum=sevkiyat_surumu(), use_container_width=True
                     )
                 
                 with col2:
-                    st.download_button(
-                        label="📥 Ürün Bazında Özet",
-                        data=urun_kayip.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="urun_bazinda_kayip.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 Ürün Bazında Özet", urun_kayip, "urun_bazinda_kayip.csv",
+                        surum=sevkiyat_surumu(), use_container_width=True
                     )
                 
                 with col3:
-                    st.download_button(
-                        label="📥 Mağaza Bazında Özet",
-                        data=magaza_kayip.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="magaza_bazinda_kayip.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 Mağaza Bazında Özet", magaza_kayip, "magaza_bazinda_kayip.csv",
+                        surum=sevkiyat_surumu(), use_container_width=True
                     )
                 
             else:
@@ -2740,94 +2647,43 @@ elif menu == "📈 Raporlar":
         # ============================================
         # İL BAZINDA HARİTA - DÜZELTİLMİŞ
         # ============================================
-        with tab4:
+        elif rapor_sekmesi == "🗺️ İl Bazında Harita":
             st.subheader("🗺️ İl Bazında Sevkiyat Haritası")
             
-            # Plotly kontrolü
-            try:
-                import plotly.express as px
-                import plotly.graph_objects as go
-                st.success("✅ Plotly kütüphanesi yüklü!")
-            except ImportError:
+            if not harita_kullanilabilir():
                 st.error("Plotly kütüphanesi yüklü değil! requirements.txt dosyasına 'plotly' ekleyin.")
                 st.stop()
             
             if st.session_state.magaza_master is None:
                 st.warning("⚠️ Mağaza Master verisi yüklenmemiş! Harita için il bilgisi gerekiyor.")
             else:
-                # KOLON ADI DÜZELTMESİ
-                sevkiyat_kolon = 'sevkiyat_miktari' if 'sevkiyat_miktari' in result_df.columns else 'sevkiyat_gercek'
-                ihtiyac_kolon = 'ihtiyac_miktari' if 'ihtiyac_miktari' in result_df.columns else 'ihtiyac'
-                
-                # İl bazında verileri hazırla
-                il_verileri = result_df.groupby('magaza_kod').agg({
-                    sevkiyat_kolon: 'sum',
-                    ihtiyac_kolon: 'sum'
-                }).reset_index()
-                
-                # Mağaza master'dan il bilgilerini ekle - VERİ TİPİ DÜZELTMESİ
-                magaza_master = st.session_state.magaza_master[['magaza_kod', 'il']].copy()
-                magaza_master['magaza_kod'] = magaza_master['magaza_kod'].astype(str)
-                il_verileri['magaza_kod'] = il_verileri['magaza_kod'].astype(str)
-                
-                il_verileri = il_verileri.merge(magaza_master, on='magaza_kod', how='left')
+                magaza_master = st.session_state.magaza_master[['magaza_kod', 'il']]
                 
-                # İl bazında toplamlar
-                il_bazinda = il_verileri.groupby('il').agg({
-                    sevkiyat_kolon: 'sum',
-                    ihtiyac_kolon: 'sum',
-                    'magaza_kod': 'nunique'
-                }).reset_index()
+                def il_analizi():
+                    # İl bazında toplamlar (küpün il seviyesi)
+                    il_bazinda = sevkiyat_kupu().seviye('il')[['il', 'sevkiyat', 'ihtiyac', 'magaza_sayisi']].copy()
                 
-                il_bazinda.columns = ['İl', 'Toplam Sevkiyat', 'Toplam İhtiyaç', 'Mağaza Sayısı']
+                    il_bazinda.columns = ['İl', 'Toplam Sevkiyat', 'Toplam İhtiyaç', 'Mağaza Sayısı']
                 
-                # Ortalama sevkiyat/mağaza hesapla
-                il_bazinda['Ortalama Sevkiyat/Mağaza'] = (il_bazinda['Toplam Sevkiyat'] / il_bazinda['Mağaza Sayısı']).round(0)
+                    # Ortalama sevkiyat/mağaza hesapla
+                    il_bazinda['Ortalama Sevkiyat/Mağaza'] = (il_bazinda['Toplam Sevkiyat'] / il_bazinda['Mağaza Sayısı']).round(0)
                 
-                # Segmentlere ayır (4 segment)
-                segmentler = pd.cut(
-                    il_bazinda['Ortalama Sevkiyat/Mağaza'], 
-                    bins=4,
-                    labels=['Çok Düşük', 'Düşük', 'Orta', 'Yüksek']
-                )
-                il_bazinda['Performans Segmenti'] = segmentler
-                
-                # Türkiye il koordinatları
-                turkiye_iller = {
-                    'İstanbul': (41.0082, 28.9784), 'Ankara': (39.9334, 32.8597), 'İzmir': (38.4237, 27.1428),
-                    'Bursa': (40.1885, 29.0610), 'Antalya': (36.8969, 30.7133), 'Adana': (37.0000, 35.3213),
-                    'Konya': (37.8667, 32.4833), 'Gaziantep': (37.0662, 37.3833), 'Şanlıurfa': (37.1591, 38.7969),
-                    'Mersin': (36.8000, 34.6333), 'Kocaeli': (40.8533, 29.8815), 'Diyarbakır': (37.9144, 40.2306),
-                    'Hatay': (36.4018, 36.3498), 'Manisa': (38.6191, 27.4289), 'Kayseri': (38.7312, 35.4787),
-                    'Samsun': (41.2928, 36.3313), 'Balıkesir': (39.6484, 27.8826), 'Kahramanmaraş': (37.5858, 36.9371),
-                    'Van': (38.4891, 43.4080), 'Aydın': (37.8560, 27.8416), 'Tekirdağ': (40.9781, 27.5117),
-                    'Denizli': (37.7765, 29.0864), 'Muğla': (37.2153, 28.3636), 'Eskişehir': (39.7767, 30.5206),
-                    'Trabzon': (41.0015, 39.7178), 'Ordu': (40.9833, 37.8833), 'Afyonkarahisar': (38.7638, 30.5403),
-                    'Sivas': (39.7477, 37.0179), 'Malatya': (38.3552, 38.3095), 'Erzurum': (39.9000, 41.2700),
-                    'Elazığ': (38.6810, 39.2264), 'Batman': (37.8812, 41.1351), 'Kütahya': (39.4167, 29.9833),
-                    'Çorum': (40.5506, 34.9556), 'Isparta': (37.7648, 30.5566), 'Osmaniye': (37.2130, 36.1763),
-                    'Çanakkale': (40.1553, 26.4142), 'Giresun': (40.9128, 38.3895), 'Aksaray': (38.3687, 34.0370),
-                    'Yozgat': (39.8200, 34.8044), 'Edirne': (41.6667, 26.5667), 'Düzce': (40.8433, 31.1565),
-                    'Tokat': (40.3167, 36.5500), 'Kastamonu': (41.3767, 33.7765), 'Uşak': (38.6823, 29.4082),
-                    'Kırklareli': (41.7333, 27.2167), 'Niğde': (37.9667, 34.6833), 'Rize': (41.0201, 40.5234),
-                    'Amasya': (40.6500, 35.8333), 'Bolu': (40.7333, 31.6000), 'Nevşehir': (38.6939, 34.6857),
-                    'Bilecik': (40.1500, 29.9833), 'Burdur': (37.7167, 30.2833), 'Kırıkkale': (39.8468, 33.5153),
-                    'Karabük': (41.2000, 32.6333), 'Karaman': (37.1759, 33.2287), 'Kırşehir': (39.1500, 34.1667),
-                    'Sinop': (42.0231, 35.1531), 'Hakkari': (37.5833, 43.7333), 'Iğdır': (39.9167, 44.0333),
-                    'Yalova': (40.6500, 29.2667), 'Bartın': (41.6344, 32.3375), 'Ardahan': (41.1105, 42.7022),
-                    'Bayburt': (40.2552, 40.2249), 'Kilis': (36.7164, 37.1156), 'Muş': (38.9462, 41.7539),
-                    'Siirt': (37.9333, 41.9500), 'Tunceli': (39.1071, 39.5400), 'Şırnak': (37.5164, 42.4611),
-                    'Bitlis': (38.4000, 42.1000), 'Artvin': (41.1667, 41.8333), 'Gümüşhane': (40.4603, 39.4814),
-                    'Ağrı': (39.7191, 43.0513), 'Erzincan': (39.7500, 39.5000), 'Adıyaman': (37.7648, 38.2786),
-                    'Zonguldak': (41.4564, 31.7987), 'Mardin': (37.3212, 40.7245), 'Sakarya': (40.6937, 30.4358)
-                }
+                    # Segmentlere ayır (4 segment)
+                    segmentler = pd.cut(
+                        il_bazinda['Ortalama Sevkiyat/Mağaza'], 
+                        bins=4,
+                        labels=['Çok Düşük', 'Düşük', 'Orta', 'Yüksek']
+                    )
+                    il_bazinda['Performans Segmenti'] = segmentler
                 
-                # Koordinatları dataframe'e ekle
-                il_bazinda['lat'] = il_bazinda['İl'].map(lambda x: turkiye_iller.get(x, (0, 0))[0])
-                il_bazinda['lon'] = il_bazinda['İl'].map(lambda x: turkiye_iller.get(x, (0, 0))[1])
+                    # İl merkezleri pakete gömülü il dosyasından
+                    il_bazinda[['lat', 'lon']] = il_koordinatlari(il_bazinda['İl'])
                 
-                # Koordinatı olmayan illeri filtrele
-                il_bazinda = il_bazinda[il_bazinda['lat'] != 0]
+                    # Koordinatı olmayan illeri filtrele
+                    il_bazinda = il_bazinda[il_bazinda['lat'].notna()]
+                    return il_bazinda
+
+                il_bazinda = rapor_hesapla('il_analizi', il_analizi)
                 
                 if len(il_bazinda) > 0:
                     # Renk skalası
@@ -2841,37 +2697,16 @@ elif menu == "📈 Raporlar":
                     # Interaktif harita oluştur
                     st.subheader("📍 İl Bazında Ortalama Sevkiyat Performansı")
                     
-                    fig = px.scatter_mapbox(
-                        il_bazinda,
-                        lat="lat",
-                        lon="lon", 
-                        hover_name="İl",
-                        hover_data={
-                            'Ortalama Sevkiyat/Mağaza': True,
-                            'Toplam Sevkiyat': True,
-                            'Mağaza Sayısı': True,
-                            'Performans Segmenti': True,
-                            'lat': False,
-                            'lon': False
-                        },
-                        color="Performans Segmenti",
-                        color_discrete_map=renk_skalasi,
-                        size="Ortalama Sevkiyat/Mağaza",
-                        size_max=25,
-                        zoom=4.5,
-                        center={"lat": 39.0, "lon": 35.0},
-                        height=600,
-                        title="Türkiye İl Bazında Ortalama Sevkiyat/Mağaza Dağılımı"
-                    )
-                    
-                    fig.update_layout(
-                        mapbox_style="open-street-map",
-                        margin={"r": 0, "t": 30, "l": 0, "b": 0}
-                    )
+                    # Çevrimdışı nokta haritası (karo sunucusu yok); figür sonuç sürümü başına bir kez çizilir
+                    fig = rapor_hesapla('il_haritasi', lambda: il_haritasi(
+                        il_bazinda, 'İl', 'Performans Segmenti', renk_skalasi,
+                        hover_kolonlari=['Ortalama Sevkiyat/Mağaza', 'Toplam Sevkiyat', 'Mağaza Sayısı', 'Performans Segmenti'],
+                        baslik="Türkiye İl Bazında Ortalama Sevkiyat/Mağaza Dağılımı"
+                    ))
                     
-                    st.info("🔍 Haritayı mouse tekerleği ile zoom in/out yapabilir, sürükleyerek hareket ettirebilirsiniz.")
+                    st.info("🔍 Haritayı mouse tekerleği ile zoom in/out yapabilir, sürükleyerek hareket ettirebilirsiniz. Her il, il merkezindeki bir noktayla gösterilir (il sınırları çizilmez).")
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, config={'scrollZoom': True})
                     
                     # İl seçimi için dropdown
                     st.markdown("---")
@@ -2900,24 +2735,16 @@ elif menu == "📈 Raporlar":
                         st.subheader(f"🏪 {secilen_il} İlindeki Mağaza Performansları")
                         
                         try:
-                            # Mağaza bazında verileri hazırla - VERİ TİPLERİNİ DÜZELT
-                            magaza_detay = result_df[result_df['magaza_kod'].isin(
-                                magaza_master[magaza_master['il'] == secilen_il]['magaza_kod'].astype(str)
-                            )]
+                            # Seçilen ildeki mağazaların toplamları (küpün mağaza seviyesinden)
+                            magaza_toplam = sevkiyat_kupu().seviye('magaza_kod')
+                            magaza_ozet = magaza_toplam.loc[
+                                magaza_toplam['magaza_kod'].isin(magaza_master[magaza_master['il'] == secilen_il]['magaza_kod']),
+                                ['magaza_kod', 'sevkiyat', 'ihtiyac', 'urun_sayisi']
+                            ]
                             
-                            if len(magaza_detay) > 0:
-                                magaza_ozet = magaza_detay.groupby('magaza_kod').agg({
-                                    sevkiyat_kolon: 'sum',
-                                    ihtiyac_kolon: 'sum',
-                                    'urun_kod': 'nunique'
-                                }).reset_index()
-                                
-                                # VERİ TİPLERİNİ AYNI YAP
-                                magaza_ozet['magaza_kod'] = magaza_ozet['magaza_kod'].astype(str)
-                                
+                            if len(magaza_ozet) > 0:
                                 # Mağaza adlarını ekle - VERİ TİPİ UYUMLU HALE GETİR
-                                magaza_master_temp = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']].copy()
-                                magaza_master_temp['magaza_kod'] = magaza_master_temp['magaza_kod'].astype(str)
+                                magaza_master_temp = st.session_state.magaza_master[['magaza_kod', 'magaza_ad']]
                                 
                                 magaza_ozet = magaza_ozet.merge(
                                     magaza_master_temp, 
@@ -2977,12 +2804,9 @@ elif menu == "📈 Raporlar":
                         st.bar_chart(segment_dagilim)
                     
                     # İndirme butonu
-                    st.download_button(
-                        label="📥 İl Bazında Analiz İndir (CSV)",
-                        data=il_bazinda.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="il_bazinda_analiz.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 İl Bazında Analiz İndir (CSV)", il_bazinda, "il_bazinda_analiz.csv",
+                        surum=sevkiyat_surumu(), use_container_width=True
                     )
                 
                 else:
@@ -3037,92 +2861,14 @@ elif menu == "💾 Master Data":
         if st.button("🚀 Master Data Oluştur", type="primary", use_container_width=True):
             with st.spinner("📊 Master data hazırlanıyor..."):
                 
-                # Base data
-                master_df = st.session_state.anlik_stok_satis.copy()
-                
-                # Veri tiplerini düzelt
-                master_df['urun_kod'] = master_df['urun_kod'].astype(str)
-                master_df['magaza_kod'] = master_df['magaza_kod'].astype(str)
-                
-                # Yeni kolonları başlat
-                master_df['ihtiyac'] = 0
-                master_df['sevkiyat'] = 0
-                master_df['tip'] = ''
-                master_df['oncelik'] = 0
-                master_df['alim_ihtiyaci'] = 0
-                master_df['depo_stok'] = 0
-                
-                # 1. SEVKIYAT VERİLERİNİ EKLE
-                if hesaplama_yapildi:
-                    sevkiyat_df = st.session_state.sevkiyat_sonuc.copy()
-                    sevkiyat_df['urun_kod'] = sevkiyat_df['urun_kod'].astype(str)
-                    sevkiyat_df['magaza_kod'] = sevkiyat_df['magaza_kod'].astype(str)
-                    
-                    # Sevkiyat verilerini merge et
-                    master_df = master_df.merge(
-                        sevkiyat_df[['magaza_kod', 'urun_kod', 'ihtiyac_miktari', 'sevkiyat_miktari', 'durum', 'oncelik']],
-                        on=['magaza_kod', 'urun_kod'],
-                        how='left',
-                        suffixes=('', '_sevk')
-                    )
-                    
-                    # Kolonları güncelle
-                    master_df['ihtiyac'] = master_df['ihtiyac_miktari'].fillna(0)
-                    master_df['sevkiyat'] = master_df['sevkiyat_miktari'].fillna(0)
-                    master_df['tip'] = master_df['durum'].fillna('')
-                    master_df['oncelik'] = master_df['oncelik'].fillna(0)
-                    
-                    # Gereksiz kolonları sil
-                    master_df = master_df.drop(['ihtiyac_miktari', 'sevkiyat_miktari', 'durum'], axis=1, errors='ignore')
-                
-                # 2. DEPO STOK VERİSİNİ EKLE
-                if st.session_state.depo_stok is not None:
-                    depo_df = st.session_state.depo_stok.copy()
-                    depo_df['urun_kod'] = depo_df['urun_kod'].astype(str).apply(
-                        lambda x: str(int(float(x))) if '.' in str(x) else str(x)
-                    )
-                    
-                    # Ürün bazında toplam depo stok
-                    depo_toplam = depo_df.groupby('urun_kod')['stok'].sum().reset_index()
-                    depo_toplam.columns = ['urun_kod', 'depo_stok_toplam']
-                    
-                    master_df = master_df.merge(depo_toplam, on='urun_kod', how='left')
-                    master_df['depo_stok'] = master_df['depo_stok_toplam'].fillna(0)
-                    master_df = master_df.drop('depo_stok_toplam', axis=1, errors='ignore')
-                
-                # 3. ALIM İHTİYACI HESAPLA (Ürün bazında)
-                # Ürün bazında toplamlar
-                urun_toplam = master_df.groupby('urun_kod').agg({
-                    'stok': 'sum',
-                    'yol': 'sum',
-                    'satis': 'sum',
-                    'ihtiyac': 'sum',
-                    'depo_stok': 'first'  # Her satırda aynı olacak
-                }).reset_index()
-                
-                # Alım ihtiyacı formülü: İhtiyaç + (2×Satış) - (Stok+Yol+Depo)
-                urun_toplam['alim_ihtiyaci_hesap'] = (
-                    urun_toplam['ihtiyac'] + 
-                    (2 * urun_toplam['satis']) - 
-                    (urun_toplam['stok'] + urun_toplam['yol'] + urun_toplam['depo_stok'])
-                ).clip(lower=0)  # Negatif değerleri 0 yap
-                
-                # Master'a merge et
-                master_df = master_df.merge(
-                    urun_toplam[['urun_kod', 'alim_ihtiyaci_hesap']],
-                    on='urun_kod',
-                    how='left'
+                master_df = master_data_olustur(
+                    st.session_state.anlik_stok_satis,
+                    sevkiyat_sonuc=st.session_state.sevkiyat_sonuc if hesaplama_yapildi else None,
+                    depo_stok=st.session_state.depo_stok,
+                    motor=st.session_state.hesaplama_motoru
                 )
-                master_df['alim_ihtiyaci'] = master_df['alim_ihtiyaci_hesap'].fillna(0)
-                master_df = master_df.drop('alim_ihtiyaci_hesap', axis=1, errors='ignore')
-                
-                # Kolonları yeniden düzenle (orijinal sıra + yeni kolonlar)
-                original_cols = [col for col in st.session_state.anlik_stok_satis.columns if col in master_df.columns]
                 new_cols = ['ihtiyac', 'sevkiyat', 'tip', 'oncelik', 'depo_stok', 'alim_ihtiyaci']
                 
-                final_cols = original_cols + new_cols
-                master_df = master_df[final_cols]
-                
                 st.success("✅ Master Data oluşturuldu!")
                 st.balloons()
                 
@@ -3138,7 +2884,7 @@ elif menu == "💾 Master Data":
                     sevkiyat_var = (master_df['sevkiyat'] > 0).sum()
                     st.metric("✅ Sevkiyatlı Satır", f"{sevkiyat_var:,}")
                 with col3:
-                    alim_gereken = master_df.groupby('urun_kod')['alim_ihtiyaci'].first()
+                    alim_gereken = master_df.groupby('urun_kod', observed=True)['alim_ihtiyaci'].first()
                     alim_var = (alim_gereken > 0).sum()
                     st.metric("🛒 Alım Gereken Ürün", f"{alim_var:,}")
                 with col4:
@@ -3192,7 +2938,7 @@ elif menu == "💾 Master Data":
                 
                 with col2:
                     st.markdown("**Alım Sipariş İstatistikleri**")
-                    alim_urun = master_df.groupby('urun_kod')['alim_ihtiyaci'].first()
+                    alim_urun = master_df.groupby('urun_kod', observed=True)['alim_ihtiyaci'].first()
                     if alim_urun.sum() > 0:
                         st.write(f"- Toplam Alım: {alim_urun.sum():,.0f}")
                         st.write(f"- Ortalama Alım/Ürün: {alim_urun[alim_urun>0].mean():,.0f}")
@@ -3213,44 +2959,31 @@ elif menu == "💾 Master Data":
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
+                # İçerikler sadece tıklanan biçim için üretilir; CSV ve Excel aynı içeriği paylaşır
                 with col1:
-                    st.download_button(
-                        label="📥 CSV İndir",
-                        data=master_df.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="master_data.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 CSV İndir", master_df, "master_data.csv",
+                        anahtar="master_data", use_container_width=True
                     )
                 
                 with col2:
-                    st.download_button(
-                        label="📥 Excel İndir",
-                        data=master_df.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="master_data.xlsx",
+                    indirme_butonu(
+                        "📥 Excel İndir", master_df, "master_data.xlsx",
+                        anahtar="master_data",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         use_container_width=True
                     )
                 
                 with col3:
-                    st.download_button(
-                        label="📥 JSON İndir",
-                        data=master_df.to_json(orient='records', force_ascii=False),
-                        file_name="master_data.json",
-                        mime="application/json",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 JSON İndir", master_df, "master_data.json",
+                        bicim='json', anahtar="master_data", use_container_width=True
                     )
                 
                 with col4:
-                    # Parquet formatı için
-                    import io
-                    buffer = io.BytesIO()
-                    master_df.to_parquet(buffer, index=False)
-                    st.download_button(
-                        label="📥 Parquet İndir",
-                        data=buffer.getvalue(),
-                        file_name="master_data.parquet",
-                        mime="application/octet-stream",
-                        use_container_width=True
+                    indirme_butonu(
+                        "📥 Parquet İndir", master_df, "master_data.parquet",
+                        bicim='parquet', anahtar="master_data", use_container_width=True
                     )
                 
                 st.markdown("---")
@@ -3273,8 +3006,8 @@ elif menu == "💾 Master Data":
                 with col3:
                     filtre_urun = st.text_input("Ürün Kodu Ara", "")
                 
-                # Filtreleri uygula
-                filtered_df = master_df.copy()
+                # Filtreleri uygula (filtreler yeni tablo döndürür; kopya gerekmez)
+                filtered_df = master_df
                 
                 if filtre_tip:
                     filtered_df = filtered_df[filtered_df['tip'].isin(filtre_tip)]
@@ -3287,14 +3020,11 @@ elif menu == "💾 Master Data":
                 
                 if len(filtered_df) > 0:
                     st.write(f"**Filtre Sonucu:** {len(filtered_df)} satır bulundu")
-                    st.dataframe(filtered_df, use_container_width=True, height=300)
+                    sayfali_tablo(filtered_df, "master_data_tablosu", height=300)
                     
                     # Filtrelenmiş veriyi indir
-                    st.download_button(
-                        label="📥 Filtrelenmiş Veriyi İndir (CSV)",
-                        data=filtered_df.to_csv(index=False, encoding='utf-8-sig'),
-                        file_name="master_data_filtered.csv",
-                        mime="text/csv"
+                    indirme_butonu(
+                        "📥 Filtrelenmiş Veriyi İndir (CSV)", filtered_df, "master_data_filtered.csv"
                     )
                 else:
                     st.warning("⚠️ Filtre kriterlerine uyan kayıt bulunamadı.")
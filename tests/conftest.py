@@ -0,0 +1,42 @@
+"""Hesaplama yollarının sevkiyat_hesapla ile karşılaştırıldığı testlerin ortak küçük verisi"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import segment_etiketleri, varsayilan_siralama
+from planlama.ornek_veri import ornek_veri_olustur
+from planlama.tanimlar import VARSAYILAN_ARALIKLAR
+
+
+@pytest.fixture(scope='session')
+def ornek_veri():
+    return ornek_veri_olustur(magaza_sayisi=20, urun_sayisi=300, depo_sayisi=3, hafta_sayisi=2, seed=7)
+
+
+@pytest.fixture
+def girdiler(ornek_veri):
+    """sevkiyat_hesapla parametreleri: rastgele hedef matrisler ve eşit öncelikler içeren sıralama"""
+    rng = np.random.default_rng(7)
+    etiketler = segment_etiketleri(VARSAYILAN_ARALIKLAR)
+
+    def matris(alt, ust):
+        return pd.DataFrame(rng.uniform(alt, ust, (len(etiketler), len(etiketler))).round(2),
+                            index=etiketler, columns=etiketler)
+
+    siralama = varsayilan_siralama(etiketler, etiketler)
+    siralama['Oncelik'] = rng.integers(1, 10, len(siralama))
+    return {
+        'urun_master': ornek_veri['urun_master'],
+        'magaza_master': ornek_veri['magaza_master'],
+        'depo_stok': ornek_veri['depo_stok'],
+        'anlik_stok_satis': ornek_veri['anlik_stok_satis'],
+        'kpi': ornek_veri['kpi'],
+        'yasak': ornek_veri['yasak_master'],
+        'matrisler': {
+            'sisme_orani': matris(0.2, 1.0),
+            'genlestirme_orani': matris(0.8, 1.5),
+            'min_oran': matris(0.5, 2.0),
+            'initial_matris': matris(2.0, 4.0)
+        },
+        'siralama': siralama
+    }
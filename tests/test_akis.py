@@ -0,0 +1,85 @@
+"""Aşama önbellekli HesaplamaAkisi: sonuç sevkiyat_hesapla ile aynı, sadece değişen girdinin aşağısı hesaplanır"""
+import pandas as pd
+
+from planlama.akis import HesaplamaAkisi
+from planlama.cekirdek import sevkiyat_hesapla
+
+TUM_ASAMALAR = {'segmentasyon', 'kpi', 'depo_eslestirme', 'matris', 'yeni_urun', 'siralama',
+                'ihtiyac', 'yasak', 'tahsis', 'sonuc'}
+# Matris veya yasak değişince depo eşleştirmesinden sonraki aşamalar
+MATRIS_SONRASI = {'matris', 'ihtiyac', 'yasak', 'tahsis', 'sonuc'}
+
+
+def durumlar(akis):
+    return {kayit['Aşama']: kayit['Durum'] for kayit in akis.son_calisma}
+
+
+def hesaplananlar(akis):
+    return {asama for asama, durum in durumlar(akis).items() if durum == 'hesaplandı'}
+
+
+def onbellekten(akis):
+    return {asama for asama, durum in durumlar(akis).items() if durum == 'önbellek'}
+
+
+def ayni_sonuc(akis, girdiler):
+    sonuc, yeni = akis.hesapla(**girdiler)
+    beklenen, beklenen_yeni = sevkiyat_hesapla(**girdiler)
+    pd.testing.assert_frame_equal(sonuc, beklenen)
+    pd.testing.assert_frame_equal(yeni, beklenen_yeni)
+
+
+def test_ilk_ve_ayni_girdili_hesaplama(girdiler):
+    akis = HesaplamaAkisi()
+    ayni_sonuc(akis, girdiler)
+    assert hesaplananlar(akis) == TUM_ASAMALAR
+
+    ayni_sonuc(akis, girdiler)
+    assert hesaplananlar(akis) == set()
+    assert onbellekten(akis) == {'sonuc', 'yeni_urun'}
+
+
+def test_matris_degisikligi(girdiler):
+    akis = HesaplamaAkisi()
+    akis.hesapla(**girdiler)
+
+    matrisler = {**girdiler['matrisler'], 'min_oran': girdiler['matrisler']['min_oran'] * 1.3}
+    ayni_sonuc(akis, {**girdiler, 'matrisler': matrisler})
+    assert hesaplananlar(akis) == MATRIS_SONRASI
+    assert onbellekten(akis) == {'depo_eslestirme', 'yeni_urun', 'siralama'}
+
+
+def test_yerinde_matris_duzenlemesi(girdiler):
+    # Arayüzdeki matris düzenleyicisi aynı DataFrame nesnesini değiştirebilir
+    akis = HesaplamaAkisi()
+    akis.hesapla(**girdiler)
+
+    girdiler['matrisler']['genlestirme_orani'].iloc[:, 0] += 0.5
+    ayni_sonuc(akis, girdiler)
+    assert hesaplananlar(akis) == MATRIS_SONRASI
+
+
+def test_yasak_degisikligi(girdiler):
+    akis = HesaplamaAkisi()
+    akis.hesapla(**girdiler)
+
+    ayni_sonuc(akis, {**girdiler, 'yasak': girdiler['yasak'].iloc[:3]})
+    assert hesaplananlar(akis) == MATRIS_SONRASI
+    assert onbellekten(akis) == {'depo_eslestirme', 'yeni_urun', 'siralama'}
+
+
+def test_segmentasyon_degisikligi(girdiler):
+    akis = HesaplamaAkisi()
+    akis.hesapla(**girdiler)
+
+    segmentation_params = {'product_ranges': [(0, 3), (4, 10), (11, float('inf'))],
+                           'store_ranges': [(0, 5), (6, float('inf'))]}
+    ayni_sonuc(akis, {**girdiler, 'segmentation_params': segmentation_params, 'siralama': None})
+    assert hesaplananlar(akis) == TUM_ASAMALAR - {'yeni_urun'}
+    assert onbellekten(akis) == {'yeni_urun'}
+
+
+def test_saklanan_asamalar(girdiler):
+    akis = HesaplamaAkisi()
+    akis.hesapla(**girdiler)
+    assert set(akis._onbellek) == {'yeni_urun', 'siralama', 'depo_eslestirme', 'sonuc'}
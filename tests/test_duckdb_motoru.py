@@ -0,0 +1,31 @@
+"""DuckDB motorunun (motor='duckdb') pandas motoruyla aynı sevkiyat sonucunu vermesi"""
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import sevkiyat_hesapla
+from planlama.motor import birlestir, grupla
+
+pytest.importorskip('duckdb')
+
+
+def test_sevkiyat_pandas_motoruyla_ayni(girdiler):
+    beklenen, beklenen_yeni = sevkiyat_hesapla(**girdiler)
+    sonuc, yeni = sevkiyat_hesapla(**girdiler, motor='duckdb')
+
+    pd.testing.assert_frame_equal(sonuc, beklenen)
+    pd.testing.assert_frame_equal(yeni, beklenen_yeni)
+
+
+def test_birlestir_ve_grupla(ornek_veri):
+    anlik_df, magaza_master = ornek_veri['anlik_stok_satis'], ornek_veri['magaza_master']
+    magaza_depo = magaza_master[['magaza_kod', 'depo_kod']]
+
+    pd.testing.assert_frame_equal(
+        birlestir(anlik_df, magaza_depo, 'magaza_kod', motor='duckdb'),
+        birlestir(anlik_df, magaza_depo, 'magaza_kod')
+    )
+    islemler = {'stok': 'sum', 'satis': 'sum', 'magaza_kod': 'nunique'}
+    pd.testing.assert_frame_equal(
+        grupla(anlik_df, 'urun_kod', islemler, motor='duckdb'),
+        grupla(anlik_df, 'urun_kod', islemler)
+    )
@@ -0,0 +1,114 @@
+"""Geniş biçimli ihtiyaç hesabı (ihtiyac_hesapla): kazanan Durum ve eşitlikte RPT > Initial > Min"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import ihtiyac_hesapla, varsayilan_siralama
+
+SEGMENTLER = ['0-4', '5-8']
+
+
+def siralama():
+    return varsayilan_siralama(SEGMENTLER, SEGMENTLER)
+
+
+def anlik(**kolonlar):
+    n = len(next(iter(kolonlar.values())))
+    varsayilan = {
+        'urun_kod': [str(100 + i) for i in range(n)],
+        'magaza_kod': ['M1'] * n,
+        'urun_segment': ['0-4'] * n,
+        'magaza_segment': ['0-4'] * n,
+        'stok': [0.0] * n, 'yol': [0.0] * n, 'satis': [5.0] * n,
+        'genlestirme': [1.0] * n, 'min_oran': [1.0] * n, 'initial_katsayi': [1.0] * n,
+        'min_deger': [10.0] * n, 'max_deger': [np.nan] * n
+    }
+    varsayilan.update(kolonlar)
+    return pd.DataFrame(varsayilan)
+
+
+def eski_ihtiyac(anlik_df, default_fc, yeni_urun_kodlari, siralama_df):
+    """Eski uygulama: RPT, Initial ve Min kopyaları alt alta, mağaza/ürün başına ilk idxmax"""
+    kopyalar = [anlik_df.assign(Durum='RPT')]
+    yeni = anlik_df[anlik_df['urun_kod'].isin(yeni_urun_kodlari)]
+    if len(yeni) > 0:
+        kopyalar.append(yeni.assign(Durum='Initial'))
+    kopyalar.append(anlik_df.assign(Durum='Min'))
+    df = pd.concat(kopyalar, ignore_index=True)
+    df = df.merge(siralama_df, left_on=['magaza_segment', 'urun_segment', 'Durum'],
+                  right_on=['Magaza_Cluster', 'Urun_Cluster', 'Durum'], how='left')
+
+    mevcut = df['stok'] + df['yol']
+    ihtiyac = np.select(
+        [df['Durum'] == 'RPT', df['Durum'] == 'Min'],
+        [default_fc * df['satis'] * df['genlestirme'] - mevcut, df['min_oran'] * df['min_deger'] - mevcut],
+        df['min_deger'] * df['initial_katsayi'] - mevcut
+    )
+    df['ihtiyac'] = np.maximum(ihtiyac, 0)
+    max_sevkiyat = (df['max_deger'] - mevcut).clip(lower=0)
+    df['ihtiyac'] = np.where(max_sevkiyat.notna(), np.minimum(df['ihtiyac'], max_sevkiyat), df['ihtiyac'])
+
+    secili = df.loc[df.groupby(['magaza_kod', 'urun_kod'], sort=False)['ihtiyac'].idxmax()]
+    return secili.set_index(['magaza_kod', 'urun_kod'])[['Durum', 'Oncelik', 'ihtiyac']]
+
+
+def test_esitlikte_ilk_kolon_kazanir():
+    anlik_df = anlik(
+        # RPT = 2 * satis, Min = Initial = 10
+        satis=[5.0, 2.0, 2.0, 50.0, 5.0, 0.0],
+        initial_katsayi=[1.0, 1.0, 3.0, 1.0, 1.0, 1.0],
+        stok=[0.0, 0.0, 0.0, 0.0, 100.0, 0.0],
+        max_deger=[np.nan, np.nan, np.nan, 5.0, np.nan, np.nan]
+    )
+    yeni_urunler = ['100', '101', '103', '104', '105']
+
+    sonuc = ihtiyac_hesapla(anlik_df, 2, yeni_urunler, siralama())
+
+    assert sonuc['Durum'].tolist() == [
+        'RPT',      # üçü de 10
+        'Initial',  # Initial = Min = 10 > RPT
+        'Min',      # yeni ürün değil, Initial aday olamaz
+        'RPT',      # max_deger sınırıyla üçü de 5
+        'RPT',      # hepsi 0
+        'Initial'   # RPT 0, Initial = Min
+    ]
+    np.testing.assert_array_equal(sonuc['ihtiyac'].to_numpy(), [10.0, 10.0, 10.0, 5.0, 0.0, 10.0])
+
+
+def test_kazanan_durumun_onceligi():
+    siralama_df = siralama()
+    anlik_df = anlik(satis=[5.0, 2.0], magaza_segment=['5-8', '5-8'], urun_segment=['0-4', '5-8'])
+
+    sonuc = ihtiyac_hesapla(anlik_df, 2, ['101'], siralama_df)
+
+    oncelik = siralama_df.set_index(['Magaza_Cluster', 'Urun_Cluster', 'Durum'])['Oncelik']
+    assert sonuc['Oncelik'].tolist() == [oncelik[('5-8', '0-4', 'RPT')], oncelik[('5-8', '5-8', 'Initial')]]
+
+
+@pytest.mark.parametrize('tohum', range(10))
+def test_eski_uzun_bicimle_ayni(tohum):
+    rng = np.random.default_rng(tohum)
+    n = 300
+    # Küçük tamsayı değerler: çok sayıda eşitlik
+    anlik_df = anlik(
+        urun_kod=[str(100 + i) for i in range(n)],
+        urun_segment=rng.choice(SEGMENTLER, n),
+        magaza_segment=rng.choice(SEGMENTLER, n),
+        stok=rng.integers(0, 6, n).astype(float),
+        yol=rng.integers(0, 3, n).astype(float),
+        satis=rng.integers(0, 6, n).astype(float),
+        genlestirme=rng.choice([1.0, 2.0], n),
+        min_oran=rng.choice([1.0, 2.0], n),
+        initial_katsayi=rng.choice([1.0, 2.0], n),
+        min_deger=rng.integers(0, 6, n).astype(float),
+        max_deger=np.where(rng.random(n) < 0.3, rng.integers(0, 12, n), np.nan)
+    )
+    yeni_urunler = anlik_df['urun_kod'].sample(n // 3, random_state=tohum).tolist()
+
+    sonuc = ihtiyac_hesapla(anlik_df, 2, yeni_urunler, siralama())
+
+    beklenen = eski_ihtiyac(anlik_df, 2, yeni_urunler, siralama())
+    sonuc = sonuc.set_index(['magaza_kod', 'urun_kod']).loc[beklenen.index]
+    assert sonuc['Durum'].tolist() == beklenen['Durum'].tolist()
+    np.testing.assert_array_equal(sonuc['Oncelik'].to_numpy(), beklenen['Oncelik'].to_numpy())
+    np.testing.assert_array_equal(sonuc['ihtiyac'].to_numpy(), beklenen['ihtiyac'].to_numpy())
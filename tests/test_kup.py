@@ -0,0 +1,97 @@
+"""Rapor küpünün (SevkiyatKupu) seviye toplamlarının sevkiyat_sonuc'un düz groupby'ı ile aynı olması"""
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import sevkiyat_hesapla
+from planlama.kup import kup_olustur
+from planlama.motor import kullanilabilir_motorlar
+
+URUN_BOYUTLARI = ['mg', 'marka_kod', 'kategori_kod']
+MAGAZA_BOYUTLARI = ['il', 'bolge', 'tip']
+
+
+@pytest.fixture
+def sevkiyat_sonuc(girdiler):
+    return sevkiyat_hesapla(**girdiler)[0]
+
+
+@pytest.fixture
+def boyutlu_sonuc(sevkiyat_sonuc, ornek_veri):
+    """sevkiyat_sonuc + master'lardaki ürün/mağaza boyutları (düz pandas birleştirme)"""
+    return sevkiyat_sonuc.merge(
+        ornek_veri['urun_master'][['urun_kod', *URUN_BOYUTLARI]], on='urun_kod', how='left'
+    ).merge(
+        ornek_veri['magaza_master'][['magaza_kod', *MAGAZA_BOYUTLARI]], on='magaza_kod', how='left'
+    )
+
+
+def beklenen_seviye(df, seviye):
+    islemler = {'ihtiyac': ('ihtiyac_miktari', 'sum'), 'sevkiyat': ('sevkiyat_miktari', 'sum'),
+                'kayip': ('stok_yoklugu_satis_kaybi', 'sum')}
+    sayilacaklar = {k: ad for k, ad in (('urun_kod', 'urun'), ('magaza_kod', 'magaza')) if k != seviye}
+    toplam = df.groupby(seviye, observed=True).agg(
+        **islemler, **{f'{ad}_sayisi': (k, 'nunique') for k, ad in sayilacaklar.items()}
+    )
+    kayipli = df[df['stok_yoklugu_satis_kaybi'] > 0].groupby(seviye, observed=True).agg(
+        **{f'kayipli_{ad}': (k, 'nunique') for k, ad in sayilacaklar.items()}
+    )
+    return toplam.join(kayipli).fillna({f'kayipli_{ad}': 0 for ad in sayilacaklar.values()}).reset_index()
+
+
+def karsilastir(kup, df, seviye):
+    beklenen = beklenen_seviye(df, seviye)
+    sonuc = kup.seviye(seviye)[beklenen.columns]
+    pd.testing.assert_frame_equal(sonuc, beklenen, check_dtype=False, check_categorical=False)
+
+
+@pytest.mark.parametrize('motor', [
+    'pandas',
+    pytest.param('duckdb', marks=pytest.mark.skipif('duckdb' not in kullanilabilir_motorlar(), reason='duckdb yok'))
+])
+def test_seviye_toplamlari(ornek_veri, boyutlu_sonuc, sevkiyat_sonuc, motor):
+    kup = kup_olustur(sevkiyat_sonuc, ornek_veri['urun_master'], ornek_veri['magaza_master'], motor=motor)
+
+    assert set(kup.seviyeler) == {'urun_kod', 'urun_segment', *URUN_BOYUTLARI,
+                                  'magaza_kod', 'magaza_segment', *MAGAZA_BOYUTLARI, 'durum'}
+    for seviye in kup.seviyeler:
+        karsilastir(kup, boyutlu_sonuc, seviye)
+
+    # Ad kolonları master'daki adlardır
+    mg_adlari = ornek_veri['urun_master'].drop_duplicates('mg').set_index('mg')['mg_ad']
+    mg = kup.seviye('mg')
+    assert mg['mg_ad'].astype(str).tolist() == mg_adlari.loc[mg['mg']].astype(str).tolist()
+
+
+def test_genel_toplam(ornek_veri, sevkiyat_sonuc):
+    kup = kup_olustur(sevkiyat_sonuc, ornek_veri['urun_master'], ornek_veri['magaza_master'])
+    sevkli = sevkiyat_sonuc[sevkiyat_sonuc['sevkiyat_miktari'] > 0]
+
+    assert kup.toplam() == {
+        'ihtiyac': pytest.approx(sevkiyat_sonuc['ihtiyac_miktari'].sum()),
+        'sevkiyat': pytest.approx(sevkiyat_sonuc['sevkiyat_miktari'].sum()),
+        'kayip': pytest.approx(sevkiyat_sonuc['stok_yoklugu_satis_kaybi'].sum()),
+        'urun_sayisi': sevkiyat_sonuc['urun_kod'].nunique(),
+        'magaza_sayisi': sevkiyat_sonuc['magaza_kod'].nunique(),
+        'sevkli_urun': sevkli['urun_kod'].nunique(),
+        'sevkli_magaza': sevkli['magaza_kod'].nunique()
+    }
+
+
+def test_masterlar_olmadan(sevkiyat_sonuc):
+    kup = kup_olustur(sevkiyat_sonuc)
+    assert kup.seviyeler == ['urun_kod', 'urun_segment', 'magaza_kod', 'magaza_segment', 'durum']
+    karsilastir(kup, sevkiyat_sonuc, 'durum')
+
+
+def test_dilim(ornek_veri, boyutlu_sonuc, sevkiyat_sonuc):
+    kup = kup_olustur(sevkiyat_sonuc, ornek_veri['urun_master'], ornek_veri['magaza_master'])
+    bolgeler = boyutlu_sonuc['bolge'].dropna().unique()[:2].tolist()
+
+    dilim = kup.dilim(['mg', 'bolge'], filtre={'bolge': bolgeler})
+
+    secili = boyutlu_sonuc[boyutlu_sonuc['bolge'].isin(bolgeler)]
+    beklenen = secili.groupby(['mg', 'bolge'], observed=True).agg(
+        ihtiyac=('ihtiyac_miktari', 'sum'), sevkiyat=('sevkiyat_miktari', 'sum'),
+        kayip=('stok_yoklugu_satis_kaybi', 'sum')
+    ).reset_index()
+    pd.testing.assert_frame_equal(dilim, beklenen, check_dtype=False, check_categorical=False)
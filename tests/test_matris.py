@@ -0,0 +1,75 @@
+"""Segment matrislerinin vektörel okunması (matris_degerleri) ve eksik anahtarlarda varsayılan değer"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import matris_degerleri, matrisleri_uygula
+
+
+def eski_matris_degeri(magaza_seg, urun_seg, matrix):
+    """Eski uygulamadaki satır satır okuma: bulunamayan hücre 1.0"""
+    try:
+        return matrix.loc[urun_seg, magaza_seg]
+    except Exception:
+        return 1.0
+
+
+def matris(urun_segmentleri, magaza_segmentleri, tohum):
+    rng = np.random.default_rng(tohum)
+    return pd.DataFrame(
+        rng.uniform(0.5, 2.0, (len(urun_segmentleri), len(magaza_segmentleri))).round(2),
+        index=urun_segmentleri, columns=magaza_segmentleri
+    )
+
+
+def test_eksik_segmentler_varsayilan_deger_alir():
+    genlestirme = pd.DataFrame({'0-4': [1.5, 2.0], '5-8': [1.2, 0.8]}, index=['0-4', '5-8'])
+    urun_segment = pd.Series(['0-4', '5-8', '9-12', '0-4', np.nan])
+    magaza_segment = pd.Series(['5-8', '0-4', '0-4', '20-inf', '0-4'])
+
+    degerler = matris_degerleri(urun_segment, magaza_segment, {'genlestirme': genlestirme})
+
+    # Matriste olmayan ürün segmenti, mağaza segmenti ve boş segment -> 1.0
+    np.testing.assert_array_equal(degerler['genlestirme'], [1.2, 2.0, 1.0, 1.0, 1.0])
+
+
+def test_varsayilan_deger_parametresi():
+    min_oran = pd.DataFrame({'0-4': [0.5]}, index=['0-4'])
+    degerler = matris_degerleri(
+        pd.Series(['0-4', '5-8']), pd.Series(['0-4', '0-4']), {'min_oran': min_oran}, varsayilan=0.0
+    )
+    np.testing.assert_array_equal(degerler['min_oran'], [0.5, 0.0])
+
+
+def test_tekrarli_segmentte_ilk_kayit():
+    matrix = pd.DataFrame({'0-4': [1.5, 9.0]}, index=['0-4', '0-4'])
+    degerler = matris_degerleri(pd.Series(['0-4']), pd.Series(['0-4']), {'sisme': matrix})
+    np.testing.assert_array_equal(degerler['sisme'], [1.5])
+
+
+@pytest.mark.parametrize('tohum', range(10))
+def test_eski_satir_satir_okumayla_ayni(tohum):
+    rng = np.random.default_rng(tohum)
+    # Veride matrislerde olmayan segmentler ve boş segmentler de var
+    urun_secenekleri = np.array(['0-4', '5-8', '9-12', '15-20', None], dtype=object)
+    magaza_secenekleri = np.array(['0-4', '5-8', '9-12', '20-inf', None], dtype=object)
+    anlik_df = pd.DataFrame({
+        'urun_segment': rng.choice(urun_secenekleri, 300),
+        'magaza_segment': rng.choice(magaza_secenekleri, 300)
+    })
+    matrisler = {
+        'genlestirme_orani': matris(['0-4', '5-8', '9-12'], ['0-4', '5-8'], tohum),
+        'sisme_orani': matris(['5-8', '0-4'], ['9-12', '0-4', '5-8'], tohum + 1),
+        'min_oran': matris(['0-4'], ['0-4'], tohum + 2),
+        'initial_matris': matris(['15-20', '9-12'], ['20-inf'], tohum + 3)
+    }
+
+    sonuc = matrisleri_uygula(anlik_df, matrisler)
+
+    for kolon, isim in [('genlestirme', 'genlestirme_orani'), ('sisme', 'sisme_orani'),
+                        ('min_oran', 'min_oran'), ('initial_katsayi', 'initial_matris')]:
+        beklenen = [
+            eski_matris_degeri(m, u, matrisler[isim])
+            for u, m in zip(anlik_df['urun_segment'], anlik_df['magaza_segment'])
+        ]
+        np.testing.assert_array_equal(sonuc[kolon].to_numpy(), np.array(beklenen, dtype=float))
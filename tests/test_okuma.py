@@ -0,0 +1,55 @@
+"""Tipli okumada kodların metne çevrilmesi: '123.0' ve '0123' gibi yazımlar aynı koda eşlenir"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import depo_tahsis_et
+from planlama.kodlama import kod_metni, kodlari_esitle
+from planlama.okuma import csv_oku
+from planlama.tanimlar import VERI_TANIMLARI
+
+
+@pytest.mark.parametrize('kod, beklenen', [
+    ('123', '123'),
+    ('0123', '123'),
+    ('000', '0'),
+    ('123.0', '123'),
+    (123, '123'),
+    (123.0, '123'),
+    ('U0123', 'U0123'),
+    ('0A12', '0A12'),
+    ('12-03', '12-03')
+])
+def test_kod_metni(kod, beklenen):
+    assert kod_metni(kod) == beklenen
+
+
+def test_bos_kod():
+    assert pd.isna(kod_metni(np.nan))
+
+
+def csv(metin):
+    return io.BytesIO(metin.encode('utf-8'))
+
+
+def test_bastaki_sifirlar_dosyalar_arasinda_eslesir():
+    # Depo dosyasında kodlar sıfırlı metin, anlık dosyada sayı olarak yazılmış
+    depo_df = csv_oku(csv(
+        "depo_kod,depo_ad,urun_kod,stok\n"
+        "D1,Depo 1,0123,10\n"
+        "D1,Depo 1,U0456,5\n"
+    ), VERI_TANIMLARI['depo_stok'])
+    anlik_df = csv_oku(csv(
+        "magaza_kod,urun_kod,stok,yol,satis,ciro,smm\n"
+        "M1,123,0,0,4,10.5,8\n"
+        "M2,U0456,1,0,2,5.0,4\n"
+    ), VERI_TANIMLARI['anlik_stok_satis'])
+
+    assert depo_df['urun_kod'].astype(str).tolist() == ['123', 'U0456']
+    assert anlik_df['urun_kod'].astype(str).tolist() == ['123', 'U0456']
+
+    talepler = anlik_df.assign(depo_kod='D1', ihtiyac=[4.0, 2.0])
+    talepler, depo_df = kodlari_esitle(talepler, depo_df)
+    np.testing.assert_array_equal(depo_tahsis_et(talepler, depo_df), [4.0, 2.0])
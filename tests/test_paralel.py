@@ -0,0 +1,14 @@
+"""Depo bazında paralel hesaplamanın (islem_sayisi > 1) tek süreçli sevkiyat_hesapla ile aynı olması"""
+import pandas as pd
+
+from planlama.cekirdek import sevkiyat_hesapla
+
+
+def test_paralel_tek_surecliyle_ayni(girdiler):
+    # Alt süreçler 'spawn' ile başlar; çalışan fonksiyonlar planlama.paralel'dedir
+    beklenen, beklenen_yeni = sevkiyat_hesapla(**girdiler)
+    sonuc, yeni = sevkiyat_hesapla(**girdiler, islem_sayisi=2)
+
+    assert len(beklenen) > 0
+    pd.testing.assert_frame_equal(sonuc, beklenen)
+    pd.testing.assert_frame_equal(yeni, beklenen_yeni)
@@ -0,0 +1,51 @@
+"""Parçalı (out-of-core) hesaplamanın sevkiyat_hesapla ile aynı sonucu dosyaya yazması"""
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import sevkiyat_hesapla
+from planlama.parcali import parcali_sevkiyat_hesapla
+
+pytest.importorskip('pyarrow')
+
+
+def parcali(girdiler, tmp_path, cikti, **kwargs):
+    kaynak = tmp_path / 'anlik_stok_satis.parquet'
+    girdiler['anlik_stok_satis'].to_parquet(kaynak, index=False)
+    diger = {k: v for k, v in girdiler.items() if k != 'anlik_stok_satis'}
+    return parcali_sevkiyat_hesapla(str(kaynak), cikti=str(tmp_path / cikti), **diger, **kwargs)
+
+
+@pytest.mark.parametrize('parca_boyutu, kova_sayisi', [(1_000_000, 16), (200, 3), (97, 1), (333, 7)])
+def test_parcali_tek_seferlikle_ayni(girdiler, tmp_path, parca_boyutu, kova_sayisi):
+    beklenen, beklenen_yeni = sevkiyat_hesapla(**girdiler)
+
+    ozet = parcali(girdiler, tmp_path, 'sonuc.parquet', parca_boyutu=parca_boyutu, kova_sayisi=kova_sayisi)
+
+    # Dosyadaki kod kolonları metin, bellekteki sonuçta kategoridir
+    sonuc = pd.read_parquet(tmp_path / 'sonuc.parquet')
+    pd.testing.assert_frame_equal(sonuc, beklenen, check_dtype=False, check_categorical=False)
+    pd.testing.assert_frame_equal(ozet['yeni_urun_listesi'], beklenen_yeni, check_dtype=False, check_categorical=False)
+    assert ozet['satir'] == len(beklenen)
+    assert ozet['sevkiyat'] == pytest.approx(beklenen['sevkiyat_miktari'].sum())
+    assert ozet['kayip'] == pytest.approx(beklenen['stok_yoklugu_satis_kaybi'].sum())
+
+
+def test_csv_ciktisi(girdiler, tmp_path):
+    beklenen, _ = sevkiyat_hesapla(**girdiler)
+
+    parcali(girdiler, tmp_path, 'sonuc.csv', parca_boyutu=150, kova_sayisi=4)
+
+    assert (tmp_path / 'sonuc.csv').read_bytes() == beklenen.to_csv(index=False).encode('utf-8-sig')
+
+
+def test_birden_fazla_depoya_bagli_magaza(girdiler, tmp_path):
+    # Mağaza birden fazla depoya bağlıysa iki hesaplamada da ilk kayıt geçerli
+    magaza_master = girdiler['magaza_master']
+    ek = magaza_master.iloc[:5].assign(depo_kod=magaza_master['depo_kod'].iloc[-1])
+    girdiler = {**girdiler, 'magaza_master': pd.concat([magaza_master, ek], ignore_index=True)}
+    beklenen, _ = sevkiyat_hesapla(**girdiler)
+
+    parcali(girdiler, tmp_path, 'sonuc.parquet', parca_boyutu=200, kova_sayisi=3)
+
+    sonuc = pd.read_parquet(tmp_path / 'sonuc.parquet')
+    pd.testing.assert_frame_equal(sonuc, beklenen, check_dtype=False, check_categorical=False)
@@ -0,0 +1,31 @@
+"""Polars motorunun (motor='polars') hesaplamanın tamamında pandas motoruyla aynı sonucu vermesi"""
+import pandas as pd
+import pytest
+
+from planlama.akis import HesaplamaAkisi
+from planlama.cekirdek import sevkiyat_hesapla
+
+pytest.importorskip('polars')
+
+
+def test_sevkiyat_pandas_motoruyla_ayni(girdiler):
+    beklenen, beklenen_yeni = sevkiyat_hesapla(**girdiler)
+    sonuc, yeni = sevkiyat_hesapla(**girdiler, motor='polars')
+
+    pd.testing.assert_frame_equal(sonuc, beklenen)
+    pd.testing.assert_frame_equal(yeni, beklenen_yeni)
+
+
+def test_varsayilan_matris_ve_siralama(girdiler):
+    girdiler = {**girdiler, 'matrisler': None, 'siralama': None, 'yasak': None}
+    pd.testing.assert_frame_equal(
+        sevkiyat_hesapla(**girdiler, motor='polars')[0],
+        sevkiyat_hesapla(**girdiler)[0]
+    )
+
+
+def test_akista_tek_asama(girdiler):
+    akis = HesaplamaAkisi()
+    sonuc, _ = akis.hesapla(**girdiler, motor='polars')
+    pd.testing.assert_frame_equal(sonuc, sevkiyat_hesapla(**girdiler)[0])
+    assert [kayit['Aşama'] for kayit in akis.son_calisma] == ['polars']
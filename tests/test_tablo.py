@@ -0,0 +1,73 @@
+"""Sunucu tarafında süzme ve sayfalama (tablo_suz, tablo_sayfasi)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from planlama.tablo import sayfa_sayisi, tablo_sayfasi, tablo_suz
+
+
+@pytest.fixture
+def tablo():
+    return pd.DataFrame({
+        'urun_kod': pd.Categorical(['U1', 'U2', 'U3', 'U4', None, 'U6', 'U7']),
+        'urun_ad': ['Kalem', 'Defter', 'kalem ucu', 'Silgi', 'Kalemtıraş', np.nan, 'Cetvel (30cm)'],
+        'sevkiyat': [5.0, np.nan, 2.0, 5.0, np.nan, 1.0, 5.0]
+    }, index=[10, 11, 12, 13, 14, 15, 16])
+
+
+def test_bos_tablo():
+    bos = pd.DataFrame({'urun_kod': pd.Categorical([]), 'sevkiyat': pd.Series([], dtype=float)})
+    assert sayfa_sayisi(0) == 1
+    assert tablo_suz(bos, 'U1').empty
+    assert tablo_sayfasi(bos, sayfa=3, sayfa_boyutu=10, siralama='sevkiyat').empty
+    assert tablo_sayfasi(bos, sayfa=1, sayfa_boyutu=10).empty
+
+
+def test_arama(tablo):
+    # Büyük/küçük harf duyarsız, düz metin; boş değerler eşleşmez
+    assert tablo_suz(tablo, 'kalem').index.tolist() == [10, 12, 14]
+    assert tablo_suz(tablo, '(30cm)').index.tolist() == [16]
+    assert tablo_suz(tablo, '  ').equals(tablo)
+    assert tablo_suz(tablo, 'nan').empty
+
+
+def test_kategori_kolonunda_arama(tablo):
+    assert tablo_suz(tablo, 'u7').index.tolist() == [16]
+    assert tablo_suz(tablo, 'U', arama_kolonlari=['urun_kod']).index.tolist() == [10, 11, 12, 13, 15, 16]
+    # Olmayan kolonlar yok sayılır
+    assert tablo_suz(tablo, 'U1', arama_kolonlari=['yok', 'urun_kod']).index.tolist() == [10]
+
+
+@pytest.mark.parametrize('sayfa, beklenen', [(1, [10, 11, 12]), (3, [16]), (0, [10, 11, 12]),
+                                             (-5, [10, 11, 12]), (99, [16])])
+def test_aralik_disi_sayfa(tablo, sayfa, beklenen):
+    assert sayfa_sayisi(len(tablo), 3) == 3
+    assert tablo_sayfasi(tablo, sayfa=sayfa, sayfa_boyutu=3).index.tolist() == beklenen
+
+
+def test_siralama_kararli_bos_degerler_sonda(tablo):
+    # Eşit değerlerde tablo sırası korunur; NaN'ler iki yönde de sondadır
+    artan = [tablo_sayfasi(tablo, sayfa, 3, siralama='sevkiyat').index.tolist() for sayfa in (1, 2, 3)]
+    assert artan == [[15, 12, 10], [13, 16, 11], [14]]
+
+    azalan = [tablo_sayfasi(tablo, sayfa, 3, siralama='sevkiyat', artan=False).index.tolist() for sayfa in (1, 2, 3)]
+    assert azalan == [[10, 13, 16], [12, 15, 11], [14]]
+
+    # Son sayfadan sonrası son sayfaya çekilir
+    assert tablo_sayfasi(tablo, 9, 3, siralama='sevkiyat').index.tolist() == [14]
+
+
+def test_kategori_kolonuna_gore_siralama(tablo):
+    sonuc = tablo_sayfasi(tablo, 1, 10, siralama='urun_kod', artan=False)
+    assert sonuc['urun_kod'].tolist()[:-1] == ['U7', 'U6', 'U4', 'U3', 'U2', 'U1']
+    assert pd.isna(sonuc['urun_kod'].iloc[-1])
+
+
+def test_bilinmeyen_siralama_kolonu(tablo):
+    assert tablo_sayfasi(tablo, 2, 3, siralama='yok').index.tolist() == [13, 14, 15]
+
+
+def test_suzme_sonrasi_sayfalama(tablo):
+    suzulmus = tablo_suz(tablo, 'kalem')
+    assert sayfa_sayisi(len(suzulmus), 2) == 2
+    assert tablo_sayfasi(suzulmus, 2, 2, siralama='sevkiyat').index.tolist() == [14]
@@ -0,0 +1,123 @@
+"""Katmanlı depo tahsisinin (depo_tahsis_et) eski satır satır açgözlü döngüyle karşılaştırılması"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from planlama.cekirdek import depo_tahsis_et, talepleri_tahsis_et
+from planlama.kodlama import kodlari_esitle
+
+
+def eski_tahsis(talepler, depo_df):
+    """Eski uygulamadaki döngü: talepler sırayla, kalan stok (depo_kod, urun_kod) sözlüğünde"""
+    depo_stok_dict = {}
+    for depo_kod, urun_kod, stok in zip(depo_df['depo_kod'], depo_df['urun_kod'], depo_df['stok']):
+        key = (str(depo_kod), str(urun_kod))
+        if key not in depo_stok_dict:
+            depo_stok_dict[key] = float(stok)
+
+    sevkiyat_gercek = []
+    for depo_kod, urun_kod, ihtiyac in zip(talepler['depo_kod'], talepler['urun_kod'], talepler['ihtiyac']):
+        ihtiyac = float(ihtiyac)
+        key = (str(depo_kod), str(urun_kod))
+        if key in depo_stok_dict:
+            kalan_stok = depo_stok_dict[key]
+            if kalan_stok >= ihtiyac:
+                sevkiyat = ihtiyac
+                depo_stok_dict[key] -= ihtiyac
+            else:
+                sevkiyat = kalan_stok
+                depo_stok_dict[key] = 0
+        else:
+            sevkiyat = 0
+        sevkiyat_gercek.append(sevkiyat)
+    return np.array(sevkiyat_gercek, dtype=float)
+
+
+def rastgele_veri(tohum, satir_sayisi=400, depo_sayisi=3, urun_sayisi=12, oncelik_sayisi=4, kesirli=False):
+    """Az sayıda öncelik (çok eşitlik), birden fazla depo ve talebi karşılamayan depo stoğu"""
+    rng = np.random.default_rng(tohum)
+    depolar = [f"D{i}" for i in range(depo_sayisi)]
+    urunler = [str(100 + i) for i in range(urun_sayisi)]
+
+    ihtiyac = rng.integers(0, 40, satir_sayisi).astype(float)
+    if kesirli:
+        ihtiyac = ihtiyac + rng.choice([0.0, 0.1, 0.25, 0.7], satir_sayisi)
+    anlik_df = pd.DataFrame({
+        'magaza_kod': [f"M{i}" for i in rng.integers(0, satir_sayisi // 4, satir_sayisi)],
+        'urun_kod': rng.choice(urunler, satir_sayisi),
+        'depo_kod': rng.choice(depolar, satir_sayisi),
+        'ihtiyac': ihtiyac,
+        'Oncelik': rng.integers(1, oncelik_sayisi + 1, satir_sayisi)
+    })
+
+    # Bazı depo/ürün çiftleri depoda yok, bazıları tekrarlı (ilk kayıt geçerli), stoklar talepten az
+    ciftler = [(d, u) for d in depolar for u in urunler if rng.random() < 0.8]
+    ciftler += [ciftler[i] for i in rng.integers(0, len(ciftler), 5)]
+    stok = rng.integers(0, 120, len(ciftler)).astype(float)
+    if kesirli:
+        stok = stok + rng.choice([0.0, 0.3, 0.5], len(ciftler))
+    depo_df = pd.DataFrame({
+        'depo_kod': [d for d, _ in ciftler],
+        'urun_kod': [u for _, u in ciftler],
+        'stok': stok
+    })
+    return anlik_df, depo_df
+
+
+@pytest.mark.parametrize('tohum', range(20))
+@pytest.mark.parametrize('kesirli', [False, True])
+def test_depo_tahsisi_eski_donguyle_ayni(tohum, kesirli):
+    anlik_df, depo_df = rastgele_veri(tohum, kesirli=kesirli)
+    talepler = anlik_df.sort_values('Oncelik', kind='stable').reset_index(drop=True)
+
+    sevkiyat = depo_tahsis_et(talepler, depo_df)
+
+    beklenen = eski_tahsis(talepler, depo_df)
+    np.testing.assert_array_equal(sevkiyat, beklenen)
+    # Stok yetmeyen satırlar olmalı, yoksa test kıtlık durumunu denemiyor
+    assert (sevkiyat < talepler['ihtiyac'].to_numpy()).any()
+
+
+@pytest.mark.parametrize('tohum', range(10))
+def test_kodlanmis_kolonlarla_ayni(tohum):
+    anlik_df, depo_df = rastgele_veri(tohum, depo_sayisi=5)
+    talepler = anlik_df.sort_values('Oncelik', kind='stable').reset_index(drop=True)
+    kodlu_talepler, kodlu_depo = kodlari_esitle(talepler, depo_df)
+
+    np.testing.assert_array_equal(
+        depo_tahsis_et(kodlu_talepler, kodlu_depo),
+        eski_tahsis(talepler, depo_df)
+    )
+
+
+def test_esit_oncelikte_islenme_sirasi():
+    # Aynı öncelikteki iki talepten önce gelen stoğu alır
+    talepler = pd.DataFrame({
+        'depo_kod': ['D1', 'D1', 'D1', 'D2'],
+        'urun_kod': ['100', '100', '100', '100'],
+        'ihtiyac': [6.0, 6.0, 6.0, 6.0],
+        'Oncelik': [1, 1, 1, 1]
+    })
+    depo_df = pd.DataFrame({'depo_kod': ['D1', 'D2'], 'urun_kod': ['100', '100'], 'stok': [10.0, 3.0]})
+
+    np.testing.assert_array_equal(depo_tahsis_et(talepler, depo_df), [6.0, 4.0, 0.0, 3.0])
+
+
+@pytest.mark.parametrize('tohum', range(10))
+def test_talepleri_tahsis_et_eski_akisla_ayni(tohum):
+    anlik_df, depo_df = rastgele_veri(tohum)
+
+    sonuc = talepleri_tahsis_et(anlik_df, depo_df)
+
+    # Eski akış: pozitif ihtiyaçlı satırlardan mağaza/ürün başına en yüksek ihtiyaç, Oncelik sırası
+    result_df = anlik_df[anlik_df['ihtiyac'] > 0]
+    result_df_max = result_df.loc[result_df.groupby(['magaza_kod', 'urun_kod'])['ihtiyac'].idxmax()]
+    result_df_max = result_df_max.sort_values('Oncelik', kind='stable').reset_index(drop=True)
+    beklenen = eski_tahsis(result_df_max, depo_df)
+
+    pd.testing.assert_frame_equal(sonuc[anlik_df.columns], result_df_max)
+    np.testing.assert_array_equal(sonuc['sevkiyat_gercek'].to_numpy(), beklenen)
+    np.testing.assert_array_equal(
+        sonuc['stok_yoklugu_kaybi'].to_numpy(),
+        result_df_max['ihtiyac'].to_numpy() - beklenen
+    )